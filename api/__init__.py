@@ -0,0 +1 @@
+# HTTP API package for Kumbayah application
\ No newline at end of file
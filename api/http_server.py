@@ -0,0 +1,445 @@
+"""
+API HTTP local de disponibilidad para Kumbayah Calendar App.
+
+Servidor asyncio que sólo usa la biblioteca estándar y la misma capa de
+negocio (`modules/`) que la aplicación de escritorio. Pensado para que el
+sitio web consulte la disponibilidad sin abrir la aplicación.
+
+Endpoints:
+    GET  /api/months/AAAA-MM      Disponibilidad de un mes (con ETag)
+    GET  /api/days/AAAA-MM-DD     Disponibilidad de un día
+    POST /api/reservations        Registrar una reserva (JSON)
+
+El trabajo con SQLite se ejecuta en un pool de hilos que comparten un mismo
+`Database`: cada hilo lee con su propia conexión y las escrituras pasan por
+la conexión de escritura única. Las respuestas de mes llevan un ETag derivado de los contadores de
+cambios de la base de datos (`change_versions`), de modo que un mes sin
+cambios se responde con 304 sin volver a consultarlo. Las peticiones
+idénticas simultáneas comparten una sola consulta.
+
+Uso:
+    python -m kumbayah serve --port 8765
+"""
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http import HTTPStatus
+from urllib.parse import urlsplit
+from config.app_config import AppConfig
+from modules.calendar_logic import open_calendar
+from modules.database import Database
+from modules.capacity import OverbookingError
+from modules.maintenance import DatabaseMaintenance
+from utils.validators import validate_client_data, validate_reservation_data, validate_guests, is_reference_required
+
+MAX_HEADERS = 100
+MAX_BODY_SIZE = 64 * 1024
+
+
+class HttpError(Exception):
+    """Error que se responde al cliente con un código HTTP."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class AvailabilityServer:
+    """
+    Servidor HTTP de disponibilidad sobre asyncio.
+
+    Responsable de:
+    - Leer peticiones HTTP/1.1 (con conexiones persistentes)
+    - Ejecutar consultas en hilos, cada uno con su propia conexión de lectura
+    - Responder 304 para meses sin cambios según su ETag
+    - Agrupar peticiones idénticas simultáneas en una sola consulta
+    """
+
+    def __init__(self, db_path, host=None, port=None, workers=None, cors_origin=None):
+        """
+        Inicializar servidor.
+
+        Args:
+            db_path (str): Ruta del archivo SQLite
+            host (str): Dirección de escucha (por defecto AppConfig.API_SERVER)
+            port (int): Puerto de escucha; 0 elige uno libre
+            workers (int): Número de hilos para la base de datos
+            cors_origin (str): Origen permitido para CORS (opcional)
+        """
+        config = AppConfig.API_SERVER
+        self.db_path = db_path
+        self.host = host if host is not None else config['host']
+        self.port = port if port is not None else config['port']
+        self.cors_origin = cors_origin if cors_origin is not None else config['cors_origin']
+
+        self._executor = ThreadPoolExecutor(max_workers=workers or config['workers'],
+                                            thread_name_prefix='kumbayah-api')
+        # Los cambios hechos por la API quedan en el historial con este usuario
+        self._db = Database(db_path, user=config['audit_user'])
+        self._local = threading.local()
+        self._inflight = {}  # clave -> Future de una consulta en curso
+        self._month_cache = OrderedDict()  # (año, mes) -> (etag, cuerpo)
+        self._month_cache_size = config['month_cache_size']
+        self._tables_ready = False
+        self._server = None
+
+    async def start(self):
+        """
+        Empezar a escuchar conexiones.
+
+        Returns:
+            int: Puerto en el que escucha el servidor
+        """
+        # Crear las tablas una sola vez antes de atender peticiones
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._calendar)
+        self._tables_ready = True
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        """Atender conexiones hasta que se cancele la tarea."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Dejar de aceptar conexiones y liberar los hilos."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+        DatabaseMaintenance(self._db).optimize()
+        self._db.close()
+
+    def _calendar(self):
+        """Lógica de calendario del hilo actual sobre la base de datos compartida."""
+        calendar_logic = getattr(self._local, 'calendar_logic', None)
+        if calendar_logic is None:
+            calendar_logic = open_calendar(self.db_path, create_tables=not self._tables_ready,
+                                           db_manager=self._db)
+            self._local.calendar_logic = calendar_logic
+        return calendar_logic
+
+    # --- Conexiones HTTP ---
+
+    async def _handle_connection(self, reader, writer):
+        """Atender una conexión, con varias peticiones si es persistente."""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HttpError as exc:
+                    self._write_response(writer, exc.status, {}, {'error': exc.message}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, path, version, headers, body = request
+                keep_alive = self._wants_keep_alive(version, headers)
+                try:
+                    status, extra_headers, payload = await self._dispatch(method, path, headers, body)
+                except HttpError as exc:
+                    status, extra_headers, payload = exc.status, {}, {'error': exc.message}
+                self._write_response(writer, status, extra_headers, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """
+        Leer una petición HTTP.
+
+        Returns:
+            tuple: (método, ruta, versión, cabeceras, cuerpo) o None si se cerró la conexión
+        """
+        try:
+            request_line = await reader.readline()
+        except ValueError:
+            raise HttpError(HTTPStatus.REQUEST_URI_TOO_LONG, 'Línea de petición demasiado larga')
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Petición mal formada')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, 'Demasiadas cabeceras')
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        body = b''
+        length = headers.get('content-length')
+        if length:
+            try:
+                length = int(length)
+            except ValueError:
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'Content-Length inválido')
+            if length > MAX_BODY_SIZE:
+                raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Cuerpo demasiado grande')
+            body = await reader.readexactly(length)
+
+        return method.upper(), urlsplit(target).path, version.upper(), headers, body
+
+    def _wants_keep_alive(self, version, headers):
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    def _write_response(self, writer, status, extra_headers, payload, keep_alive):
+        """Escribir una respuesta; payload puede ser bytes ya codificados, un objeto JSON o None."""
+        if payload is None:
+            body = b''
+        elif isinstance(payload, bytes):
+            body = payload
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+        headers = {
+            'Content-Length': str(len(body)),
+            'Cache-Control': 'no-cache',
+            'Connection': 'keep-alive' if keep_alive else 'close',
+        }
+        if body:
+            headers['Content-Type'] = 'application/json; charset=utf-8'
+        if self.cors_origin:
+            headers['Access-Control-Allow-Origin'] = self.cors_origin
+            headers['Access-Control-Expose-Headers'] = 'ETag'
+        headers.update(extra_headers)
+
+        lines = [f'HTTP/1.1 {status.value} {status.phrase}']
+        lines.extend(f'{name}: {value}' for name, value in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+
+    # --- Rutas ---
+
+    async def _dispatch(self, method, path, headers, body):
+        """
+        Enrutar una petición.
+
+        Returns:
+            tuple: (HTTPStatus, cabeceras adicionales, cuerpo)
+        """
+        parts = [part for part in path.split('/') if part]
+        if method == 'OPTIONS' and self.cors_origin:
+            return HTTPStatus.NO_CONTENT, {
+                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type, If-None-Match',
+            }, None
+
+        if len(parts) == 3 and parts[:2] == ['api', 'months']:
+            self._require_method(method, 'GET')
+            year, month = _parse_month(parts[2])
+            return await self._get_month(year, month, headers)
+
+        if len(parts) == 3 and parts[:2] == ['api', 'days']:
+            self._require_method(method, 'GET')
+            day = _parse_date(parts[2])
+            result = await self._coalesce(('day', day), self._day_status, day)
+            return HTTPStatus.OK, {}, result
+
+        if parts == ['api', 'reservations']:
+            self._require_method(method, 'POST')
+            return await self._post_reservation(body)
+
+        raise HttpError(HTTPStatus.NOT_FOUND, 'Ruta no encontrada')
+
+    def _require_method(self, method, allowed):
+        if method != allowed:
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f'Método no permitido (use {allowed})')
+
+    async def _get_month(self, year, month, headers):
+        """Responder un mes, con 304 si el cliente ya tiene la versión actual."""
+        etag = await self._coalesce(('version', year, month), self._month_etag, year, month)
+        if etag in _parse_etags(headers.get('if-none-match', '')):
+            return HTTPStatus.NOT_MODIFIED, {'ETag': etag}, None
+
+        key = (year, month)
+        cached = self._month_cache.get(key)
+        if cached is not None and cached[0] == etag:
+            self._month_cache.move_to_end(key)
+            return HTTPStatus.OK, {'ETag': etag}, cached[1]
+
+        etag, body = await self._coalesce(('month', year, month), self._month_body, year, month)
+        self._month_cache[key] = (etag, body)
+        self._month_cache.move_to_end(key)
+        while len(self._month_cache) > self._month_cache_size:
+            self._month_cache.popitem(last=False)
+        return HTTPStatus.OK, {'ETag': etag}, body
+
+    async def _post_reservation(self, body):
+        """Registrar una reserva enviada como JSON."""
+        try:
+            data = json.loads(body.decode('utf-8') or '{}')
+        except (UnicodeDecodeError, ValueError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'JSON inválido')
+        if not isinstance(data, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Se espera un objeto JSON')
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executor, self._book, data)
+        return HTTPStatus.CREATED, {}, result
+
+    async def _coalesce(self, key, func, *args):
+        """
+        Ejecutar func en el pool de hilos, compartiendo el resultado entre
+        peticiones idénticas que lleguen mientras está en curso.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+            self._inflight[key] = future
+
+            def _forget(done, key=key):
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+            future.add_done_callback(_forget)
+        # shield: si un cliente se desconecta, los demás siguen esperando el resultado
+        return await asyncio.shield(future)
+
+    # --- Trabajo en hilos (base de datos) ---
+
+    def _month_etag(self, year, month):
+        month_version, global_version = self._calendar().reservations_manager.get_month_version(year, month)
+        return f'"{year:04d}{month:02d}-{month_version}-{global_version}"'
+
+    def _month_body(self, year, month):
+        calendar_logic = self._calendar()
+        # La versión se lee antes que los datos: si algo cambia entre ambas
+        # lecturas, el ETag queda más antiguo que el cuerpo y el siguiente
+        # cliente simplemente vuelve a descargarlo
+        etag = self._month_etag(year, month)
+        calendar_logic.set_month_year(month, year)
+        days = [
+            _public_day(day_info)
+            for week in calendar_logic.get_month_calendar_data()
+            for day_info in week if day_info.is_current_month
+        ]
+        body = json.dumps({'month': f'{year:04d}-{month:02d}', 'days': days}, ensure_ascii=False)
+        return etag, body.encode('utf-8')
+
+    def _day_status(self, day):
+        return _public_day(self._calendar().get_day_status(day))
+
+    def _book(self, data):
+        fields = {name: str(data.get(name, '')).strip()
+                  for name in ('date', 'first_name', 'last_name', 'phone', 'amount', 'guests',
+                               'payment_status', 'payment_method', 'reference')}
+        day = _parse_date(fields['date'])
+        payment_status = fields['payment_status'] or AppConfig.PAYMENT_STATUSES[-1]
+        # Sin método, el primero que no pide referencia (p. ej. una reserva aún sin pagar)
+        payment_method = fields['payment_method'] or next(
+            method for method in AppConfig.PAYMENT_METHODS if not is_reference_required(method))
+        if payment_status not in AppConfig.PAYMENT_STATUSES:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Estado de pago inválido')
+        if payment_method not in AppConfig.PAYMENT_METHODS:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Método de pago inválido')
+
+        valid, error = validate_client_data(fields['first_name'], fields['last_name'], fields['phone'])
+        if not valid:
+            raise HttpError(HTTPStatus.BAD_REQUEST, error)
+        calendar_logic = self._calendar()
+        if not fields['amount']:
+            # Sin monto, el de las tarifas
+            price = calendar_logic.get_price(day)
+            if price is None:
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'No hay tarifa para ese día: indique el monto')
+            fields['amount'] = str(price)
+        valid, error = validate_reservation_data(fields['amount'], payment_method, fields['reference'])
+        if not valid:
+            raise HttpError(HTTPStatus.BAD_REQUEST, error)
+        guests = fields['guests'] or str(AppConfig.CAPACITY['default_guests'])
+        valid, error = validate_guests(guests)
+        if not valid:
+            raise HttpError(HTTPStatus.BAD_REQUEST, error)
+
+        # Comprobar y registrar en la misma transacción de escritura para que
+        # dos peticiones simultáneas (o la aplicación) no reserven el mismo día
+        with self._db.write():
+            if not calendar_logic.get_day_status(day).is_available:
+                raise HttpError(HTTPStatus.CONFLICT, AppConfig.LABELS['unavailable_detail'])
+            try:
+                calendar_logic.add_or_update_reservation(
+                    day,
+                    {'first_name': fields['first_name'], 'last_name': fields['last_name'], 'phone': fields['phone']},
+                    {'amount': float(fields['amount']), 'guests': int(guests), 'payment_status': payment_status,
+                     'payment_method': payment_method, 'reference': fields['reference']}
+                )
+            except OverbookingError as exc:
+                raise HttpError(HTTPStatus.CONFLICT, str(exc))
+            return _public_day(calendar_logic.get_day_status(day))
+
+
+def serve(db_path, host=None, port=None, workers=None):
+    """
+    Ejecutar el servidor hasta Ctrl+C.
+
+    Args:
+        db_path (str): Ruta del archivo SQLite
+        host (str): Dirección de escucha
+        port (int): Puerto de escucha
+        workers (int): Número de hilos para la base de datos
+    """
+    server = AvailabilityServer(db_path, host, port, workers)
+
+    async def _run():
+        port = await server.start()
+        print(f'Kumbayah API escuchando en http://{server.host}:{port}', flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+
+
+def _public_day(day_info):
+    """Estado público de un día, sin datos personales del cliente."""
+    if day_info.reservation:
+        status = 'reserved'
+    elif not day_info.is_available:
+        status = 'blocked'
+    else:
+        status = 'available'
+    return {'date': day_info.date_str, 'available': day_info.is_available, 'status': status,
+            'guests': day_info.guests, 'capacity': day_info.capacity}
+
+
+def _parse_etags(value):
+    return {tag.strip() for tag in value.split(',') if tag.strip()}
+
+
+def _parse_month(value):
+    try:
+        year, month = (int(part) for part in value.split('-'))
+        date(year, month, 1)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'Mes inválido (se espera AAAA-MM)')
+    return year, month
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'Fecha inválida (se espera AAAA-MM-DD)')
@@ -0,0 +1 @@
+# CLI package for Kumbayah application
\ No newline at end of file
@@ -0,0 +1,787 @@
+"""
+Interfaz de línea de comandos para Kumbayah Calendar App.
+
+Reutiliza la capa de negocio (`modules/`) sin importar tkinter, para poder
+consultar y modificar el calendario desde scripts. Cada comando escribe una
+línea JSON en la salida estándar. El modo `batch` lee comandos de la entrada
+estándar y los ejecuta todos sobre una sola conexión.
+
+Ejemplos:
+    python -m kumbayah availability 2026-10-05
+    python -m kumbayah month 2026-10
+    python -m kumbayah block 2026-11-01 --to 2026-11-30
+    python -m kumbayah pay 2026-10-05 --amount 40 --method Efectivo
+    python -m kumbayah outstanding
+    python -m kumbayah agenda --from 2026-10-19 --limit 200 --due
+    python -m kumbayah reconcile extracto.csv --dry-run
+    python -m kumbayah resources add "Cabaña 2" --kind cabaña
+    python -m kumbayah --resource 2 book 2026-10-05 --first-name Ana ...
+    python -m kumbayah occupancy 2026-10
+    python -m kumbayah capacity set 2026-12-24 --to 2026-12-31 60
+    python -m kumbayah rates add-yearly 12-15 01-15 80 --label "Temporada alta"
+    python -m kumbayah quote 2026-12-20 --nights 14 --resources 1,2,3
+    python -m kumbayah clients duplicates --limit 50
+    python -m kumbayah clients merge 12 40 77
+    python -m kumbayah sync export a_sede2.json.gz
+    python -m kumbayah sync import de_sede2.json.gz
+    python -m kumbayah --user ana audit history 2026-10-05 --limit 20
+    python -m kumbayah batch < comandos.txt
+    python -m kumbayah serve --port 8765
+"""
+import argparse
+import calendar
+import csv
+import json
+import shlex
+import sqlite3
+import sys
+from datetime import date
+from config.app_config import AppConfig
+from modules.calendar_logic import open_calendar
+from modules.database import DEFAULT_RESOURCE_ID
+from modules.dedup import Deduplicator
+from modules.pricing import weekday_list, weekday_mask
+from modules.maintenance import DatabaseMaintenance
+from modules.reconciliation import Reconciler
+from modules.replication import Replicator
+from utils.dates import from_day_number
+from utils.validators import validate_client_data, validate_reservation_data, validate_guests
+
+DEFAULT_DB_PATH = 'kumbayah.db'
+
+# Campos de reserva incluidos en la salida JSON y en la exportación
+RESERVATION_FIELDS = ['resource_id', 'date', 'first_name', 'last_name', 'phone', 'guests', 'amount',
+                      'paid_total', 'payment_status', 'payment_method', 'reference', 'created_at']
+
+# Campos de un cambio del historial en la salida JSON (la fecha y las columnas
+# cambiadas se añaden ya convertidas)
+AUDIT_FIELDS = ['id', 'resource_id', 'entity', 'action', 'payment_id', 'user']
+# El historial guarda el nombre del cliente en la columna client_id
+AUDIT_CHANGE_KEYS = {'client_id': 'client'}
+
+
+class CliError(Exception):
+    """Error de uso o de datos que se informa al usuario sin traza."""
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser que lanza CliError en lugar de terminar el proceso."""
+
+    def error(self, message):
+        raise CliError(message)
+
+
+def build_parser():
+    """Crear el parser de argumentos con todos los subcomandos."""
+    parser = _ArgumentParser(prog='python -m kumbayah', description=AppConfig.WINDOW_TITLE)
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Ruta de la base de datos SQLite')
+    parser.add_argument('--resource', type=int, default=DEFAULT_RESOURCE_ID,
+                        help='Id del recurso (cabaña, parcela, salón) sobre el que actúa el comando')
+    parser.add_argument('--user', help='Usuario que figura en el historial de cambios (por defecto el del sistema)')
+    commands = parser.add_subparsers(dest='command', metavar='COMANDO')
+    commands.required = True
+
+    cmd = commands.add_parser('availability', help='Consultar disponibilidad de uno o varios días')
+    cmd.add_argument('date', type=_parse_date)
+    cmd.add_argument('--to', type=_parse_date, help='Último día del rango (inclusive)')
+    cmd.set_defaults(handler=cmd_availability)
+
+    cmd = commands.add_parser('month', help='Listar los días de un mes (AAAA-MM)')
+    cmd.add_argument('month', type=_parse_month)
+    cmd.set_defaults(handler=cmd_month)
+
+    cmd = commands.add_parser('book', help='Registrar una reserva')
+    cmd.add_argument('date', type=_parse_date)
+    cmd.add_argument('--first-name', required=True)
+    cmd.add_argument('--last-name', required=True)
+    cmd.add_argument('--phone', required=True)
+    cmd.add_argument('--amount', help='Monto (por defecto el precio de las tarifas)')
+    cmd.add_argument('--guests', default=str(AppConfig.CAPACITY['default_guests']))
+    cmd.add_argument('--status', default=AppConfig.PAYMENT_STATUSES[0], choices=AppConfig.PAYMENT_STATUSES)
+    cmd.add_argument('--method', default=AppConfig.PAYMENT_METHODS[0], choices=AppConfig.PAYMENT_METHODS)
+    cmd.add_argument('--reference', default='')
+    cmd.set_defaults(handler=cmd_book)
+
+    cmd = commands.add_parser('cancel', help='Eliminar la reserva de un día')
+    cmd.add_argument('date', type=_parse_date)
+    cmd.set_defaults(handler=cmd_cancel)
+
+    cmd = commands.add_parser('pay', help='Registrar un pago de la reserva de un día')
+    cmd.add_argument('date', type=_parse_date)
+    cmd.add_argument('--amount', required=True)
+    cmd.add_argument('--method', default=AppConfig.PAYMENT_METHODS[0], choices=AppConfig.PAYMENT_METHODS)
+    cmd.add_argument('--reference', default='')
+    cmd.set_defaults(handler=cmd_pay)
+
+    cmd = commands.add_parser('payments', help='Listar los pagos de la reserva de un día')
+    cmd.add_argument('date', type=_parse_date)
+    cmd.set_defaults(handler=cmd_payments)
+
+    cmd = commands.add_parser('outstanding', help='Listar las reservas con saldo pendiente')
+    cmd.set_defaults(handler=cmd_outstanding)
+
+    cmd = commands.add_parser('agenda', help='Próximas reservas de todos los recursos a partir de una fecha')
+    cmd.add_argument('--from', dest='start', type=_parse_date, default=None, help='Primer día (por defecto hoy)')
+    cmd.add_argument('--limit', type=int, default=AppConfig.AGENDA_VIEW['page_size'])
+    cmd.add_argument('--due', action='store_true', help='Sólo reservas con saldo pendiente')
+    cmd.set_defaults(handler=cmd_agenda)
+
+    cmd = commands.add_parser('reconcile', help='Conciliar pagos con referencia con un extracto bancario CSV')
+    cmd.add_argument('csv_path', metavar='CSV')
+    cmd.add_argument('--dry-run', action='store_true', help='Mostrar coincidencias sin marcar los pagos')
+    cmd.add_argument('--amount-tolerance', type=float, default=AppConfig.RECONCILIATION['amount_tolerance'])
+    cmd.add_argument('--date-tolerance', type=int, default=AppConfig.RECONCILIATION['date_tolerance_days'],
+                     help='Días de diferencia permitidos entre el pago y el movimiento')
+    cmd.add_argument('--delimiter', default=AppConfig.RECONCILIATION['delimiter'])
+    cmd.set_defaults(handler=cmd_reconcile)
+
+    for name, available, help_text in (('block', False, 'Bloquear uno o varios días'),
+                                       ('unblock', True, 'Liberar uno o varios días')):
+        cmd = commands.add_parser(name, help=help_text)
+        cmd.add_argument('date', type=_parse_date)
+        cmd.add_argument('--to', type=_parse_date, help='Último día del rango (inclusive)')
+        cmd.set_defaults(handler=cmd_set_availability, available=available)
+
+    cmd = commands.add_parser('export', help='Exportar reservas en JSON o CSV')
+    cmd.add_argument('--from', dest='start', type=_parse_date, default=date.min)
+    cmd.add_argument('--to', dest='end', type=_parse_date, default=date.max)
+    cmd.add_argument('--format', choices=['json', 'csv'], default='json')
+    cmd.add_argument('--output', help='Archivo de destino (por defecto, salida estándar)')
+    cmd.set_defaults(handler=cmd_export)
+
+    cmd = commands.add_parser('occupancy', help='Ocupación de todos los recursos en un mes (AAAA-MM)')
+    cmd.add_argument('month', type=_parse_month)
+    cmd.set_defaults(handler=cmd_occupancy)
+
+    cmd = commands.add_parser('resources', help='Gestionar recursos (cabañas, parcelas, salones)')
+    resources = cmd.add_subparsers(dest='resources_command', metavar='ACCION')
+    resources.required = True
+    sub = resources.add_parser('list', help='Listar recursos')
+    sub.add_argument('--all', action='store_true', help='Incluir recursos desactivados')
+    sub.set_defaults(handler=cmd_resources_list)
+    sub = resources.add_parser('add', help='Agregar un recurso')
+    sub.add_argument('name')
+    sub.add_argument('--kind', default=None)
+    sub.add_argument('--order', type=int, default=0)
+    sub.add_argument('--capacity', type=int, default=None, help='Huéspedes máximos por reserva')
+    sub.set_defaults(handler=cmd_resources_add)
+    sub = resources.add_parser('set-capacity', help='Cambiar los huéspedes máximos por reserva (sin valor: sin límite)')
+    sub.add_argument('resource_id', type=int)
+    sub.add_argument('capacity', type=int, nargs='?')
+    sub.set_defaults(handler=cmd_resources_set_capacity)
+    for name, active, help_text in (('enable', True, 'Activar un recurso'),
+                                    ('disable', False, 'Desactivar un recurso (conserva sus reservas)')):
+        sub = resources.add_parser(name, help=help_text)
+        sub.add_argument('resource_id', type=int)
+        sub.set_defaults(handler=cmd_resources_set_active, active=active)
+
+    cmd = commands.add_parser('capacity', help='Capacidad de huéspedes por día (todos los recursos)')
+    capacity = cmd.add_subparsers(dest='capacity_command', metavar='ACCION')
+    capacity.required = True
+    sub = capacity.add_parser('show', help='Huéspedes, capacidad y plazas libres de cada día del mes (AAAA-MM)')
+    sub.add_argument('month', type=_parse_month)
+    sub.set_defaults(handler=cmd_capacity_show)
+    sub = capacity.add_parser('set', help='Fijar la capacidad de uno o varios días')
+    sub.add_argument('date', type=_parse_date)
+    sub.add_argument('capacity', type=int)
+    sub.add_argument('--to', type=_parse_date, help='Último día del rango (inclusive)')
+    sub.set_defaults(handler=cmd_capacity_set)
+    sub = capacity.add_parser('clear', help='Volver a la capacidad por defecto en uno o varios días')
+    sub.add_argument('date', type=_parse_date)
+    sub.add_argument('--to', type=_parse_date, help='Último día del rango (inclusive)')
+    sub.set_defaults(handler=cmd_capacity_set, capacity=None)
+
+    cmd = commands.add_parser('rates', help='Gestionar tarifas por noche (temporadas y días de la semana)')
+    rates = cmd.add_subparsers(dest='rates_command', metavar='ACCION')
+    rates.required = True
+    sub = rates.add_parser('list', help='Listar tarifas')
+    sub.set_defaults(handler=cmd_rates_list)
+    sub = rates.add_parser('add-base', help='Precio por defecto')
+    sub.add_argument('price', type=float)
+    sub.set_defaults(handler=cmd_rates_add, kind='base')
+    sub = rates.add_parser('add-season', help='Precio entre dos fechas')
+    sub.add_argument('start', type=_parse_date)
+    sub.add_argument('end', type=_parse_date)
+    sub.add_argument('price', type=float)
+    sub.set_defaults(handler=cmd_rates_add, kind='range')
+    sub = rates.add_parser('add-yearly', help='Precio en un periodo que se repite cada año (MM-DD MM-DD)')
+    sub.add_argument('start', type=_parse_month_day)
+    sub.add_argument('end', type=_parse_month_day)
+    sub.add_argument('price', type=float)
+    sub.set_defaults(handler=cmd_rates_add, kind='yearly')
+    for sub in (rates.choices['add-base'], rates.choices['add-season'], rates.choices['add-yearly']):
+        sub.add_argument('--resource-id', type=int, default=None, help='Sólo para este recurso (por defecto todos)')
+        sub.add_argument('--weekdays', type=_parse_weekdays, default=None,
+                         help='Sólo estos días de la semana, p. ej. 4,5 (0=lunes ... 6=domingo)')
+        sub.add_argument('--label', default='')
+    sub = rates.add_parser('delete', help='Eliminar una tarifa')
+    sub.add_argument('rate_id', type=int)
+    sub.set_defaults(handler=cmd_rates_delete)
+
+    cmd = commands.add_parser('quote', help='Presupuesto de una estancia en uno o varios recursos')
+    cmd.add_argument('date', type=_parse_date, help='Primera noche')
+    group = cmd.add_mutually_exclusive_group()
+    group.add_argument('--to', type=_parse_date, help='Última noche (inclusive)')
+    group.add_argument('--nights', type=int, help='Número de noches')
+    cmd.add_argument('--resources', type=_parse_id_list, default=None,
+                     help='Ids de recurso separados por comas (por defecto --resource)')
+    cmd.set_defaults(handler=cmd_quote)
+
+    cmd = commands.add_parser('clients', help='Detectar y fusionar clientes duplicados')
+    clients = cmd.add_subparsers(dest='clients_command', metavar='ACCION')
+    clients.required = True
+    sub = clients.add_parser('duplicates', help='Listar parejas de clientes que parecen la misma persona')
+    sub.add_argument('--min-similarity', type=float, default=AppConfig.DEDUP['min_similarity'],
+                     help='Parecido mínimo de los nombres (0 a 1) cuando el teléfono no coincide')
+    sub.add_argument('--limit', type=int, default=100, help='Máximo de parejas a mostrar')
+    sub.set_defaults(handler=cmd_clients_duplicates)
+    sub = clients.add_parser('merge', help='Fusionar duplicados en un cliente (sus reservas pasan a él)')
+    sub.add_argument('keep_id', type=int)
+    sub.add_argument('duplicate_ids', type=int, nargs='+')
+    sub.set_defaults(handler=cmd_clients_merge)
+
+    cmd = commands.add_parser('rules', help='Gestionar reglas de disponibilidad')
+    rules = cmd.add_subparsers(dest='rules_command', metavar='ACCION')
+    rules.required = True
+    sub = rules.add_parser('list', help='Listar reglas')
+    sub.set_defaults(handler=cmd_rules_list)
+    sub = rules.add_parser('add-weekly', help='Bloquear un día de la semana (0=lunes ... 6=domingo)')
+    sub.add_argument('weekday', type=int, choices=range(7))
+    sub.add_argument('--from', dest='start', type=_parse_date)
+    sub.add_argument('--to', dest='end', type=_parse_date)
+    sub.add_argument('--label', default='')
+    sub.set_defaults(handler=cmd_rules_add_weekly)
+    sub = rules.add_parser('add-range', help='Bloquear un rango de fechas')
+    sub.add_argument('start', type=_parse_date)
+    sub.add_argument('end', type=_parse_date)
+    sub.add_argument('--label', default='')
+    sub.set_defaults(handler=cmd_rules_add_range)
+    sub = rules.add_parser('add-yearly', help='Bloquear un periodo anual (MM-DD MM-DD)')
+    sub.add_argument('start', type=_parse_month_day)
+    sub.add_argument('end', type=_parse_month_day)
+    sub.add_argument('--label', default='')
+    sub.set_defaults(handler=cmd_rules_add_yearly)
+    sub = rules.add_parser('delete', help='Eliminar una regla')
+    sub.add_argument('rule_id', type=int)
+    sub.set_defaults(handler=cmd_rules_delete)
+
+    cmd = commands.add_parser('sync', help='Replicar cambios con otra instalación mediante archivos')
+    sync = cmd.add_subparsers(dest='sync_command', metavar='ACCION')
+    sync.required = True
+    sub = sync.add_parser('status', help='Identificador de esta instalación y estado de las demás')
+    sub.set_defaults(handler=cmd_sync_status)
+    sub = sync.add_parser('export', help='Escribir los cambios que la otra instalación aún no tiene')
+    sub.add_argument('path', help='Archivo de cambios (.json.gz)')
+    sub.add_argument('--peer', help='Identificador del destino (por defecto la única instalación conocida)')
+    sub.set_defaults(handler=cmd_sync_export)
+    sub = sync.add_parser('import', help='Aplicar un archivo de cambios de otra instalación')
+    sub.add_argument('path')
+    sub.set_defaults(handler=cmd_sync_import)
+    sub = sync.add_parser('new-origin', help='Nuevo identificador (tras copiar la base de datos a otra sede)')
+    sub.set_defaults(handler=cmd_sync_new_origin)
+
+    cmd = commands.add_parser('audit', help='Historial de cambios de reservas y pagos')
+    audit = cmd.add_subparsers(dest='audit_command', metavar='ACCION')
+    audit.required = True
+    sub = audit.add_parser('history', help='Cambios de la reserva de un día, del más reciente al más antiguo')
+    sub.add_argument('date', type=_parse_date)
+    sub.add_argument('--limit', type=int, default=AppConfig.AUDIT['page_size'])
+    sub.set_defaults(handler=cmd_audit_history)
+    sub = audit.add_parser('prune', help='Eliminar los cambios más antiguos que la retención')
+    sub.add_argument('--days', type=int, default=AppConfig.AUDIT['retention_days'],
+                     help='Días de historial que se conservan')
+    sub.set_defaults(handler=cmd_audit_prune)
+
+    cmd = commands.add_parser('batch', help='Ejecutar comandos leídos de la entrada estándar')
+    cmd.set_defaults(handler=None)
+
+    cmd = commands.add_parser('serve', help='Iniciar la API HTTP local de disponibilidad')
+    cmd.add_argument('--host', default=AppConfig.API_SERVER['host'])
+    cmd.add_argument('--port', type=int, default=AppConfig.API_SERVER['port'])
+    cmd.add_argument('--workers', type=int, default=AppConfig.API_SERVER['workers'])
+    cmd.set_defaults(handler=None)
+
+    return parser
+
+
+def cmd_availability(calendar_logic, args):
+    """Disponibilidad de un día o de un rango."""
+    days = calendar_logic.get_range_status(args.date, args.to or args.date)
+    return [_day_to_json(day_info) for day_info in days]
+
+
+def cmd_month(calendar_logic, args):
+    """Todos los días del mes indicado."""
+    year, month = args.month
+    calendar_logic.set_month_year(month, year)
+    return [_day_to_json(day_info)
+            for week in calendar_logic.get_month_calendar_data()
+            for day_info in week if day_info.is_current_month]
+
+
+def cmd_book(calendar_logic, args):
+    """Registrar una reserva en un día disponible."""
+    valid, error = validate_client_data(args.first_name, args.last_name, args.phone)
+    if not valid:
+        raise CliError(error)
+    amount = args.amount
+    if amount is None:
+        price = calendar_logic.get_price(args.date)
+        if price is None:
+            raise CliError('no hay tarifa para ese día: indique --amount')
+        amount = str(price)
+    valid, error = validate_reservation_data(amount, args.method, args.reference)
+    if valid:
+        valid, error = validate_guests(args.guests)
+    if not valid:
+        raise CliError(error)
+    if not calendar_logic.get_day_status(args.date).is_available:
+        raise CliError(AppConfig.LABELS['unavailable_detail'])
+
+    # Un OverbookingError (ValueError) se informa como error del comando
+    calendar_logic.add_or_update_reservation(
+        args.date,
+        {'first_name': args.first_name, 'last_name': args.last_name, 'phone': args.phone},
+        {'amount': float(amount), 'guests': int(args.guests), 'payment_status': args.status,
+         'payment_method': args.method, 'reference': args.reference}
+    )
+    return _day_to_json(calendar_logic.get_day_status(args.date))
+
+
+def cmd_cancel(calendar_logic, args):
+    """Eliminar la reserva de un día."""
+    calendar_logic.delete_reservation(args.date)
+    return _day_to_json(calendar_logic.get_day_status(args.date))
+
+
+def cmd_pay(calendar_logic, args):
+    """Registrar un pago de una reserva existente."""
+    valid, error = validate_reservation_data(args.amount, args.method, args.reference)
+    if not valid or float(args.amount) <= 0:
+        raise CliError(error or AppConfig.LABELS['amount_invalid'])
+    if calendar_logic.get_day_status(args.date).reservation is None:
+        raise CliError(f'no hay reserva el {args.date.isoformat()}')
+    # Un OverpaymentError (ValueError) se informa como error del comando
+    calendar_logic.add_payment(args.date, float(args.amount), args.method, args.reference)
+    return _day_to_json(calendar_logic.get_day_status(args.date))
+
+
+def cmd_payments(calendar_logic, args):
+    """Historial de pagos de la reserva de un día."""
+    return [dict({field: value for field, value in payment._asdict().items() if field != 'day'},
+                 date=from_day_number(payment.day).isoformat())
+            for payment in calendar_logic.get_payments(args.date)]
+
+
+def cmd_outstanding(calendar_logic, args):
+    """Reservas con saldo pendiente y el total, con una consulta cada uno."""
+    count, balance = calendar_logic.reservations_manager.get_outstanding_total()
+    return {
+        'count': count,
+        'balance': balance,
+        'reservations': [dict({field: getattr(row, field) for field in RESERVATION_FIELDS}, balance=row.balance)
+                         for row in calendar_logic.get_outstanding()]
+    }
+
+
+def cmd_agenda(calendar_logic, args):
+    """Reservas en orden cronológico desde una fecha, con una consulta sobre un índice parcial."""
+    manager = calendar_logic.reservations_manager
+    rows = manager.get_agenda(manager.agenda_start(args.start or date.today()), True, args.limit, args.due)
+    return [dict({field: getattr(row, field) for field in RESERVATION_FIELDS}, balance=row.balance) for row in rows]
+
+
+def cmd_reconcile(calendar_logic, args):
+    """Conciliar en una sola transacción los pagos que coinciden con el extracto."""
+    config = dict(AppConfig.RECONCILIATION, amount_tolerance=args.amount_tolerance,
+                  date_tolerance_days=args.date_tolerance, delimiter=args.delimiter)
+    try:
+        result = Reconciler(calendar_logic.db_manager, config).reconcile(args.csv_path, args.dry_run)
+    except OSError as exc:
+        raise CliError(str(exc))
+    return {
+        'movements': result.movements,
+        'matched': len(result.matches),
+        'skipped': result.skipped,
+        'pending_payments': result.pending,
+        'dry_run': args.dry_run,
+        'reservations': [{'resource_id': resource_id, 'date': from_day_number(day).isoformat()}
+                         for resource_id, day in sorted({(p.resource_id, p.day) for _, p in result.matches})],
+        'unmatched': [{'line': m.line, 'date': from_day_number(m.day).isoformat(), 'amount': m.amount,
+                       'reference': m.reference} for m in result.unmatched]
+    }
+
+
+def cmd_set_availability(calendar_logic, args):
+    """Bloquear o liberar un día o un rango en una sola transacción."""
+    end = args.to or args.date
+    calendar_logic.set_availability_range(args.date, end, args.available)
+    return [_day_to_json(day_info) for day_info in calendar_logic.get_range_status(args.date, end)]
+
+
+def cmd_export(calendar_logic, args):
+    """Exportar las reservas con cliente del rango indicado."""
+    rows = calendar_logic.reservations_manager.get_range(args.start, args.end)
+    reservations = [
+        {field: getattr(row, field) for field in RESERVATION_FIELDS}
+        for _, row in sorted(rows.items()) if not row.is_block
+    ]
+
+    if args.format == 'json' and not args.output:
+        return reservations
+
+    out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            writer = csv.DictWriter(out, fieldnames=RESERVATION_FIELDS)
+            writer.writeheader()
+            writer.writerows(reservations)
+        else:
+            json.dump(reservations, out, ensure_ascii=False)
+    finally:
+        if args.output:
+            out.close()
+    # El CSV por salida estándar no lleva envoltorio JSON
+    return {'exported': len(reservations), 'output': args.output} if args.output else None
+
+
+def cmd_occupancy(calendar_logic, args):
+    """Días reservados y bloqueados de cada recurso en el mes, con una consulta."""
+    year, month = args.month
+    resources, days, cells = calendar_logic.get_month_occupancy(year, month)
+    return [
+        {
+            'resource_id': resource.id,
+            'name': resource.name,
+            'reserved': [info.date_str for info in cells[resource.id].values() if info.reservation],
+            'blocked': [info.date_str for info in cells[resource.id].values()
+                        if not info.reservation and not info.is_available]
+        }
+        for resource in resources
+    ]
+
+
+def cmd_resources_list(calendar_logic, args):
+    """Listar los recursos."""
+    return [resource._asdict() for resource in calendar_logic.resources_manager.get_resources(args.all)]
+
+
+def cmd_resources_add(calendar_logic, args):
+    """Agregar un recurso."""
+    try:
+        return {'id': calendar_logic.resources_manager.add_resource(args.name, args.kind, args.order, args.capacity)}
+    except sqlite3.IntegrityError:
+        raise CliError(f'ya existe un recurso llamado {args.name!r}')
+
+
+def cmd_resources_set_active(calendar_logic, args):
+    """Activar o desactivar un recurso."""
+    calendar_logic.resources_manager.set_active(args.resource_id, args.active)
+    return {'id': args.resource_id, 'active': args.active}
+
+
+def cmd_resources_set_capacity(calendar_logic, args):
+    """Cambiar los huéspedes máximos por reserva de un recurso."""
+    calendar_logic.resources_manager.set_capacity(args.resource_id, args.capacity)
+    return {'id': args.resource_id, 'capacity': args.capacity}
+
+
+def cmd_capacity_show(calendar_logic, args):
+    """Huéspedes y capacidad de cada día del mes, con una consulta."""
+    year, month = args.month
+    start = date(year, month, 1)
+    end = date(year, month, calendar.monthrange(year, month)[1])
+    return [
+        {'date': from_day_number(day).isoformat(), 'guests': guests, 'capacity': capacity,
+         'remaining': None if capacity is None else max(0, capacity - guests)}
+        for day, (guests, capacity) in sorted(calendar_logic.capacity_manager.get_range(start, end).items())
+    ]
+
+
+def cmd_capacity_set(calendar_logic, args):
+    """Fijar o quitar la capacidad propia de un día o un rango."""
+    end = args.to or args.date
+    calendar_logic.capacity_manager.set_daily_capacity(args.date, end, args.capacity)
+    return {'from': args.date.isoformat(), 'to': end.isoformat(), 'capacity': args.capacity}
+
+
+def cmd_rates_list(calendar_logic, args):
+    """Listar las tarifas."""
+    return [dict(rate._asdict(), weekdays=weekday_list(rate.weekdays))
+            for rate in calendar_logic.pricing_manager.list_rates()]
+
+
+def cmd_rates_add(calendar_logic, args):
+    """Agregar una tarifa base, de temporada o anual."""
+    pricing = calendar_logic.pricing_manager
+    options = {'resource_id': args.resource_id, 'weekdays': args.weekdays, 'label': args.label}
+    try:
+        if args.kind == 'base':
+            rate_id = pricing.add_base_rate(args.price, **options)
+        elif args.kind == 'range':
+            rate_id = pricing.add_season(args.start, args.end, args.price, **options)
+        else:
+            (start_month, start_day), (end_month, end_day) = args.start, args.end
+            rate_id = pricing.add_yearly_season(start_month, start_day, end_month, end_day, args.price, **options)
+    except ValueError as exc:
+        raise CliError(str(exc))
+    return {'id': rate_id}
+
+
+def cmd_rates_delete(calendar_logic, args):
+    """Eliminar una tarifa."""
+    if not calendar_logic.pricing_manager.delete_rate(args.rate_id):
+        raise CliError(f'no existe la tarifa {args.rate_id}')
+    return {'id': args.rate_id}
+
+
+def cmd_quote(calendar_logic, args):
+    """Precio de cada noche y total, sin consultar la base de datos por noche."""
+    if args.nights is not None and args.nights < 1:
+        raise CliError('--nights debe ser al menos 1')
+    end = args.to or date.fromordinal(args.date.toordinal() + (args.nights or 1) - 1)
+    quote = calendar_logic.pricing_manager.quote(args.date, end, args.resources or [args.resource])
+    return {
+        'total': quote.total,
+        'complete': not quote.missing,
+        'nights': [{'resource_id': resource_id, 'date': from_day_number(day).isoformat(), 'price': price}
+                   for resource_id, day, price in quote.nights]
+    }
+
+
+def cmd_clients_duplicates(calendar_logic, args):
+    """Buscar duplicados comparando sólo clientes que comparten una clave de bloqueo."""
+    result = Deduplicator(calendar_logic.db_manager).find_duplicates(args.min_similarity)
+    return {
+        'pairs': len(result.pairs),
+        'compared': result.compared,
+        'oversized_blocks': result.oversized,
+        'duplicates': [
+            {'clients': [result.clients[pair.client_id]._asdict(), result.clients[pair.duplicate_id]._asdict()],
+             'similarity': pair.similarity, 'same_phone': pair.same_phone, 'keys': list(pair.kinds)}
+            for pair in result.pairs[:args.limit]
+        ]
+    }
+
+
+def cmd_clients_merge(calendar_logic, args):
+    """Fusionar duplicados en un cliente en una sola transacción."""
+    try:
+        moved = Deduplicator(calendar_logic.db_manager).merge(args.keep_id, args.duplicate_ids)
+    except ValueError as exc:
+        raise CliError(str(exc))
+    return {'client_id': args.keep_id, 'merged': sorted(set(args.duplicate_ids)), 'reservations': moved}
+
+
+def cmd_rules_list(calendar_logic, args):
+    """Listar las reglas de disponibilidad."""
+    return calendar_logic.rules_manager.list_rules()
+
+
+def cmd_rules_add_weekly(calendar_logic, args):
+    """Agregar una regla semanal."""
+    rule_id = calendar_logic.rules_manager.add_weekly_rule(args.weekday, args.start, args.end, args.label)
+    return {'id': rule_id}
+
+
+def cmd_rules_add_range(calendar_logic, args):
+    """Agregar una regla de rango de fechas."""
+    return {'id': calendar_logic.rules_manager.add_range_rule(args.start, args.end, args.label)}
+
+
+def cmd_rules_add_yearly(calendar_logic, args):
+    """Agregar una regla anual."""
+    (start_month, start_day), (end_month, end_day) = args.start, args.end
+    rule_id = calendar_logic.rules_manager.add_yearly_rule(start_month, start_day, end_month, end_day, args.label)
+    return {'id': rule_id}
+
+
+def cmd_rules_delete(calendar_logic, args):
+    """Eliminar una regla."""
+    calendar_logic.rules_manager.delete_rule(args.rule_id)
+    return {'deleted': args.rule_id}
+
+
+def cmd_sync_status(calendar_logic, args):
+    """Identificador de la instalación y lo intercambiado con cada otra."""
+    replicator = Replicator(calendar_logic.db_manager)
+    return {'origin': replicator.origin, 'last_seq': replicator.repository.last_seq(), 'peers': replicator.peers()}
+
+
+def cmd_sync_export(calendar_logic, args):
+    """Exportar los cambios desde la última sincronización."""
+    return Replicator(calendar_logic.db_manager).export_changes(args.path, args.peer)._asdict()
+
+
+def cmd_sync_import(calendar_logic, args):
+    """Importar un archivo de cambios en una sola transacción."""
+    return Replicator(calendar_logic.db_manager).import_changes(args.path)._asdict()
+
+
+def cmd_sync_new_origin(calendar_logic, args):
+    """Asignar un nuevo identificador a esta instalación."""
+    return {'origin': Replicator(calendar_logic.db_manager).new_origin()}
+
+
+def cmd_audit_history(calendar_logic, args):
+    """Historial de cambios de la reserva de un día y de sus pagos."""
+    return [dict({field: getattr(entry, field) for field in AUDIT_FIELDS},
+                 date=from_day_number(entry.day).isoformat(), changed_on=entry.changed_on.isoformat(),
+                 changes={AUDIT_CHANGE_KEYS.get(column, column): value for column, value in entry.changed.items()})
+            for entry in calendar_logic.get_history(args.date, limit=args.limit)]
+
+
+def cmd_audit_prune(calendar_logic, args):
+    """Depurar el historial por lotes."""
+    if args.days < 0:
+        raise CliError('--days no puede ser negativo')
+    return {'deleted': calendar_logic.audit_manager.prune(args.days)}
+
+
+def run_command(parser, calendar_logic, argv, out=sys.stdout):
+    """
+    Ejecutar un comando y escribir su resultado como una línea JSON.
+
+    Args:
+        parser: Parser creado por build_parser
+        calendar_logic: Lógica de calendario compartida
+        argv (list): Argumentos del comando (sin --db)
+        out: Flujo de salida
+
+    Returns:
+        bool: True si el comando terminó correctamente
+    """
+    try:
+        args = parser.parse_args(argv)
+        if args.handler is None:
+            raise CliError(f'{args.command} no está disponible en modo batch')
+        _select_resource(calendar_logic, args.resource)
+        result = args.handler(calendar_logic, args)
+    except (CliError, ValueError) as exc:
+        _write_json(out, {'ok': False, 'error': str(exc)})
+        return False
+    if result is not None:
+        _write_json(out, {'ok': True, 'result': result})
+    return True
+
+
+def run_batch(parser, calendar_logic, lines, out=sys.stdout):
+    """
+    Ejecutar comandos línea por línea sobre la misma conexión.
+
+    Las líneas vacías y las que empiezan con '#' se ignoran.
+
+    Returns:
+        bool: True si todos los comandos terminaron correctamente
+    """
+    ok = True
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            argv = shlex.split(line)
+        except ValueError as exc:
+            _write_json(out, {'ok': False, 'error': str(exc)})
+            ok = False
+            continue
+        ok = run_command(parser, calendar_logic, argv, out) and ok
+        out.flush()
+    return ok
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        args = parser.parse_args(argv)
+    except CliError as exc:
+        parser.print_usage(sys.stderr)
+        print(f'error: {exc}', file=sys.stderr)
+        return 2
+
+    if args.command == 'serve':
+        # Importación diferida: el resto de comandos no necesita asyncio
+        from api.http_server import serve
+        serve(args.db, args.host, args.port, args.workers)
+        return 0
+
+    calendar_logic = open_calendar(args.db)
+    if args.user:
+        calendar_logic.db_manager.user = args.user
+    try:
+        if args.command == 'batch':
+            ok = run_batch(parser, calendar_logic, sys.stdin)
+        else:
+            ok = run_command(parser, calendar_logic, argv)
+    finally:
+        DatabaseMaintenance(calendar_logic.db_manager).optimize()
+        calendar_logic.db_manager.close()
+    return 0 if ok else 1
+
+
+def _day_to_json(day_info):
+    """Convertir la información de un día a un diccionario serializable."""
+    reservation = day_info.reservation
+    return {
+        'date': day_info.date_str,
+        'available': day_info.is_available,
+        'guests': day_info.guests,
+        'capacity': day_info.capacity,
+        'reservation': {field: getattr(reservation, field) for field in RESERVATION_FIELDS} if reservation else None
+    }
+
+
+def _select_resource(calendar_logic, resource_id):
+    if resource_id != calendar_logic.resource_id:
+        known = {resource.id for resource in calendar_logic.resources_manager.get_resources(include_inactive=True)}
+        if resource_id not in known:
+            raise CliError(f'recurso desconocido: {resource_id}')
+    calendar_logic.set_resource(resource_id)
+
+
+def _write_json(out, payload):
+    out.write(json.dumps(payload, ensure_ascii=False))
+    out.write('\n')
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'fecha inválida: {value!r} (se espera AAAA-MM-DD)')
+
+
+def _parse_month(value):
+    try:
+        year, month = (int(part) for part in value.split('-'))
+        date(year, month, 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'mes inválido: {value!r} (se espera AAAA-MM)')
+    return year, month
+
+
+def _parse_weekdays(value):
+    try:
+        weekdays = [int(part) for part in value.split(',') if part.strip()]
+        weekday_mask(weekdays)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'días de la semana inválidos: {value!r} (se espera p. ej. 4,5)')
+    return weekdays
+
+
+def _parse_id_list(value):
+    try:
+        return [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'lista de ids inválida: {value!r} (se espera p. ej. 1,2,3)')
+
+
+def _parse_month_day(value):
+    try:
+        month, day = (int(part) for part in value.split('-'))
+        date(2000, month, day)  # Año bisiesto: acepta 02-29
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'fecha anual inválida: {value!r} (se espera MM-DD)')
+    return month, day
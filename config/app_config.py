@@ -8,11 +8,14 @@ Todos los valores codificados extraídos de main.py para centralización y mante
 class AppConfig:
     # Configuración de ventana (línea 15)
     WINDOW_TITLE = 'Kumbayah - Calendario de Reservas (offline)'
+
+    # Versión de la aplicación (las métricas de latencia se agrupan por ella)
+    APP_VERSION = '1.1.0'
     
     # Dimensiones de formulario (líneas 212, 373)
     FORM_DIMENSIONS = {
         'reservation': '420x340',
-        'details': '420x340'
+        'details': '480x600'
     }
     
     # Esquema de colores (líneas 53-56, 125, 133)
@@ -28,7 +31,10 @@ class AppConfig:
         'current_month': '#ffffff',       # Blanco para días del mes actual
         'other_month': '#f5f5f5',         # Gris muy claro para otros meses
         'text_current': '#000000',        # Texto negro para mes actual
-        'text_other': '#9e9e9e'          # Texto gris para otros meses
+        'text_other': '#9e9e9e',         # Texto gris para otros meses
+        'selection': '#1976d2',          # Borde de la selección de rango
+        'capacity_fill': '#64b5f6',       # Barra de ocupación del día
+        'capacity_full': '#e53935'        # Barra de ocupación con el día lleno
     }
     
     # Dimensiones de celda de calendario (línea 100)
@@ -37,6 +43,45 @@ class AppConfig:
         'height': 110
     }
     
+    # Modo de renderizado del calendario:
+    # 'widgets' crea un Canvas por día; 'canvas' dibuja el mes en un único Canvas
+    RENDER_MODE = 'widgets'
+    
+    # Altura del encabezado de días de la semana en el modo 'canvas'
+    WEEKDAY_HEADER_HEIGHT = 28
+    
+    # Vista de ocupación: una fila por recurso y una columna por día, en un solo Canvas
+    OCCUPANCY_VIEW = {
+        'name_width': 140,
+        'cell_width': 30,
+        'row_height': 26,
+        'header_height': 24
+    }
+    
+    # Directorio de clientes: lista paginada por clave y historial del seleccionado
+    CLIENT_DIRECTORY = {
+        'page_size': 200,          # Filas por consulta
+        'max_pages': 5,            # Páginas que se mantienen en la lista a la vez
+        'detail_delay_ms': 150,    # Espera antes de cargar el historial del seleccionado
+        'history_limit': 500,      # Reservas mostradas en el historial
+        'visible_rows': 24
+    }
+    
+    # Agenda: reservas de todos los recursos en orden cronológico, por páginas
+    AGENDA_VIEW = {
+        'page_size': 100,          # Filas por consulta
+        'max_pages': 5,            # Páginas que se mantienen en la lista a la vez
+        'visible_rows': 24,
+        'column_widths': (90, 110, 160, 110, 75, 75, 75, 80)
+    }
+    
+    # Capacidad de huéspedes (modules/capacity.py)
+    CAPACITY = {
+        'daily_guests': 40,        # Huéspedes por día en todos los recursos (None = sin límite)
+        'default_guests': 1,       # Huéspedes de una reserva si no se indican
+        'bar_height': 5            # Alto de la barra de ocupación en las celdas
+    }
+    
     # Configuración de pago (líneas 257, 266, 384, 389)
     PAYMENT_STATUSES = ['Completo', 'Mitad', 'Nada']
     PAYMENT_METHODS = ['PagoMovil', 'Efectivo', 'Transferencia']
@@ -75,7 +120,7 @@ class AppConfig:
         'legend_reserved': 'Reservado',
         'legend_partial': 'Parcial/Nada',
         'legend_blocked': 'Bloqueado',
-        'availability_hint': 'Marcar disponibilidad (click derecho)',
+        'availability_hint': 'Marcar disponibilidad (click derecho, arrastrar para un rango)',
         'unavailable_msg': 'No disponible',
         'unavailable_detail': 'Este día no está disponible para reservas.',
         
@@ -87,6 +132,53 @@ class AppConfig:
         'payment_status': 'Estado de pago',
         'payment_method': 'Método de pago',
         'reference': 'Referencia (>=6 dígitos)',
+        'paid_total': 'Pagado',
+        'balance': 'Saldo',
+        'guests': 'Huéspedes',
+        
+        # Recursos y vista de ocupación
+        'resource': 'Recurso:',
+        'occupancy': 'Ocupación',
+        'occupancy_title': 'Ocupación por recurso',
+        
+        # Directorio de clientes
+        'clients': 'Clientes',
+        'clients_title': 'Directorio de clientes',
+        'client_columns': ('N°', 'Apellido', 'Nombre', 'Teléfono'),
+        'client_history': 'Reservas',
+        'history_columns': ('Fecha', 'Recurso', 'Huéspedes', 'Monto', 'Estado'),
+        'sort_marker': ' ▲',
+        
+        # Agenda
+        'agenda': 'Agenda',
+        'agenda_title': 'Agenda de reservas',
+        'agenda_columns': ('Fecha', 'Recurso', 'Cliente', 'Teléfono', 'Huéspedes', 'Monto', 'Saldo', 'Estado'),
+        'agenda_go': 'Ir',
+        'agenda_today': 'Hoy',
+        'agenda_due_only': 'Sólo con saldo',
+        'date_invalid': 'Fecha inválida (se espera AAAA-MM-DD).',
+        
+        # Historial de pagos del diálogo de detalles
+        'payments_title': 'Pagos',
+        'payment_columns': ('Fecha', 'Monto', 'Método', 'Referencia', 'Conciliado'),
+        'add_payment': 'Registrar pago',
+        'delete_payment': 'Eliminar pago',
+        'confirm_delete_payment': '¿Eliminar este pago?',
+        
+        # Historial de cambios del diálogo de detalles
+        'audit': 'Historial',
+        'audit_columns': ('Fecha', 'Usuario', 'Cambio'),
+        'audit_entities': {'reservation': 'reserva', 'payment': 'pago'},
+        'audit_actions': {'insert': 'Alta', 'update': 'Cambio', 'delete': 'Baja'},
+        'audit_change_format': '{action} de {entity}: {fields}',
+        'audit_fields': {
+            'client_id': 'Cliente', 'guests': 'Huéspedes', 'amount': 'Monto', 'payment_method': 'Método',
+            'method': 'Método', 'reference': 'Referencia', 'paid_on': 'Fecha', 'reconciled_at': 'Conciliado'
+        },
+        'audit_empty_value': '—',
+        
+        # Deshacer/rehacer (Ctrl+Z, Ctrl+Y)
+        'undo_conflict': 'Ese cambio no se puede deshacer: los días se modificaron después.',
         
         # Etiquetas de botones
         'edit': 'Editar',
@@ -100,11 +192,103 @@ class AppConfig:
         'phone_digits': 'Teléfono debe contener sólo dígitos.',
         'amount_invalid': 'Monto inválido.',
         'reference_length': 'Referencia debe tener al menos 6 dígitos.',
+        'guests_invalid': 'El número de huéspedes debe ser un entero mayor que cero.',
+        'capacity_resource': 'Este recurso admite como máximo {capacity} huéspedes por reserva.',
+        'capacity_day': 'Capacidad del {date} superada: quedan {remaining} de {capacity} plazas.',
+        'payment_exceeds_balance': 'El pago supera el saldo pendiente ({balance:.2f}).',
         'confirm_delete': '¿Eliminar esta reserva?',
         
         # Form titles
         'reservation_title_prefix': 'Reservar ',
-        'details_title_prefix': 'Reserva '
+        'details_title_prefix': 'Reserva ',
+        
+        # Visor de telemetría
+        'telemetry_title': 'Rendimiento de la interfaz',
+        'telemetry_period': 'Periodo:',
+        'telemetry_periods': {'Últimos 7 días': 7, 'Últimos 30 días': 30, 'Todo': None},
+        'telemetry_columns': ('Versión', 'Interacción', 'Muestras', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Máx (ms)'),
+        'telemetry_interactions': {
+            'month_navigation': 'Cambiar de mes',
+            'day_click': 'Click en día → formulario',
+            'form_save': 'Guardar → celda actualizada',
+            'availability_toggle': 'Cambiar disponibilidad',
+            'undo': 'Deshacer / rehacer'
+        },
+        'telemetry_empty': 'Sin mediciones en este periodo.'
+    }
+    
+    # API HTTP local de disponibilidad (python -m kumbayah serve)
+    API_SERVER = {
+        'host': '127.0.0.1',
+        'port': 8765,
+        'workers': 4,          # Hilos para el trabajo con la base de datos
+        'cors_origin': None,   # p. ej. 'https://kumbayah.com' para permitir el sitio web
+        'month_cache_size': 48,
+        'audit_user': 'api'    # Usuario de los cambios de la API en el historial
+    }
+    
+    # Telemetría de latencia de interacciones (F12 abre el visor)
+    TELEMETRY = {
+        'enabled': True,
+        'path': 'kumbayah_metrics.json',
+        'retention_days': 180
+    }
+    
+    # Mantenimiento de la base de datos en segundo plano (modules/maintenance.py)
+    MAINTENANCE = {
+        'idle_after_s': 20,            # Segundos sin interacción para considerar la app inactiva
+        'tick_ms': 2000,               # Frecuencia de comprobación mientras está inactiva
+        'step_interval_s': 60,         # Separación mínima entre repeticiones de una tarea
+        'step_budget_ms': 40,          # Tiempo máximo de cada paso
+        'close_budget_ms': 500,        # Tiempo máximo de PRAGMA optimize al cerrar
+        'vacuum_pages_per_step': 64,
+        'analyze_every_hours': 24,
+        'analysis_limit': 400,
+        'convert_max_bytes': 32 * 1024 * 1024,
+        'convert_budget_ms': 1500,
+        'audit_rows_per_step': 2000    # Cambios antiguos del historial eliminados por paso
+    }
+    
+    # Conciliación con extractos bancarios en CSV (modules/reconciliation.py)
+    RECONCILIATION = {
+        'columns': {                   # Encabezados del CSV del banco
+            'date': 'Fecha',
+            'amount': 'Monto',
+            'reference': 'Referencia'
+        },
+        'delimiter': ',',
+        'encoding': 'utf-8-sig',
+        'date_formats': ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y'),
+        'amount_tolerance': 0.01,      # Diferencia máxima de monto (absoluta)
+        'date_tolerance_days': 3       # Días de diferencia entre el pago y el movimiento
+    }
+    
+    # Detección de clientes duplicados (modules/dedup.py)
+    DEDUP = {
+        'phone_digits': 10,        # Dígitos finales que identifican un teléfono
+        'min_phone_digits': 7,     # Teléfonos más cortos no forman bloque
+        'max_block_size': 200,     # Bloques mayores (nombres muy comunes) se omiten
+        'min_similarity': 0.85     # Parecido de nombres para proponer una fusión
+    }
+
+    # Historial de cambios de reservas y pagos (modules/audit.py)
+    AUDIT = {
+        'retention_days': 730,     # Los cambios más antiguos se depuran en segundo plano
+        'prune_batch_size': 5000,  # Filas por transacción al depurar desde la línea de comandos
+        'page_size': 50,           # Cambios por página en el diálogo de la reserva
+        'max_pages': 4,
+        'visible_rows': 6
+    }
+
+    # Deshacer/rehacer cambios del calendario (modules/undo.py)
+    UNDO = {
+        'max_commands': 100        # Cambios que se pueden deshacer
+    }
+
+    # Replicación entre instalaciones con archivos de cambios (modules/replication.py)
+    REPLICATION = {
+        'compress_level': 6,       # gzip (1 = más rápido, 9 = archivo más pequeño)
+        'format': 1                # Versión del formato del archivo de cambios
     }
     
     # Configuración de tema (línea 29)
@@ -0,0 +1,12 @@
+"""
+Kumbayah - Calendario de Reservas (línea de comandos)
+
+Punto de entrada sin interfaz gráfica: `python -m kumbayah --help`.
+No importa tkinter, por lo que arranca rápido y puede llamarse desde scripts.
+"""
+import sys
+from cli.commands import main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,12 +10,28 @@ from config.app_config import AppConfig
 from modules.database import Database
 from modules.clients import Clients
 from modules.reservations import Reservations
+from modules.availability_rules import AvailabilityRules
+from modules.payments import Payments
+from modules.resources import Resources
+from modules.capacity import Capacity
+from modules.pricing import Pricing
+from modules.audit import AuditLog
+from modules.undo import UndoLog
+from modules.events import EventBus, DatesChanged, ClientChanged
 from modules.calendar_logic import CalendarLogic
+from modules.maintenance import DatabaseMaintenance
 from ui.styles import StyleManager
 from ui.components import CalendarHeader, CalendarControls
 from ui.calendar_renderer import CalendarRenderer
+from ui.canvas_renderer import CanvasCalendarRenderer
 from ui.calendar_events import EventCoordinator
 from ui.forms import FormManager
+from ui.telemetry_viewer import TelemetryViewer
+from ui.occupancy_view import OccupancyView
+from ui.client_directory import ClientDirectory
+from ui.agenda_view import AgendaView
+from ui.idle_tasks import IdleMaintenanceScheduler
+from utils.telemetry import telemetry
 
 
 class CalendarApp:
@@ -26,9 +42,16 @@ class CalendarApp:
     en lugar de contener toda la lógica de UI directamente.
     """
     
-    def __init__(self, root):
-        """Inicializar aplicación de calendario."""
+    def __init__(self, root, db_path='kumbayah.db'):
+        """
+        Inicializar aplicación de calendario.
+        
+        Args:
+            root: Ventana raíz de Tk
+            db_path (str): Ruta del archivo SQLite
+        """
         self.root = root
+        self.db_path = db_path
         self.root.title(AppConfig.WINDOW_TITLE)
         
         # Inicializar base de datos y gestores
@@ -40,21 +63,49 @@ class CalendarApp:
         # Luego inicializar coordinadores que dependen de componentes de UI
         self._setup_coordinators()
         
+        # Deshacer/rehacer cambios del calendario
+        self._setup_undo()
+        
         # Configurar manejador de cierre de ventana
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+        # Telemetría de latencia; F12 abre el visor
+        self._setup_telemetry()
+        
+        # Mantenimiento de la base de datos mientras la app está inactiva
+        self.maintenance = DatabaseMaintenance(self.db_manager)
+        self.maintenance_scheduler = IdleMaintenanceScheduler(self.root, self.maintenance)
+        self.maintenance_scheduler.start()
     
     def _setup_database(self):
         """Inicializar base de datos y gestores relacionados."""
-        self.db_manager = Database('kumbayah.db')
+        self.db_manager = Database(self.db_path)
         self.db_manager.create_tables()
-        db_conn = self.db_manager.connect()
         
-        self.clients_manager = Clients(db_conn)
-        self.reservations_manager = Reservations(db_conn)
+        self.clients_manager = Clients(self.db_manager)
+        self.reservations_manager = Reservations(self.db_manager)
+        self.rules_manager = AvailabilityRules(self.db_manager)
+        self.payments_manager = Payments(self.db_manager)
+        self.resources_manager = Resources(self.db_manager)
+        self.capacity_manager = Capacity(self.db_manager)
+        self.pricing_manager = Pricing(self.db_manager)
+        self.audit_manager = AuditLog(self.db_manager)
+        self.undo_log = UndoLog(self.db_manager, capacity_manager=self.capacity_manager)
+        # Cambios de datos publicados por CalendarLogic, entregados juntos
+        # una vez por ciclo de inactividad de Tk
+        self.events = EventBus(schedule=self.root.after_idle)
         self.calendar_logic = CalendarLogic(
             self.db_manager, 
             self.clients_manager, 
-            self.reservations_manager
+            self.reservations_manager,
+            self.rules_manager,
+            self.payments_manager,
+            self.resources_manager,
+            self.capacity_manager,
+            self.pricing_manager,
+            self.audit_manager,
+            self.undo_log,
+            self.events
         )
     
     def _setup_ui_components(self):
@@ -75,20 +126,35 @@ class CalendarApp:
             on_next_month=self._on_next_month
         )
         
-        # Frame de controles con leyenda
-        controls = CalendarControls(self.root)
-        controls.pack(fill='x', padx=AppConfig.PADDING['controls'][0], 
+        # Frame de controles con selector de recurso y leyenda
+        self.controls = CalendarControls(
+            self.root,
+            resources=self.calendar_logic.get_resources(),
+            on_resource_change=self._on_resource_change,
+            on_show_occupancy=self._on_show_occupancy,
+            on_show_clients=self._on_show_clients,
+            on_show_agenda=self._on_show_agenda,
+            selected_id=self.calendar_logic.resource_id
+        )
+        self.controls.pack(fill='x', padx=AppConfig.PADDING['controls'][0], 
                     pady=AppConfig.PADDING['controls'][1])
         
         # Frame de calendario para celdas de día
         self.calendar_frame = ttk.Frame(self.root)
-        self.calendar_frame.pack(padx=AppConfig.PADDING['main_frame'][0], 
-                              pady=AppConfig.PADDING['main_frame'][1])
+        if AppConfig.RENDER_MODE == 'canvas':
+            # El Canvas único se adapta al tamaño de la ventana
+            self.calendar_frame.pack(fill='both', expand=True,
+                                  padx=AppConfig.PADDING['main_frame'][0], 
+                                  pady=AppConfig.PADDING['main_frame'][1])
+        else:
+            self.calendar_frame.pack(padx=AppConfig.PADDING['main_frame'][0], 
+                                  pady=AppConfig.PADDING['main_frame'][1])
     
     def _setup_coordinators(self):
         """Inicializar coordinadores que gestionan interacciones entre componentes."""
         # Inicializar renderizador de calendario con manejador de eventos
-        self.calendar_renderer = CalendarRenderer(
+        renderer_class = CanvasCalendarRenderer if AppConfig.RENDER_MODE == 'canvas' else CalendarRenderer
+        self.calendar_renderer = renderer_class(
             calendar_frame=self.calendar_frame,
             title_label=self.header.get_title_label(),
             style_manager=self.style_manager,
@@ -101,7 +167,7 @@ class CalendarApp:
             parent=self.root,
             style_manager=self.style_manager,
             calendar_logic=self.calendar_logic,
-            calendar_renderer=self.calendar_renderer
+            events=self.events
         )
         
         # Coordinador de eventos para manejar interacciones del usuario
@@ -114,9 +180,65 @@ class CalendarApp:
         # Conectar manejador de eventos al renderizador
         self.calendar_renderer.event_handler = self.event_coordinator.get_event_handler()
         
+        # Ocupación de todos los recursos (un Canvas, una consulta por mes)
+        self.occupancy_view = OccupancyView(
+            parent=self.root,
+            style_manager=self.style_manager,
+            calendar_logic=self.calendar_logic,
+            on_select=self._on_occupancy_select
+        )
+        
+        # Directorio de clientes (lista paginada, historial bajo demanda)
+        self.client_directory = ClientDirectory(
+            parent=self.root,
+            calendar_logic=self.calendar_logic,
+            on_open_day=self._on_occupancy_select
+        )
+        
+        # Agenda de reservas (lista paginada a partir de una fecha)
+        self.agenda_view = AgendaView(
+            parent=self.root,
+            calendar_logic=self.calendar_logic,
+            on_open_day=self._on_occupancy_select
+        )
+        
+        # Suscriptores de los cambios de datos: cada uno actualiza sólo lo suyo
+        self._setup_events()
+        
         # Dibujar calendario inicial
         self.calendar_renderer.draw_calendar()
     
+    def _setup_events(self):
+        """Suscribir la ventana principal y las vistas a los cambios de datos."""
+        subscriptions = {
+            DatesChanged: (self.calendar_renderer.on_dates_changed, self.occupancy_view.on_dates_changed,
+                           self.agenda_view.on_data_changed, self.client_directory.on_dates_changed),
+            ClientChanged: (self.calendar_renderer.on_client_changed, self.occupancy_view.on_client_changed,
+                            self.agenda_view.on_data_changed, self.client_directory.on_client_changed),
+        }
+        for event_type, callbacks in subscriptions.items():
+            for callback in callbacks:
+                self.events.subscribe(event_type, callback)
+    
+    def _setup_undo(self):
+        """Atajos para deshacer (Ctrl+Z) y rehacer (Ctrl+Y o Ctrl+Mayús+Z) en la ventana principal."""
+        undo = lambda event: self.event_coordinator.handle_undo()
+        redo = lambda event: self.event_coordinator.handle_undo(redo=True)
+        self.root.bind('<Control-z>', undo)
+        self.root.bind('<Control-y>', redo)
+        self.root.bind('<Control-Z>', redo)
+    
+    def _setup_telemetry(self):
+        """Activar la medición de latencias y el atajo del visor."""
+        telemetry.configure(
+            path=AppConfig.TELEMETRY['path'],
+            version=AppConfig.APP_VERSION,
+            enabled=AppConfig.TELEMETRY['enabled']
+        )
+        telemetry.attach(self.root)
+        self.telemetry_viewer = TelemetryViewer(self.root, telemetry)
+        self.root.bind('<F12>', lambda event: self.telemetry_viewer.show())
+    
     def _on_prev_month(self):
         """Manejar navegación de mes anterior."""
         self.event_coordinator.handle_month_navigation('prev')
@@ -125,8 +247,34 @@ class CalendarApp:
         """Manejar navegación de mes siguiente."""
         self.event_coordinator.handle_month_navigation('next')
     
+    def _on_resource_change(self, resource_id):
+        """Mostrar el calendario del recurso elegido en el selector."""
+        self.event_coordinator.handle_resource_change(resource_id)
+    
+    def _on_show_occupancy(self):
+        """Abrir la vista de ocupación de todos los recursos."""
+        # Los recursos pueden haberse añadido desde la línea de comandos
+        self.controls.set_resources(self.calendar_logic.get_resources(), self.calendar_logic.resource_id)
+        self.occupancy_view.show()
+    
+    def _on_show_clients(self):
+        """Abrir el directorio de clientes."""
+        self.client_directory.show()
+    
+    def _on_show_agenda(self):
+        """Abrir la agenda de reservas en el día de hoy."""
+        self.agenda_view.show()
+    
+    def _on_occupancy_select(self, resource_id, day):
+        """Abrir en el calendario principal el recurso y mes pulsados en la vista de ocupación."""
+        self.controls.select_resource(resource_id)
+        self.event_coordinator.handle_resource_change(resource_id, day)
+    
     def on_closing(self):
         """Manejar cierre de aplicación."""
+        telemetry.flush()
+        self.maintenance_scheduler.stop()
+        self.maintenance.optimize()
         self.db_manager.close()
         self.root.destroy()
 
@@ -1,4 +1,5 @@
-# Business logic modules for Kumbayah Calendar App
+"""
+Business logic modules for Kumbayah Calendar App
 
 This package contains all core business logic modules:
 - Database management and connection handling
@@ -6,4 +7,5 @@ This package contains all core business logic modules:
 - Reservation management
 - Calendar business logic
 
-All modules are independent and reusable components of the application architecture.
\ No newline at end of file
+All modules are independent and reusable components of the application architecture.
+"""
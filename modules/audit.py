@@ -0,0 +1,54 @@
+import time
+from config.app_config import AppConfig
+from modules.database import DEFAULT_RESOURCE_ID
+from modules.repository import AuditRepository
+from utils.dates import to_day_number
+
+# Clave anterior al primer cambio (el historial va del más reciente al más antiguo)
+FIRST_KEY = (1 << 63) - 1
+
+
+class AuditLog:
+    # Historial de cambios de reservas y pagos. Lo escriben los triggers de
+    # reservation_audit (modules/database.py) en la misma transacción que el
+    # cambio, con una fila por cambio y sólo las columnas cambiadas, así que
+    # guardar una reserva no hace ninguna consulta más desde Python. Se lee
+    # por páginas (clave = id) y los cambios de más de retention_days se
+    # depuran por lotes.
+    def __init__(self, db_manager, config=None):
+        self.db = db_manager
+        self.config = config or AppConfig.AUDIT
+        self.repository = AuditRepository(db_manager)
+
+    def get_history(self, day, resource_id=DEFAULT_RESOURCE_ID, key=None, forward=True, limit=50):
+        # Cambios de la reserva del día, del más reciente al más antiguo.
+        # `key` es history_key() del último cambio mostrado (o del primero si
+        # forward es False).
+        return self.repository.page(resource_id, to_day_number(day), FIRST_KEY if key is None else key,
+                                    forward, limit)
+
+    def history_key(self, entry):
+        return entry.id
+
+    def prune(self, retention_days=None, batch_size=None):
+        # Eliminar los cambios anteriores a retention_days días, por lotes
+        # (cada lote es una transacción); devuelve cuántos se eliminaron
+        batch_size = batch_size or self.config['prune_batch_size']
+        deleted = 0
+        while True:
+            count = self.prune_batch(batch_size, retention_days)
+            deleted += count
+            if count < batch_size:
+                return deleted
+
+    def prune_batch(self, batch_size, retention_days=None):
+        # Un solo lote (el mantenimiento en segundo plano depura así, paso a paso)
+        return self.repository.prune(self._cutoff(retention_days), batch_size)
+
+    def has_expired(self, retention_days=None):
+        # ¿Hay cambios más antiguos que la retención?
+        return self.repository.has_before(self._cutoff(retention_days))
+
+    def _cutoff(self, retention_days):
+        retention_days = self.config['retention_days'] if retention_days is None else retention_days
+        return int(time.time()) - retention_days * 86400
@@ -0,0 +1,125 @@
+import calendar
+from datetime import date
+from utils.dates import to_day_number
+from modules.repository import RuleRepository
+
+# Tipos de regla de disponibilidad
+WEEKLY = 'weekly'    # Un día de la semana (opcionalmente entre dos fechas)
+RANGE = 'range'      # Un rango de fechas concreto
+YEARLY = 'yearly'    # Un periodo que se repite cada año (p. ej. 24/12 - 06/01)
+
+
+class AvailabilityRules:
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.repository = RuleRepository(db_manager)
+        # Caché de días bloqueados por mes: (año, mes) -> frozenset de números de día
+        self._month_cache = {}
+        self._rules = None
+
+    def add_weekly_rule(self, weekday, start=None, end=None, label=''):
+        return self._add_rule(WEEKLY, weekday=weekday,
+                              start_day=to_day_number(start) if start else None,
+                              end_day=to_day_number(end) if end else None, label=label)
+
+    def add_range_rule(self, start, end, label=''):
+        first, last = sorted((to_day_number(start), to_day_number(end)))
+        return self._add_rule(RANGE, start_day=first, end_day=last, label=label)
+
+    def add_yearly_rule(self, start_month, start_day, end_month, end_day, label=''):
+        return self._add_rule(YEARLY, start_md=start_month * 100 + start_day,
+                              end_md=end_month * 100 + end_day, label=label)
+
+    def _add_rule(self, kind, weekday=None, start_day=None, end_day=None, start_md=None, end_md=None, label=''):
+        rule_id = self.repository.insert(kind, weekday, start_day, end_day, start_md, end_md, label)
+        self.invalidate()
+        return rule_id
+
+    def delete_rule(self, rule_id):
+        self.repository.delete(rule_id)
+        self.invalidate()
+
+    def list_rules(self):
+        return self.repository.list()
+
+    def add_exceptions(self, pairs):
+        # pairs: iterable de (rule_id, día); el día queda libre para esa regla
+        self.repository.add_exceptions((rule_id, to_day_number(day)) for rule_id, day in pairs)
+        self.invalidate()
+
+    def remove_exception(self, rule_id, day):
+        self.repository.remove_exception(rule_id, to_day_number(day))
+        self.invalidate()
+
+    def invalidate(self):
+        self._month_cache.clear()
+        self._rules = None
+
+    def blocked_days(self, year, month):
+        # Las reglas se expanden sólo cuando se carga un mes y el resultado se
+        # guarda en caché hasta que cambien las reglas o sus excepciones
+        if self.repository.global_version_changed():
+            self.invalidate()
+        key = (year, month)
+        blocked = self._month_cache.get(key)
+        if blocked is None:
+            blocked = frozenset(self._expand_month(year, month))
+            self._month_cache[key] = blocked
+        return blocked
+
+    def blocked_days_in_range(self, start, end):
+        first, last = sorted((to_day_number(start), to_day_number(end)))
+        start_date, end_date = date.fromordinal(first), date.fromordinal(last)
+        blocked = set()
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            blocked.update(n for n in self.blocked_days(year, month) if first <= n <= last)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return blocked
+
+    def rules_blocking(self, day):
+        # Reglas que bloquearían el día si no tuviera excepción
+        day = date.fromordinal(to_day_number(day))
+        return [rule['id'] for rule in self._get_rules() if self._rule_matches(rule, day)]
+
+    def _expand_month(self, year, month):
+        rules = self._get_rules()
+        if not rules:
+            return set()
+        first = date(year, month, 1).toordinal()
+        last = date(year, month, calendar.monthrange(year, month)[1]).toordinal()
+
+        exceptions = self.repository.exceptions_in_range(first, last)
+
+        blocked = set()
+        for n in range(first, last + 1):
+            day = date.fromordinal(n)
+            for rule in rules:
+                if (rule['id'], n) not in exceptions and self._rule_matches(rule, day):
+                    blocked.add(n)
+                    break
+        return blocked
+
+    def _rule_matches(self, rule, day):
+        n = day.toordinal()
+        kind = rule['kind']
+        if kind == WEEKLY:
+            if day.weekday() != rule['weekday']:
+                return False
+            return ((rule['start_day'] is None or n >= rule['start_day'])
+                    and (rule['end_day'] is None or n <= rule['end_day']))
+        if kind == RANGE:
+            return rule['start_day'] <= n <= rule['end_day']
+        if kind == YEARLY:
+            md = day.month * 100 + day.day
+            start_md, end_md = rule['start_md'], rule['end_md']
+            if start_md <= end_md:
+                return start_md <= md <= end_md
+            # El periodo cruza el fin de año
+            return md >= start_md or md <= end_md
+        return False
+
+    def _get_rules(self):
+        if self._rules is None:
+            self._rules = self.list_rules()
+        return self._rules
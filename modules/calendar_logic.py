@@ -1,15 +1,75 @@
 import calendar
 from datetime import datetime, date
+from config.app_config import AppConfig
+from modules.database import Database, DEFAULT_RESOURCE_ID
+from modules.clients import Clients
+from modules.reservations import Reservations
+from modules.availability_rules import AvailabilityRules
+from modules.payments import Payments, initial_payment
+from modules.resources import Resources
+from modules.capacity import Capacity
+from modules.pricing import Pricing
+from modules.audit import AuditLog
+from modules.records import DayInfo
+from modules.events import DatesChanged, ClientChanged
+from utils.dates import to_day_number
+
+
+def open_calendar(db_path, create_tables=True, db_manager=None):
+    # Crear la lógica de calendario con sus gestores (usado por la línea de
+    # comandos y la API, que no pasan por main.py). Varios hilos pueden
+    # compartir el mismo db_manager, cada uno con su propia CalendarLogic.
+    if db_manager is None:
+        db_manager = Database(db_path)
+    if create_tables:
+        db_manager.create_tables()
+    return CalendarLogic(
+        db_manager,
+        Clients(db_manager),
+        Reservations(db_manager),
+        AvailabilityRules(db_manager),
+        Payments(db_manager),
+        Resources(db_manager),
+        Capacity(db_manager),
+        Pricing(db_manager),
+        AuditLog(db_manager)
+    )
+
 
 class CalendarLogic:
-    def __init__(self, db_manager, clients_manager, reservations_manager):
+    def __init__(self, db_manager, clients_manager, reservations_manager, rules_manager=None, payments_manager=None,
+                 resources_manager=None, capacity_manager=None, pricing_manager=None, audit_manager=None,
+                 undo_log=None, events=None):
         self.db_manager = db_manager
         self.clients_manager = clients_manager
         self.reservations_manager = reservations_manager
+        self.rules_manager = rules_manager
+        self.payments_manager = payments_manager
+        self.resources_manager = resources_manager
+        self.capacity_manager = capacity_manager
+        self.pricing_manager = pricing_manager
+        self.audit_manager = audit_manager
+        # Registro para deshacer/rehacer (sólo la aplicación de escritorio)
+        self.undo_log = undo_log
+        # EventBus donde se publican los días y clientes cambiados (sólo la
+        # aplicación de escritorio; la ventana y los diálogos se suscriben)
+        self.events = events
 
         self.now = datetime.now()
         self.current_year = self.now.year
         self.current_month = self.now.month
+        # Recurso cuyo calendario se muestra y modifica; las reglas de
+        # disponibilidad son comunes a todos los recursos
+        self.resource_id = DEFAULT_RESOURCE_ID
+
+    def set_resource(self, resource_id):
+        self.resource_id = resource_id
+
+    def get_resources(self):
+        return self.resources_manager.get_resources() if self.resources_manager else []
+
+    def _resource(self, resource_id):
+        return self.resource_id if resource_id is None else resource_id
 
     def get_current_month_year(self):
         return self.current_month, self.current_year
@@ -38,61 +98,224 @@ class CalendarLogic:
         cal = calendar.Calendar(firstweekday=0)
         month_cal = cal.monthdatescalendar(self.current_year, self.current_month)
 
+        # Una sola consulta de rango para todos los días del mes actual
+        first_day = date(self.current_year, self.current_month, 1)
+        last_day = date(self.current_year, self.current_month,
+                        calendar.monthrange(self.current_year, self.current_month)[1])
+        rows = self.reservations_manager.get_range(first_day, last_day, self.resource_id)
+        blocked = self.rules_manager.blocked_days(self.current_year, self.current_month) if self.rules_manager else ()
+        occupancy = self._occupancy(first_day, last_day)
+
         calendar_data = []
         for week in month_cal:
             week_data = []
             for day in week:
-                day_str = day.isoformat()
-                reservation = None
-                is_available = True
-
                 if day.month == self.current_month:
-                    reservation = self.reservations_manager.get_reservation(day_str)
-                    is_available = self.reservations_manager.is_available(day_str)
-
-                week_data.append({
-                    'date': day,
-                    'date_str': day_str,
-                    'is_current_month': day.month == self.current_month,
-                    'reservation': reservation,
-                    'is_available': is_available
-                })
+                    n = day.toordinal()
+                    week_data.append(self._build_day_info(day, rows.get(n), n in blocked, occupancy=occupancy.get(n)))
+                else:
+                    week_data.append(self._build_day_info(day, None, False))
             calendar_data.append(week_data)
         return calendar_data
 
+    def get_month_occupancy(self, year, month):
+        # Ocupación de todos los recursos en un mes: (recursos, días del mes,
+        # {resource_id: {día: DayInfo}}). Una consulta de reservas para todos
+        # los recursos y las reglas (comunes) evaluadas una sola vez.
+        days = [date(year, month, d) for d in range(1, calendar.monthrange(year, month)[1] + 1)]
+        occupancy = self.reservations_manager.get_occupancy(days[0], days[-1])
+        blocked = self.rules_manager.blocked_days(year, month) if self.rules_manager else ()
+        day_occupancy = self._occupancy(days[0], days[-1])
+        resources = self.get_resources()
+        cells = {}
+        for resource in resources:
+            rows = occupancy.get(resource.id, {})
+            cells[resource.id] = {
+                day.toordinal(): self._build_day_info(day, rows.get(day.toordinal()), day.toordinal() in blocked, month,
+                                                      day_occupancy.get(day.toordinal()))
+                for day in days
+            }
+        return resources, days, cells
+
+    def _build_day_info(self, day, row, rule_blocked, month=None, occupancy=None):
+        # `row` es la Reservation del día (o None si no hay); una fila
+        # explícita tiene prioridad sobre las reglas de disponibilidad.
+        # `occupancy` es (huéspedes, capacidad) del día en todos los recursos.
+        guests, capacity = occupancy or (0, None)
+        return DayInfo(
+            day,
+            day.isoformat(),
+            day.month == (self.current_month if month is None else month),
+            row if row is not None and not row.is_block else None,
+            row is None and not rule_blocked,
+            guests,
+            capacity
+        )
+
+    def _occupancy(self, start, end):
+        if not self.capacity_manager:
+            return {}
+        return self.capacity_manager.get_range(start, end)
+
+    def _rule_blocked_days(self, start, end):
+        if not self.rules_manager:
+            return ()
+        return self.rules_manager.blocked_days_in_range(start, end)
+
+    def _write(self, resource_id, start, end, action):
+        # Ejecutar un cambio de los días start..end registrándolo para
+        # deshacerlo y publicar los días cambiados
+        if self.undo_log is None:
+            result = action()
+        else:
+            result = self.undo_log.record(resource_id, start, end, action)
+        self._publish_days(resource_id, to_day_number(start), to_day_number(end))
+        return result
+
+    def _publish_days(self, resource_id, first, last):
+        if self.events is not None:
+            first, last = sorted((first, last))
+            self.events.publish(DatesChanged(frozenset(date.fromordinal(n) for n in range(first, last + 1)),
+                                             frozenset((resource_id,))))
+
+    def _publish_clients(self, client_ids):
+        if self.events is not None and client_ids:
+            self.events.publish(ClientChanged(frozenset(client_ids)))
+
+    def undo(self):
+        # Devuelve el cambio deshecho (UndoCommand, con sus días) o None
+        return self._publish_command(self.undo_log.undo() if self.undo_log else None)
+
+    def redo(self):
+        return self._publish_command(self.undo_log.redo() if self.undo_log else None)
+
+    def _publish_command(self, command):
+        if command is not None:
+            self._publish_days(command.resource_id, command.first, command.last)
+            self._publish_clients({row[0] for row in set(command.before[3]) ^ set(command.after[3])})
+        return command
+
     def toggle_day_availability(self, day):
-        day_str = day.isoformat()
-        is_currently_available = self.reservations_manager.is_available(day_str)
-        self.reservations_manager.set_availability(day_str, 0 if is_currently_available else 1)
+        return self._write(self.resource_id, day, day, lambda: self._toggle_day_availability(day))
+
+    def _toggle_day_availability(self, day):
+        status = self.get_day_status(day)
+        if status.reservation:
+            return False
+        if status.is_available:
+            self.reservations_manager.set_availability(day, 0, self.resource_id)
+        else:
+            self._free_days(day, day)
         # Return updated status for the day
-        return self.reservations_manager.is_available(day_str)
-
-    def get_day_status(self, day):
-        day_str = day.isoformat()
-        reservation = self.reservations_manager.get_reservation(day_str)
-        is_available = self.reservations_manager.is_available(day_str)
-        return {
-            'date': day,
-            'date_str': day_str,
-            'is_current_month': day.month == self.current_month,
-            'reservation': reservation,
-            'is_available': is_available
-        }
-
-    def add_or_update_reservation(self, day_str, client_data, reservation_data):
+        return self.get_day_status(day).is_available
+
+    def set_availability_range(self, start, end, available):
+        self._write(self.resource_id, start, end, lambda: self._set_availability_range(start, end, available))
+
+    def _set_availability_range(self, start, end, available):
+        if available:
+            self._free_days(start, end)
+        else:
+            self.reservations_manager.set_availability_range(start, end, 0, self.resource_id)
+
+    def _free_days(self, start, end):
+        # Quitar bloqueos explícitos y, si una regla sigue bloqueando el día,
+        # registrar una excepción para esa regla (todo en una transacción).
+        # Las reglas son comunes, así que la excepción libera el día en todos
+        # los recursos.
+        with self.db_manager.write():
+            self.reservations_manager.set_availability_range(start, end, 1, self.resource_id)
+            rule_blocked = self._rule_blocked_days(start, end)
+            if rule_blocked:
+                reserved = self.reservations_manager.get_range(start, end, self.resource_id)
+                self.rules_manager.add_exceptions(
+                    (rule_id, n) for n in sorted(rule_blocked) if n not in reserved
+                    for rule_id in self.rules_manager.rules_blocking(n)
+                )
+
+    def get_range_status(self, start, end, resource_id=None):
+        # Estado de varios días consecutivos con una sola consulta (del
+        # recurso actual si no se indica otro)
+        start, end = sorted((start, end))
+        rows = self.reservations_manager.get_range(start, end, self._resource(resource_id))
+        blocked = self._rule_blocked_days(start, end)
+        occupancy = self._occupancy(start, end)
+        return [self._build_day_info(date.fromordinal(n), rows.get(n), n in blocked, occupancy=occupancy.get(n))
+                for n in range(start.toordinal(), end.toordinal() + 1)]
+
+    def get_price(self, day, resource_id=None):
+        # Precio por noche según las tarifas, o None si no hay ninguna
+        if not self.pricing_manager:
+            return None
+        return self.pricing_manager.price(day, self._resource(resource_id))
+
+    def get_day_status(self, day, resource_id=None):
+        return self.get_range_status(day, day, resource_id)[0]
+
+    def add_or_update_reservation(self, day_str, client_data, reservation_data, resource_id=None):
+        resource_id = self._resource(resource_id)
+        client_id, client_changed = self._write(
+            resource_id, day_str, day_str,
+            lambda: self._save_reservation(day_str, client_data, reservation_data, resource_id))
+        if client_changed:
+            self._publish_clients({client_id})
+
+    def _save_reservation(self, day_str, client_data, reservation_data, resource_id):
         first_name = client_data['first_name']
         last_name = client_data['last_name']
         phone = client_data['phone']
 
-        client_id = self.clients_manager.add_or_get_client(first_name, last_name, phone)
+        guests = int(reservation_data.get('guests', AppConfig.CAPACITY['default_guests']))
+
+        # Capacidad, cliente, reserva y primer pago se confirman juntos: la
+        # comprobación usa la misma transacción que el INSERT
+        with self.db_manager.write():
+            if self.capacity_manager:
+                self.capacity_manager.check(day_str, resource_id, guests)
+            client_id, client_changed = self.clients_manager.save_client(first_name, last_name, phone)
+            is_new = self.reservations_manager.get_reservation(day_str, resource_id) is None
+
+            self.reservations_manager.add_reservation({
+                'date': day_str,
+                'guests': guests,
+                'amount': reservation_data['amount'],
+                'payment_method': reservation_data['payment_method'],
+                'reference': reservation_data.get('reference', ''),
+            }, client_id, resource_id)
+
+            # Al reservar, el estado elegido se registra como primer pago; al
+            # editar, los pagos se gestionan con add_payment()/delete_payment()
+            paid = initial_payment(reservation_data['amount'], reservation_data.get('payment_status'))
+            if is_new and paid and self.payments_manager:
+                self.payments_manager.add_payment(day_str, paid, reservation_data['payment_method'],
+                                                  reservation_data.get('reference', ''), resource_id=resource_id)
+        return client_id, client_changed
+
+    def delete_reservation(self, day_str, resource_id=None):
+        resource_id = self._resource(resource_id)
+        self._write(resource_id, day_str, day_str,
+                    lambda: self.reservations_manager.delete_reservation(day_str, resource_id))
+
+    def add_payment(self, day_str, amount, method, reference='', resource_id=None):
+        resource_id = self._resource(resource_id)
+        return self._write(resource_id, day_str, day_str,
+                           lambda: self.payments_manager.add_payment(day_str, amount, method, reference,
+                                                                     resource_id=resource_id))
+
+    def delete_payment(self, payment_id):
+        located = self.payments_manager.get_payment_day(payment_id)
+        if located is None:
+            return
+        resource_id, day = located
+        self._write(resource_id, day, day, lambda: self.payments_manager.delete_payment(payment_id))
+
+    def get_payments(self, day_str, resource_id=None):
+        return self.payments_manager.get_payments(day_str, self._resource(resource_id))
 
-        self.reservations_manager.add_reservation({
-            'date': day_str,
-            'amount': reservation_data['amount'],
-            'payment_status': reservation_data['payment_status'],
-            'payment_method': reservation_data['payment_method'],
-            'reference': reservation_data.get('reference', ''),
-        }, client_id)
+    def get_history(self, day_str, resource_id=None, key=None, forward=True, limit=50):
+        if not self.audit_manager:
+            return []
+        return self.audit_manager.get_history(day_str, self._resource(resource_id), key, forward, limit)
 
-    def delete_reservation(self, day_str):
-        self.reservations_manager.delete_reservation(day_str)
+    def get_outstanding(self):
+        return self.reservations_manager.get_outstanding()
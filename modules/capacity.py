@@ -0,0 +1,59 @@
+from config.app_config import AppConfig
+from utils.dates import to_day_number, from_day_number
+from modules.repository import CapacityRepository
+
+
+class OverbookingError(ValueError):
+    # La reserva supera la capacidad del recurso o la del día
+    pass
+
+
+class Capacity:
+    # Capacidad de huéspedes por día (común a todos los recursos) y por
+    # reserva de cada recurso. Los huéspedes de cada día (day_occupancy) los
+    # mantienen triggers, así que no hace falta recorrer las reservas ni para
+    # leer un mes ni para comprobar una reserva.
+    def __init__(self, db_manager, config=None):
+        self.db = db_manager
+        self.config = config or AppConfig.CAPACITY
+        self.repository = CapacityRepository(db_manager)
+
+    @property
+    def default_capacity(self):
+        return self.config['daily_guests']
+
+    def get_range(self, start, end):
+        # {número de día: (huéspedes, capacidad)} de todos los días del rango
+        # con una sola consulta; capacidad None = sin límite
+        first, last = sorted((to_day_number(start), to_day_number(end)))
+        rows = self.repository.range(first, last)
+        default = self.default_capacity
+        result = {}
+        for n in range(first, last + 1):
+            guests, capacity = rows.get(n, (0, None))
+            result[n] = (guests or 0, default if capacity is None else capacity)
+        return result
+
+    def set_daily_capacity(self, start, end, capacity):
+        # Capacidad propia de los días del rango; None vuelve a la de por defecto
+        first, last = sorted((to_day_number(start), to_day_number(end)))
+        if capacity is None:
+            self.repository.clear_range(first, last)
+        else:
+            self.repository.set_many(range(first, last + 1), capacity)
+
+    def check(self, day, resource_id, guests):
+        # Debe llamarse dentro de la transacción de escritura que guarda la
+        # reserva para que nadie ocupe el mismo cupo entre la comprobación y
+        # el INSERT. Al editar sólo se rechaza si aumentan los huéspedes.
+        day_guests, current, day_capacity, resource_capacity = self.repository.check(resource_id, day)
+        if resource_capacity is not None and guests > resource_capacity:
+            raise OverbookingError(AppConfig.LABELS['capacity_resource'].format(capacity=resource_capacity))
+        capacity = self.default_capacity if day_capacity is None else day_capacity
+        current = current or 0
+        total = (day_guests or 0) - current + guests
+        if capacity is not None and guests > current and total > capacity:
+            remaining = max(0, capacity - (day_guests or 0) + current)
+            raise OverbookingError(AppConfig.LABELS['capacity_day'].format(
+                date=from_day_number(to_day_number(day)).isoformat(), remaining=remaining, capacity=capacity))
+
@@ -1,22 +1,37 @@
+from modules.repository import ClientRepository, client_sort_key
 
 class Clients:
-    def __init__(self, db_conn):
-        self.conn = db_conn
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.repository = ClientRepository(db_manager)
 
     def add_or_get_client(self, first_name, last_name, phone):
-        cur = self.conn.cursor()
-        if not phone:
-            cur.execute('INSERT INTO clients (first_name, last_name, phone) VALUES (?,?,?)', (first_name, last_name, None))
-            return cur.lastrowid
-
-        cur.execute('SELECT id FROM clients WHERE phone=?', (phone,))
-        row = cur.fetchone()
-        if row:
-            # Opcional: Actualizar nombre y apellido si han cambiado
-            cur.execute('UPDATE clients SET first_name=?, last_name=? WHERE id=?', (first_name, last_name, row['id']))
-            self.conn.commit()
-            return row['id']
-        else:
-            cur.execute('INSERT INTO clients (first_name, last_name, phone) VALUES (?,?,?)', (first_name, last_name, phone))
-            self.conn.commit()
-            return cur.lastrowid
+        return self.save_client(first_name, last_name, phone)[0]
+
+    def save_client(self, first_name, last_name, phone):
+        # Devuelve (id, True si el cliente se creó o cambió de nombre)
+        with self.db.write():
+            if not phone:
+                return self.repository.insert(first_name, last_name, None), True
+
+            client_id = self.repository.id_by_phone(phone)
+            if client_id is not None:
+                # Opcional: Actualizar nombre y apellido si han cambiado
+                return client_id, self.repository.update_name(client_id, first_name, last_name)
+            else:
+                return self.repository.insert(first_name, last_name, phone), True
+
+    def get_client(self, client_id):
+        return self.repository.get(client_id)
+
+    def get_clients(self, client_ids):
+        return self.repository.get_many(client_ids)
+
+    def get_page(self, sort='name', key=None, forward=True, limit=100):
+        # Paginación por clave (sin OFFSET): cada página cuesta lo mismo esté
+        # donde esté en la tabla. `key` es page_key() de la última fila
+        # mostrada (o de la primera si forward es False).
+        return self.repository.page(sort, key, forward, limit)
+
+    def page_key(self, sort, client):
+        return client_sort_key(sort, client)
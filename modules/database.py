@@ -1,22 +1,197 @@
+import getpass
 import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from utils.dates import JULIAN_OFFSET
+from modules.repository import STATEMENTS
+
+# Espera máxima (ms) cuando otro proceso tiene bloqueada la base de datos
+BUSY_TIMEOUT_MS = 5000
+
+# Caché de sentencias compiladas por conexión: todo el registro de
+# modules/repository.py más margen para consultas puntuales y pragmas
+STATEMENT_CACHE_SIZE = max(128, 2 * len(STATEMENTS))
+
+# Recurso (cabaña, parcela, salón) al que pasan las reservas de las bases de
+# datos anteriores a los recursos; también es el recurso por defecto
+DEFAULT_RESOURCE_ID = 1
+DEFAULT_RESOURCE_NAME = 'Principal'
+
+# Triggers de payments que actualizan reservations; se recrean al reconstruir
+# la tabla reservations
+PAYMENT_LEDGER_TRIGGERS = ('payments_ai_balance', 'payments_ad_balance', 'payments_au_balance')
+
+# Estado de pago derivado del registro de pagos (los nombres son los de
+# AppConfig.PAYMENT_STATUSES); NULL en los días bloqueados
+PAYMENT_STATUS_COLUMN = '''payment_status TEXT GENERATED ALWAYS AS (
+                CASE WHEN client_id IS NULL THEN NULL
+                     WHEN ROUND(paid_total, 2) >= ROUND(COALESCE(amount, 0), 2) THEN 'Completo'
+                     WHEN paid_total > 0 THEN 'Mitad'
+                     ELSE 'Nada' END) VIRTUAL'''
+
+# Tablas replicadas entre instalaciones (modules/replication.py): expresión
+# de la clave estable de una fila y columnas cuyo cambio se replica. Las
+# tarifas, reglas y capacidades son configuración de cada instalación.
+REPLICATED_TABLES = {
+    'resources': ('{row}.name', ('name', 'kind', 'sort_order', 'active', 'capacity')),
+    'clients': ('{row}.uid', ('first_name', 'last_name', 'phone')),
+    'reservations': ('json_array((SELECT name FROM resources WHERE id = {row}.resource_id), {row}.day)',
+                     ('resource_id', 'day', 'client_id', 'guests', 'amount', 'payment_method', 'reference',
+                      'created_at')),
+    'payments': ('{row}.uid', ('resource_id', 'day', 'paid_on', 'amount', 'method', 'reference', 'created_at',
+                               'reconciled_at', 'bank_reference')),
+}
+
+# Columnas de reservations y payments cuyo cambio queda en reservation_audit
+# (expresión de cada una sobre la fila OLD o NEW). Del cliente se guarda el
+# nombre que tenía en ese momento; paid_total y created_at no se auditan.
+AUDITED_COLUMNS = {
+    'reservations': {
+        'client_id': "(SELECT TRIM(IFNULL(first_name, '') || ' ' || IFNULL(last_name, '')) "
+                     "FROM clients WHERE id = {row}.client_id)",
+        'guests': '{row}.guests',
+        'amount': '{row}.amount',
+        'payment_method': '{row}.payment_method',
+        'reference': '{row}.reference',
+    },
+    'payments': {
+        'paid_on': '{row}.paid_on',
+        'amount': '{row}.amount',
+        'method': '{row}.method',
+        'reference': '{row}.reference',
+        'reconciled_at': '{row}.reconciled_at',
+    },
+}
+
+NEW_UID = 'lower(hex(randomblob(16)))'
+# Milisegundos desde 1970 (versión de los cambios en change_log)
+NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
 
 class Database:
-    def __init__(self, path='kumbayah.db'):
+    # Gestor de conexiones: una conexión de escritura compartida y serializada
+    # por un cerrojo, y una conexión de sólo lectura por hilo. Con WAL los
+    # lectores no bloquean al escritor ni el escritor a los lectores.
+    def __init__(self, path='kumbayah.db', user=None):
         self.path = path
+        # Usuario que firma los cambios del historial (app_user() en SQL)
+        self.user = user or _system_user()
         self.conn = None
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._write_owner = None
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._statement_counts = Counter()
+        self._counts_lock = threading.Lock()
 
     def connect(self):
-        self.conn = sqlite3.connect(self.path)
-        self.conn.row_factory = sqlite3.Row
+        # Conexión de escritura; en modo autocommit para controlar las
+        # transacciones explícitamente desde write()
+        if self.conn is None:
+            self.conn = self._open(isolation_level=None)
+            # Sólo tiene efecto en bases de datos nuevas; las existentes se
+            # convierten desde modules/maintenance.py
+            self.conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
         return self.conn
 
+    def _open(self, isolation_level=''):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=isolation_level,
+                               check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        # Los triggers de reservation_audit la llaman; se lee en cada llamada
+        # para que cambiar db_manager.user tenga efecto sin reabrir
+        conn.create_function('app_user', 0, lambda: self.user)
+        return conn
+
+    def reader(self):
+        # Dentro de una transacción de escritura del mismo hilo se lee con la
+        # conexión de escritura para ver los cambios aún no confirmados
+        if self._write_owner == threading.get_ident():
+            return self.conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.connect()
+            conn = self._open(isolation_level=None)
+            conn.execute('PRAGMA query_only=ON')
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextmanager
+    def write(self):
+        # Transacción de escritura serializada entre hilos. BEGIN IMMEDIATE toma
+        # el bloqueo de escritura de SQLite al empezar, así que tampoco se
+        # intercala con otros procesos. Las llamadas anidadas se unen a la
+        # transacción exterior.
+        with self._write_lock:
+            conn = self.connect()
+            if self._write_depth:
+                self._write_depth += 1
+                try:
+                    yield conn
+                finally:
+                    self._write_depth -= 1
+                return
+            conn.execute('BEGIN IMMEDIATE')
+            self._write_depth, self._write_owner = 1, threading.get_ident()
+            try:
+                yield conn
+            except BaseException:
+                # Una sentencia interrumpida (progress handler) ya deshizo la transacción
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+            else:
+                conn.execute('COMMIT')
+            finally:
+                self._write_depth, self._write_owner = 0, None
+
+    def count_statement(self, name):
+        with self._counts_lock:
+            self._statement_counts[name] += 1
+
+    def statement_counts(self):
+        # Ejecuciones por sentencia del registro desde que se abrió la base de datos
+        with self._counts_lock:
+            return dict(self._statement_counts.most_common())
+
+    @contextmanager
+    def exclusive(self, blocking=True):
+        # Conexión de escritura sin transacción, para sentencias que no pueden
+        # ir dentro de BEGIN (VACUUM, checkpoints). Con blocking=False produce
+        # None si otro hilo está escribiendo.
+        if not self._write_lock.acquire(blocking=blocking):
+            yield None
+            return
+        try:
+            if self._write_depth:
+                raise RuntimeError('exclusive() dentro de una transacción de escritura')
+            yield self.connect()
+        finally:
+            self._write_lock.release()
+
     def close(self):
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        self._local = threading.local()
         if self.conn:
             self.conn.close()
+            self.conn = None
 
     def create_tables(self):
-        conn = self.connect()
-        cur = conn.cursor()
+        with self.write() as conn:
+            self._create_tables(conn.cursor())
+
+    def _create_tables(self, cur):
         # Crear la tabla clients
         cur.execute('''
         CREATE TABLE IF NOT EXISTS clients (
@@ -26,10 +201,503 @@ class Database:
             phone TEXT UNIQUE
         )
         ''')
-        # Tabla reservations normalizada que referencia a clients
+        # Orden del directorio de clientes (paginación por clave); las mismas
+        # expresiones que CLIENT_SORTS en modules/repository.py
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_clients_name "
+                    "ON clients(IFNULL(last_name, ''), IFNULL(first_name, ''))")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_clients_phone_sort ON clients(IFNULL(phone, ''))")
+        self._create_client_keys(cur)
+        # Recursos reservables; cada uno tiene su propio calendario
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS resources (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            kind TEXT,
+            sort_order INTEGER NOT NULL DEFAULT 0,
+            active INTEGER NOT NULL DEFAULT 1
+        )
+        ''')
+        cur.execute('INSERT OR IGNORE INTO resources (id, name) VALUES (?, ?)',
+                    (DEFAULT_RESOURCE_ID, DEFAULT_RESOURCE_NAME))
+        # Huéspedes máximos por reserva del recurso (NULL = sin límite)
+        cur.execute('PRAGMA table_info(resources)')
+        if 'capacity' not in [row['name'] for row in cur.fetchall()]:
+            cur.execute('ALTER TABLE resources ADD COLUMN capacity INTEGER')
+        # Migrar el esquema antiguo (fecha ISO como clave) antes de crear el nuevo
+        self._migrate_reservations_to_day_numbers(cur)
+        self._create_payments(cur)
+        self._migrate_payment_status_to_ledger(cur)
+        self._migrate_reservation_guests(cur)
+        self._migrate_reservations_to_resources(cur)
+        # Tabla reservations normalizada que referencia a clients y resources
+        cur.execute(self._reservations_schema('reservations'))
+        # Ocupación de todos los recursos por rango de días
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_reservations_day ON reservations(day)')
+        # Historial de reservas de un cliente
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_reservations_client ON reservations(client_id, day)')
+        # Agenda de reservas en orden cronológico, sin los días bloqueados
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_reservations_agenda ON reservations(day) '
+                    'WHERE client_id IS NOT NULL')
+        self._create_payment_ledger(cur)
+        self._create_day_occupancy(cur)
+        # Reglas de disponibilidad recurrentes; las filas explícitas de
+        # reservations tienen prioridad sobre ellas
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS availability_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            weekday INTEGER,
+            start_day INTEGER,
+            end_day INTEGER,
+            start_md INTEGER,
+            end_md INTEGER,
+            label TEXT
+        )
+        ''')
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS availability_rule_exceptions (
+            rule_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            PRIMARY KEY(rule_id, day),
+            FOREIGN KEY(rule_id) REFERENCES availability_rules(id)
+        ) WITHOUT ROWID
+        ''')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_rule_exceptions_day ON availability_rule_exceptions(day)')
+        # Tarifas por noche (modules/pricing.py); resource_id NULL = todos los recursos
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS rates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            resource_id INTEGER,
+            kind TEXT NOT NULL,
+            start_day INTEGER,
+            end_day INTEGER,
+            start_md INTEGER,
+            end_md INTEGER,
+            weekdays INTEGER,
+            price REAL NOT NULL,
+            label TEXT,
+            FOREIGN KEY(resource_id) REFERENCES resources(id)
+        )
+        ''')
+        self._create_change_tracking(cur)
+        self._create_audit(cur)
+        # Última ejecución de las tareas de mantenimiento periódicas
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS maintenance_runs (
+            task TEXT PRIMARY KEY,
+            last_run TEXT NOT NULL
+        )
+        ''')
+        self._create_replication(cur)
+
+    def _create_triggers(self, cur, triggers):
+        # triggers: {nombre: (evento, cuerpo)}. Un trigger cuya definición
+        # cambió (bases de datos creadas con una versión anterior) se elimina
+        # y se vuelve a crear; los que no cambiaron no se tocan.
+        cur.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row['name']: row['sql'] for row in cur.fetchall()}
+        for name, (event, body) in triggers.items():
+            sql = f'CREATE TRIGGER {name} {event} BEGIN {body} END'
+            if existing.get(name) != sql:
+                cur.execute(f'DROP TRIGGER IF EXISTS {name}')
+                cur.execute(sql)
+
+    def _create_replication(self, cur):
+        # Registro de cambios para la replicación entre instalaciones
+        # (modules/replication.py). Cada alta, cambio o baja de las tablas de
+        # REPLICATED_TABLES añade a change_log la clave estable de la fila, la
+        # versión (milisegundos, siempre mayor que la anterior de la fila) y
+        # el origen; las bajas quedan como lápidas (deleted = 1). Los ids
+        # autoincrementales no coinciden entre instalaciones, así que clients
+        # y payments tienen un uid. Al crear el registro se anotan todas las
+        # filas existentes para que la primera exportación sea completa.
+        for table in ('clients', 'payments'):
+            cur.execute(f'PRAGMA table_info({table})')
+            if 'uid' not in [row['name'] for row in cur.fetchall()]:
+                cur.execute(f'ALTER TABLE {table} ADD COLUMN uid TEXT')
+                cur.execute(f'UPDATE {table} SET uid = {NEW_UID}')
+            cur.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_uid ON {table}(uid)')
+        # Identificador de esta instalación ('origin') y marca 'applying'
+        # mientras se aplica un archivo de cambios (los triggers no anotan)
+        cur.execute('CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        cur.execute("INSERT OR IGNORE INTO sync_state (key, value) VALUES ('origin', lower(hex(randomblob(8))))")
+        # Hasta dónde ha confirmado cada otra instalación nuestros cambios
+        # (sent_seq) y hasta dónde hemos aplicado los suyos (received_seq)
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS sync_peers (
+            origin TEXT PRIMARY KEY,
+            sent_seq INTEGER NOT NULL DEFAULT 0,
+            received_seq INTEGER NOT NULL DEFAULT 0,
+            last_import TEXT
+        )
+        ''')
+        # Clientes de otra instalación cuyo teléfono ya tenía un cliente de
+        # esta: sus reservas se asignan al cliente local
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS client_aliases (
+            uid TEXT PRIMARY KEY,
+            local_uid TEXT NOT NULL
+        ) WITHOUT ROWID
+        ''')
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'")
+        exists = cur.fetchone() is not None
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tbl TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            deleted INTEGER NOT NULL,
+            changed_at INTEGER NOT NULL,
+            origin TEXT NOT NULL
+        )
+        ''')
+        # Última versión de una fila: la mayor (changed_at, origin) de su clave
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_change_log_row ON change_log(tbl, row_key, changed_at, origin)')
+        if not exists:
+            for table, (key, _) in REPLICATED_TABLES.items():
+                cur.execute(f'''
+                INSERT INTO change_log (tbl, row_key, deleted, changed_at, origin)
+                SELECT '{table}', {key.format(row='t')}, 0, {NOW_MS},
+                       (SELECT value FROM sync_state WHERE key = 'origin')
+                FROM {table} t
+                ''')
+        log = ('''INSERT INTO change_log (tbl, row_key, deleted, changed_at, origin)
+                  SELECT '{table}', k.row_key, {deleted},
+                         MAX({now}, IFNULL((SELECT MAX(changed_at) + 1 FROM change_log
+                                             WHERE tbl = '{table}' AND row_key = k.row_key), 0)),
+                         s.value
+                  FROM (SELECT {key} AS row_key) k JOIN sync_state s ON s.key = 'origin'
+                  WHERE {condition} NOT EXISTS (SELECT 1 FROM sync_state WHERE key = 'applying');''')
+        for table, (key, columns) in REPLICATED_TABLES.items():
+            def entry(row_key, deleted, condition=''):
+                return log.format(table=table, key=row_key, deleted=deleted, now=NOW_MS, condition=condition)
+            old_key, new_key = key.format(row='OLD'), key.format(row='NEW')
+            inserted = entry(new_key, 0)
+            if table in ('clients', 'payments'):
+                # El uid se asigna aquí para que la anotación lo vea
+                inserted = (f'UPDATE {table} SET uid = {NEW_UID} WHERE id = NEW.id AND NEW.uid IS NULL;\n'
+                            + entry(f'(SELECT uid FROM {table} WHERE id = NEW.id)', 0))
+            moved = f'({old_key}) IS NOT ({new_key}) AND'
+            changed = ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in columns)
+            triggers = {
+                f'{table}_ai_sync': (f'AFTER INSERT ON {table}', inserted),
+                f'{table}_au_sync': (f'AFTER UPDATE OF {", ".join(columns)} ON {table} WHEN {changed}',
+                                     entry(old_key, 1, moved) + '\n' + entry(new_key, 0)),
+                f'{table}_ad_sync': (f'AFTER DELETE ON {table}', entry(old_key, 1)),
+            }
+            # Los recursos no se eliminan (se desactivan)
+            if table == 'resources':
+                del triggers['resources_ad_sync']
+            self._create_triggers(cur, triggers)
+
+    def _create_audit(self, cur):
+        # Historial de sólo inserción de los cambios de reservas y pagos:
+        # quién (app_user(), registrada en cada conexión), cuándo (segundos
+        # desde 1970) y, en JSON, sólo las columnas cambiadas: {columna: valor}
+        # al crear o eliminar y {columna: [antes, después]} al modificar. Un
+        # índice por (recurso, día) para el historial de una reserva y otro
+        # por fecha del cambio para depurar los antiguos (modules/maintenance.py).
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS reservation_audit (
+            id INTEGER PRIMARY KEY,
+            resource_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            entity TEXT NOT NULL,
+            action TEXT NOT NULL,
+            payment_id INTEGER,
+            changed_at INTEGER NOT NULL,
+            user TEXT,
+            changes TEXT NOT NULL
+        )
+        ''')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_audit_reservation ON reservation_audit(resource_id, day, id)')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_audit_changed_at ON reservation_audit(changed_at)')
+        entry = ('''INSERT INTO reservation_audit (resource_id, day, entity, action, payment_id, changed_at, user, changes)
+                    VALUES ({row}.resource_id, {row}.day, '{entity}', '{action}', {payment_id},
+                            CAST(strftime('%s', 'now') AS INTEGER), app_user(), '{{' || substr({changes}, 2) || '}}');''')
+        for table, columns in AUDITED_COLUMNS.items():
+            entity = table[:-1]
+            def audit(row, action):
+                if action == 'update':
+                    fragments = [f"IIF(({value.format(row='OLD')}) IS ({value.format(row='NEW')}), '', "
+                                 f"',\"{column}\":' || json_array({value.format(row='OLD')}, {value.format(row='NEW')}))"
+                                 for column, value in columns.items()]
+                else:
+                    fragments = [f"IIF(IFNULL({value.format(row=row)}, '') = '', '', "
+                                 f"',\"{column}\":' || json_quote({value.format(row=row)}))"
+                                 for column, value in columns.items()]
+                return entry.format(row=row, entity=entity, action=action, changes=' || '.join(fragments),
+                                    payment_id=f'{row}.id' if table == 'payments' else 'NULL')
+            changed = ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in columns)
+            triggers = {
+                f'{table}_ai_audit': (f'AFTER INSERT ON {table}', audit('NEW', 'insert')),
+                f'{table}_au_audit': (f'AFTER UPDATE OF {", ".join(columns)} ON {table} WHEN {changed}',
+                                      audit('NEW', 'update')),
+                f'{table}_ad_audit': (f'AFTER DELETE ON {table}', audit('OLD', 'delete')),
+            }
+            self._create_triggers(cur, triggers)
+
+    def _create_change_tracking(self, cur):
+        # Contador de cambios por mes (AAAAMM), mantenido por triggers para que
+        # cualquier conexión (app, línea de comandos, API) lo actualice. El mes 0
+        # es global: cambios en reglas (y sus excepciones), tarifas o nombres de
+        # clientes afectan a todos los meses, y las cachés de reglas y tarifas
+        # se invalidan sólo cuando cambia.
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS change_versions (
+            month INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+        ''')
+        bump = ('''INSERT INTO change_versions (month, version) VALUES ({month}, 1)
+                  ON CONFLICT(month) DO UPDATE SET version = version + 1;''')
+        reservation_month = "CAST(strftime('%Y%m', {row}.day + {offset}) AS INTEGER)"
+        triggers = {
+            'reservations_ai': ('AFTER INSERT ON reservations', [reservation_month.format(row='NEW', offset=JULIAN_OFFSET)]),
+            'reservations_au': ('AFTER UPDATE ON reservations', [reservation_month.format(row='OLD', offset=JULIAN_OFFSET),
+                                                                reservation_month.format(row='NEW', offset=JULIAN_OFFSET)]),
+            'reservations_ad': ('AFTER DELETE ON reservations', [reservation_month.format(row='OLD', offset=JULIAN_OFFSET)]),
+            'rule_exceptions_ai': ('AFTER INSERT ON availability_rule_exceptions',
+                                   [reservation_month.format(row='NEW', offset=JULIAN_OFFSET), '0']),
+            'rule_exceptions_ad': ('AFTER DELETE ON availability_rule_exceptions',
+                                   [reservation_month.format(row='OLD', offset=JULIAN_OFFSET), '0']),
+            'day_capacity_ai': ('AFTER INSERT ON day_capacity', [reservation_month.format(row='NEW', offset=JULIAN_OFFSET)]),
+            'day_capacity_au': ('AFTER UPDATE ON day_capacity', [reservation_month.format(row='NEW', offset=JULIAN_OFFSET)]),
+            'day_capacity_ad': ('AFTER DELETE ON day_capacity', [reservation_month.format(row='OLD', offset=JULIAN_OFFSET)]),
+            'resources_ai': ('AFTER INSERT ON resources', ['0']),
+            'resources_au': ('AFTER UPDATE ON resources', ['0']),
+            'availability_rules_ai': ('AFTER INSERT ON availability_rules', ['0']),
+            'availability_rules_au': ('AFTER UPDATE ON availability_rules', ['0']),
+            'availability_rules_ad': ('AFTER DELETE ON availability_rules', ['0']),
+            'rates_ai': ('AFTER INSERT ON rates', ['0']),
+            'rates_au': ('AFTER UPDATE ON rates', ['0']),
+            'rates_ad': ('AFTER DELETE ON rates', ['0']),
+            'clients_au': ('AFTER UPDATE OF first_name, last_name ON clients '
+                           'WHEN OLD.first_name IS NOT NEW.first_name OR OLD.last_name IS NOT NEW.last_name', ['0']),
+        }
+        self._create_triggers(cur, {f'{name}_version': (event, '\n'.join(bump.format(month=month) for month in months))
+                                    for name, (event, months) in triggers.items()})
+
+    def _create_payments(self, cur):
+        # Pagos de cada reserva (varios por día, cada uno con su método y
+        # referencia). El índice por día sirve tanto para el historial como
+        # para los triggers que mantienen reservations.paid_total.
+        cur.execute(f'''
+        CREATE TABLE IF NOT EXISTS payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            resource_id INTEGER NOT NULL DEFAULT {DEFAULT_RESOURCE_ID},
+            day INTEGER NOT NULL,
+            paid_on TEXT NOT NULL,
+            amount REAL NOT NULL,
+            method TEXT,
+            reference TEXT,
+            created_at TEXT,
+            reconciled_at TEXT,
+            bank_reference TEXT,
+            FOREIGN KEY(resource_id, day) REFERENCES reservations(resource_id, day)
+        )
+        ''')
+        # Columnas añadidas después de crear la tabla (conciliación bancaria, recursos)
+        cur.execute('PRAGMA table_info(payments)')
+        columns = [row['name'] for row in cur.fetchall()]
+        for column in ('reconciled_at', 'bank_reference'):
+            if column not in columns:
+                cur.execute(f'ALTER TABLE payments ADD COLUMN {column} TEXT')
+        if 'resource_id' not in columns:
+            cur.execute(f'ALTER TABLE payments ADD COLUMN resource_id INTEGER NOT NULL DEFAULT {DEFAULT_RESOURCE_ID}')
+        cur.execute('DROP INDEX IF EXISTS idx_payments_day')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_payments_reservation ON payments(resource_id, day, paid_on)')
+        # Sólo los pagos con referencia pendientes de conciliar
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_payments_unreconciled ON payments(id) "
+                    "WHERE reconciled_at IS NULL AND reference <> ''")
+
+    def _create_payment_ledger(self, cur):
+        # paid_total se mantiene de forma incremental con cada pago, así que el
+        # saldo y el estado de una reserva no necesitan sumar sus pagos. El
+        # índice parcial contiene sólo las reservas con saldo pendiente.
+        balance = ('UPDATE reservations SET paid_total = paid_total {sign} {{row}}.amount '
+                   'WHERE resource_id = {{row}}.resource_id AND day = {{row}}.day;')
+        add, subtract = balance.format(sign='+'), balance.format(sign='-')
+        triggers = {
+            'payments_ai_balance': ('AFTER INSERT ON payments', add.format(row='NEW')),
+            'payments_ad_balance': ('AFTER DELETE ON payments', subtract.format(row='OLD')),
+            'payments_au_balance': ('AFTER UPDATE OF resource_id, day, amount ON payments',
+                                    subtract.format(row='OLD') + '\n' + add.format(row='NEW')),
+            # Al eliminar una reserva se eliminan sus pagos
+            'reservations_ad_payments': ('AFTER DELETE ON reservations',
+                                         'DELETE FROM payments WHERE resource_id = OLD.resource_id AND day = OLD.day;'),
+        }
+        self._create_triggers(cur, triggers)
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_reservations_outstanding ON reservations(day) '
+                    'WHERE client_id IS NOT NULL AND paid_total < amount')
+
+    def _create_day_occupancy(self, cur):
+        # Huéspedes y reservas de cada día sumando todos los recursos. Se
+        # calcula una vez con un GROUP BY al crear la tabla y luego los
+        # triggers lo mantienen con cada alta, baja o cambio de reserva, así
+        # que la capacidad restante de un mes es un rango sobre esta tabla y
+        # comprobar una reserva es una búsqueda por clave. Los días bloqueados
+        # (client_id nulo) no cuentan.
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'day_occupancy'")
+        exists = cur.fetchone() is not None
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS day_occupancy (
+            day INTEGER PRIMARY KEY,
+            reservations INTEGER NOT NULL,
+            guests INTEGER NOT NULL
+        ) WITHOUT ROWID
+        ''')
+        if not exists:
+            cur.execute('''
+            INSERT INTO day_occupancy (day, reservations, guests)
+            SELECT day, COUNT(*), SUM(guests) FROM reservations WHERE client_id IS NOT NULL GROUP BY day
+            ''')
+        # Capacidad de huéspedes de días concretos; los demás usan
+        # AppConfig.CAPACITY['daily_guests']
+        cur.execute('''
+        CREATE TABLE IF NOT EXISTS day_capacity (
+            day INTEGER PRIMARY KEY,
+            capacity INTEGER NOT NULL
+        ) WITHOUT ROWID
+        ''')
+        add = ('INSERT INTO day_occupancy (day, reservations, guests) VALUES (NEW.day, 1, NEW.guests) '
+               'ON CONFLICT(day) DO UPDATE SET reservations = reservations + 1, guests = guests + excluded.guests;')
+        subtract = ('UPDATE day_occupancy SET reservations = reservations - 1, guests = guests - OLD.guests '
+                    'WHERE day = OLD.day;\n'
+                    'DELETE FROM day_occupancy WHERE day = OLD.day AND reservations = 0;')
+        triggers = {
+            'reservations_ai_occupancy': ('AFTER INSERT ON reservations WHEN NEW.client_id IS NOT NULL', add),
+            'reservations_ad_occupancy': ('AFTER DELETE ON reservations WHEN OLD.client_id IS NOT NULL', subtract),
+            'reservations_au_occupancy_old': ('AFTER UPDATE OF day, client_id, guests ON reservations '
+                                              'WHEN OLD.client_id IS NOT NULL', subtract),
+            'reservations_au_occupancy_new': ('AFTER UPDATE OF day, client_id, guests ON reservations '
+                                              'WHEN NEW.client_id IS NOT NULL', add),
+        }
+        self._create_triggers(cur, triggers)
+
+    def _create_client_keys(self, cur):
+        # Claves de bloqueo para detectar clientes duplicados (modules/dedup.py):
+        # teléfono normalizado, nombre sin acentos y clave fonética. Las claves
+        # se calculan en Python; los triggers sólo anotan en
+        # client_keys_pending los clientes nuevos o cambiados, y al crear la
+        # tabla se anotan todos.
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'client_keys'")
+        exists = cur.fetchone() is not None
         cur.execute('''
-        CREATE TABLE IF NOT EXISTS reservations (
-            date TEXT PRIMARY KEY,
+        CREATE TABLE IF NOT EXISTS client_keys (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            client_id INTEGER NOT NULL,
+            PRIMARY KEY(kind, key, client_id)
+        ) WITHOUT ROWID
+        ''')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_client_keys_client ON client_keys(client_id)')
+        cur.execute('CREATE TABLE IF NOT EXISTS client_keys_pending (client_id INTEGER PRIMARY KEY)')
+        if not exists:
+            cur.execute('INSERT OR IGNORE INTO client_keys_pending (client_id) SELECT id FROM clients')
+        mark = 'INSERT OR IGNORE INTO client_keys_pending (client_id) VALUES (NEW.id);'
+        triggers = {
+            'clients_ai_keys': ('AFTER INSERT ON clients', mark),
+            'clients_au_keys': ('AFTER UPDATE OF first_name, last_name, phone ON clients '
+                                'WHEN OLD.first_name IS NOT NEW.first_name OR OLD.last_name IS NOT NEW.last_name '
+                                'OR OLD.phone IS NOT NEW.phone', mark),
+            'clients_ad_keys': ('AFTER DELETE ON clients',
+                                'DELETE FROM client_keys WHERE client_id = OLD.id;\n'
+                                'DELETE FROM client_keys_pending WHERE client_id = OLD.id;'),
+        }
+        self._create_triggers(cur, triggers)
+
+    def _reservations_schema(self, table_name):
+        # `day` es el número de día (date.toordinal()). La clave es (recurso,
+        # día) en una tabla WITHOUT ROWID, así que la tabla misma es el índice
+        # por recurso y fecha. `date` se conserva como columna generada en
+        # formato ISO para compatibilidad. payment_status se deriva de lo
+        # pagado (paid_total) frente al monto.
+        return f'''
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            resource_id INTEGER NOT NULL DEFAULT {DEFAULT_RESOURCE_ID},
+            day INTEGER NOT NULL,
+            date TEXT GENERATED ALWAYS AS (date(day + {JULIAN_OFFSET})) VIRTUAL,
+            client_id INTEGER,
+            guests INTEGER NOT NULL DEFAULT 0,
+            amount REAL,
+            payment_method TEXT,
+            reference TEXT,
+            created_at TEXT,
+            paid_total REAL NOT NULL DEFAULT 0,
+            {PAYMENT_STATUS_COLUMN},
+            PRIMARY KEY(resource_id, day),
+            FOREIGN KEY(resource_id) REFERENCES resources(id),
+            FOREIGN KEY(client_id) REFERENCES clients(id)
+        ) WITHOUT ROWID
+        '''
+
+    def _migrate_reservations_to_resources(self, cur):
+        # Esquema con un solo calendario (day como clave): reconstruir la
+        # tabla con las reservas asignadas al recurso por defecto
+        cur.execute('PRAGMA table_info(reservations)')
+        columns = [row['name'] for row in cur.fetchall()]
+        if not columns or 'resource_id' in columns:
+            return
+        # Los triggers de payments hacen referencia a reservations; se
+        # recrean con la clave nueva en _create_payment_ledger
+        for name in PAYMENT_LEDGER_TRIGGERS:
+            cur.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cur.execute(self._reservations_schema('reservations_new'))
+        cur.execute('''
+        INSERT INTO reservations_new (resource_id, day, client_id, guests, amount, payment_method, reference,
+                                      created_at, paid_total)
+        SELECT ?, day, client_id, guests, amount, payment_method, reference, created_at, paid_total
+        FROM reservations
+        ''', (DEFAULT_RESOURCE_ID,))
+        cur.execute('DROP TABLE reservations')
+        cur.execute('ALTER TABLE reservations_new RENAME TO reservations')
+
+    def _migrate_reservation_guests(self, cur):
+        # Esquema anterior a la capacidad: cada reserva existente cuenta como
+        # un huésped; los días bloqueados quedan en 0
+        cur.execute('PRAGMA table_info(reservations)')
+        columns = [row['name'] for row in cur.fetchall()]
+        if not columns or 'guests' in columns:
+            return
+        cur.execute('ALTER TABLE reservations ADD COLUMN guests INTEGER NOT NULL DEFAULT 0')
+        cur.execute('UPDATE reservations SET guests = 1 WHERE client_id IS NOT NULL')
+
+    def _migrate_payment_status_to_ledger(self, cur):
+        # Esquema anterior al registro de pagos: payment_status era texto libre.
+        # Completo y Mitad se convierten en un pago del monto o de la mitad,
+        # con el método y la referencia que tenía la reserva.
+        cur.execute('PRAGMA table_info(reservations)')
+        columns = [row['name'] for row in cur.fetchall()]
+        if not columns or 'paid_total' in columns:
+            return
+        cur.execute('''
+        INSERT INTO payments (day, paid_on, amount, method, reference, created_at)
+        SELECT day, COALESCE(date(created_at), date),
+               CASE payment_status WHEN 'Completo' THEN amount ELSE amount / 2.0 END,
+               payment_method, reference, created_at
+        FROM reservations
+        WHERE client_id IS NOT NULL AND amount > 0 AND payment_status IN ('Completo', 'Mitad')
+        ''')
+        cur.execute('ALTER TABLE reservations DROP COLUMN payment_status')
+        cur.execute('ALTER TABLE reservations ADD COLUMN paid_total REAL NOT NULL DEFAULT 0')
+        cur.execute(f'ALTER TABLE reservations ADD COLUMN {PAYMENT_STATUS_COLUMN}')
+        cur.execute('''
+        UPDATE reservations SET paid_total = (SELECT TOTAL(amount) FROM payments WHERE payments.day = reservations.day)
+        WHERE day IN (SELECT day FROM payments)
+        ''')
+
+    def _migrate_reservations_to_day_numbers(self, cur):
+        cur.execute('PRAGMA table_info(reservations)')
+        columns = [row['name'] for row in cur.fetchall()]
+        if not columns or 'day' in columns:
+            return
+        # Se copia con el esquema de entonces (payment_status como texto);
+        # _migrate_payment_status_to_ledger lo convierte a continuación
+        cur.execute(f'''
+        CREATE TABLE reservations_new (
+            day INTEGER PRIMARY KEY,
+            date TEXT GENERATED ALWAYS AS (date(day + {JULIAN_OFFSET})) VIRTUAL,
             client_id INTEGER,
             amount REAL,
             payment_status TEXT,
@@ -39,4 +707,19 @@ class Database:
             FOREIGN KEY(client_id) REFERENCES clients(id)
         )
         ''')
-        conn.commit()
+        cur.execute(f'''
+        INSERT INTO reservations_new (day, client_id, amount, payment_status, payment_method, reference, created_at)
+        SELECT CAST(julianday(date) - {JULIAN_OFFSET} AS INTEGER), client_id, amount, payment_status,
+               payment_method, reference, created_at
+        FROM reservations
+        ''')
+        cur.execute('DROP TABLE reservations')
+        cur.execute('ALTER TABLE reservations_new RENAME TO reservations')
+
+
+def _system_user():
+    # Usuario del sistema operativo (variables de entorno o cuenta)
+    try:
+        return getpass.getuser()
+    except (OSError, KeyError):
+        return None
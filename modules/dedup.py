@@ -0,0 +1,151 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import NamedTuple
+from config.app_config import AppConfig
+from modules.repository import ClientKeyRepository, ClientRepository
+
+_NON_DIGITS = re.compile(r'\D')
+_NON_LETTERS = re.compile(r'[^a-z ]+')
+
+# Simplificación fonética del español: grafías que suenan igual se escriben
+# igual (se aplican en orden sobre el texto sin acentos)
+_PHONETIC_RULES = [(re.compile(pattern), replacement) for pattern, replacement in (
+    (r'qu', 'k'), (r'gu(?=[ei])', 'g'), (r'g(?=[ei])', 'j'), (r'c(?=[ei])', 's'), (r'c', 'k'),
+    (r'z', 's'), (r'x', 'ks'), (r'v', 'b'), (r'w', 'b'), (r'll', 'y'), (r'y\b', 'i'), (r'h', ''),
+    (r'(.)\1+', r'\1'),
+)]
+
+
+class DuplicatePair(NamedTuple):
+    # Dos clientes que parecen la misma persona; client_id < duplicate_id
+    client_id: int
+    duplicate_id: int
+    similarity: float        # Parecido de los nombres (0 a 1)
+    same_phone: bool         # Mismo teléfono normalizado
+    kinds: tuple             # Claves de bloqueo compartidas
+
+
+class DuplicateSearch(NamedTuple):
+    pairs: list              # [DuplicatePair], de nombres más a menos parecidos
+    clients: dict            # {id: Client} de los clientes de las parejas
+    compared: int            # Parejas comparadas
+    oversized: int           # Bloques omitidos por superar max_block_size
+
+
+class Deduplicator:
+    # Detecta y fusiona clientes duplicados. Cada cliente tiene claves de
+    # bloqueo (teléfono normalizado, nombre sin acentos, clave fonética) en
+    # la tabla indexada client_keys; sólo se comparan clientes que comparten
+    # una clave, nunca todas las parejas. Las claves se recalculan sólo para
+    # los clientes nuevos o cambiados (client_keys_pending).
+    def __init__(self, db_manager, config=None):
+        self.db = db_manager
+        self.config = config or AppConfig.DEDUP
+        self.keys = ClientKeyRepository(db_manager)
+        self.clients = ClientRepository(db_manager)
+
+    def refresh_keys(self):
+        # Devuelve cuántos clientes se han recalculado
+        with self.db.write():
+            pending = self.keys.pending()
+            if pending:
+                self.keys.replace((client.id for client in pending),
+                                  [(kind, key, client.id) for client in pending
+                                   for kind, key in self.blocking_keys(client)])
+        return len(pending)
+
+    def blocking_keys(self, client):
+        keys = []
+        phone = self.phone_key(client.phone)
+        if phone:
+            keys.append(('phone', phone))
+        last, first = fold(client.last_name), fold(client.first_name)
+        if last or first:
+            keys.append(('name', f'{last}|{first}'))
+            # Primer nombre sólo: "María José" y "María" caen en el mismo bloque
+            keys.append(('sound', f"{phonetic(last)}|{phonetic(first.split(' ')[0])}"))
+        return keys
+
+    def phone_key(self, phone):
+        # Últimos dígitos del teléfono: "0414-123.45.67" y "+58 414 1234567"
+        # dan la misma clave
+        digits = _NON_DIGITS.sub('', phone or '')
+        if len(digits) < self.config['min_phone_digits']:
+            return None
+        return digits[-self.config['phone_digits']:]
+
+    def find_duplicates(self, min_similarity=None):
+        if min_similarity is None:
+            min_similarity = self.config['min_similarity']
+        self.refresh_keys()
+        max_size = self.config['max_block_size']
+        candidates = {}
+        for kind, _, ids in self.keys.blocks(max_size):
+            ids.sort()
+            for position, client_id in enumerate(ids):
+                for other_id in ids[position + 1:]:
+                    candidates.setdefault((client_id, other_id), []).append(kind)
+        clients = self.clients.get_many({client_id for pair in candidates for client_id in pair})
+
+        pairs = []
+        for (client_id, other_id), kinds in candidates.items():
+            client, other = clients[client_id], clients[other_id]
+            phone, other_phone = self.phone_key(client.phone), self.phone_key(other.phone)
+            same_phone = phone is not None and phone == other_phone
+            similarity = name_similarity(client, other)
+            # Con teléfonos distintos son personas distintas aunque se llamen igual
+            if same_phone or (similarity >= min_similarity and not (phone and other_phone)):
+                pairs.append(DuplicatePair(client_id, other_id, round(similarity, 3), same_phone,
+                                           tuple(sorted(set(kinds)))))
+        pairs.sort(key=lambda pair: (-pair.similarity, not pair.same_phone, pair.client_id, pair.duplicate_id))
+        used = {client_id for pair in pairs for client_id in pair[:2]}
+        return DuplicateSearch(pairs, {client_id: clients[client_id] for client_id in used},
+                               len(candidates), self.keys.oversized(max_size))
+
+    def merge(self, keep_id, duplicate_ids):
+        # Fusionar en keep_id: sus reservas pasan a keep_id en una sola
+        # transacción. Devuelve cuántas reservas se han movido.
+        duplicate_ids = sorted(set(duplicate_ids))
+        if not duplicate_ids:
+            raise ValueError('indique al menos un duplicado')
+        if keep_id in duplicate_ids:
+            raise ValueError('el cliente que se conserva no puede ser también un duplicado')
+        with self.db.write():
+            found = self.clients.get_many([keep_id, *duplicate_ids])
+            missing = [client_id for client_id in (keep_id, *duplicate_ids) if client_id not in found]
+            if missing:
+                raise ValueError(f"clientes no encontrados: {', '.join(map(str, missing))}")
+            duplicates = [found[client_id] for client_id in duplicate_ids]
+            return self.keys.merge(
+                keep_id, duplicate_ids,
+                next((client.first_name for client in duplicates if client.first_name), None),
+                next((client.last_name for client in duplicates if client.last_name), None),
+                next((client.phone for client in duplicates if client.phone), None)
+            )
+
+
+@lru_cache(maxsize=65536)
+def fold(text):
+    # Minúsculas, sin acentos ni signos y con los espacios normalizados
+    text = unicodedata.normalize('NFKD', (text or '').lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(_NON_LETTERS.sub(' ', text).split())
+
+
+@lru_cache(maxsize=65536)
+def phonetic(text):
+    # Clave fonética de un texto ya pasado por fold()
+    for pattern, replacement in _PHONETIC_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def name_similarity(client, other):
+    a = f'{fold(client.last_name)} {fold(client.first_name)}'
+    b = f'{fold(other.last_name)} {fold(other.first_name)}'
+    if a == b:
+        return 1.0
+    matcher = SequenceMatcher(None, a, b)
+    return matcher.ratio() if matcher.quick_ratio() >= 0.5 else 0.0
@@ -0,0 +1,59 @@
+from typing import NamedTuple
+
+
+class DatesChanged(NamedTuple):
+    # Días (date) cuyas reservas, bloqueos o pagos cambiaron, y en qué recursos
+    days: frozenset
+    resource_ids: frozenset
+
+    def merge(self, other):
+        return DatesChanged(self.days | other.days, self.resource_ids | other.resource_ids)
+
+
+class ClientChanged(NamedTuple):
+    # Clientes creados o renombrados
+    client_ids: frozenset
+
+    def merge(self, other):
+        return ClientChanged(self.client_ids | other.client_ids)
+
+
+class EventBus:
+    # Publicación/suscripción de cambios de datos. CalendarLogic publica un
+    # evento por escritura; los eventos del mismo tipo se combinan (merge) y
+    # se entregan una vez por ciclo de inactividad (schedule = root.after_idle
+    # en la aplicación), así que una ráfaga de escrituras produce un solo
+    # DatesChanged con todos sus días. Sin schedule se entregan al publicar.
+    def __init__(self, schedule=None):
+        self.schedule = schedule
+        self._subscribers = {}  # tipo de evento -> callbacks
+        self._pending = {}      # tipo de evento -> evento combinado aún no entregado
+        self._scheduled = False
+
+    def subscribe(self, event_type, callback):
+        self._subscribers.setdefault(event_type, []).append(callback)
+        return callback
+
+    def unsubscribe(self, event_type, callback):
+        callbacks = self._subscribers.get(event_type, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def publish(self, event):
+        pending = self._pending.get(type(event))
+        self._pending[type(event)] = event if pending is None else pending.merge(event)
+        if self.schedule is None:
+            self.flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            self.schedule(self.flush)
+
+    def flush(self):
+        # Entregar los eventos pendientes; un suscriptor puede publicar otros
+        # (se entregan en el siguiente ciclo)
+        self._scheduled = False
+        pending, self._pending = self._pending, {}
+        for event_type, event in pending.items():
+            # Copia: un suscriptor puede cancelar su suscripción al recibirlo
+            for callback in list(self._subscribers.get(event_type, ())):
+                callback(event)
@@ -0,0 +1,130 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from config.app_config import AppConfig
+from modules.audit import AuditLog
+from modules.database import BUSY_TIMEOUT_MS
+
+# Tareas de mantenimiento
+CONVERT_AUTO_VACUUM = 'convert_auto_vacuum'
+CHECKPOINT = 'wal_checkpoint'
+INCREMENTAL_VACUUM = 'incremental_vacuum'
+ANALYZE = 'analyze'
+PRUNE_AUDIT = 'prune_audit'
+
+TASKS = (CONVERT_AUTO_VACUUM, CHECKPOINT, INCREMENTAL_VACUUM, ANALYZE, PRUNE_AUDIT)
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class DatabaseMaintenance:
+    # Mantenimiento de SQLite en pasos pequeños: cada paso tiene un tiempo
+    # máximo (progress handler) y se omite si otro hilo está escribiendo, así
+    # que nunca retiene una interacción. Lo programa ui/idle_tasks.py cuando
+    # la aplicación está inactiva; optimize() se ejecuta al cerrar.
+    def __init__(self, db_manager, config=None):
+        self.db = db_manager
+        self.config = config or AppConfig.MAINTENANCE
+        self._last_run = {}  # tarea -> time.monotonic() de la última ejecución en esta sesión
+        self._next = 0       # Turno rotatorio para que ninguna tarea acapare los pasos
+        self.audit = AuditLog(db_manager)
+
+    def run_pending(self):
+        # Ejecutar la siguiente tarea pendiente; devuelve (tarea, completada) o None
+        for offset in range(len(TASKS)):
+            index = (self._next + offset) % len(TASKS)
+            task = TASKS[index]
+            if self._is_due(task):
+                self._next = index + 1
+                self._last_run[task] = time.monotonic()
+                return task, getattr(self, task)()
+        return None
+
+    def _is_due(self, task):
+        if task == CONVERT_AUTO_VACUUM:
+            return task not in self._last_run and self._pragma('auto_vacuum') != AUTO_VACUUM_INCREMENTAL
+        last = self._last_run.get(task)
+        if last is not None and time.monotonic() - last < self.config['step_interval_s']:
+            return False
+        if task == INCREMENTAL_VACUUM:
+            return self._pragma('freelist_count') > 0
+        if task == ANALYZE:
+            return self._analyze_due()
+        if task == PRUNE_AUDIT:
+            return self.audit.has_expired()
+        return True
+
+    def convert_auto_vacuum(self):
+        # Las bases de datos creadas antes de auto_vacuum necesitan un VACUUM
+        # completo una sola vez; sólo se intenta si el archivo es pequeño
+        size = self._pragma('page_count') * self._pragma('page_size')
+        if size > self.config['convert_max_bytes']:
+            return False
+        return self._run(['PRAGMA auto_vacuum=INCREMENTAL', 'VACUUM'], self.config['convert_budget_ms'])
+
+    def wal_checkpoint(self):
+        # PASSIVE copia al archivo principal lo que pueda sin esperar a nadie
+        return self._run(['PRAGMA wal_checkpoint(PASSIVE)'], self.config['step_budget_ms'])
+
+    def incremental_vacuum(self):
+        pages = self.config['vacuum_pages_per_step']
+        return self._run([f'PRAGMA incremental_vacuum({pages})'], self.config['step_budget_ms'])
+
+    def analyze(self):
+        # analysis_limit limita las filas examinadas por índice
+        done = self._run([f"PRAGMA analysis_limit={self.config['analysis_limit']}", 'ANALYZE'],
+                         self.config['step_budget_ms'])
+        if done:
+            with self.db.write() as conn:
+                conn.execute('INSERT INTO maintenance_runs (task, last_run) VALUES (?, ?) '
+                             'ON CONFLICT(task) DO UPDATE SET last_run = excluded.last_run',
+                             (ANALYZE, datetime.utcnow().isoformat()))
+        return done
+
+    def prune_audit(self):
+        # Un lote de cambios del historial más antiguos que la retención
+        # (AppConfig.AUDIT); el espacio liberado lo recupera incremental_vacuum
+        return self._run_step(lambda conn: self.audit.prune_batch(self.config['audit_rows_per_step']),
+                              self.config['step_budget_ms'])
+
+    def optimize(self):
+        # Recomendado por SQLite al cerrar cada conexión de larga duración
+        return self._run([f"PRAGMA analysis_limit={self.config['analysis_limit']}", 'PRAGMA optimize'],
+                         self.config['close_budget_ms'], blocking=True)
+
+    def _analyze_due(self):
+        row = self.db.reader().execute('SELECT last_run FROM maintenance_runs WHERE task=?', (ANALYZE,)).fetchone()
+        if row is None:
+            return True
+        elapsed = datetime.utcnow() - datetime.fromisoformat(row['last_run'])
+        return elapsed >= timedelta(hours=self.config['analyze_every_hours'])
+
+    def _pragma(self, name):
+        return self.db.reader().execute(f'PRAGMA {name}').fetchone()[0]
+
+    def _run(self, statements, budget_ms, blocking=False):
+        # executescript ejecuta cada sentencia hasta el final (execute() sólo
+        # avanza un paso en pragmas sin columnas como incremental_vacuum)
+        return self._run_step(lambda conn: conn.executescript(';\n'.join(statements) + ';'), budget_ms, blocking)
+
+    def _run_step(self, step, budget_ms, blocking=False):
+        # Ejecutar step(conn) con la conexión de escritura y abortar al superar
+        # el tiempo; devuelve False si se omitió o se interrumpió. step puede
+        # usar los repositorios: db.write() se une a esta conexión.
+        deadline = time.perf_counter() + budget_ms / 1000
+        with self.db.exclusive(blocking=blocking) as conn:
+            if conn is None:
+                return False
+            # No esperar a otros procesos que tengan la base de datos bloqueada
+            conn.execute('PRAGMA busy_timeout=0')
+            conn.set_progress_handler(lambda: time.perf_counter() > deadline, 1000)
+            try:
+                step(conn)
+                return True
+            except sqlite3.OperationalError as exc:
+                if 'interrupted' in str(exc) or 'locked' in str(exc) or 'busy' in str(exc):
+                    return False
+                raise
+            finally:
+                conn.set_progress_handler(None, 0)
+                conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
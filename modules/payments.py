@@ -0,0 +1,51 @@
+from datetime import date, datetime
+from config.app_config import AppConfig
+from utils.dates import to_day_number, from_day_number
+from modules.database import DEFAULT_RESOURCE_ID
+from modules.records import Payment
+from modules.repository import PaymentRepository
+
+# Parte del monto que se registra como primer pago según el estado elegido al
+# reservar (Completo, Mitad, Nada)
+INITIAL_PAYMENT_SHARE = dict(zip(AppConfig.PAYMENT_STATUSES, (1.0, 0.5, 0.0)))
+
+
+class OverpaymentError(ValueError):
+    # El pago supera el saldo pendiente de la reserva
+    pass
+
+
+def initial_payment(amount, payment_status):
+    return round((amount or 0.0) * INITIAL_PAYMENT_SHARE.get(payment_status, 0.0), 2)
+
+
+class Payments:
+    def __init__(self, db_manager):
+        # Registro de pagos por reserva; los triggers de payments mantienen
+        # reservations.paid_total y con él el saldo y el estado de pago
+        self.db = db_manager
+        self.repository = PaymentRepository(db_manager)
+
+    def add_payment(self, day, amount, method='', reference='', paid_on=None, resource_id=DEFAULT_RESOURCE_ID):
+        paid_on = from_day_number(to_day_number(paid_on or date.today()))
+        # El saldo se lee en la misma transacción que el INSERT para que dos
+        # pagos simultáneos no lo superen entre los dos
+        with self.db.write():
+            balance = self.repository.balance(resource_id, to_day_number(day))
+            if balance is not None and round(amount, 2) > round(balance, 2):
+                raise OverpaymentError(AppConfig.LABELS['payment_exceeds_balance'].format(
+                    balance=max(0.0, round(balance, 2))))
+            return self.repository.insert(Payment(
+                None, resource_id, to_day_number(day), paid_on.isoformat(), amount, method, reference,
+                datetime.utcnow().isoformat()
+            ))
+
+    def get_payments(self, day, resource_id=DEFAULT_RESOURCE_ID):
+        # Historial de pagos de la reserva, del más antiguo al más reciente
+        return self.repository.for_day(resource_id, day)
+
+    def delete_payment(self, payment_id):
+        self.repository.delete(payment_id)
+
+    def get_payment_day(self, payment_id):
+        return self.repository.day_of(payment_id)
@@ -0,0 +1,170 @@
+import calendar
+from bisect import bisect_right
+from datetime import date
+from typing import NamedTuple
+from utils.dates import to_day_number
+from modules.repository import RateRepository
+
+# Tipos de tarifa (misma nomenclatura que modules/availability_rules.py)
+BASE = 'base'        # Siempre (precio por defecto del recurso o de todos)
+RANGE = 'range'      # Temporada con fechas concretas
+YEARLY = 'yearly'    # Temporada que se repite cada año (p. ej. 15/12 - 15/01)
+
+
+class Quote(NamedTuple):
+    nights: list             # [(resource_id, día, precio)]; precio None si no hay tarifa
+    total: float             # Suma de las noches con tarifa
+    missing: list            # [(resource_id, día)] sin tarifa
+
+
+class Pricing:
+    # Precio por noche según tarifas de temporada y de día de la semana. Las
+    # tarifas se leen con una sola consulta y, para cada (recurso, año), se
+    # convierten en un índice de intervalos ordenado: el inicio de cada tramo
+    # en el que no empieza ni termina ninguna temporada y, por tramo, sus
+    # tarifas en orden de prioridad. El precio de un día es un bisect sobre
+    # los inicios; un presupuesto de varias noches y recursos no consulta la
+    # base de datos por noche.
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.repository = RateRepository(db_manager)
+        self._rates = None
+        # (resource_id, año) -> (inicios de tramo, [tarifas del tramo])
+        self._index = {}
+
+    def add_base_rate(self, price, resource_id=None, weekdays=None, label=''):
+        return self._add_rate(BASE, price, resource_id, weekdays, label)
+
+    def add_season(self, start, end, price, resource_id=None, weekdays=None, label=''):
+        first, last = sorted((to_day_number(start), to_day_number(end)))
+        return self._add_rate(RANGE, price, resource_id, weekdays, label, start_day=first, end_day=last)
+
+    def add_yearly_season(self, start_month, start_day, end_month, end_day, price, resource_id=None,
+                          weekdays=None, label=''):
+        return self._add_rate(YEARLY, price, resource_id, weekdays, label,
+                              start_md=start_month * 100 + start_day, end_md=end_month * 100 + end_day)
+
+    def _add_rate(self, kind, price, resource_id, weekdays, label, start_day=None, end_day=None,
+                  start_md=None, end_md=None):
+        if price < 0:
+            raise ValueError('el precio no puede ser negativo')
+        rate_id = self.repository.insert(resource_id, kind, start_day, end_day, start_md, end_md,
+                                         weekday_mask(weekdays), price, label)
+        self.invalidate()
+        return rate_id
+
+    def delete_rate(self, rate_id):
+        deleted = self.repository.delete(rate_id)
+        self.invalidate()
+        return deleted > 0
+
+    def list_rates(self):
+        return self.repository.list()
+
+    def invalidate(self):
+        self._index.clear()
+        self._rates = None
+
+    def price(self, day, resource_id):
+        # Precio de la noche `day` en el recurso, o None si ninguna tarifa aplica
+        if self.repository.global_version_changed():
+            self.invalidate()
+        return self._price(to_day_number(day), resource_id)
+
+    def quote(self, start, end, resource_ids):
+        # Noches de start a end (inclusive) en cada recurso
+        first, last = sorted((to_day_number(start), to_day_number(end)))
+        if self.repository.global_version_changed():
+            self.invalidate()
+        nights, missing, total = [], [], 0.0
+        for resource_id in resource_ids:
+            for day in range(first, last + 1):
+                price = self._price(day, resource_id)
+                nights.append((resource_id, day, price))
+                if price is None:
+                    missing.append((resource_id, day))
+                else:
+                    total += price
+        return Quote(nights, round(total, 2), missing)
+
+    def _price(self, day, resource_id):
+        starts, segments = self._year_index(resource_id, date.fromordinal(day).year)
+        # El día 1 (01/01/0001) fue lunes: weekday() sin crear la fecha
+        weekday_bit = 1 << ((day - 1) % 7)
+        for rate in segments[bisect_right(starts, day) - 1]:
+            if rate.weekdays is None or rate.weekdays & weekday_bit:
+                return rate.price
+        return None
+
+    def _year_index(self, resource_id, year):
+        key = (resource_id, year)
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = self._build_index(resource_id, year)
+        return index
+
+    def _build_index(self, resource_id, year):
+        first = date(year, 1, 1).toordinal()
+        last = date(year, 12, 31).toordinal()
+        intervals, base = [], []
+        for rate in self._get_rates():
+            if rate.resource_id not in (None, resource_id):
+                continue
+            if rate.kind == BASE:
+                base.append(rate)
+            elif rate.kind == RANGE:
+                if rate.start_day <= last and rate.end_day >= first:
+                    intervals.append((max(rate.start_day, first), min(rate.end_day, last), rate))
+            elif rate.kind == YEARLY:
+                intervals.extend((start, end, rate) for start, end in _yearly_days(rate, year))
+        starts = sorted({first} | {start for start, _, _ in intervals}
+                        | {end + 1 for _, end, _ in intervals if end < last})
+        base = sorted(base, key=_precedence)
+        segments = [
+            sorted((rate for start, end, rate in intervals if start <= segment_start <= end), key=_precedence) + base
+            for segment_start in starts
+        ]
+        return starts, segments
+
+    def _get_rates(self):
+        if self._rates is None:
+            self._rates = self.list_rates()
+        return self._rates
+
+
+def weekday_mask(weekdays):
+    # Días de la semana (0 = lunes ... 6 = domingo) -> máscara; None = todos
+    if weekdays is None:
+        return None
+    mask = 0
+    for weekday in weekdays:
+        if not 0 <= weekday <= 6:
+            raise ValueError(f'día de la semana inválido: {weekday}')
+        mask |= 1 << weekday
+    return mask or None
+
+
+def weekday_list(mask):
+    return None if mask is None else [weekday for weekday in range(7) if mask & (1 << weekday)]
+
+
+def _precedence(rate):
+    # Gana la tarifa más específica: de un recurso antes que de todos, de
+    # fechas concretas antes que anual, con días de la semana antes que sin
+    # ellos y, a igualdad, la más reciente
+    return rate.resource_id is None, rate.kind != RANGE, rate.weekdays is None, -rate.id
+
+
+def _yearly_days(rate, year):
+    # Tramos del año `year` cubiertos por una temporada anual (MMDD); si
+    # cruza el fin de año son dos tramos
+    start, end = _md_day(year, rate.start_md), _md_day(year, rate.end_md)
+    if rate.start_md <= rate.end_md:
+        return [(start, end)]
+    return [(date(year, 1, 1).toordinal(), end), (start, date(year, 12, 31).toordinal())]
+
+
+def _md_day(year, md):
+    # 29/02 en años no bisiestos es el 28/02
+    month, day = divmod(md, 100)
+    return date(year, month, min(day, calendar.monthrange(year, month)[1])).toordinal()
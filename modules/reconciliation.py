@@ -0,0 +1,147 @@
+import csv
+import re
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+from config.app_config import AppConfig
+from modules.repository import PaymentRepository
+
+# Dígitos finales con los que se indexan las referencias: es la longitud
+# mínima que exige validate_reference, así que toda referencia los tiene
+REFERENCE_KEY_DIGITS = AppConfig.MIN_REFERENCE_LENGTH
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+class BankMovement(NamedTuple):
+    # Un crédito del extracto; line es la línea del CSV (1 = encabezado)
+    line: int
+    day: int
+    amount: float
+    reference: str
+
+
+class ReconciliationResult(NamedTuple):
+    movements: int
+    matches: list            # [(BankMovement, Payment)]
+    unmatched: list          # [BankMovement] sin pago que coincida
+    skipped: int             # Líneas sin referencia, débitos o ilegibles
+    pending: int             # Pagos con referencia que siguen sin conciliar
+
+
+class Reconciler:
+    # Concilia los pagos con referencia (PagoMovil, Transferencia) con los
+    # movimientos de un extracto bancario. Los pagos pendientes se cargan con
+    # una sola consulta en un índice hash por los últimos dígitos de la
+    # referencia; el CSV se lee en streaming y cada movimiento se busca en el
+    # índice (una sola pasada). Los pagos conciliados se marcan en una
+    # transacción.
+    def __init__(self, db_manager, config=None):
+        self.db = db_manager
+        self.config = config or AppConfig.RECONCILIATION
+        self.repository = PaymentRepository(db_manager)
+
+    def reconcile(self, path, dry_run=False):
+        with open(path, newline='', encoding=self.config['encoding']) as file:
+            result = self.match(self.read_movements(file))
+        if not dry_run and result.matches:
+            self.mark(result.matches)
+        return result
+
+    def read_movements(self, file):
+        # Generador de BankMovement; los débitos y las líneas sin referencia o
+        # con fecha/monto ilegibles producen None (se cuentan como omitidas)
+        columns = self.config['columns']
+        reader = csv.DictReader(file, delimiter=self.config['delimiter'])
+        missing = [name for name in columns.values() if name not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"columnas no encontradas en el extracto: {', '.join(missing)}")
+        # Un extracto repite pocas fechas distintas: strptime una vez por fecha
+        days = {}
+        for line, row in enumerate(reader, start=2):
+            reference = _digits(row[columns['reference']])
+            text = row[columns['date']]
+            day = days.get(text, 0)
+            if day == 0:
+                day = days[text] = self._parse_day(text)
+            amount = _parse_amount(row[columns['amount']])
+            if len(reference) < REFERENCE_KEY_DIGITS or day is None or amount is None or amount <= 0:
+                yield None
+            else:
+                yield BankMovement(line, day, amount, reference)
+
+    def match(self, movements):
+        index = self._build_index()
+        pending = sum(len(candidates) for candidates in index.values())
+        matches, unmatched, count, skipped = [], [], 0, 0
+        for movement in movements:
+            count += 1
+            if movement is None:
+                skipped += 1
+                continue
+            payment = self._take_match(index, movement)
+            if payment is None:
+                unmatched.append(movement)
+            else:
+                matches.append((movement, payment))
+        return ReconciliationResult(count, matches, unmatched, skipped, pending - len(matches))
+
+    def mark(self, matches):
+        now = datetime.utcnow().isoformat()
+        self.repository.mark_reconciled((now, movement.reference, payment.id) for movement, payment in matches)
+
+    def _build_index(self):
+        # {últimos dígitos de la referencia: [(dígitos, día del pago, Payment)]}
+        index = {}
+        for payment in self.repository.unreconciled():
+            digits = _digits(payment.reference)
+            if len(digits) >= REFERENCE_KEY_DIGITS:
+                paid_on = date.fromisoformat(payment.paid_on).toordinal()
+                index.setdefault(digits[-REFERENCE_KEY_DIGITS:], []).append((digits, paid_on, payment))
+        return index
+
+    def _take_match(self, index, movement):
+        # El mejor candidato (menor diferencia de monto y luego de fecha) cuya
+        # referencia sea sufijo de la otra; se retira del índice para que cada
+        # pago se concilie una sola vez
+        candidates = index.get(movement.reference[-REFERENCE_KEY_DIGITS:])
+        if not candidates:
+            return None
+        best = None
+        for position, (digits, paid_on, payment) in enumerate(candidates):
+            if not (movement.reference.endswith(digits) or digits.endswith(movement.reference)):
+                continue
+            amount_diff = abs(payment.amount - movement.amount)
+            day_diff = abs(paid_on - movement.day)
+            if amount_diff > self.config['amount_tolerance'] + 1e-9 or day_diff > self.config['date_tolerance_days']:
+                continue
+            if best is None or (amount_diff, day_diff) < best[0]:
+                best = ((amount_diff, day_diff), position)
+        if best is None:
+            return None
+        return candidates.pop(best[1])[2]
+
+    def _parse_day(self, value):
+        value = value.strip()
+        for fmt in self.config['date_formats']:
+            try:
+                return datetime.strptime(value, fmt).toordinal()
+            except ValueError:
+                pass
+        return None
+
+
+def _digits(value):
+    return _NON_DIGITS.sub('', value or '')
+
+
+def _parse_amount(value) -> Optional[float]:
+    # Acepta "1234.56", "1.234,56" y "1,234.56" (el último separador es el decimal)
+    value = (value or '').strip().replace(' ', '').replace('Bs', '').replace('$', '')
+    if ',' in value and '.' in value:
+        thousands = '.' if value.rfind(',') > value.rfind('.') else ','
+        value = value.replace(thousands, '')
+    value = value.replace(',', '.')
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,145 @@
+import json
+from typing import NamedTuple, Optional
+from datetime import date, datetime
+
+# Registros inmutables que sustituyen a los diccionarios por día/fila. Las
+# tuplas con nombre no tienen __dict__, así que ocupan menos memoria y se
+# crean directamente desde SQLite con row_factory.
+
+
+class Client(NamedTuple):
+    id: int
+    first_name: str
+    last_name: str
+    phone: Optional[str]
+
+
+class Resource(NamedTuple):
+    # Cabaña, parcela o salón con su propio calendario
+    id: int
+    name: str
+    kind: Optional[str]
+    sort_order: int
+    active: bool
+    capacity: Optional[int] = None  # Huéspedes máximos por reserva (None = sin límite)
+
+
+class Reservation(NamedTuple):
+    # Fila de reservations unida a clients; client_id es None en los días
+    # bloqueados (sin reserva)
+    resource_id: int
+    day: int
+    date: str
+    client_id: Optional[int]
+    first_name: Optional[str]
+    last_name: Optional[str]
+    phone: Optional[str]
+    guests: int
+    amount: Optional[float]
+    paid_total: Optional[float]
+    payment_status: Optional[str]
+    payment_method: Optional[str]
+    reference: Optional[str]
+    created_at: Optional[str]
+
+    @property
+    def is_block(self):
+        return self.client_id is None
+
+    @property
+    def balance(self):
+        # Saldo pendiente según los pagos registrados
+        return (self.amount or 0.0) - (self.paid_total or 0.0)
+
+    @property
+    def client_name(self):
+        return f"{self.first_name or ''} {self.last_name or ''}".strip()
+
+    @property
+    def client(self):
+        return Client(self.client_id, self.first_name, self.last_name, self.phone)
+
+
+class Payment(NamedTuple):
+    # Un pago de la reserva (resource_id, day); paid_on es la fecha ISO del pago
+    id: Optional[int]
+    resource_id: int
+    day: int
+    paid_on: str
+    amount: float
+    method: Optional[str]
+    reference: Optional[str]
+    created_at: Optional[str]
+    reconciled_at: Optional[str] = None
+
+
+class Rate(NamedTuple):
+    # Precio por noche. kind: 'base' (siempre), 'range' (start_day..end_day)
+    # o 'yearly' (start_md..end_md, MMDD, cada año); weekdays es una máscara
+    # de días de la semana (bit 0 = lunes, None = todos) y resource_id None
+    # vale para todos los recursos
+    id: int
+    resource_id: Optional[int]
+    kind: str
+    start_day: Optional[int]
+    end_day: Optional[int]
+    start_md: Optional[int]
+    end_md: Optional[int]
+    weekdays: Optional[int]
+    price: float
+    label: Optional[str]
+
+
+class AuditEntry(NamedTuple):
+    # Un cambio de reservation_audit. entity: 'reservation' o 'payment';
+    # action: 'insert', 'update' o 'delete'; changes es el JSON con sólo las
+    # columnas cambiadas; changed_at, segundos desde 1970
+    id: int
+    resource_id: int
+    day: int
+    entity: str
+    action: str
+    payment_id: Optional[int]
+    changed_at: int
+    user: Optional[str]
+    changes: str
+
+    @property
+    def changed(self):
+        # {columna: valor} al crear o eliminar; {columna: [antes, después]} al modificar
+        return json.loads(self.changes)
+
+    @property
+    def changed_on(self):
+        return datetime.fromtimestamp(self.changed_at)
+
+
+class DayInfo(NamedTuple):
+    # Estado de una celda del calendario; guests y capacity son los huéspedes
+    # del día en todos los recursos y la capacidad del día (None = sin límite)
+    date: date
+    date_str: str
+    is_current_month: bool
+    reservation: Optional[Reservation]
+    is_available: bool
+    guests: int = 0
+    capacity: Optional[int] = None
+
+    @property
+    def remaining_capacity(self):
+        if self.capacity is None:
+            return None
+        return max(0, self.capacity - self.guests)
+
+
+def row_factory(record_type):
+    # row_factory para cursores cuya consulta selecciona las columnas en el
+    # mismo orden que los campos del registro
+    make = record_type._make
+    return lambda cursor, row: make(row)
+
+
+def select_columns(record_type, columns):
+    # Lista de columnas SQL en el orden de los campos; `columns` traduce los
+    # campos que necesitan prefijo o expresión (p. ej. {'client_id': 'c.id'})
+    return ', '.join(columns.get(field, field) for field in record_type._fields)
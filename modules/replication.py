@@ -0,0 +1,114 @@
+import gzip
+import json
+import secrets
+from datetime import datetime
+from typing import NamedTuple
+from config.app_config import AppConfig
+from modules.database import REPLICATED_TABLES
+from modules.repository import SyncRepository
+
+
+class ExportResult(NamedTuple):
+    path: str
+    origin: str              # Instalación que exporta
+    peer: str                # Destino cuyos cambios confirmados se omiten (None = todo)
+    since: int               # Primer número de cambio incluido
+    last_seq: int            # Último número de cambio incluido
+    changes: int             # Filas en el archivo
+
+
+class ImportResult(NamedTuple):
+    origin: str              # Instalación que exportó el archivo
+    received: int            # Filas en el archivo
+    applied: int             # Filas aplicadas
+    skipped: int             # Filas con una versión local igual o más reciente
+
+
+class Replicator:
+    # Replicación entre instalaciones sin red mediante archivos de cambios.
+    # Los triggers anotan cada cambio en change_log (modules/database.py);
+    # exportar escribe, comprimidas, la última versión de cada fila cambiada
+    # desde lo que el destino ya confirmó, e importar aplica en una sola
+    # transacción las filas cuya versión (milisegundos, origen) es mayor que
+    # la local: gana el último cambio y, a igualdad, el origen mayor, así que
+    # ambas instalaciones resuelven igual cada conflicto. Cada archivo lleva
+    # también hasta dónde se aplicaron los cambios de las demás, que así
+    # saben desde dónde exportar la próxima vez.
+    def __init__(self, db_manager, config=None):
+        self.db = db_manager
+        self.config = config or AppConfig.REPLICATION
+        self.repository = SyncRepository(db_manager)
+
+    @property
+    def origin(self):
+        return self.repository.origin()
+
+    def new_origin(self):
+        # Tras copiar la base de datos para instalar otra sede, una de las
+        # dos copias necesita su propio identificador
+        origin = secrets.token_hex(8)
+        self.repository.set_origin(origin)
+        return origin
+
+    def peers(self):
+        return self.repository.peers()
+
+    def export_changes(self, path, peer=None):
+        # Sin destino, el de la única instalación conocida; si no hay
+        # ninguna, todo el registro
+        with self.db.write():
+            origin = self.origin
+            peers = {row['origin']: row for row in self.peers()}
+            if peer is None and len(peers) == 1:
+                peer = next(iter(peers))
+            since = peers[peer]['sent_seq'] + 1 if peer in peers else 1
+            last_seq = self.repository.last_seq()
+            changes = self.repository.changes(since, last_seq, peer)
+            rows = {table: self.repository.rows(table, [change['row_key'] for change in changes
+                                                         if change['tbl'] == table and not change['deleted']])
+                    for table in REPLICATED_TABLES}
+        entries = []
+        for change in changes:
+            data = None
+            if not change['deleted']:
+                data = rows[change['tbl']].get(change['row_key'])
+                if data is None:
+                    # La fila ya no existe aquí (p. ej. un cliente asignado a otro local)
+                    continue
+                data = json.loads(data)
+            entries.append([change['tbl'], change['row_key'], change['deleted'], change['changed_at'],
+                            change['origin'], data])
+        document = {
+            'format': self.config['format'],
+            'origin': origin,
+            'exported_at': datetime.now().isoformat(timespec='seconds'),
+            'since': since,
+            'last_seq': last_seq,
+            'acks': {row['origin']: row['received_seq'] for row in peers.values()},
+            'changes': entries,
+        }
+        with gzip.open(path, 'wt', encoding='utf-8', compresslevel=self.config['compress_level']) as file:
+            json.dump(document, file, ensure_ascii=False, separators=(',', ':'))
+        return ExportResult(str(path), origin, peer, since, last_seq, len(entries))
+
+    def import_changes(self, path):
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                document = json.load(file)
+        except (OSError, EOFError) as exc:
+            raise ValueError(f'archivo de cambios ilegible: {exc}')
+        if not isinstance(document, dict) or document.get('format') != self.config['format']:
+            raise ValueError('formato de archivo de cambios no reconocido')
+        sender = document['origin']
+        changes = [(table, key, deleted, changed_at, origin, None if data is None else json.dumps(data))
+                   for table, key, deleted, changed_at, origin, data in document['changes']
+                   if table in REPLICATED_TABLES]
+        with self.db.write():
+            if sender == self.origin:
+                raise ValueError('el archivo de cambios lo exportó esta misma instalación')
+            applied = self.repository.apply(changes)
+            self.repository.ack_received(sender, document['last_seq'], datetime.now().isoformat(timespec='seconds'))
+            acknowledged = document['acks'].get(self.origin)
+            if acknowledged:
+                self.repository.ack_sent(sender, acknowledged)
+        return ImportResult(sender, len(changes), applied, len(changes) - applied)
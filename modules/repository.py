@@ -0,0 +1,766 @@
+import json
+from modules.records import Reservation, Client, Payment, Resource, Rate, AuditEntry, row_factory, select_columns
+from utils.dates import to_day_number
+
+# Todas las sentencias SQL de la capa de negocio, declaradas una sola vez.
+# Al usar siempre el mismo texto, la caché de sentencias de sqlite3
+# (cached_statements) evita volver a compilarlas en cada llamada.
+
+RESERVATION_SELECT = f'''
+    SELECT {select_columns(Reservation, {'resource_id': 'b.resource_id', 'day': 'b.day', 'date': 'b.date', 'client_id': 'c.id',
+                                         'first_name': 'c.first_name', 'last_name': 'c.last_name',
+                                         'phone': 'c.phone', 'guests': 'b.guests', 'amount': 'b.amount',
+                                         'paid_total': 'b.paid_total',
+                                         'payment_status': 'b.payment_status',
+                                         'payment_method': 'b.payment_method',
+                                         'reference': 'b.reference', 'created_at': 'b.created_at'})}
+    FROM reservations b
+    LEFT JOIN clients c ON b.client_id = c.id
+    '''
+
+# payment_status y paid_total no se escriben: los derivan los pagos (payments)
+RESERVATION_COLUMNS = 'resource_id, day, client_id, guests, amount, payment_method, reference, created_at'
+
+# Reservas con saldo pendiente; la condición coincide con la del índice
+# parcial idx_reservations_outstanding
+OUTSTANDING_WHERE = 'WHERE b.client_id IS NOT NULL AND b.paid_total < b.amount'
+
+PAYMENT_COLUMNS = 'id, resource_id, day, paid_on, amount, method, reference, created_at, reconciled_at'
+# Todas las columnas de un pago (para restaurarlo tal cual al deshacer)
+UNDO_PAYMENT_COLUMNS = PAYMENT_COLUMNS + ', bank_reference, uid'
+
+# Órdenes del directorio de clientes: expresiones de los índices
+# idx_clients_name e idx_clients_phone_sort; el id desempata
+CLIENT_SORTS = {
+    'name': ("IFNULL(last_name, '')", "IFNULL(first_name, '')"),
+    'phone': ("IFNULL(phone, '')",),
+    'id': (),
+}
+
+
+# Agenda: reservas con cliente en orden (día, recurso). Cada filtro va con
+# el índice parcial cuya condición repite; se fija con INDEXED BY porque
+# idx_reservations_agenda también cumple la condición del filtro 'due' pero
+# obligaría a recorrer las reservas ya pagadas.
+AGENDA_FILTERS = {
+    'all': ('idx_reservations_agenda', 'WHERE b.client_id IS NOT NULL'),
+    'due': ('idx_reservations_outstanding', OUTSTANDING_WHERE),
+}
+
+
+def _agenda_page(index, where, forward):
+    # Página que sigue (o precede) a la clave (día, recurso); como en
+    # _keyset_page, el día se acota con >=/<= para buscar en el índice
+    op = '>' if forward else '<'
+    order = '' if forward else ' DESC'
+    select = RESERVATION_SELECT.replace('FROM reservations b', f'FROM reservations b INDEXED BY {index}')
+    return (select + f'{where} AND b.day {op}= ?1 AND (b.day {op} ?1 OR b.resource_id {op} ?2) '
+            f'ORDER BY b.day{order}, b.resource_id{order} LIMIT ?3')
+
+
+def _keyset_page(columns, forward):
+    # Página que sigue (o precede) a una clave (columnas..., id). La primera
+    # columna se acota con >=/<= para que SQLite busque en el índice en lugar
+    # de recorrerlo (con (a, b) > (?, ?) recorre el índice de expresiones).
+    op = '>' if forward else '<'
+    order = ', '.join(f"{column}{'' if forward else ' DESC'}" for column in columns + ('id',))
+    condition = f'id {op} ?{len(columns) + 1}'
+    for index in reversed(range(len(columns))):
+        column, param = columns[index], f'?{index + 1}'
+        condition = f'{column} {op} {param} OR ({column} = {param} AND ({condition}))'
+    if columns:
+        condition = f'{columns[0]} {op}= ?1 AND ({condition})'
+    return f'SELECT id, first_name, last_name, phone FROM clients WHERE {condition} ORDER BY {order} LIMIT ?'
+
+
+# Replicación (modules/replication.py): los cambios recibidos se cargan en la
+# tabla temporal sync_incoming, se marcan los que ganan a la versión local
+# (won) y se aplican por tabla con una sentencia cada una, en este orden:
+# altas y cambios de padres a hijos, bajas de hijos a padres
+SYNC_APPLY = ('sync.apply.resources', 'sync.apply.client_aliases', 'sync.apply.clients',
+              'sync.apply.alias_names', 'sync.log.alias_names', 'sync.apply.reservations',
+              'sync.skip.orphan_payments', 'sync.apply.payments', 'sync.delete.payments',
+              'sync.log.reservation_payments', 'sync.delete.reservations', 'sync.delete.clients')
+
+# El cambio recibido de un cliente asignado a uno local (alias a) es más
+# reciente que la última versión del cliente local
+ALIAS_IS_NEWER = ("NOT IFNULL((SELECT changed_at, origin FROM change_log l WHERE l.tbl = 'clients' "
+                  "AND l.row_key = a.local_uid ORDER BY changed_at DESC, origin DESC LIMIT 1) "
+                  ">= (w.changed_at, w.origin), 0)")
+
+
+def _incoming(table, deleted=False):
+    return f"FROM sync_incoming w WHERE w.won AND w.tbl = '{table}' AND {'' if deleted else 'NOT '}w.deleted"
+
+
+def _field(name):
+    # Campo de los datos de un cambio recibido
+    return f"json_extract(w.data, '$.{name}')"
+
+
+STATEMENTS = {
+    # reservations
+    'reservation.get': RESERVATION_SELECT + 'WHERE b.resource_id = ? AND b.day = ?',
+    'reservation.get_many': RESERVATION_SELECT + 'WHERE b.resource_id = ? '
+                            'AND b.day IN (SELECT value FROM json_each(?)) ORDER BY b.day',
+    'reservation.range': RESERVATION_SELECT + 'WHERE b.resource_id = ? AND b.day BETWEEN ? AND ? ORDER BY b.day',
+    # Todos los recursos a la vez (idx_reservations_day)
+    'reservation.range_all': RESERVATION_SELECT + 'WHERE b.day BETWEEN ? AND ? ORDER BY b.day, b.resource_id',
+    'reservation.upsert': f'''
+        INSERT INTO reservations ({RESERVATION_COLUMNS}) VALUES (?,?,?,?,?,?,?,?)
+        ON CONFLICT(resource_id, day) DO UPDATE SET
+            client_id = excluded.client_id, guests = excluded.guests, amount = excluded.amount,
+            payment_method = excluded.payment_method,
+            reference = excluded.reference, created_at = excluded.created_at''',
+    'reservation.delete': 'DELETE FROM reservations WHERE resource_id = ? AND day = ?',
+    'reservation.client_of': 'SELECT client_id FROM reservations WHERE resource_id = ? AND day = ?',
+    'reservation.block': 'INSERT OR IGNORE INTO reservations (resource_id, day, client_id, created_at) '
+                         'VALUES (?, ?, NULL, ?)',
+    'reservation.unblock_range': 'DELETE FROM reservations '
+                                 'WHERE resource_id = ? AND day BETWEEN ? AND ? AND client_id IS NULL',
+    'reservation.for_client': RESERVATION_SELECT + 'WHERE b.client_id = ? ORDER BY b.day DESC LIMIT ?',
+    **{f'reservation.agenda.{name}.{direction}': _agenda_page(index, where, direction == 'next')
+       for name, (index, where) in AGENDA_FILTERS.items() for direction in ('next', 'prev')},
+    'reservation.outstanding': RESERVATION_SELECT + OUTSTANDING_WHERE + ' ORDER BY b.day, b.resource_id',
+    'reservation.outstanding_total': 'SELECT COUNT(*), TOTAL(b.amount - b.paid_total) FROM reservations b '
+                                     + OUTSTANDING_WHERE,
+    'change_versions.month': 'SELECT month, version FROM change_versions WHERE month IN (0, ?)',
+    'change_versions.global': 'SELECT version FROM change_versions WHERE month = 0',
+    # payments
+    'payment.for_day': f'SELECT {PAYMENT_COLUMNS} FROM payments WHERE resource_id = ? AND day = ? '
+                       'ORDER BY paid_on, id',
+    'payment.insert': 'INSERT INTO payments (resource_id, day, paid_on, amount, method, reference, created_at) '
+                      'VALUES (?,?,?,?,?,?,?)',
+    'payment.delete': 'DELETE FROM payments WHERE id = ?',
+    'payment.day': 'SELECT resource_id, day FROM payments WHERE id = ?',
+    'payment.balance': 'SELECT amount - paid_total FROM reservations WHERE resource_id = ? AND day = ?',
+    'payment.unreconciled': f"SELECT {PAYMENT_COLUMNS} FROM payments "
+                            "WHERE reconciled_at IS NULL AND reference <> ''",
+    'payment.reconcile': 'UPDATE payments SET reconciled_at = ?, bank_reference = ? '
+                         'WHERE id = ? AND reconciled_at IS NULL',
+    # resources
+    'resource.list': 'SELECT id, name, kind, sort_order, active, capacity FROM resources '
+                     'WHERE active = 1 OR ? ORDER BY sort_order, id',
+    'resource.insert': 'INSERT INTO resources (name, kind, sort_order, capacity) VALUES (?,?,?,?)',
+    'resource.set_active': 'UPDATE resources SET active = ? WHERE id = ?',
+    'resource.set_capacity': 'UPDATE resources SET capacity = ? WHERE id = ?',
+    # rates (tarifas por noche de modules/pricing.py)
+    'rate.list': f"SELECT {select_columns(Rate, {})} FROM rates ORDER BY id",
+    'rate.insert': 'INSERT INTO rates (resource_id, kind, start_day, end_day, start_md, end_md, weekdays, price, label) '
+                   'VALUES (?,?,?,?,?,?,?,?,?)',
+    'rate.delete': 'DELETE FROM rates WHERE id = ?',
+    # capacidad: day_occupancy la mantienen triggers; los días sin fila en
+    # day_capacity usan la capacidad por defecto (NULL aquí)
+    'capacity.range': '''
+        SELECT day, SUM(guests), MAX(capacity) FROM (
+            SELECT day, guests, NULL AS capacity FROM day_occupancy WHERE day BETWEEN ?1 AND ?2
+            UNION ALL
+            SELECT day, 0, capacity FROM day_capacity WHERE day BETWEEN ?1 AND ?2
+        ) GROUP BY day''',
+    # Todo lo necesario para validar una reserva, con búsquedas por clave
+    'capacity.check': '''
+        SELECT (SELECT guests FROM day_occupancy WHERE day = ?2),
+               (SELECT guests FROM reservations WHERE resource_id = ?1 AND day = ?2 AND client_id IS NOT NULL),
+               (SELECT capacity FROM day_capacity WHERE day = ?2),
+               (SELECT capacity FROM resources WHERE id = ?1)''',
+    'capacity.set': 'INSERT INTO day_capacity (day, capacity) VALUES (?, ?) '
+                    'ON CONFLICT(day) DO UPDATE SET capacity = excluded.capacity',
+    'capacity.clear_range': 'DELETE FROM day_capacity WHERE day BETWEEN ? AND ?',
+    # clients
+    'client.get': 'SELECT id, first_name, last_name, phone FROM clients WHERE id = ?',
+    'client.get_many': 'SELECT id, first_name, last_name, phone FROM clients '
+                       'WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id',
+    **{f'client.page.{sort}.{direction}': _keyset_page(columns, direction == 'next')
+       for sort, columns in CLIENT_SORTS.items() for direction in ('next', 'prev')},
+    'client.id_by_phone': 'SELECT id FROM clients WHERE phone = ?',
+    'client.insert': 'INSERT INTO clients (first_name, last_name, phone) VALUES (?,?,?)',
+    # Sólo si el nombre cambia (rowcount indica si se renombró)
+    'client.update_name': 'UPDATE clients SET first_name = ?1, last_name = ?2 '
+                          'WHERE id = ?3 AND (first_name IS NOT ?1 OR last_name IS NOT ?2)',
+    'client.upsert_by_phone': '''
+        INSERT INTO clients (first_name, last_name, phone) VALUES (?,?,?)
+        ON CONFLICT(phone) DO UPDATE SET first_name = excluded.first_name, last_name = excluded.last_name''',
+    # Fusión de duplicados: completar los datos que faltan en el cliente que
+    # se conserva y pasarle las reservas de los demás
+    'client.fill_missing': '''
+        UPDATE clients SET first_name = COALESCE(NULLIF(first_name, ''), ?),
+                           last_name = COALESCE(NULLIF(last_name, ''), ?),
+                           phone = COALESCE(NULLIF(phone, ''), ?)
+        WHERE id = ?''',
+    'client.delete_many': 'DELETE FROM clients WHERE id IN (SELECT value FROM json_each(?))',
+    'reservation.reassign_clients': 'UPDATE reservations SET client_id = ? '
+                                    'WHERE client_id IN (SELECT value FROM json_each(?))',
+    # client_keys (claves de bloqueo de modules/dedup.py)
+    'client_key.pending': 'SELECT c.id, c.first_name, c.last_name, c.phone FROM client_keys_pending p '
+                          'JOIN clients c ON c.id = p.client_id',
+    'client_key.delete_many': 'DELETE FROM client_keys WHERE client_id IN (SELECT value FROM json_each(?))',
+    'client_key.clear_pending': 'DELETE FROM client_keys_pending WHERE client_id IN (SELECT value FROM json_each(?))',
+    'client_key.insert': 'INSERT OR IGNORE INTO client_keys (kind, key, client_id) VALUES (?,?,?)',
+    # Bloques con más de un cliente, en el orden de la clave primaria (sin ordenar aparte)
+    'client_key.blocks': 'SELECT kind, key, json_group_array(client_id) AS ids FROM client_keys '
+                         'GROUP BY kind, key HAVING COUNT(*) BETWEEN 2 AND ?',
+    'client_key.oversized': 'SELECT COUNT(*) FROM (SELECT 1 FROM client_keys GROUP BY kind, key HAVING COUNT(*) > ?)',
+    # availability_rules
+    'rule.insert': 'INSERT INTO availability_rules (kind, weekday, start_day, end_day, start_md, end_md, label) '
+                   'VALUES (?,?,?,?,?,?,?)',
+    'rule.delete': 'DELETE FROM availability_rules WHERE id = ?',
+    'rule.list': 'SELECT id, kind, weekday, start_day, end_day, start_md, end_md, label '
+                 'FROM availability_rules ORDER BY id',
+    'rule_exception.insert': 'INSERT OR IGNORE INTO availability_rule_exceptions (rule_id, day) VALUES (?,?)',
+    'rule_exception.delete': 'DELETE FROM availability_rule_exceptions WHERE rule_id = ? AND day = ?',
+    'rule_exception.delete_rule': 'DELETE FROM availability_rule_exceptions WHERE rule_id = ?',
+    'rule_exception.range': 'SELECT rule_id, day FROM availability_rule_exceptions WHERE day BETWEEN ? AND ?',
+    # reservation_audit (historial de cambios de una reserva, del más reciente
+    # al más antiguo, paginado por id sobre idx_audit_reservation)
+    'audit.page.next': f'SELECT {select_columns(AuditEntry, {})} FROM reservation_audit '
+                       'WHERE resource_id = ? AND day = ? AND id < ? ORDER BY id DESC LIMIT ?',
+    'audit.page.prev': f'SELECT {select_columns(AuditEntry, {})} FROM reservation_audit '
+                       'WHERE resource_id = ? AND day = ? AND id > ? ORDER BY id LIMIT ?',
+    # Depuración por lotes de los cambios anteriores a una fecha (idx_audit_changed_at)
+    'audit.prune': 'DELETE FROM reservation_audit WHERE id IN '
+                   '(SELECT id FROM reservation_audit WHERE changed_at < ? ORDER BY changed_at LIMIT ?)',
+    'audit.has_before': 'SELECT 1 FROM reservation_audit WHERE changed_at < ? LIMIT 1',
+    # Deshacer/rehacer (modules/undo.py): estado de un rango de días de un
+    # recurso y restauración de las filas que difieren
+    'undo.reservations': f'SELECT {RESERVATION_COLUMNS} FROM reservations '
+                         'WHERE resource_id = ? AND day BETWEEN ? AND ? ORDER BY day',
+    'undo.payments': f'SELECT {UNDO_PAYMENT_COLUMNS} FROM payments '
+                     'WHERE resource_id = ? AND day BETWEEN ? AND ? ORDER BY id',
+    'undo.exceptions': 'SELECT rule_id, day FROM availability_rule_exceptions '
+                       'WHERE day BETWEEN ? AND ? ORDER BY day, rule_id',
+    'undo.clients': 'SELECT id, first_name, last_name FROM clients '
+                    'WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id',
+    'undo.payment.restore': f'''
+        INSERT INTO payments ({UNDO_PAYMENT_COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?,?,?)
+        ON CONFLICT(id) DO UPDATE SET resource_id = excluded.resource_id, day = excluded.day,
+            paid_on = excluded.paid_on, amount = excluded.amount, method = excluded.method,
+            reference = excluded.reference, created_at = excluded.created_at,
+            reconciled_at = excluded.reconciled_at, bank_reference = excluded.bank_reference''',
+    # Replicación: registro de cambios, filas exportadas y aplicación de cambios recibidos
+    'sync.origin': "SELECT value FROM sync_state WHERE key = 'origin'",
+    'sync.set_origin': "UPDATE sync_state SET value = ? WHERE key = 'origin'",
+    'sync.last_seq': 'SELECT IFNULL(MAX(seq), 0) FROM change_log',
+    # Última anotación de cada fila cambiada en el intervalo, sin las que
+    # vienen del destino (ya las tiene)
+    'sync.changes': '''
+        SELECT l.seq, l.tbl, l.row_key, l.deleted, l.changed_at, l.origin FROM change_log l
+        JOIN (SELECT MAX(seq) AS seq FROM change_log WHERE seq BETWEEN ? AND ? GROUP BY tbl, row_key) m
+          ON m.seq = l.seq
+        WHERE l.origin IS NOT ?
+        ORDER BY l.seq''',
+    'sync.peers': 'SELECT origin, sent_seq, received_seq, last_import FROM sync_peers ORDER BY origin',
+    'sync.ack_sent': 'INSERT INTO sync_peers (origin, sent_seq) VALUES (?, ?) '
+                     'ON CONFLICT(origin) DO UPDATE SET sent_seq = MAX(sent_seq, excluded.sent_seq)',
+    'sync.ack_received': 'INSERT INTO sync_peers (origin, received_seq, last_import) VALUES (?, ?, ?) '
+                         'ON CONFLICT(origin) DO UPDATE SET received_seq = MAX(received_seq, excluded.received_seq), '
+                         'last_import = excluded.last_import',
+    'sync.rows.resources': "SELECT name, json_object('kind', kind, 'sort_order', sort_order, 'active', active, "
+                           "'capacity', capacity) FROM resources WHERE name IN (SELECT value FROM json_each(?))",
+    'sync.rows.clients': "SELECT uid, json_object('first_name', first_name, 'last_name', last_name, "
+                         "'phone', phone) FROM clients WHERE uid IN (SELECT value FROM json_each(?))",
+    'sync.rows.reservations': '''
+        SELECT json_array(r.name, b.day), json_object('client', c.uid, 'guests', b.guests, 'amount', b.amount,
+               'payment_method', b.payment_method, 'reference', b.reference, 'created_at', b.created_at)
+        FROM json_each(?) k
+        JOIN resources r ON r.name = json_extract(k.value, '$[0]')
+        JOIN reservations b ON b.resource_id = r.id AND b.day = json_extract(k.value, '$[1]')
+        LEFT JOIN clients c ON c.id = b.client_id''',
+    'sync.rows.payments': '''
+        SELECT p.uid, json_object('resource', r.name, 'day', p.day, 'paid_on', p.paid_on, 'amount', p.amount,
+               'method', p.method, 'reference', p.reference, 'created_at', p.created_at,
+               'reconciled_at', p.reconciled_at, 'bank_reference', p.bank_reference)
+        FROM payments p JOIN resources r ON r.id = p.resource_id
+        WHERE p.uid IN (SELECT value FROM json_each(?))''',
+    'sync.create_incoming': '''
+        CREATE TEMP TABLE IF NOT EXISTS sync_incoming (
+            tbl TEXT NOT NULL, row_key TEXT NOT NULL, deleted INTEGER NOT NULL, changed_at INTEGER NOT NULL,
+            origin TEXT NOT NULL, data TEXT, won INTEGER NOT NULL DEFAULT 0, PRIMARY KEY(tbl, row_key)
+        )''',
+    'sync.clear_incoming': 'DELETE FROM sync_incoming',
+    'sync.stage': 'INSERT OR REPLACE INTO sync_incoming (tbl, row_key, deleted, changed_at, origin, data) '
+                  'VALUES (?,?,?,?,?,?)',
+    # Gana la versión mayor (changed_at, origin); a igualdad es el mismo cambio
+    'sync.mark_winners': '''
+        UPDATE sync_incoming SET won = 1
+        WHERE NOT IFNULL((SELECT changed_at, origin FROM change_log l
+                          WHERE l.tbl = sync_incoming.tbl AND l.row_key = sync_incoming.row_key
+                          ORDER BY changed_at DESC, origin DESC LIMIT 1) >= (changed_at, origin), 0)''',
+    'sync.won': 'SELECT COUNT(*) FROM sync_incoming WHERE won',
+    'sync.begin_apply': "INSERT OR IGNORE INTO sync_state (key, value) VALUES ('applying', '1')",
+    'sync.end_apply': "DELETE FROM sync_state WHERE key = 'applying'",
+    'sync.apply.resources': f'''
+        INSERT INTO resources (name, kind, sort_order, active, capacity)
+        SELECT w.row_key, {_field('kind')}, IFNULL({_field('sort_order')}, 0), IFNULL({_field('active')}, 1),
+               {_field('capacity')}
+        {_incoming('resources')}
+        ON CONFLICT(name) DO UPDATE SET kind = excluded.kind, sort_order = excluded.sort_order,
+            active = excluded.active, capacity = excluded.capacity''',
+    # Un cliente nuevo con el teléfono de un cliente local es el mismo cliente
+    'sync.apply.client_aliases': f'''
+        INSERT OR REPLACE INTO client_aliases (uid, local_uid)
+        SELECT w.row_key, c.uid FROM sync_incoming w JOIN clients c ON c.phone = {_field('phone')}
+        WHERE w.won AND w.tbl = 'clients' AND NOT w.deleted AND c.uid <> w.row_key
+          AND NOT EXISTS (SELECT 1 FROM clients WHERE uid = w.row_key)''',
+    'sync.apply.clients': f'''
+        INSERT INTO clients (uid, first_name, last_name, phone)
+        SELECT w.row_key, {_field('first_name')}, {_field('last_name')}, {_field('phone')}
+        {_incoming('clients')} AND w.row_key NOT IN (SELECT uid FROM client_aliases)
+        ON CONFLICT(uid) DO UPDATE SET first_name = excluded.first_name, last_name = excluded.last_name,
+            phone = CASE WHEN EXISTS (SELECT 1 FROM clients WHERE phone = excluded.phone AND uid <> excluded.uid)
+                         THEN phone ELSE excluded.phone END''',
+    # El nombre de un cliente asignado a uno local se copia a éste si es más
+    # reciente, y se anota con la versión recibida para que ambas
+    # instalaciones acaben con el mismo nombre
+    'sync.apply.alias_names': f'''
+        UPDATE clients SET first_name = {_field('first_name')}, last_name = {_field('last_name')}
+        FROM sync_incoming w JOIN client_aliases a ON a.uid = w.row_key
+        WHERE clients.uid = a.local_uid AND w.won AND w.tbl = 'clients' AND NOT w.deleted
+          AND {ALIAS_IS_NEWER}''',
+    'sync.log.alias_names': f'''
+        INSERT INTO change_log (tbl, row_key, deleted, changed_at, origin)
+        SELECT 'clients', a.local_uid, 0, w.changed_at, w.origin
+        FROM sync_incoming w JOIN client_aliases a ON a.uid = w.row_key
+        WHERE w.won AND w.tbl = 'clients' AND NOT w.deleted AND {ALIAS_IS_NEWER}''',
+    'sync.apply.reservations': f'''
+        INSERT INTO reservations ({RESERVATION_COLUMNS})
+        SELECT r.id, json_extract(w.row_key, '$[1]'),
+               (SELECT id FROM clients WHERE uid = IFNULL((SELECT local_uid FROM client_aliases
+                                                           WHERE uid = {_field('client')}), {_field('client')})),
+               IFNULL({_field('guests')}, 0), {_field('amount')}, {_field('payment_method')},
+               {_field('reference')}, {_field('created_at')}
+        FROM sync_incoming w JOIN resources r ON r.name = json_extract(w.row_key, '$[0]')
+        WHERE w.won AND w.tbl = 'reservations' AND NOT w.deleted
+        ON CONFLICT(resource_id, day) DO UPDATE SET
+            client_id = excluded.client_id, guests = excluded.guests, amount = excluded.amount,
+            payment_method = excluded.payment_method,
+            reference = excluded.reference, created_at = excluded.created_at''',
+    # Un pago sólo existe con su reserva: los pagos recibidos de una reserva
+    # que aquí no existe (o que este mismo archivo da de baja) se descartan y
+    # no se anotan, y los pagos locales de las reservas dadas de baja se
+    # anotan como bajas (el trigger de reservations los elimina sin anotarlos)
+    # para que las dos instalaciones acaben sin ellos
+    'sync.skip.orphan_payments': f'''
+        UPDATE sync_incoming AS w SET won = 0
+        WHERE w.won AND w.tbl = 'payments' AND NOT w.deleted AND NOT EXISTS (
+            SELECT 1 FROM reservations b JOIN resources r ON r.id = b.resource_id
+            WHERE r.name = {_field('resource')} AND b.day = {_field('day')}
+              AND NOT EXISTS (SELECT 1 FROM sync_incoming t
+                              WHERE t.won AND t.tbl = 'reservations' AND t.deleted
+                                AND json_extract(t.row_key, '$[0]') = r.name
+                                AND json_extract(t.row_key, '$[1]') = b.day))''',
+    'sync.apply.payments': f'''
+        INSERT INTO payments (uid, resource_id, day, paid_on, amount, method, reference, created_at,
+                              reconciled_at, bank_reference)
+        SELECT w.row_key, r.id, {_field('day')}, {_field('paid_on')}, {_field('amount')}, {_field('method')},
+               {_field('reference')}, {_field('created_at')}, {_field('reconciled_at')}, {_field('bank_reference')}
+        FROM sync_incoming w JOIN resources r ON r.name = {_field('resource')}
+        WHERE w.won AND w.tbl = 'payments' AND NOT w.deleted
+        ON CONFLICT(uid) DO UPDATE SET resource_id = excluded.resource_id, day = excluded.day,
+            paid_on = excluded.paid_on, amount = excluded.amount, method = excluded.method,
+            reference = excluded.reference, created_at = excluded.created_at,
+            reconciled_at = excluded.reconciled_at, bank_reference = excluded.bank_reference''',
+    'sync.delete.payments': f"DELETE FROM payments WHERE uid IN (SELECT w.row_key {_incoming('payments', True)})",
+    'sync.log.reservation_payments': '''
+        INSERT INTO change_log (tbl, row_key, deleted, changed_at, origin)
+        SELECT 'payments', p.uid, 1,
+               MAX(w.changed_at, IFNULL((SELECT MAX(changed_at) + 1 FROM change_log
+                                         WHERE tbl = 'payments' AND row_key = p.uid), 0)),
+               (SELECT value FROM sync_state WHERE key = 'origin')
+        FROM sync_incoming w JOIN resources r ON r.name = json_extract(w.row_key, '$[0]')
+        JOIN payments p ON p.resource_id = r.id AND p.day = json_extract(w.row_key, '$[1]')
+        WHERE w.won AND w.tbl = 'reservations' AND w.deleted''',
+    'sync.delete.reservations': '''
+        DELETE FROM reservations WHERE (resource_id, day) IN (
+            SELECT r.id, json_extract(w.row_key, '$[1]')
+            FROM sync_incoming w JOIN resources r ON r.name = json_extract(w.row_key, '$[0]')
+            WHERE w.won AND w.tbl = 'reservations' AND w.deleted)''',
+    'sync.delete.clients': f"DELETE FROM clients WHERE uid IN (SELECT w.row_key {_incoming('clients', True)})",
+    # Los cambios aplicados se anotan con su versión y origen (para
+    # reenviarlos a otras instalaciones y comparar con los siguientes)
+    'sync.log_winners': 'INSERT INTO change_log (tbl, row_key, deleted, changed_at, origin) '
+                        'SELECT tbl, row_key, deleted, changed_at, origin FROM sync_incoming WHERE won '
+                        'ORDER BY changed_at, origin',
+}
+
+_RESERVATION_ROW = row_factory(Reservation)
+_CLIENT_ROW = row_factory(Client)
+_PAYMENT_ROW = row_factory(Payment)
+_RESOURCE_ROW = row_factory(Resource)
+_RATE_ROW = row_factory(Rate)
+_AUDIT_ROW = row_factory(AuditEntry)
+
+
+class Repository:
+    # Acceso a las sentencias del registro: lecturas con la conexión de
+    # lectura del hilo, escrituras dentro de db_manager.write() (se unen a la
+    # transacción exterior si la hay). Cada ejecución se cuenta por nombre.
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self._global_version = None
+
+    def global_version_changed(self):
+        # Versión global de change_versions (mes 0): la suben los triggers de
+        # reglas, excepciones, tarifas, recursos y nombres de clientes desde
+        # cualquier conexión, pero no las reservas ni los pagos. True si
+        # cambió desde la llamada anterior, para invalidar las cachés del gestor.
+        row = self._query('change_versions.global').fetchone()
+        version = row[0] if row else 0
+        changed, self._global_version = version != self._global_version, version
+        return changed
+
+    def _query(self, name, params=(), factory=None):
+        self.db.count_statement(name)
+        cur = self.db.reader().execute(STATEMENTS[name], params)
+        if factory is not None:
+            cur.row_factory = factory
+        return cur
+
+    def _execute(self, name, params=()):
+        self.db.count_statement(name)
+        with self.db.write() as conn:
+            return conn.execute(STATEMENTS[name], params)
+
+    def _executemany(self, name, seq_of_params):
+        self.db.count_statement(name)
+        with self.db.write() as conn:
+            return conn.executemany(STATEMENTS[name], seq_of_params)
+
+
+class ReservationRepository(Repository):
+    # Todas las operaciones por día van sobre un recurso (resource_id)
+    def get(self, resource_id, day):
+        return self._query('reservation.get', (resource_id, to_day_number(day)), _RESERVATION_ROW).fetchone()
+
+    def get_many(self, resource_id, days):
+        # Varios días sueltos con una sola sentencia (la lista va como JSON)
+        days = json.dumps([to_day_number(day) for day in days])
+        return {row.day: row for row in self._query('reservation.get_many', (resource_id, days), _RESERVATION_ROW)}
+
+    def range(self, resource_id, start, end):
+        params = (resource_id, to_day_number(start), to_day_number(end))
+        return {row.day: row for row in self._query('reservation.range', params, _RESERVATION_ROW)}
+
+    def range_all(self, start, end):
+        # {resource_id: {día: Reservation}} de todos los recursos en una consulta
+        occupancy = {}
+        params = (to_day_number(start), to_day_number(end))
+        for row in self._query('reservation.range_all', params, _RESERVATION_ROW):
+            occupancy.setdefault(row.resource_id, {})[row.day] = row
+        return occupancy
+
+    def upsert(self, reservation):
+        self.upsert_many([reservation])
+
+    def upsert_many(self, reservations):
+        # reservations: Reservation (sólo se guardan las columnas de la tabla)
+        self._executemany('reservation.upsert', (
+            (r.resource_id, r.day, r.client_id, r.guests, r.amount, r.payment_method, r.reference, r.created_at)
+            for r in reservations
+        ))
+
+    def delete(self, resource_id, day):
+        self._execute('reservation.delete', (resource_id, to_day_number(day)))
+
+    def exists(self, resource_id, day):
+        return self._query('reservation.client_of', (resource_id, to_day_number(day))).fetchone() is not None
+
+    def block_many(self, resource_id, days, created_at):
+        self._executemany('reservation.block', ((resource_id, to_day_number(day), created_at) for day in days))
+
+    def unblock_range(self, resource_id, first, last):
+        self._execute('reservation.unblock_range', (resource_id, first, last))
+
+    def for_client(self, client_id, limit):
+        # Reservas del cliente, de la más reciente a la más antigua
+        return self._query('reservation.for_client', (client_id, limit), _RESERVATION_ROW).fetchall()
+
+    def agenda(self, key, forward, limit, due_only=False):
+        # Reservas tras (o antes de) la clave (día, recurso_id), siempre en
+        # orden ascendente
+        name = f"reservation.agenda.{'due' if due_only else 'all'}.{'next' if forward else 'prev'}"
+        rows = self._query(name, (*key, limit), _RESERVATION_ROW).fetchall()
+        return rows if forward else rows[::-1]
+
+    def outstanding(self):
+        # Todas las reservas con saldo pendiente en una sola consulta
+        return self._query('reservation.outstanding', (), _RESERVATION_ROW).fetchall()
+
+    def outstanding_total(self):
+        # (número de reservas, saldo pendiente total)
+        count, balance = self._query('reservation.outstanding_total').fetchone()
+        return count, balance
+
+    def month_versions(self, key):
+        return {row['month']: row['version'] for row in self._query('change_versions.month', (key,))}
+
+
+class PaymentRepository(Repository):
+    def for_day(self, resource_id, day):
+        return self._query('payment.for_day', (resource_id, to_day_number(day)), _PAYMENT_ROW).fetchall()
+
+    def insert(self, payment):
+        # payment: Payment (el id lo asigna SQLite); devuelve el id nuevo
+        return self._execute('payment.insert', _payment_params(payment)).lastrowid
+
+    def insert_many(self, payments):
+        self._executemany('payment.insert', (_payment_params(p) for p in payments))
+
+    def delete(self, payment_id):
+        self._execute('payment.delete', (payment_id,))
+
+    def balance(self, resource_id, day):
+        # Saldo pendiente de la reserva; None si no hay reserva o no tiene monto
+        row = self._query('payment.balance', (resource_id, day)).fetchone()
+        return row[0] if row else None
+
+    def day_of(self, payment_id):
+        # (resource_id, day) de la reserva del pago, o None si no existe
+        row = self._query('payment.day', (payment_id,)).fetchone()
+        return (row['resource_id'], row['day']) if row else None
+
+    def unreconciled(self):
+        # Pagos con referencia aún sin conciliar (índice parcial)
+        return self._query('payment.unreconciled', (), _PAYMENT_ROW)
+
+    def mark_reconciled(self, rows):
+        # rows: (reconciled_at, bank_reference, id); todo en una transacción
+        self._executemany('payment.reconcile', rows)
+
+
+class ResourceRepository(Repository):
+    def list(self, include_inactive=False):
+        return self._query('resource.list', (include_inactive,), _RESOURCE_ROW).fetchall()
+
+    def insert(self, name, kind=None, sort_order=0, capacity=None):
+        return self._execute('resource.insert', (name, kind, sort_order, capacity)).lastrowid
+
+    def set_active(self, resource_id, active):
+        self._execute('resource.set_active', (active, resource_id))
+
+    def set_capacity(self, resource_id, capacity):
+        self._execute('resource.set_capacity', (capacity, resource_id))
+
+
+class RateRepository(Repository):
+    def list(self):
+        return self._query('rate.list', (), _RATE_ROW).fetchall()
+
+    def insert(self, resource_id, kind, start_day, end_day, start_md, end_md, weekdays, price, label):
+        return self._execute('rate.insert', (resource_id, kind, start_day, end_day, start_md, end_md, weekdays,
+                                             price, label)).lastrowid
+
+    def delete(self, rate_id):
+        return self._execute('rate.delete', (rate_id,)).rowcount
+
+
+class CapacityRepository(Repository):
+    def range(self, first, last):
+        # {día: (huéspedes, capacidad del día o None)} de los días con
+        # huéspedes o con capacidad propia, en una sola consulta
+        return {day: (guests, capacity)
+                for day, guests, capacity in self._query('capacity.range', (first, last))}
+
+    def check(self, resource_id, day):
+        # (huéspedes del día, huéspedes de la reserva actual del recurso,
+        # capacidad del día, capacidad del recurso); None donde no hay fila
+        return tuple(self._query('capacity.check', (resource_id, to_day_number(day))).fetchone())
+
+    def set_many(self, days, capacity):
+        self._executemany('capacity.set', ((day, capacity) for day in days))
+
+    def clear_range(self, first, last):
+        self._execute('capacity.clear_range', (first, last))
+
+
+class ClientRepository(Repository):
+    def get(self, client_id):
+        return self._query('client.get', (client_id,), _CLIENT_ROW).fetchone()
+
+    def get_many(self, client_ids):
+        ids = json.dumps(list(client_ids))
+        return {row.id: row for row in self._query('client.get_many', (ids,), _CLIENT_ROW)}
+
+    def page(self, sort, key, forward, limit):
+        # Página del directorio tras (o antes de) `key`, la clave de
+        # client_sort_key() de la última (o primera) fila mostrada; siempre
+        # en orden ascendente. Sin clave, desde el principio.
+        if key is None:
+            key = client_sort_key(sort, Client(0, None, None, None))
+        rows = self._query(f"client.page.{sort}.{'next' if forward else 'prev'}", (*key, limit),
+                           _CLIENT_ROW).fetchall()
+        return rows if forward else rows[::-1]
+
+    def id_by_phone(self, phone):
+        row = self._query('client.id_by_phone', (phone,)).fetchone()
+        return row['id'] if row else None
+
+    def insert(self, first_name, last_name, phone):
+        return self._execute('client.insert', (first_name, last_name, phone)).lastrowid
+
+    def update_name(self, client_id, first_name, last_name):
+        return self._execute('client.update_name', (first_name, last_name, client_id)).rowcount > 0
+
+    def upsert_many(self, clients):
+        # clients: Client con teléfono; el teléfono identifica al cliente y el id se ignora
+        self._executemany('client.upsert_by_phone', ((c.first_name, c.last_name, c.phone) for c in clients))
+
+
+class ClientKeyRepository(Repository):
+    def pending(self):
+        # Clientes nuevos o cambiados desde el último cálculo de claves
+        return self._query('client_key.pending', (), _CLIENT_ROW).fetchall()
+
+    def replace(self, client_ids, keys):
+        # keys: (kind, key, client_id) de los clientes `client_ids`, que dejan
+        # de estar pendientes
+        ids = json.dumps(list(client_ids))
+        with self.db.write():
+            self._execute('client_key.delete_many', (ids,))
+            self._executemany('client_key.insert', keys)
+            self._execute('client_key.clear_pending', (ids,))
+
+    def blocks(self, max_size):
+        # [(kind, key, [client_id])] de los bloques de 2 a max_size clientes
+        return [(row['kind'], row['key'], json.loads(row['ids']))
+                for row in self._query('client_key.blocks', (max_size,))]
+
+    def oversized(self, max_size):
+        return self._query('client_key.oversized', (max_size,)).fetchone()[0]
+
+    def merge(self, keep_id, duplicate_ids, first_name, last_name, phone):
+        # Pasar las reservas de los duplicados a keep_id, borrarlos y completar
+        # los datos vacíos de keep_id; el teléfono es único, así que se copia
+        # después de borrar al duplicado que lo tenía
+        ids = json.dumps(list(duplicate_ids))
+        with self.db.write():
+            moved = self._execute('reservation.reassign_clients', (keep_id, ids)).rowcount
+            self._execute('client.delete_many', (ids,))
+            self._execute('client.fill_missing', (first_name, last_name, phone, keep_id))
+        return moved
+
+
+class RuleRepository(Repository):
+    def insert(self, kind, weekday, start_day, end_day, start_md, end_md, label):
+        return self._execute('rule.insert', (kind, weekday, start_day, end_day, start_md, end_md, label)).lastrowid
+
+    def delete(self, rule_id):
+        with self.db.write():
+            self._execute('rule_exception.delete_rule', (rule_id,))
+            self._execute('rule.delete', (rule_id,))
+
+    def list(self):
+        return [dict(row) for row in self._query('rule.list')]
+
+    def add_exceptions(self, pairs):
+        self._executemany('rule_exception.insert', pairs)
+
+    def remove_exception(self, rule_id, day):
+        self._execute('rule_exception.delete', (rule_id, day))
+
+    def exceptions_in_range(self, first, last):
+        return {(row['rule_id'], row['day']) for row in self._query('rule_exception.range', (first, last))}
+
+
+class AuditRepository(Repository):
+    def page(self, resource_id, day, key, forward, limit):
+        # Cambios más antiguos (forward) o más recientes que el id `key`,
+        # siempre del más reciente al más antiguo
+        direction = 'next' if forward else 'prev'
+        rows = self._query(f'audit.page.{direction}', (resource_id, day, key, limit), _AUDIT_ROW).fetchall()
+        return rows if forward else rows[::-1]
+
+    def prune(self, before, limit):
+        return self._execute('audit.prune', (before, limit)).rowcount
+
+    def has_before(self, before):
+        return self._query('audit.has_before', (before,)).fetchone() is not None
+
+
+class UndoRepository(Repository):
+    def state(self, resource_id, first, last):
+        # Filas de un rango de días como tuplas (comparables entre sí)
+        reservations = tuple(map(tuple, self._query('undo.reservations', (resource_id, first, last))))
+        client_ids = sorted({row[2] for row in reservations if row[2] is not None})
+        return (
+            reservations,
+            tuple(map(tuple, self._query('undo.payments', (resource_id, first, last)))),
+            tuple(map(tuple, self._query('undo.exceptions', (first, last)))),
+            tuple(map(tuple, self._query('undo.clients', (json.dumps(client_ids),)))),
+        )
+
+    def restore(self, current, target):
+        # Dejar como en `target` las filas que difieren de `current` (ambos de
+        # state() sobre el mismo rango). Las reservas se eliminan primero (sus
+        # pagos se eliminan con ellas) y se insertan antes que sus pagos.
+        (reservations, payments, exceptions, clients), (reservations_to, payments_to, exceptions_to, clients_to) = \
+            current, target
+        keep = {row[:2] for row in reservations_to}
+        with self.db.write():
+            self._executemany('reservation.delete', (row[:2] for row in reservations if row[:2] not in keep))
+            self._executemany('reservation.upsert', set(reservations_to) - set(reservations))
+            kept_ids = {row[0] for row in payments_to}
+            self._executemany('payment.delete', ((row[0],) for row in payments if row[0] not in kept_ids))
+            self._executemany('undo.payment.restore', sorted(set(payments_to) - set(payments)))
+            self._executemany('rule_exception.delete', set(exceptions) - set(exceptions_to))
+            self._executemany('rule_exception.insert', set(exceptions_to) - set(exceptions))
+            self._executemany('client.update_name', ((first_name, last_name, client_id)
+                                                     for client_id, first_name, last_name
+                                                     in set(clients_to) - set(clients)))
+
+
+class SyncRepository(Repository):
+    def origin(self):
+        return self._query('sync.origin').fetchone()[0]
+
+    def set_origin(self, origin):
+        self._execute('sync.set_origin', (origin,))
+
+    def last_seq(self):
+        return self._query('sync.last_seq').fetchone()[0]
+
+    def changes(self, first_seq, last_seq, exclude_origin=None):
+        return self._query('sync.changes', (first_seq, last_seq, exclude_origin)).fetchall()
+
+    def rows(self, table, keys):
+        # {clave: datos de la fila en JSON} de las filas que siguen existiendo
+        return dict(self._query(f'sync.rows.{table}', (json.dumps(keys),)).fetchall())
+
+    def peers(self):
+        return [dict(row) for row in self._query('sync.peers')]
+
+    def ack_sent(self, origin, seq):
+        self._execute('sync.ack_sent', (origin, seq))
+
+    def ack_received(self, origin, seq, imported_at):
+        self._execute('sync.ack_received', (origin, seq, imported_at))
+
+    def apply(self, changes):
+        # changes: (tbl, row_key, deleted, changed_at, origin, datos JSON).
+        # Todo en una transacción; devuelve cuántos cambios se han aplicado.
+        with self.db.write():
+            self._execute('sync.create_incoming')
+            self._execute('sync.clear_incoming')
+            self._executemany('sync.stage', changes)
+            self._execute('sync.mark_winners')
+            # Los triggers no anotan lo que se aplica: se anota con la versión de origen
+            self._execute('sync.begin_apply')
+            for name in SYNC_APPLY:
+                self._execute(name)
+            self._execute('sync.end_apply')
+            applied = self._execute('sync.log_winners').rowcount
+            self._execute('sync.clear_incoming')
+        return applied
+
+
+def client_sort_key(sort, client):
+    # Clave de paginación de un cliente en el orden `sort` (ver CLIENT_SORTS)
+    if sort == 'name':
+        return (client.last_name or '', client.first_name or '', client.id)
+    if sort == 'phone':
+        return (client.phone or '', client.id)
+    return (client.id,)
+
+
+def _payment_params(payment):
+    return (payment.resource_id, payment.day, payment.paid_on, payment.amount, payment.method,
+            payment.reference, payment.created_at)
@@ -1,48 +1,92 @@
 from datetime import datetime
+from config.app_config import AppConfig
+from utils.dates import to_day_number, from_day_number
+from modules.database import DEFAULT_RESOURCE_ID
+from modules.records import Reservation
+from modules.repository import ReservationRepository
 
 class Reservations:
-    def __init__(self, db_conn):
-        self.conn = db_conn
-
-    def add_reservation(self, data: dict, client_id: int):
-        cur = self.conn.cursor()
-        cur.execute('REPLACE INTO reservations (date, client_id, amount, payment_status, payment_method, reference, created_at) VALUES (?,?,?,?,?,?,?)',
-                (data['date'], client_id, data.get('amount', 0.0), data.get('payment_status',''), data.get('payment_method',''), data.get('reference',''), datetime.utcnow().isoformat()))
-        self.conn.commit()
-
-    def get_reservation(self, date_str):
-        cur = self.conn.cursor()
-        cur.execute('''
-        SELECT b.date, b.amount, b.payment_status, b.payment_method, b.reference, b.created_at,
-               c.id as client_id, c.first_name, c.last_name, c.phone
-        FROM reservations b
-        LEFT JOIN clients c ON b.client_id = c.id
-        WHERE b.date = ?
-        ''', (date_str,))
-        row = cur.fetchone()
-        if not row:
-            return None
-        d = dict(row)
-        if d.get('client_id') is None:
+    def __init__(self, db_manager):
+        # Lecturas con la conexión de lectura del hilo actual; escrituras en
+        # transacciones serializadas de db_manager.write(). Cada recurso tiene
+        # su propio calendario (resource_id).
+        self.db = db_manager
+        self.repository = ReservationRepository(db_manager)
+
+    def add_reservation(self, data: dict, client_id: int, resource_id=DEFAULT_RESOURCE_ID):
+        day = to_day_number(data['date'])
+        self.repository.upsert(Reservation(
+            resource_id, day, from_day_number(day).isoformat(), client_id, None, None, None,
+            data.get('guests', AppConfig.CAPACITY['default_guests']), data.get('amount', 0.0), None, None, data.get('payment_method',''),
+            data.get('reference',''), datetime.utcnow().isoformat()
+        ))
+
+    def get_reservation(self, day, resource_id=DEFAULT_RESOURCE_ID):
+        # Reservation del día, o None si está libre o sólo bloqueado
+        row = self.repository.get(resource_id, day)
+        if row is None or row.is_block:
             return None
-        return d
+        return row
+
+    def get_range(self, start, end, resource_id=DEFAULT_RESOURCE_ID):
+        # Una sola consulta por rango; devuelve {número de día: Reservation}
+        # incluyendo los días bloqueados (client_id nulo)
+        return self.repository.range(resource_id, start, end)
+
+    def get_occupancy(self, start, end):
+        # Todos los recursos en una sola consulta: {resource_id: {día: Reservation}}
+        return self.repository.range_all(start, end)
+
+    def get_days(self, days, resource_id=DEFAULT_RESOURCE_ID):
+        # Varios días sueltos en una sola consulta: {número de día: Reservation}
+        return self.repository.get_many(resource_id, days)
+
+    def get_month_version(self, year, month):
+        # (versión del mes, versión global) según los contadores de change_versions
+        key = year * 100 + month
+        versions = self.repository.month_versions(key)
+        return versions.get(key, 0), versions.get(0, 0)
+
+    def get_client_history(self, client_id, limit=None):
+        # Reservas del cliente en todos los recursos, de la más reciente a la
+        # más antigua (idx_reservations_client)
+        return self.repository.for_client(client_id, -1 if limit is None else limit)
+
+    def get_agenda(self, key=None, forward=True, limit=100, due_only=False):
+        # Reservas de todos los recursos en orden cronológico, por páginas
+        # (sin OFFSET). `key` es agenda_key() de la última fila mostrada (o
+        # de la primera si forward es False); agenda_start() salta a un día.
+        return self.repository.agenda(key or self.agenda_start(0), forward, limit, due_only)
+
+    def agenda_start(self, day):
+        # Clave que precede a la primera reserva del día
+        return to_day_number(day), 0
+
+    def agenda_key(self, reservation):
+        return reservation.day, reservation.resource_id
+
+    def get_outstanding(self):
+        # Reservas con saldo pendiente (una sola consulta sobre el índice parcial)
+        return self.repository.outstanding()
+
+    def get_outstanding_total(self):
+        # (número de reservas con saldo, saldo total pendiente)
+        return self.repository.outstanding_total()
+
+    def delete_reservation(self, day, resource_id=DEFAULT_RESOURCE_ID):
+        self.repository.delete(resource_id, day)
 
-    def delete_reservation(self, date_str):
-        cur = self.conn.cursor()
-        cur.execute('DELETE FROM reservations WHERE date=?', (date_str,))
-        self.conn.commit()
+    def is_available(self, day, resource_id=DEFAULT_RESOURCE_ID):
+        return not self.repository.exists(resource_id, day)
 
-    def is_available(self, date_str):
-        cur = self.conn.cursor()
-        cur.execute('SELECT client_id FROM reservations WHERE date=?', (date_str,))
-        row = cur.fetchone()
-        return row is None
+    def set_availability(self, day, available:int, resource_id=DEFAULT_RESOURCE_ID):
+        self.set_availability_range(day, day, available, resource_id)
 
-    def set_availability(self, date_str, available:int):
-        cur = self.conn.cursor()
+    def set_availability_range(self, start, end, available:int, resource_id=DEFAULT_RESOURCE_ID):
+        # Todo el rango en una sola transacción: un executemany para bloquear
+        # o un único DELETE por rango para liberar. Los días con reserva no se tocan.
+        first, last = sorted((to_day_number(start), to_day_number(end)))
         if available:
-            cur.execute('DELETE FROM reservations WHERE date=? AND client_id IS NULL', (date_str,))
+            self.repository.unblock_range(resource_id, first, last)
         else:
-            cur.execute('INSERT OR IGNORE INTO reservations (date, client_id, created_at) VALUES (?,?,?)',
-                        (date_str, None, datetime.utcnow().isoformat()))
-        self.conn.commit()
+            self.repository.block_many(resource_id, range(first, last + 1), datetime.utcnow().isoformat())
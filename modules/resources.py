@@ -0,0 +1,22 @@
+from modules.repository import ResourceRepository
+
+class Resources:
+    def __init__(self, db_manager):
+        # Cabañas, parcelas y salones; cada uno con su propio calendario
+        self.db = db_manager
+        self.repository = ResourceRepository(db_manager)
+
+    def get_resources(self, include_inactive=False):
+        # Ordenados por sort_order y luego por id
+        return self.repository.list(include_inactive)
+
+    def add_resource(self, name, kind=None, sort_order=0, capacity=None):
+        return self.repository.insert(name, kind, sort_order, capacity)
+
+    def set_active(self, resource_id, active):
+        # Desactivar oculta el recurso sin perder sus reservas
+        self.repository.set_active(resource_id, 1 if active else 0)
+
+    def set_capacity(self, resource_id, capacity):
+        # Huéspedes máximos por reserva; None quita el límite
+        self.repository.set_capacity(resource_id, capacity)
@@ -0,0 +1,108 @@
+from collections import deque
+from datetime import date
+from typing import NamedTuple
+from config.app_config import AppConfig
+from modules.capacity import OverbookingError
+from modules.repository import UndoRepository
+from utils.dates import to_day_number
+
+
+class UndoConflictError(ValueError):
+    # Los días del cambio se modificaron después (otra ventana, la línea de
+    # comandos o la API): deshacerlo pisaría ese cambio
+    pass
+
+
+class UndoCommand(NamedTuple):
+    resource_id: int
+    first: int               # Primer y último día del rango afectado
+    last: int
+    before: tuple            # UndoRepository.state() antes y después del cambio
+    after: tuple
+
+    @property
+    def days(self):
+        return [date.fromordinal(n) for n in range(self.first, self.last + 1)]
+
+
+class UndoLog:
+    # Registro de los cambios del calendario para deshacerlos y rehacerlos.
+    # Cada cambio guarda en memoria el estado de sus días (reservas, pagos,
+    # excepciones de reglas y nombre de los clientes) antes y después, leído
+    # en la misma transacción que el cambio; deshacer restaura en una
+    # transacción sólo las filas que difieren, así que no relee el mes.
+    # Guarda como mucho max_commands cambios. Con capacity_manager, las
+    # reservas que vuelven se comprueban contra la capacidad del día, que
+    # comparten todos los recursos.
+    def __init__(self, db_manager, config=None, capacity_manager=None):
+        self.db = db_manager
+        self.config = config or AppConfig.UNDO
+        self.capacity_manager = capacity_manager
+        self.repository = UndoRepository(db_manager)
+        self._undo = deque(maxlen=self.config['max_commands'])
+        self._redo = []
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def record(self, resource_id, start, end, action):
+        # Ejecutar action() registrando el cambio de los días start..end del
+        # recurso; devuelve lo que devuelva action()
+        first, last = sorted((to_day_number(start), to_day_number(end)))
+        with self.db.write():
+            before = self.repository.state(resource_id, first, last)
+            result = action()
+            after = self.repository.state(resource_id, first, last)
+        if after != before:
+            self._undo.append(UndoCommand(resource_id, first, last, before, after))
+            self._redo.clear()
+        return result
+
+    def undo(self):
+        # Devuelve el cambio deshecho (sus días deben redibujarse) o None
+        if not self._undo:
+            return None
+        command = self._undo[-1]
+        # Se quita de la pila sólo si se restauró: ante un conflicto sigue ahí
+        self._restore(command, command.after, command.before)
+        self._undo.pop()
+        self._redo.append(command)
+        return command
+
+    def redo(self):
+        if not self._redo:
+            return None
+        command = self._redo[-1]
+        self._restore(command, command.before, command.after)
+        self._redo.pop()
+        self._undo.append(command)
+        return command
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
+    def _restore(self, command, expected, target):
+        with self.db.write():
+            current = self.repository.state(command.resource_id, command.first, command.last)
+            if current != expected:
+                raise UndoConflictError(AppConfig.LABELS['undo_conflict'])
+            self._check_capacity(current, target)
+            self.repository.restore(current, target)
+
+    def _check_capacity(self, current, target):
+        # Antes de restaurar: otro recurso puede haber ocupado el cupo del día
+        # desde el cambio (sólo se rechaza si aumentan los huéspedes)
+        if self.capacity_manager is None:
+            return
+        for resource_id, day, client_id, guests, *_ in set(target[0]) - set(current[0]):
+            if client_id is not None:
+                try:
+                    self.capacity_manager.check(day, resource_id, guests)
+                except OverbookingError as error:
+                    raise UndoConflictError(str(error)) from error
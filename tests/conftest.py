@@ -0,0 +1,27 @@
+"""Fixtures comunes: una base de datos SQLite temporal por prueba."""
+import pytest
+from modules.calendar_logic import open_calendar
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'kumbayah.db')
+
+
+@pytest.fixture
+def calendar_logic(db_path):
+    logic = open_calendar(db_path)
+    yield logic
+    logic.db_manager.close()
+
+
+@pytest.fixture
+def book(calendar_logic):
+    # Reservar un día con los datos mínimos válidos (Efectivo no pide referencia)
+    def book(day, first_name='Ana', last_name='Pérez', phone='04141234567', amount=100.0, status='Nada',
+             guests=1, resource_id=None, logic=None):
+        (logic or calendar_logic).add_or_update_reservation(
+            day, {'first_name': first_name, 'last_name': last_name, 'phone': phone},
+            {'amount': amount, 'payment_method': 'Efectivo', 'payment_status': status, 'guests': guests},
+            resource_id=resource_id)
+    return book
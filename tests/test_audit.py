@@ -0,0 +1,63 @@
+import io
+import json
+import threading
+import time
+from cli.commands import build_parser, run_command
+from config.app_config import AppConfig
+from modules.maintenance import DatabaseMaintenance, PRUNE_AUDIT
+
+
+def _cli(calendar_logic, *argv):
+    out = io.StringIO()
+    assert run_command(build_parser(), calendar_logic, list(argv), out=out)
+    return json.loads(out.getvalue())['result']
+
+
+def test_triggers_store_only_changed_columns(calendar_logic, book):
+    book('2026-10-05', amount=100.0)
+    book('2026-10-05', amount=120.0)
+    latest, created = calendar_logic.get_history('2026-10-05')
+    assert (latest.action, latest.changed) == ('update', {'amount': [100.0, 120.0]})
+    assert created.action == 'insert' and created.changed['client_id'] == 'Ana Pérez'
+
+
+def test_cli_history_uses_dates_and_client_names(calendar_logic, book):
+    book('2026-10-05')
+    [entry] = _cli(calendar_logic, 'audit', 'history', '2026-10-05')
+    assert entry['date'] == '2026-10-05'
+    assert 'day' not in entry and 'changed_at' not in entry
+    assert entry['changes']['client'] == 'Ana Pérez' and 'client_id' not in entry['changes']
+
+
+def test_maintenance_prunes_expired_changes_in_steps(calendar_logic, book):
+    for day in range(1, 4):
+        book(f'2026-10-0{day}')
+    with calendar_logic.db_manager.write() as conn:
+        conn.execute('UPDATE reservation_audit SET changed_at = ?',
+                     (int(time.time()) - (AppConfig.AUDIT['retention_days'] + 1) * 86400,))
+    maintenance = DatabaseMaintenance(calendar_logic.db_manager, dict(AppConfig.MAINTENANCE, audit_rows_per_step=2))
+    assert maintenance._is_due(PRUNE_AUDIT)
+    assert maintenance.prune_audit()
+    assert maintenance.audit.has_expired()
+    assert maintenance.prune_audit()
+    assert not maintenance.audit.has_expired()
+
+
+def test_maintenance_step_is_skipped_while_another_thread_writes(calendar_logic):
+    maintenance = DatabaseMaintenance(calendar_logic.db_manager)
+    writing, release = threading.Event(), threading.Event()
+
+    def hold_write():
+        with calendar_logic.db_manager.write():
+            writing.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold_write)
+    thread.start()
+    writing.wait()
+    try:
+        assert maintenance.prune_audit() is False
+    finally:
+        release.set()
+        thread.join()
+    assert maintenance.prune_audit() is True
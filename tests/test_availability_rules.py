@@ -0,0 +1,38 @@
+from datetime import date
+from modules.calendar_logic import open_calendar
+
+
+def _count_expansions(monkeypatch, rules):
+    calls = []
+    expand = rules._expand_month
+    monkeypatch.setattr(rules, '_expand_month', lambda year, month: calls.append((year, month)) or expand(year, month))
+    return calls
+
+
+def test_weekly_rule_blocks_only_its_weekday(calendar_logic):
+    rules = calendar_logic.rules_manager
+    rules.add_weekly_rule(0, label='lunes')
+    blocked = rules.blocked_days(2026, 10)
+    assert sorted(date.fromordinal(n).day for n in blocked) == [5, 12, 19, 26]
+
+
+def test_month_cache_survives_reservation_writes(calendar_logic, book, monkeypatch):
+    rules = calendar_logic.rules_manager
+    rules.add_weekly_rule(0)
+    calls = _count_expansions(monkeypatch, rules)
+    rules.blocked_days(2026, 10)
+    book('2026-10-07')
+    calendar_logic.add_payment('2026-10-07', 10, 'Efectivo')
+    rules.blocked_days(2026, 10)
+    assert calls == [(2026, 10)]
+
+
+def test_month_cache_sees_rules_and_exceptions_from_other_connections(calendar_logic, db_path):
+    rules = calendar_logic.rules_manager
+    assert rules.blocked_days(2026, 10) == frozenset()
+    other = open_calendar(db_path)
+    rule_id = other.rules_manager.add_range_rule('2026-10-10', '2026-10-11')
+    assert len(rules.blocked_days(2026, 10)) == 2
+    other.rules_manager.add_exceptions([(rule_id, '2026-10-10')])
+    other.db_manager.close()
+    assert [date.fromordinal(n).day for n in rules.blocked_days(2026, 10)] == [11]
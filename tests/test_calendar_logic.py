@@ -0,0 +1,48 @@
+import sqlite3
+import pytest
+from datetime import date
+
+
+def _available(calendar_logic, start, end):
+    return [info.is_available for info in calendar_logic.get_range_status(start, end)]
+
+
+def test_range_blocking_skips_reservations_and_frees_rule_days(calendar_logic, book):
+    book('2026-10-07')
+    calendar_logic.set_availability_range(date(2026, 10, 9), date(2026, 10, 5), False)
+    assert _available(calendar_logic, date(2026, 10, 5), date(2026, 10, 9)) == [False] * 5
+    assert calendar_logic.get_day_status(date(2026, 10, 7)).reservation is not None
+
+    calendar_logic.rules_manager.add_range_rule('2026-10-08', '2026-10-08')
+    calendar_logic.set_availability_range(date(2026, 10, 5), date(2026, 10, 9), True)
+    assert _available(calendar_logic, date(2026, 10, 5), date(2026, 10, 9)) == [True, True, False, True, True]
+    assert calendar_logic.get_day_status(date(2026, 10, 7)).reservation is not None
+
+
+def test_range_blocking_is_one_transaction(calendar_logic):
+    with calendar_logic.db_manager.write() as conn:
+        conn.execute(f"CREATE TEMP TRIGGER fail_block BEFORE INSERT ON main.reservations "
+                     f"WHEN NEW.day = {date(2026, 10, 8).toordinal()} BEGIN SELECT RAISE(ABORT, 'fallo'); END")
+    with pytest.raises(sqlite3.IntegrityError):
+        calendar_logic.set_availability_range(date(2026, 10, 5), date(2026, 10, 9), False)
+    assert all(_available(calendar_logic, date(2026, 10, 5), date(2026, 10, 9)))
+
+
+def test_each_resource_has_its_own_calendar(calendar_logic, book):
+    cabin = calendar_logic.resources_manager.add_resource('Cabaña 2', kind='cabaña')
+    book('2026-10-05')
+    book('2026-10-05', first_name='Luis', phone='04121234567', resource_id=cabin)
+    calendar_logic.set_resource(cabin)
+    calendar_logic.set_availability_range(date(2026, 10, 6), date(2026, 10, 6), False)
+    calendar_logic.delete_reservation('2026-10-05')
+
+    resources, days, cells = calendar_logic.get_month_occupancy(2026, 10)
+    assert [resource.id for resource in resources] == [1, cabin] and len(days) == 31
+    first, second = (cells[resource.id] for resource in resources)
+    assert first[date(2026, 10, 5).toordinal()].reservation.first_name == 'Ana'
+    assert second[date(2026, 10, 5).toordinal()].is_available
+    assert first[date(2026, 10, 6).toordinal()].is_available
+    assert not second[date(2026, 10, 6).toordinal()].is_available
+
+    calendar_logic.resources_manager.set_active(cabin, False)
+    assert [resource.id for resource in calendar_logic.get_resources()] == [1]
@@ -0,0 +1,118 @@
+import calendar
+from datetime import date
+import pytest
+from config.app_config import AppConfig
+from ui import canvas_renderer
+from ui.canvas_renderer import CanvasCalendarRenderer
+from ui.styles import StyleManager
+
+
+class RecordingCanvas:
+    # Canvas sin pantalla: guarda coordenadas y opciones y registra cada
+    # itemconfig, que en Tk es un viaje al intérprete Tcl
+    def __init__(self, parent=None, width=0, height=0, **options):
+        self.options = {'width': width, 'height': height}
+        self.items = {}
+        self.item_coords = {}
+        self.itemconfig_calls = []
+
+    def _create(self, coords, options):
+        item = len(self.items) + 1
+        self.items[item] = dict(options)
+        self.item_coords[item] = list(coords)
+        return item
+
+    def create_rectangle(self, *coords, **options):
+        return self._create(coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create(coords, options)
+
+    def coords(self, item, *coords):
+        if coords:
+            self.item_coords[item] = list(coords)
+        return self.item_coords[item]
+
+    def itemconfig(self, item, **options):
+        self.itemconfig_calls.append((item, options))
+        if isinstance(item, int):
+            self.items[item].update(options)
+
+    def cget(self, name):
+        return self.options[name]
+
+    def config(self, **options):
+        self.options.update(options)
+
+    def winfo_width(self):
+        return 1
+
+    winfo_height = winfo_width
+
+    def pack(self, **options):
+        pass
+
+    def bind(self, sequence, callback):
+        pass
+
+
+class HeadlessStyles:
+    # Colores de StyleManager sin crear un ttk.Style (necesita pantalla)
+    get_color_for_status = StyleManager.get_color_for_status
+
+    class style:
+        @staticmethod
+        def lookup(style, option):
+            return ''
+
+    def get_font(self, name):
+        return None
+
+
+class Label:
+    def config(self, **options):
+        self.text = options['text']
+
+
+@pytest.fixture
+def renderer(calendar_logic, monkeypatch):
+    monkeypatch.setattr(canvas_renderer.tk, 'Canvas', RecordingCanvas)
+    calendar_logic.set_month_year(10, 2026)
+    renderer = CanvasCalendarRenderer(None, Label(), HeadlessStyles(), calendar_logic)
+    renderer.draw_calendar()
+    return renderer
+
+
+def test_clicks_map_to_days_and_margins_to_nothing(renderer):
+    pad_x, pad_y = AppConfig.PADDING['cell']
+    cell_width, cell_height, rows = renderer._geometry
+    top = AppConfig.WEEKDAY_HEADER_HEIGHT + pad_y
+    assert rows == 5 and renderer.title_label.text == f'{calendar.month_name[10]} 2026'
+    # Octubre de 2026 empieza en jueves: la primera fila va del 28 de septiembre al 4 de octubre
+    assert renderer.day_at(pad_x, top) == date(2026, 9, 28)
+    assert renderer.day_at(3 * (cell_width + 2 * pad_x) + pad_x + 1, top + 1) == date(2026, 10, 1)
+    assert renderer.day_at(6 * (cell_width + 2 * pad_x) + pad_x, top + 4 * (cell_height + 2 * pad_y)) == \
+        date(2026, 11, 1)
+    assert renderer.day_at(pad_x - 1, top) is None
+    assert renderer.day_at(pad_x, AppConfig.WEEKDAY_HEADER_HEIGHT - 1) is None
+    assert renderer.day_at(pad_x, top + 5 * (cell_height + 2 * pad_y)) is None
+
+
+def test_redraw_only_touches_cells_whose_state_changed(renderer, calendar_logic, book):
+    canvas = renderer.canvas
+    items = len(canvas.items)
+    canvas.itemconfig_calls.clear()
+    renderer.draw_calendar()
+    assert canvas.itemconfig_calls == []
+
+    book('2026-10-14', status='Completo')
+    renderer.draw_calendar()
+    [(_, _, cell)] = [entry for entry in renderer.day_buttons if entry[0] == date(2026, 10, 14)]
+    # Fondo, nombre y barra de ocupación de esa celda; el número del día no cambia
+    assert {item for item, _ in canvas.itemconfig_calls} == {cell['rect'], cell['name_txt'], cell['fill_bar']}
+    assert canvas.items[cell['name_txt']]['text'] == 'Ana Pérez'
+
+    # Cambiar de mes reutiliza los mismos elementos
+    calendar_logic.next_month()
+    renderer.draw_calendar()
+    assert len(canvas.items) == items
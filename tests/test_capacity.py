@@ -0,0 +1,34 @@
+import pytest
+from datetime import date
+from modules.capacity import OverbookingError
+
+
+def _day(calendar_logic, day):
+    return calendar_logic.get_day_status(date.fromisoformat(day))
+
+
+def test_day_capacity_counts_guests_of_every_resource(calendar_logic, book):
+    calendar_logic.capacity_manager.set_daily_capacity('2026-10-05', '2026-10-05', 5)
+    cabin = calendar_logic.resources_manager.add_resource('Cabaña 2')
+    book('2026-10-05', guests=3)
+    book('2026-10-05', first_name='Luis', phone='04121234567', guests=2, resource_id=cabin)
+    day = _day(calendar_logic, '2026-10-05')
+    assert (day.guests, day.remaining_capacity) == (5, 0)
+
+    # Al editar, las plazas de la propia reserva cuentan como libres
+    with pytest.raises(OverbookingError, match='quedan 3 de 5'):
+        book('2026-10-05', guests=4)
+    # Bajar los huéspedes de una reserva siempre se permite
+    book('2026-10-05', guests=1)
+    calendar_logic.delete_reservation('2026-10-05', resource_id=cabin)
+    assert calendar_logic.capacity_manager.get_range('2026-10-05', '2026-10-06') == {
+        date(2026, 10, 5).toordinal(): (1, 5), date(2026, 10, 6).toordinal(): (0, 40)}
+
+
+def test_resource_capacity_limits_each_reservation(calendar_logic, book):
+    tent = calendar_logic.resources_manager.add_resource('Parcela 1', capacity=2)
+    with pytest.raises(OverbookingError, match='como máximo 2'):
+        book('2026-10-05', guests=3, resource_id=tent)
+    assert _day(calendar_logic, '2026-10-05').guests == 0
+    book('2026-10-05', guests=2, resource_id=tent)
+    assert _day(calendar_logic, '2026-10-05').guests == 2
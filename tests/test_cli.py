@@ -0,0 +1,40 @@
+import io
+import json
+from cli.commands import build_parser, run_batch, run_command
+
+
+def _run(calendar_logic, *argv):
+    out = io.StringIO()
+    ok = run_command(build_parser(), calendar_logic, list(argv), out=out)
+    return ok, json.loads(out.getvalue())
+
+
+def test_book_then_query_day_range_and_month(calendar_logic):
+    ok, response = _run(calendar_logic, 'book', '2026-10-05', '--first-name', 'Ana', '--last-name', 'Pérez',
+                        '--phone', '04141234567', '--amount', '80', '--status', 'Nada', '--method', 'Efectivo')
+    assert ok and response['result']['reservation']['first_name'] == 'Ana'
+
+    ok, response = _run(calendar_logic, 'availability', '2026-10-04', '--to', '2026-10-06')
+    assert [day['available'] for day in response['result']] == [True, False, True]
+
+    ok, response = _run(calendar_logic, 'month', '2026-10')
+    assert len(response['result']) == 31
+    assert [day['date'] for day in response['result'] if day['reservation']] == ['2026-10-05']
+
+
+def test_errors_are_reported_as_json(calendar_logic, book):
+    book('2026-10-05', amount=80.0)
+    ok, response = _run(calendar_logic, 'pay', '2026-10-05', '--amount', '100', '--method', 'Efectivo')
+    assert not ok and response['ok'] is False and '80.00' in response['error']
+    ok, response = _run(calendar_logic, 'availability', '05/10/2026')
+    assert not ok and response['error']
+
+
+def test_batch_runs_every_line_on_one_connection(calendar_logic):
+    out = io.StringIO()
+    lines = ['# bloquear la primera semana', 'block 2026-10-01 --to 2026-10-07', '', 'availability 2026-10-07',
+             'cancel "2026-10-']
+    assert not run_batch(build_parser(), calendar_logic, lines, out=out)
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [response['ok'] for response in responses] == [True, True, False]
+    assert responses[1]['result'][0]['available'] is False
@@ -0,0 +1,41 @@
+import pytest
+from modules.repository import STATEMENTS
+
+NAMES = [('Ana', 'Pérez'), ('Luis', 'Gil'), ('Eva', 'Pérez'), ('Ana', 'Pérez'), (None, None), ('Juan', 'Ruiz'),
+         ('Marta', 'Gil'), ('Ana', 'Báez')]
+
+
+@pytest.fixture
+def clients(calendar_logic):
+    manager = calendar_logic.clients_manager
+    for n, (first_name, last_name) in enumerate(NAMES):
+        manager.add_or_get_client(first_name, last_name, f'0414{n:07d}' if n % 3 else None)
+    return manager
+
+
+def _walk(clients, sort, limit):
+    pages, key = [], None
+    while True:
+        page = clients.get_page(sort, key, limit=limit)
+        if not page:
+            return pages
+        pages.append(page)
+        key = clients.page_key(sort, page[-1])
+
+
+@pytest.mark.parametrize('sort', ['name', 'phone', 'id'])
+def test_keyset_pages_cover_every_client_once_in_order(clients, sort):
+    everything = clients.get_page(sort, limit=100)
+    pages = _walk(clients, sort, 3)
+    assert [client for page in pages for client in page] == everything
+    assert len(everything) == len(NAMES)
+    assert everything == sorted(everything, key=lambda client: clients.page_key(sort, client))
+    # Hacia atrás desde la primera fila de la última página se obtiene la anterior
+    assert clients.get_page(sort, clients.page_key(sort, pages[-1][0]), forward=False, limit=3) == pages[-2]
+
+
+@pytest.mark.parametrize('sort, key', [('name', ('', '', 0)), ('phone', ('', 0))])
+def test_pages_are_read_from_the_sort_index(calendar_logic, sort, key):
+    plan = ' '.join(row[3] for row in calendar_logic.db_manager.reader().execute(
+        'EXPLAIN QUERY PLAN ' + STATEMENTS[f'client.page.{sort}.next'], (*key, 10)))
+    assert 'USING INDEX' in plan and 'TEMP B-TREE' not in plan
@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+import pytest
+from datetime import date
+from modules.calendar_logic import open_calendar
+from modules.database import Database
+
+
+def test_migrates_iso_dates_to_day_numbers(db_path):
+    # Esquema original: fecha ISO como clave y payment_status como texto
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE clients (id INTEGER PRIMARY KEY AUTOINCREMENT, first_name TEXT, last_name TEXT,
+                              phone TEXT UNIQUE);
+        CREATE TABLE reservations (date TEXT PRIMARY KEY, client_id INTEGER, amount REAL, payment_status TEXT,
+                                   payment_method TEXT, reference TEXT, created_at TEXT);
+        INSERT INTO clients (first_name, last_name, phone) VALUES ('Ana', 'Pérez', '0414');
+        INSERT INTO reservations VALUES ('2026-10-05', 1, 100, 'Mitad', 'Efectivo', '', '2026-10-01T10:00:00');
+        INSERT INTO reservations VALUES ('2026-10-06', NULL, NULL, NULL, NULL, NULL, NULL);
+    ''')
+    conn.commit()
+    conn.close()
+
+    logic = open_calendar(db_path)
+    rows = logic.reservations_manager.get_range('2026-10-01', '2026-10-31')
+    logic.db_manager.close()
+
+    reserved, blocked = rows[date(2026, 10, 5).toordinal()], rows[date(2026, 10, 6).toordinal()]
+    assert reserved.date == '2026-10-05'
+    assert (reserved.amount, reserved.paid_total, reserved.payment_status) == (100.0, 50.0, 'Mitad')
+    assert reserved.guests == 1
+    assert blocked.is_block and blocked.guests == 0
+
+
+def test_range_query_uses_primary_key(calendar_logic):
+    plan = calendar_logic.db_manager.reader().execute(
+        'EXPLAIN QUERY PLAN SELECT * FROM reservations WHERE resource_id = 1 AND day BETWEEN 1 AND 2').fetchall()
+    assert any('USING PRIMARY KEY' in row['detail'] for row in plan)
+
+
+def test_payment_triggers_keep_running_balance(calendar_logic, book):
+    book('2026-10-05', amount=100.0)
+    first = calendar_logic.add_payment('2026-10-05', 30, 'Efectivo')
+    calendar_logic.add_payment('2026-10-05', 20, 'Efectivo')
+    assert calendar_logic.get_day_status(date(2026, 10, 5)).reservation.paid_total == 50.0
+    calendar_logic.delete_payment(first)
+    reservation = calendar_logic.get_day_status(date(2026, 10, 5)).reservation
+    assert (reservation.paid_total, reservation.payment_status) == (20.0, 'Mitad')
+
+
+def test_changed_trigger_definition_is_recreated(db_path):
+    db = Database(db_path)
+    db.create_tables()
+    with db.write() as conn:
+        conn.execute('DROP TRIGGER payments_ai_balance')
+        conn.execute('CREATE TRIGGER payments_ai_balance AFTER INSERT ON payments BEGIN SELECT 1; END')
+    db.close()
+
+    db = Database(db_path)
+    db.create_tables()
+    sql = db.reader().execute("SELECT sql FROM sqlite_master WHERE name = 'payments_ai_balance'").fetchone()[0]
+    db.close()
+    assert 'paid_total' in sql
+
+
+def test_readers_are_per_thread_and_see_uncommitted_writes_of_their_thread(calendar_logic):
+    db = calendar_logic.db_manager
+    main_reader, thread_readers = db.reader(), []
+    thread = threading.Thread(target=lambda: thread_readers.append(db.reader()))
+    thread.start()
+    thread.join()
+    assert thread_readers[0] is not main_reader and db.reader() is main_reader
+    with pytest.raises(sqlite3.OperationalError):
+        main_reader.execute("INSERT INTO clients (first_name, last_name, phone) VALUES ('a', 'b', '1')")
+    with db.write() as conn:
+        conn.execute("INSERT INTO clients (first_name, last_name, phone) VALUES ('Ana', 'Pérez', '0414')")
+        assert db.reader() is conn
+        assert db.reader().execute('SELECT COUNT(*) FROM clients').fetchone()[0] == 1
+        assert main_reader.execute('SELECT COUNT(*) FROM clients').fetchone()[0] == 0
+
+
+def test_writes_from_other_threads_wait_for_the_open_transaction(calendar_logic):
+    db = calendar_logic.db_manager
+    order = []
+
+    def other_writer():
+        with db.write() as conn:
+            order.append('other')
+            conn.execute("INSERT INTO clients (first_name, last_name, phone) VALUES ('Luis', 'Gil', '0412')")
+
+    with db.write() as conn:
+        thread = threading.Thread(target=other_writer)
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+        order.append('main')
+        conn.execute("INSERT INTO clients (first_name, last_name, phone) VALUES ('Ana', 'Pérez', '0414')")
+    thread.join()
+    assert order == ['main', 'other']
+    assert db.reader().execute('SELECT COUNT(*) FROM clients').fetchone()[0] == 2
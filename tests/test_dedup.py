@@ -0,0 +1,43 @@
+import pytest
+from datetime import date
+from modules.dedup import Deduplicator
+
+
+@pytest.fixture
+def ids(calendar_logic):
+    add = calendar_logic.clients_manager.add_or_get_client
+    return {
+        'jose': add('José', 'Pérez', '0414-123.45.67'),
+        'jose_intl': add('Jose', 'Perez', '+58 414 1234567'),
+        'josefa': add('Josefa', 'Vázquez', None),
+        'josefa_typo': add('Josefa', 'Basquez', None),
+        'jose_other_phone': add('José', 'Pérez', '04249876543'),
+    }
+
+
+def test_duplicates_share_a_blocking_key(calendar_logic, ids):
+    dedup = Deduplicator(calendar_logic.db_manager)
+    search = dedup.find_duplicates()
+    found = {(pair.client_id, pair.duplicate_id): pair for pair in search.pairs}
+    assert set(found) == {(ids['jose'], ids['jose_intl']), (ids['josefa'], ids['josefa_typo'])}
+    assert found[ids['jose'], ids['jose_intl']].same_phone
+    assert found[ids['josefa'], ids['josefa_typo']].kinds == ('sound',)
+    # Las claves sólo se recalculan para clientes nuevos o cambiados
+    assert dedup.refresh_keys() == 0
+
+
+def test_merge_moves_reservations_and_fills_missing_data(calendar_logic, book, ids):
+    # La reserva crea otra ficha (con teléfono) para la misma persona
+    book('2026-10-05', first_name='Josefa', last_name='Basquez', phone='04121112233')
+    typo = calendar_logic.get_day_status(date(2026, 10, 5)).reservation.client_id
+    dedup = Deduplicator(calendar_logic.db_manager)
+    assert dedup.merge(ids['josefa'], [typo]) == 1
+
+    reservation = calendar_logic.get_day_status(date(2026, 10, 5)).reservation
+    assert (reservation.client_id, reservation.last_name, reservation.phone) == (ids['josefa'], 'Vázquez',
+                                                                               '04121112233')
+    assert calendar_logic.clients_manager.get_client(typo) is None
+    with pytest.raises(ValueError):
+        dedup.merge(ids['josefa'], [typo])
+    with pytest.raises(ValueError):
+        dedup.merge(ids['jose'], [ids['jose']])
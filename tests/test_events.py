@@ -0,0 +1,48 @@
+from datetime import date
+from modules.events import ClientChanged, DatesChanged, EventBus
+
+
+def test_burst_of_events_is_delivered_once_merged():
+    idle = []
+    bus = EventBus(schedule=idle.append)
+    received = []
+    bus.subscribe(DatesChanged, received.append)
+    bus.publish(DatesChanged(frozenset({date(2026, 10, 5)}), frozenset({1})))
+    bus.publish(DatesChanged(frozenset({date(2026, 10, 6)}), frozenset({2})))
+    assert received == [] and len(idle) == 1
+
+    idle.pop()()
+    assert received == [DatesChanged(frozenset({date(2026, 10, 5), date(2026, 10, 6)}), frozenset({1, 2}))]
+
+
+def test_subscriber_can_unsubscribe_while_receiving():
+    bus = EventBus()
+    received = []
+
+    def once(event):
+        received.append(event)
+        bus.unsubscribe(ClientChanged, once)
+
+    bus.subscribe(ClientChanged, once)
+    bus.subscribe(ClientChanged, received.append)
+    bus.publish(ClientChanged(frozenset({1})))
+    bus.publish(ClientChanged(frozenset({2})))
+    assert [event.client_ids for event in received] == [{1}, {1}, {2}]
+
+
+def test_calendar_logic_publishes_changed_days_and_clients(calendar_logic, book):
+    idle = []
+    calendar_logic.events = bus = EventBus(schedule=idle.append)
+    received = []
+    bus.subscribe(DatesChanged, received.append)
+    bus.subscribe(ClientChanged, received.append)
+    book('2026-10-05')
+    calendar_logic.set_availability_range(date(2026, 10, 7), date(2026, 10, 6), False)
+    book('2026-10-05', amount=120.0)
+    idle.pop()()
+    assert idle == []
+
+    dates, clients = received
+    assert dates == DatesChanged(frozenset({date(2026, 10, 5), date(2026, 10, 6), date(2026, 10, 7)}),
+                                 frozenset({1}))
+    assert clients.client_ids == {calendar_logic.get_day_status(date(2026, 10, 5)).reservation.client_id}
@@ -0,0 +1,50 @@
+import asyncio
+import json
+from http.client import HTTPConnection
+from api.http_server import AvailabilityServer
+
+
+def _run(db_path, requests):
+    # Arrancar el servidor en un puerto libre y hacer las peticiones desde otro hilo
+    async def scenario():
+        server = AvailabilityServer(db_path, host='127.0.0.1', port=0, workers=2)
+        port = await server.start()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, requests, port)
+        finally:
+            await server.close()
+    return asyncio.run(scenario())
+
+
+def _request(port, method, path, body=None, headers=None):
+    conn = HTTPConnection('127.0.0.1', port, timeout=5)
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers or {})
+    response = conn.getresponse()
+    payload = response.read()
+    conn.close()
+    return response.status, response.getheader('ETag'), json.loads(payload) if payload else None
+
+
+def test_minimal_booking_without_payment(db_path):
+    booking = {'date': '2026-10-05', 'first_name': 'Ana', 'last_name': 'Pérez', 'phone': '04141234567',
+               'amount': 100}
+    status, _, day = _run(db_path, lambda port: _request(port, 'POST', '/api/reservations', booking))
+    assert status == 201
+    assert day['available'] is False
+
+
+def test_month_etag_changes_only_with_the_month(db_path):
+    booking = {'date': '2026-10-05', 'first_name': 'Ana', 'last_name': 'Pérez', 'phone': '04141234567',
+               'amount': 100}
+
+    def requests(port):
+        status, etag, month = _request(port, 'GET', '/api/months/2026-10')
+        assert status == 200 and len(month['days']) == 31
+        assert _request(port, 'GET', '/api/months/2026-10', headers={'If-None-Match': etag})[0] == 304
+        november = _request(port, 'GET', '/api/months/2026-11')[1]
+        assert _request(port, 'POST', '/api/reservations', booking)[0] == 201
+        assert _request(port, 'GET', '/api/months/2026-10', headers={'If-None-Match': etag})[0] == 200
+        assert _request(port, 'GET', '/api/months/2026-11', headers={'If-None-Match': november})[0] == 304
+        return _request(port, 'POST', '/api/reservations', booking)[0]
+
+    assert _run(db_path, requests) == 409
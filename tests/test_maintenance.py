@@ -0,0 +1,39 @@
+from config.app_config import AppConfig
+from modules.maintenance import DatabaseMaintenance, ANALYZE, CHECKPOINT, CONVERT_AUTO_VACUUM, INCREMENTAL_VACUUM
+
+
+def _pragma(calendar_logic, name):
+    return calendar_logic.db_manager.reader().execute(f'PRAGMA {name}').fetchone()[0]
+
+
+def test_pending_tasks_run_in_turn_once_per_interval(calendar_logic):
+    maintenance = DatabaseMaintenance(calendar_logic.db_manager)
+    # Una base de datos nueva ya usa auto_vacuum incremental y no tiene páginas libres
+    assert not maintenance._is_due(CONVERT_AUTO_VACUUM) and not maintenance._is_due(INCREMENTAL_VACUUM)
+    assert maintenance.run_pending() == (CHECKPOINT, True)
+    assert maintenance.run_pending() == (ANALYZE, True)
+    assert maintenance.run_pending() is None
+    # ANALYZE queda registrado en la base de datos para las próximas sesiones
+    assert not DatabaseMaintenance(calendar_logic.db_manager)._is_due(ANALYZE)
+
+
+def test_incremental_vacuum_frees_pages_in_steps(calendar_logic):
+    with calendar_logic.db_manager.write() as conn:
+        conn.execute('CREATE TABLE scratch (data BLOB)')
+        conn.executemany('INSERT INTO scratch VALUES (randomblob(4000))', [()] * 200)
+    with calendar_logic.db_manager.write() as conn:
+        conn.execute('DROP TABLE scratch')
+    free = _pragma(calendar_logic, 'freelist_count')
+    maintenance = DatabaseMaintenance(calendar_logic.db_manager, dict(AppConfig.MAINTENANCE, vacuum_pages_per_step=50))
+    assert maintenance._is_due(INCREMENTAL_VACUUM)
+    assert maintenance.incremental_vacuum()
+    assert _pragma(calendar_logic, 'freelist_count') == free - 50
+
+
+def test_step_over_budget_is_interrupted(calendar_logic):
+    maintenance = DatabaseMaintenance(calendar_logic.db_manager)
+    slow = 'WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n'
+    assert maintenance._run([slow], budget_ms=10) is False
+    # La conexión de escritura sigue utilizable
+    with calendar_logic.db_manager.write() as conn:
+        conn.execute('SELECT 1')
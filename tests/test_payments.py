@@ -0,0 +1,26 @@
+import pytest
+from datetime import date
+from modules.payments import OverpaymentError
+
+
+def _reservation(calendar_logic, day):
+    return calendar_logic.get_day_status(date.fromisoformat(day)).reservation
+
+
+def test_payments_update_balance_and_status(calendar_logic, book):
+    book('2026-10-05', amount=100.0, status='Mitad')
+    calendar_logic.add_payment('2026-10-05', 20.0, 'Efectivo')
+    assert _reservation(calendar_logic, '2026-10-05').payment_status == 'Mitad'
+    calendar_logic.add_payment('2026-10-05', 30.0, 'Efectivo')
+    assert _reservation(calendar_logic, '2026-10-05').payment_status == 'Completo'
+    assert [p.amount for p in calendar_logic.get_payments('2026-10-05')] == [50.0, 20.0, 30.0]
+
+
+def test_payment_above_balance_is_rejected(calendar_logic, book):
+    book('2026-10-05', amount=100.0, status='Mitad')
+    with pytest.raises(OverpaymentError, match='50.00'):
+        calendar_logic.add_payment('2026-10-05', 50.01, 'Efectivo')
+    assert len(calendar_logic.get_payments('2026-10-05')) == 1
+    calendar_logic.add_payment('2026-10-05', 50.0, 'Efectivo')
+    with pytest.raises(OverpaymentError):
+        calendar_logic.add_payment('2026-10-05', 0.01, 'Efectivo')
@@ -0,0 +1,33 @@
+from modules.calendar_logic import open_calendar
+
+
+def test_season_overrides_base_rate_and_quotes_nights(calendar_logic):
+    pricing = calendar_logic.pricing_manager
+    pricing.add_base_rate(50.0)
+    pricing.add_season('2026-12-15', '2027-01-05', 80.0)
+    assert pricing.price('2026-12-14', 1) == 50.0
+    assert pricing.price('2026-12-15', 1) == 80.0
+    quote = pricing.quote('2026-12-13', '2026-12-16', [1])
+    assert quote.total == 50.0 * 2 + 80.0 * 2 and not quote.missing
+
+
+def test_index_survives_reservation_writes(calendar_logic, book, monkeypatch):
+    pricing = calendar_logic.pricing_manager
+    pricing.add_base_rate(50.0)
+    pricing.price('2026-10-05', 1)
+    calls = []
+    list_rates = pricing.list_rates
+    monkeypatch.setattr(pricing, 'list_rates', lambda: calls.append(1) or list_rates())
+    book('2026-10-05')
+    calendar_logic.add_payment('2026-10-05', 10, 'Efectivo')
+    assert pricing.price('2026-10-06', 1) == 50.0
+    assert calls == []
+
+
+def test_rates_from_other_connections_invalidate_the_index(calendar_logic, db_path):
+    pricing = calendar_logic.pricing_manager
+    assert pricing.price('2026-10-05', 1) is None
+    other = open_calendar(db_path)
+    other.pricing_manager.add_base_rate(70.0)
+    other.db_manager.close()
+    assert pricing.price('2026-10-05', 1) == 70.0
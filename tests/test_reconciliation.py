@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+from modules.reconciliation import Reconciler, _parse_amount
+
+
+def _statement(tmp_path, *rows):
+    path = tmp_path / 'extracto.csv'
+    path.write_text('\n'.join(['Fecha,Monto,Referencia'] + [','.join(row) for row in rows]), encoding='utf-8')
+    return str(path)
+
+
+def test_movements_match_payments_by_reference_amount_and_date(calendar_logic, book, tmp_path):
+    book('2026-10-05', amount=100.0)
+    book('2026-10-06', amount=100.0)
+    calendar_logic.add_payment('2026-10-05', 40.0, 'PagoMovil', '00123456')
+    calendar_logic.add_payment('2026-10-06', 60.0, 'Transferencia', '654321')
+    today = date.today()
+    path = _statement(
+        tmp_path,
+        (today.strftime('%d/%m/%Y'), '"40,00"', '9900123456'),                  # referencia más larga del banco
+        ((today + timedelta(days=10)).isoformat(), '60.00', '654321'),           # fuera de la tolerancia de fechas
+        (today.isoformat(), '-15.00', '777777'),                                  # débito
+        (today.isoformat(), '25.00', ''),                                         # sin referencia
+    )
+    reconciler = Reconciler(calendar_logic.db_manager)
+
+    result = reconciler.reconcile(path)
+    assert (result.movements, result.skipped, result.pending) == (4, 2, 1)
+    [(movement, payment)] = result.matches
+    assert (movement.line, payment.reference) == (2, '00123456')
+    assert [movement.reference for movement in result.unmatched] == ['654321']
+    # El pago conciliado ya no se vuelve a ofrecer
+    assert reconciler.reconcile(path).matches == []
+
+
+def test_dry_run_does_not_mark_payments(calendar_logic, book, tmp_path):
+    book('2026-10-05', amount=100.0)
+    calendar_logic.add_payment('2026-10-05', 40.0, 'PagoMovil', '123456')
+    path = _statement(tmp_path, (date.today().isoformat(), '40', '123456'))
+    reconciler = Reconciler(calendar_logic.db_manager)
+    assert len(reconciler.reconcile(path, dry_run=True).matches) == 1
+    assert len(reconciler.reconcile(path).matches) == 1
+
+
+def test_amounts_in_local_and_english_formats():
+    assert [_parse_amount(value) for value in ('1.234,56', '1,234.56', 'Bs 40', 'x')] == [1234.56, 1234.56, 40.0, None]
@@ -0,0 +1,23 @@
+from datetime import date
+from modules.records import Client, DayInfo, Reservation, select_columns
+
+
+def test_reservation_records_have_no_instance_dict(calendar_logic, book):
+    book('2026-10-05', amount=100.0, status='Mitad')
+    calendar_logic.set_availability_range(date(2026, 10, 6), date(2026, 10, 6), False)
+    reserved, blocked = calendar_logic.reservations_manager.get_range('2026-10-05', '2026-10-06').values()
+    assert isinstance(reserved, Reservation) and not hasattr(reserved, '__dict__')
+    assert (reserved.balance, reserved.client_name) == (50.0, 'Ana Pérez')
+    assert reserved.client == Client(reserved.client_id, 'Ana', 'Pérez', '04141234567')
+    assert blocked.is_block and blocked.balance == 0.0
+
+
+def test_day_info_remaining_capacity():
+    day = date(2026, 10, 5)
+    assert DayInfo(day, day.isoformat(), True, None, True, 3, 10).remaining_capacity == 7
+    assert DayInfo(day, day.isoformat(), True, None, True, 12, 10).remaining_capacity == 0
+    assert DayInfo(day, day.isoformat(), True, None, True).remaining_capacity is None
+
+
+def test_select_columns_follows_field_order():
+    assert select_columns(Client, {'id': 'c.id'}) == 'c.id, first_name, last_name, phone'
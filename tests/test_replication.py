@@ -0,0 +1,69 @@
+from datetime import date
+import pytest
+from modules.calendar_logic import open_calendar
+from modules.replication import Replicator
+
+
+@pytest.fixture
+def sites(tmp_path):
+    logics = [open_calendar(str(tmp_path / f'{name}.db')) for name in ('a', 'b')]
+    yield logics
+    for logic in logics:
+        logic.db_manager.close()
+
+
+def _sync(source, target, path):
+    Replicator(source.db_manager).export_changes(str(path))
+    return Replicator(target.db_manager).import_changes(str(path))
+
+
+def _snapshot(logic):
+    conn = logic.db_manager.reader()
+    reservations = conn.execute(
+        'SELECT r.name, b.day, c.uid, c.first_name, b.guests, b.amount, b.paid_total FROM reservations b '
+        'JOIN resources r ON r.id = b.resource_id LEFT JOIN clients c ON c.id = b.client_id ORDER BY 1, 2').fetchall()
+    payments = conn.execute('SELECT uid, day, amount FROM payments ORDER BY uid').fetchall()
+    return [tuple(row) for row in reservations], [tuple(row) for row in payments]
+
+
+def test_round_trip_converges_on_updates_and_tombstones(sites, book, tmp_path):
+    a, b = sites
+    book('2026-11-01', amount=100.0, logic=a)
+    book('2026-11-02', first_name='Luis', phone='04142222222', logic=a)
+    _sync(a, b, tmp_path / 'a1.json.gz')
+    # La misma reserva cambia en las dos sedes: gana el cambio más reciente
+    book('2026-11-01', amount=110.0, logic=a)
+    book('2026-11-01', amount=120.0, logic=b)
+    a.delete_reservation('2026-11-02')
+    b.set_availability_range(date(2026, 12, 1), date(2026, 12, 3), False)
+    _sync(a, b, tmp_path / 'a2.json.gz')
+    _sync(b, a, tmp_path / 'b2.json.gz')
+
+    assert _snapshot(a) == _snapshot(b)
+    reservations, _ = _snapshot(a)
+    assert [row[1] for row in reservations] == [date(2026, 11, 1).toordinal()] + [
+        date(2026, 12, day).toordinal() for day in (1, 2, 3)]
+    assert reservations[0][5] == 120.0
+    # Importar otra vez el mismo archivo no cambia nada
+    assert _sync(b, a, tmp_path / 'b2.json.gz').applied == 0
+
+
+@pytest.mark.parametrize('first', ['cancelled', 'paid'])
+def test_payment_on_a_reservation_cancelled_elsewhere_is_dropped_on_both(sites, book, tmp_path, first):
+    a, b = sites
+    book('2026-12-03', logic=a)
+    _sync(a, b, tmp_path / 'a0.json.gz')
+    a.delete_reservation('2026-12-03')
+    b.add_payment('2026-12-03', 10, 'Efectivo')
+    pair = [(a, b), (b, a)] if first == 'cancelled' else [(b, a), (a, b)]
+    for index, (source, target) in enumerate(pair):
+        _sync(source, target, tmp_path / f'{index}.json.gz')
+    # Una ronda más para que las bajas anotadas lleguen a la otra sede
+    _sync(a, b, tmp_path / 'a3.json.gz')
+    _sync(b, a, tmp_path / 'b3.json.gz')
+
+    for logic in sites:
+        assert _snapshot(logic) == ([], [])
+        assert logic.db_manager.reader().execute('PRAGMA foreign_key_check').fetchall() == []
+    book('2026-12-03', first_name='Eva', phone='04143333333', logic=a)
+    assert a.get_payments('2026-12-03') == []
@@ -0,0 +1,30 @@
+import re
+from datetime import date
+from modules.records import Reservation
+from modules.repository import STATEMENTS, ReservationRepository
+
+
+def _parameters(sql):
+    # Como SQLite: un '?' sin número toma el siguiente al mayor usado
+    highest = 0
+    for number in re.findall(r'\?(\d*)', sql):
+        highest = max(highest, int(number)) if number else highest + 1
+    return highest
+
+
+def test_every_registered_statement_compiles(calendar_logic):
+    with calendar_logic.db_manager.write() as conn:
+        conn.execute(STATEMENTS['sync.create_incoming'])
+        for name, sql in STATEMENTS.items():
+            conn.execute('EXPLAIN ' + sql, [None] * _parameters(sql))
+
+
+def test_statements_are_counted_by_name(calendar_logic, book):
+    db = calendar_logic.db_manager
+    before = db.statement_counts().get('reservation.get_many', 0)
+    book('2026-10-05')
+    book('2026-10-07')
+    rows = ReservationRepository(db).get_many(1, ['2026-10-05', date(2026, 10, 6), '2026-10-07'])
+    assert [row.date for row in rows.values()] == ['2026-10-05', '2026-10-07']
+    assert all(isinstance(row, Reservation) for row in rows.values())
+    assert db.statement_counts()['reservation.get_many'] == before + 1
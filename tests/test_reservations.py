@@ -0,0 +1,35 @@
+import pytest
+from datetime import date
+
+
+@pytest.fixture
+def agenda(calendar_logic, book):
+    cabin = calendar_logic.resources_manager.add_resource('Cabaña 2')
+    book('2026-10-03')
+    book('2026-10-05', status='Completo')
+    book('2026-10-05', resource_id=cabin)
+    book('2026-10-06', resource_id=cabin, status='Mitad')
+    book('2026-10-09')
+    calendar_logic.set_availability_range(date(2026, 10, 7), date(2026, 10, 8), False)
+    return calendar_logic.reservations_manager, cabin
+
+
+def _keys(rows):
+    return [(row.date, row.resource_id) for row in rows]
+
+
+def test_agenda_pages_forward_and_back_without_blocks(agenda):
+    manager, cabin = agenda
+    first = manager.get_agenda(manager.agenda_start('2026-10-04'), limit=2)
+    assert _keys(first) == [('2026-10-05', 1), ('2026-10-05', cabin)]
+    second = manager.get_agenda(manager.agenda_key(first[-1]), limit=2)
+    assert _keys(second) == [('2026-10-06', cabin), ('2026-10-09', 1)]
+    assert manager.get_agenda(manager.agenda_key(second[-1]), limit=2) == []
+    assert manager.get_agenda(manager.agenda_key(second[0]), forward=False, limit=2) == first
+
+
+def test_agenda_of_reservations_with_balance(agenda):
+    manager, cabin = agenda
+    due = manager.get_agenda(manager.agenda_start('2026-10-01'), due_only=True)
+    assert _keys(due) == [('2026-10-03', 1), ('2026-10-05', cabin), ('2026-10-06', cabin), ('2026-10-09', 1)]
+    assert manager.get_outstanding_total() == (4, 350.0)
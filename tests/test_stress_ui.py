@@ -0,0 +1,35 @@
+import random
+from datetime import date
+from modules.calendar_logic import open_calendar
+from tools.stress_ui import generate_database, _add_months
+
+
+def _contents(path):
+    logic = open_calendar(path)
+    try:
+        conn = logic.db_manager.reader()
+        return (conn.execute('SELECT day, client_id, guests, amount, paid_total, payment_status FROM reservations '
+                             'ORDER BY day').fetchall(),
+                conn.execute('SELECT COUNT(*), TOTAL(amount) FROM payments').fetchone())
+    finally:
+        logic.db_manager.close()
+
+
+def test_generated_database_is_reproducible_and_consistent(tmp_path):
+    first, months = generate_database(str(tmp_path / 'a.db'), 2, 0.5, random.Random(7))
+    generate_database(str(tmp_path / 'b.db'), 2, 0.5, random.Random(7))
+    reservations, payments = _contents(str(tmp_path / 'a.db'))
+    assert [tuple(row) for row in reservations] == [tuple(row) for row in _contents(str(tmp_path / 'b.db'))[0]]
+
+    assert first == date.today().replace(day=1) and months == 2
+    days = [row['day'] for row in reservations]
+    assert min(days) >= first.toordinal() and max(days) < _add_months(first, 2).toordinal()
+    booked = [row for row in reservations if row['client_id'] is not None]
+    assert booked and len(booked) < len(reservations)
+    # Los saldos derivan de los pagos generados
+    assert sum(row['paid_total'] for row in booked) == payments[1]
+    assert all(row['paid_total'] <= row['amount'] for row in booked)
+
+
+def test_add_months_crosses_years():
+    assert _add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
@@ -0,0 +1,43 @@
+import json
+from datetime import date, timedelta
+from config.app_config import AppConfig
+from utils.telemetry import BUCKET_BOUNDS_MS, LatencyHistogram, Telemetry, DAY_CLICK, UNDO
+
+
+def test_percentiles_interpolate_within_buckets():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    for _ in range(10):
+        histogram.record(4)
+    assert histogram.percentile(50) == 3.5
+    histogram.record(7000)
+    assert histogram.percentile(99) == 7000
+    assert (histogram.count, histogram.max_ms) == (11, 7000)
+
+
+def test_flush_adds_to_stored_histograms_and_drops_old_days(tmp_path):
+    path = str(tmp_path / 'metrics.json')
+    old_day = (date.today() - timedelta(days=AppConfig.TELEMETRY['retention_days'] + 1)).isoformat()
+    with open(path, 'w', encoding='utf-8') as out:
+        json.dump({'bounds_ms': list(BUCKET_BOUNDS_MS),
+                   'versions': {'1.0': {old_day: {UNDO: LatencyHistogram(count=1).to_dict()}}}}, out)
+    for _ in range(2):
+        session = Telemetry(path, '1.0')
+        session.record(DAY_CLICK, 10)
+        session.flush()
+
+    with open(path, encoding='utf-8') as src:
+        assert list(json.load(src)['versions']['1.0']) == [date.today().isoformat()]
+    session = Telemetry(path, '1.0')
+    session.record(DAY_CLICK, 20)
+    histogram = session.summary()[('1.0', DAY_CLICK)]
+    assert (histogram.count, histogram.max_ms) == (3, 20)
+
+
+def test_file_with_other_buckets_starts_over(tmp_path):
+    path = tmp_path / 'metrics.json'
+    path.write_text(json.dumps({'bounds_ms': [1, 10], 'versions': {'1.0': {}}}), encoding='utf-8')
+    session = Telemetry(str(path), '2.0')
+    session.record(UNDO, 1)
+    session.flush()
+    assert list(json.loads(path.read_text(encoding='utf-8'))['versions']) == ['2.0']
@@ -0,0 +1,59 @@
+from datetime import date
+import pytest
+from modules.calendar_logic import open_calendar
+from modules.undo import UndoLog, UndoConflictError
+
+
+@pytest.fixture
+def undoable(calendar_logic):
+    calendar_logic.undo_log = UndoLog(calendar_logic.db_manager, capacity_manager=calendar_logic.capacity_manager)
+    return calendar_logic
+
+
+def _reservation(logic, day, resource_id=None):
+    return logic.get_day_status(day, resource_id).reservation
+
+
+def test_undo_and_redo_delete_with_payments(undoable, book):
+    book('2026-10-05', amount=100.0)
+    undoable.add_payment('2026-10-05', 40, 'Efectivo')
+    undoable.delete_reservation('2026-10-05')
+    assert _reservation(undoable, date(2026, 10, 5)) is None
+    undoable.undo()
+    restored = _reservation(undoable, date(2026, 10, 5))
+    assert (restored.first_name, restored.paid_total) == ('Ana', 40.0)
+    undoable.redo()
+    assert _reservation(undoable, date(2026, 10, 5)) is None
+
+
+def test_undo_of_a_range_block(undoable):
+    undoable.set_availability_range(date(2026, 10, 1), date(2026, 10, 30), False)
+    undoable.undo()
+    days = undoable.get_range_status(date(2026, 10, 1), date(2026, 10, 30))
+    assert all(info.is_available for info in days)
+
+
+def test_conflict_keeps_the_command(undoable, book, db_path):
+    undoable.toggle_day_availability(date(2026, 10, 5))
+    other = open_calendar(db_path)
+    other.toggle_day_availability(date(2026, 10, 5))
+    with pytest.raises(UndoConflictError):
+        undoable.undo()
+    other.db_manager.close()
+    assert undoable.undo_log.can_undo and not undoable.undo_log.can_redo
+    # El cambio sigue en la pila: se vuelve a comprobar, no se salta al anterior
+    with pytest.raises(UndoConflictError):
+        undoable.undo()
+
+
+def test_undo_checks_shared_day_capacity(undoable, book, db_path):
+    cabin = undoable.resources_manager.add_resource('Cabaña 2', 'cabaña')
+    book('2026-12-10', guests=30)
+    undoable.delete_reservation('2026-12-10')
+    other = open_calendar(db_path)
+    book('2026-12-10', phone='04149999999', guests=30, resource_id=cabin, logic=other)
+    other.db_manager.close()
+    with pytest.raises(UndoConflictError):
+        undoable.undo()
+    assert undoable.capacity_manager.get_range('2026-12-10', '2026-12-10') == {date(2026, 12, 10).toordinal(): (30, 40)}
+    assert undoable.undo_log.can_undo
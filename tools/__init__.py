@@ -0,0 +1 @@
+# Herramientas de desarrollo para la aplicación Kumbayah
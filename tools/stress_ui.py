@@ -0,0 +1,404 @@
+"""
+Generador de carga sintética para la interfaz de Kumbayah Calendar App.
+
+Crea una base de datos de prueba, abre la aplicación real sobre una raíz de
+Tk y repite miles de interacciones aleatorias a través de los mismos
+manejadores que usa el usuario:
+
+- EventCoordinator.handle_month_navigation (mes anterior/siguiente)
+- CalendarEventHandler.on_day_click, rellenando y guardando el formulario
+  de reserva o editando/eliminando/cerrando el diálogo de detalles
+- CalendarEventHandler.toggle_availability
+
+Cada interacción se mide hasta que Tk procesa todos sus eventos pendientes.
+Cada cierto número de interacciones se toma una muestra del número de
+widgets, comandos Tcl, elementos de canvas y memoria residente (RSS), para
+detectar fugas en draw_calendar o en los formularios durante turnos largos.
+
+Necesita una pantalla; en un servidor sin ella se ejecuta con Xvfb:
+    xvfb-run -a python -m tools.stress_ui --interactions 5000 --seed 1
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tkinter as tk
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from config.app_config import AppConfig
+from modules.calendar_logic import open_calendar
+from modules.database import DEFAULT_RESOURCE_ID
+from modules.records import Client, Reservation, Payment
+from modules.payments import initial_payment
+from utils.telemetry import LatencyHistogram, telemetry
+
+NAVIGATE = 'navigate'
+CLICK_FORM = 'click_form_submit'
+CLICK_DETAILS = 'click_details'
+TOGGLE = 'toggle'
+
+OPERATION_WEIGHTS = {NAVIGATE: 3, CLICK_FORM: 3, CLICK_DETAILS: 2, TOGGLE: 3}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m tools.stress_ui',
+                                     description='Carga sintética de la interfaz sobre una raíz de Tk real.')
+    parser.add_argument('--interactions', type=int, default=3000, help='Número total de interacciones')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla para repetir la misma secuencia')
+    parser.add_argument('--db', default=None, help='Base de datos a usar (por defecto una temporal generada)')
+    parser.add_argument('--months', type=int, default=24, help='Meses de datos generados y navegables')
+    parser.add_argument('--fill', type=float, default=0.4, help='Fracción de días reservados al generar')
+    parser.add_argument('--sample-every', type=int, default=250, help='Interacciones entre muestras de recursos')
+    parser.add_argument('--warmup', type=int, default=200,
+                        help='Interacciones iniciales excluidas del cálculo de crecimiento')
+    parser.add_argument('--render-mode', choices=('widgets', 'canvas'), default=AppConfig.RENDER_MODE)
+    parser.add_argument('--output', default=None, help='Guardar el informe completo en JSON')
+    parser.add_argument('--max-widget-growth', type=int, default=None,
+                        help='Salir con código 1 si los widgets crecen más de esto tras el calentamiento')
+    parser.add_argument('--max-rss-growth-kb', type=int, default=None,
+                        help='Salir con código 1 si el RSS crece más de esto (KB) tras el calentamiento')
+    return parser
+
+
+def generate_database(path, months, fill, rng):
+    """Crear una base de datos con reservas y bloqueos aleatorios desde el mes actual."""
+    calendar_logic = open_calendar(path)
+    db = calendar_logic.db_manager
+    first = date.today().replace(day=1)
+    last = _add_months(first, months) - timedelta(days=1)
+    created_at = datetime.utcnow().isoformat()
+
+    clients_repository = calendar_logic.clients_manager.repository
+    with db.write():
+        clients_repository.upsert_many(Client(None, f'Cliente{i}', f'Prueba{i}', f'0414{i:07d}') for i in range(500))
+        client_ids = list(clients_repository.get_many(range(1, 501)))
+        rows, payments = [], []
+        for n in range(first.toordinal(), last.toordinal() + 1):
+            roll = rng.random()
+            if roll < fill:
+                amount = rng.choice((20.0, 50.0, 80.0))
+                rows.append(Reservation(DEFAULT_RESOURCE_ID, n, None, rng.choice(client_ids), None, None, None,
+                                        rng.randint(1, 6), amount, None, None, 'Efectivo', '', created_at))
+                paid = initial_payment(amount, rng.choice(AppConfig.PAYMENT_STATUSES))
+                if paid:
+                    payments.append(Payment(None, DEFAULT_RESOURCE_ID, n, first.isoformat(), paid, 'Efectivo', '',
+                                            created_at))
+            elif roll < fill + 0.1:
+                rows.append(Reservation(DEFAULT_RESOURCE_ID, n, None, None, None, None, None, 0, None, None, None,
+                                        None, None, created_at))
+        calendar_logic.reservations_manager.repository.upsert_many(rows)
+        calendar_logic.payments_manager.repository.insert_many(payments)
+    db.close()
+    return first, months
+
+
+class StressRun:
+    """
+    Ejecución de la carga sobre una CalendarApp real.
+
+    Responsable de:
+    - Elegir y ejecutar interacciones aleatorias
+    - Medir su latencia hasta que Tk queda sin eventos pendientes
+    - Muestrear widgets, comandos Tcl, elementos de canvas y RSS
+    """
+
+    def __init__(self, app, rng, first_month, months):
+        self.app = app
+        self.root = app.root
+        self.rng = rng
+        self.first_month = first_month
+        self.months = months
+        self.month_offset = 0
+        self.histograms = {name: LatencyHistogram() for name in OPERATION_WEIGHTS}
+        self.samples = []
+        self.started = None
+        self._operations = list(OPERATION_WEIGHTS)
+        self._weights = list(OPERATION_WEIGHTS.values())
+
+    def run(self, interactions, sample_every):
+        self.app.calendar_logic.set_month_year(self.first_month.month, self.first_month.year)
+        self.app.calendar_renderer.draw_calendar()
+        self.root.update()
+        self.started = time.perf_counter()
+        self.sample(0)
+        for i in range(1, interactions + 1):
+            operation = self.rng.choices(self._operations, self._weights)[0]
+            began = time.perf_counter()
+            getattr(self, f'_op_{operation}')()
+            self.root.update()
+            self.histograms[operation].record((time.perf_counter() - began) * 1000)
+            if i % sample_every == 0 or i == interactions:
+                self.sample(i)
+
+    def sample(self, interactions):
+        self.samples.append({
+            'interactions': interactions,
+            'elapsed_s': round(time.perf_counter() - self.started, 3),
+            'widgets': _count_widgets(self.root),
+            'toplevels': sum(isinstance(w, tk.Toplevel) for w in self.root.winfo_children()),
+            'tcl_commands': len(self.root.tk.call('info', 'commands')),
+            'canvas_items': _count_canvas_items(self.root),
+            'pending_after': len(self.root.tk.splitlist(self.root.tk.call('after', 'info'))),
+            'rss_kb': _rss_kb(),
+        })
+
+    # --- Interacciones ---
+
+    def _op_navigate(self):
+        # Moverse dentro del rango generado
+        if self.month_offset == 0:
+            direction = 'next'
+        elif self.month_offset == self.months - 1:
+            direction = 'prev'
+        else:
+            direction = self.rng.choice(('prev', 'next'))
+        self.month_offset += 1 if direction == 'next' else -1
+        self.app.event_coordinator.handle_month_navigation(direction)
+
+    def _op_click_form_submit(self):
+        day = self._random_day(lambda info: info.is_available)
+        if day is None:
+            return
+        with self._new_toplevel() as found:
+            self.app.event_coordinator.get_event_handler().on_day_click(day)
+        form = found[0]
+        if form is None:
+            return
+        n = self.rng.randrange(10 ** 7)
+        # Método por defecto (PagoMovil): pide referencia
+        self._fill_entries(form, self._reservation_values(n, '0416', amount='50', reference=f'{n:07d}'))
+        if not self._invoke(form, AppConfig.LABELS['save']):
+            form.destroy()
+
+    def _op_click_details(self):
+        day = self._random_day(lambda info: info.reservation is not None)
+        if day is None:
+            return
+        with self._new_toplevel() as found:
+            self.app.event_coordinator.get_event_handler().on_day_click(day)
+        dialog = found[0]
+        if dialog is None:
+            return
+        action = self.rng.choice(('close', 'edit', 'edit_cancel', 'delete'))
+        if action in ('edit', 'edit_cancel'):
+            self._invoke(dialog, AppConfig.LABELS['edit'])
+            self.root.update_idletasks()
+            if action == 'edit':
+                n = self.rng.randrange(10 ** 7)
+                self._fill_entries(dialog, self._reservation_values(n, '0424', amount='80', reference=f'{n:07d}'))
+                self._invoke(dialog, AppConfig.LABELS['save'])
+                # El diálogo vuelve a solo lectura cuando se entregan los cambios (EventBus)
+                self.root.update_idletasks()
+            else:
+                self._invoke(dialog, AppConfig.LABELS['cancel'])
+            self._invoke(dialog, AppConfig.LABELS['close'])
+        elif action == 'delete':
+            self._invoke(dialog, AppConfig.LABELS['delete'])
+        else:
+            self._invoke(dialog, AppConfig.LABELS['close'])
+        if dialog.winfo_exists():
+            dialog.destroy()
+
+    def _op_toggle(self):
+        day = self._random_day(lambda info: info.reservation is None)
+        if day is not None:
+            self.app.event_coordinator.handle_availability_toggle(day)
+
+    # --- Utilidades ---
+
+    def _random_day(self, predicate):
+        month, year = self.app.calendar_logic.get_current_month_year()
+        first = date(year, month, 1)
+        days = self.app.calendar_logic.get_range_status(first, _add_months(first, 1) - timedelta(days=1))
+        candidates = [info.date for info in days if predicate(info)]
+        return self.rng.choice(candidates) if candidates else None
+
+    @contextmanager
+    def _new_toplevel(self):
+        # Detectar la ventana que abre una interacción
+        before = set(self.root.winfo_children())
+        found = [None]
+        yield found
+        self.root.update_idletasks()
+        new = [w for w in self.root.winfo_children() if w not in before and isinstance(w, tk.Toplevel)]
+        found[0] = new[-1] if new else None
+
+    def _reservation_values(self, n, phone_prefix, amount, reference):
+        # Huéspedes como los de generate_database, dentro de la capacidad diaria
+        labels = AppConfig.LABELS
+        return {
+            labels['name']: f'Nombre{n}',
+            labels['last_name']: f'Apellido{n}',
+            labels['phone']: f'{phone_prefix}{n:07d}',
+            labels['guests']: str(self.rng.randint(1, 6)),
+            labels['amount']: amount,
+            labels['reference']: reference,
+        }
+
+    def _fill_entries(self, window, values):
+        # Cada campo de texto se identifica por la etiqueta de su fila en la
+        # grilla (los desplegables son TCombobox, no TEntry; la referencia
+        # sólo está en la grilla si el método la pide)
+        labels, entries = {}, []
+        for widget in _walk(window):
+            if widget.winfo_manager() != 'grid':
+                continue
+            info = widget.grid_info()
+            cell = (widget.winfo_parent(), int(info['row']))
+            if widget.winfo_class() == 'TLabel' and int(info['column']) == 0:
+                labels[cell] = widget.cget('text')
+            elif widget.winfo_class() == 'TEntry':
+                entries.append((cell, widget))
+        for cell, entry in entries:
+            value = values.get(labels.get(cell))
+            if value is not None:
+                entry.delete(0, 'end')
+                entry.insert(0, value)
+
+    def _invoke(self, window, label):
+        for widget in _walk(window):
+            if widget.winfo_class() == 'TButton' and widget.cget('text') == label:
+                widget.invoke()
+                return True
+        return False
+
+
+@contextmanager
+def silenced_dialogs():
+    """Sustituir los cuadros de diálogo modales mientras dura la carga."""
+    from tkinter import messagebox
+    originals = {name: getattr(messagebox, name) for name in ('showinfo', 'showerror', 'askyesno')}
+    messagebox.showinfo = lambda *args, **kwargs: 'ok'
+    messagebox.showerror = lambda *args, **kwargs: 'ok'
+    messagebox.askyesno = lambda *args, **kwargs: True
+    try:
+        yield
+    finally:
+        for name, function in originals.items():
+            setattr(messagebox, name, function)
+
+
+def build_report(run, warmup):
+    latency = {
+        name: {
+            'count': histogram.count,
+            'p50_ms': _round(histogram.percentile(50)),
+            'p95_ms': _round(histogram.percentile(95)),
+            'p99_ms': _round(histogram.percentile(99)),
+            'max_ms': _round(histogram.max_ms),
+        }
+        for name, histogram in run.histograms.items()
+    }
+    baseline = next((s for s in run.samples if s['interactions'] >= warmup), run.samples[0])
+    final = run.samples[-1]
+    growth = {key: final[key] - baseline[key]
+              for key in ('widgets', 'toplevels', 'tcl_commands', 'canvas_items', 'pending_after', 'rss_kb')
+              if final[key] is not None and baseline[key] is not None}
+    elapsed = final['elapsed_s'] or 1
+    return {
+        'interactions': final['interactions'],
+        'interactions_per_minute': round(final['interactions'] * 60 / elapsed),
+        'latency': latency,
+        'growth_after_warmup': growth,
+        'statements': run.app.db_manager.statement_counts(),
+        'samples': run.samples,
+    }
+
+
+def print_report(report, out=sys.stdout):
+    print(f"{report['interactions']} interacciones, {report['interactions_per_minute']}/min", file=out)
+    print(f"{'interacción':<20}{'n':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}", file=out)
+    for name, stats in report['latency'].items():
+        print(f"{name:<20}{stats['count']:>7}" + ''.join(
+            f"{stats[key] if stats[key] is not None else '':>9}" for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms')),
+            file=out)
+    print(f"{'muestra':>8}{'seg':>9}{'widgets':>9}{'tcl':>8}{'items':>8}{'after':>7}{'rss_kb':>10}", file=out)
+    for s in report['samples']:
+        print(f"{s['interactions']:>8}{s['elapsed_s']:>9}{s['widgets']:>9}{s['tcl_commands']:>8}"
+              f"{s['canvas_items']:>8}{s['pending_after']:>7}{s['rss_kb'] or '':>10}", file=out)
+    print('crecimiento tras calentamiento: ' + ', '.join(
+        f'{key}={value:+}' for key, value in report['growth_after_warmup'].items()), file=out)
+    print('sentencias más ejecutadas: ' + ', '.join(
+        f'{name}={count}' for name, count in list(report['statements'].items())[:8]), file=out)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    rng = random.Random(args.seed)
+    AppConfig.RENDER_MODE = args.render_mode
+
+    tmp_dir = None
+    db_path = args.db
+    if db_path is None:
+        tmp_dir = tempfile.TemporaryDirectory(prefix='kumbayah-stress-')
+        db_path = os.path.join(tmp_dir.name, 'stress.db')
+    first_month, months = generate_database(db_path, args.months, args.fill, rng)
+
+    # Importación diferida: main.py necesita una pantalla disponible
+    from main import CalendarApp
+    root = tk.Tk()
+    try:
+        app = CalendarApp(root, db_path=db_path)
+        # No mezclar la carga sintética con la telemetría real del usuario
+        telemetry.configure(path=None, version=AppConfig.APP_VERSION, enabled=False)
+        run = StressRun(app, rng, first_month, months)
+        with silenced_dialogs():
+            run.run(args.interactions, args.sample_every)
+        app.db_manager.close()
+    finally:
+        root.destroy()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    report = build_report(run, args.warmup)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            json.dump(report, out, indent=2)
+
+    growth = report['growth_after_warmup']
+    if args.max_widget_growth is not None and growth.get('widgets', 0) > args.max_widget_growth:
+        return 1
+    if args.max_rss_growth_kb is not None and growth.get('rss_kb', 0) > args.max_rss_growth_kb:
+        return 1
+    return 0
+
+
+def _walk(widget):
+    for child in widget.winfo_children():
+        yield child
+        yield from _walk(child)
+
+
+def _count_widgets(root):
+    return sum(1 for _ in _walk(root))
+
+
+def _count_canvas_items(root):
+    return sum(len(w.find_all()) for w in _walk(root) if isinstance(w, tk.Canvas))
+
+
+def _rss_kb():
+    # Memoria residente actual; sólo disponible en Linux (/proc)
+    try:
+        with open('/proc/self/statm') as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def _add_months(day, months):
+    month_index = day.month - 1 + months
+    return day.replace(year=day.year + month_index // 12, month=month_index % 12 + 1, day=1)
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Agenda de reservas para Kumbayah Calendar App.
+
+Lista cronológica de las reservas de todos los recursos a partir de una
+fecha, con desplazamiento virtual (PagedTreeview): las páginas se piden por
+clave (día, recurso) sobre índices parciales de reservations al acercarse a
+un extremo, así que saltar a una fecha es una sola consulta y la memoria no
+crece por mucho que se desplace la lista.
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import date
+from config.app_config import AppConfig
+from ui.paged_list import PagedTreeview
+
+
+class AgendaView:
+    """
+    Ventana con las reservas en orden cronológico.
+
+    Responsable de:
+    - Saltar a una fecha (por defecto hoy) y cargar las reservas hacia delante y hacia atrás
+    - Filtrar las reservas con saldo pendiente
+    - Abrir en el calendario principal el recurso y el día de la reserva elegida
+    - Releer las filas a la vista cuando cambian reservas o clientes (EventBus)
+    """
+
+    def __init__(self, parent, calendar_logic, on_open_day=None):
+        """
+        Inicializar agenda.
+
+        Args:
+            parent: Ventana principal de la aplicación
+            calendar_logic: Instancia de CalendarLogic para datos
+            on_open_day: Callback (resource_id, date) al hacer doble click en una reserva
+        """
+        self.parent = parent
+        self.calendar_logic = calendar_logic
+        self.on_open_day = on_open_day
+        self.window = None
+        self.agenda_list = None
+        self.date_var = None
+        self.due_only_var = None
+        self._resource_names = {}
+
+    def show(self):
+        """Abrir la agenda en el día de hoy, o traerla al frente si ya está abierta."""
+        if self.window is not None and self.window.winfo_exists():
+            self.window.lift()
+        else:
+            self.window = tk.Toplevel(self.parent)
+            self.window.title(AppConfig.LABELS['agenda_title'])
+            self._create_widgets()
+        self.date_var.set(date.today().isoformat())
+        self.jump()
+
+    def _create_widgets(self):
+        """Crear la barra de fecha y filtro y la lista paginada."""
+        config = AppConfig.AGENDA_VIEW
+        pad_x, pad_y = AppConfig.PADDING['main_frame']
+        bar = ttk.Frame(self.window)
+        bar.pack(fill='x', padx=pad_x, pady=pad_y)
+        self.date_var = tk.StringVar()
+        entry = ttk.Entry(bar, textvariable=self.date_var, width=12)
+        entry.pack(side='left')
+        entry.bind('<Return>', lambda event: self.jump())
+        ttk.Button(bar, text=AppConfig.LABELS['agenda_go'], command=self.jump).pack(
+            side='left', padx=AppConfig.PADDING['legend_item'])
+        ttk.Button(bar, text=AppConfig.LABELS['agenda_today'], command=self._jump_today).pack(side='left')
+        self.due_only_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bar, text=AppConfig.LABELS['agenda_due_only'], variable=self.due_only_var,
+                        command=self.jump).pack(side='left', padx=AppConfig.PADDING['legend_item'] * 3)
+
+        columns = AppConfig.LABELS['agenda_columns']
+        self.agenda_list = PagedTreeview(
+            self.window, columns,
+            fetch_page=self._fetch_page,
+            row_key=self.calendar_logic.reservations_manager.agenda_key,
+            row_values=self._row_values,
+            page_size=config['page_size'],
+            max_pages=config['max_pages'],
+            height=config['visible_rows']
+        )
+        for index, column in enumerate(columns):
+            self.agenda_list.tree.heading(column, text=column)
+            self.agenda_list.tree.column(column, width=config['column_widths'][index],
+                                         anchor='e' if index in (4, 5, 6) else 'w')
+        self.agenda_list.tree.bind('<Double-1>', self._on_open)
+        self.agenda_list.frame.pack(fill='both', expand=True, padx=pad_x, pady=pad_y)
+
+    def jump(self):
+        """Mostrar las reservas a partir de la fecha escrita."""
+        try:
+            day = date.fromisoformat(self.date_var.get().strip())
+        except ValueError:
+            messagebox.showerror('Error', AppConfig.LABELS['date_invalid'], parent=self.window)
+            return
+        # Los recursos pueden haberse añadido o renombrado desde la línea de comandos
+        self._resource_names = {resource.id: resource.name for resource in
+                                self.calendar_logic.resources_manager.get_resources(include_inactive=True)}
+        self.agenda_list.reload(self.calendar_logic.reservations_manager.agenda_start(day))
+
+    def on_data_changed(self, event):
+        """Releer la lista desde la primera fila visible si la agenda está abierta."""
+        if self.window is not None and self.window.winfo_exists():
+            self.agenda_list.refresh()
+
+    def _jump_today(self):
+        self.date_var.set(date.today().isoformat())
+        self.jump()
+
+    def _fetch_page(self, key, forward, limit):
+        return self.calendar_logic.reservations_manager.get_agenda(key, forward, limit, self.due_only_var.get())
+
+    def _row_values(self, reservation):
+        return (
+            reservation.date,
+            self._resource_names.get(reservation.resource_id, reservation.resource_id),
+            f"{reservation.first_name or ''} {reservation.last_name or ''}".strip(),
+            reservation.phone or '',
+            reservation.guests,
+            f'{reservation.amount or 0.0:.2f}',
+            f'{reservation.balance:.2f}',
+            reservation.payment_status or ''
+        )
+
+    def _on_open(self, event=None):
+        """Abrir en el calendario principal el recurso y el día de la reserva."""
+        reservation = self.agenda_list.selected_row()
+        if reservation is not None and self.on_open_day:
+            self.on_open_day(reservation.resource_id, date.fromordinal(reservation.day))
@@ -0,0 +1,115 @@
+"""
+Historial de cambios de una reserva para Kumbayah Calendar App.
+
+Panel del diálogo de detalles con los cambios de la reserva y de sus pagos
+(reservation_audit, modules/audit.py), del más reciente al más antiguo. No
+consulta nada hasta que se muestra y, como la lista está paginada
+(PagedTreeview), sólo lee los cambios que llegan a verse.
+"""
+from tkinter import ttk
+from config.app_config import AppConfig
+from ui.paged_list import PagedTreeview
+
+
+def describe_change(entry):
+    """
+    Describir un cambio del historial en una línea.
+
+    Args:
+        entry (AuditEntry): Cambio de la reserva o de uno de sus pagos
+
+    Returns:
+        str: p. ej. "Cambio de reserva: Monto 100 → 120"
+    """
+    labels = AppConfig.LABELS
+    fields = []
+    for column, value in entry.changed.items():
+        name = labels['audit_fields'].get(column, column)
+        if entry.action == 'update':
+            before, after = (_format_value(item) for item in value)
+            fields.append(f"{name} {before} → {after}")
+        else:
+            fields.append(f"{name} {_format_value(value)}")
+    return labels['audit_change_format'].format(
+        action=labels['audit_actions'].get(entry.action, entry.action),
+        entity=labels['audit_entities'].get(entry.entity, entry.entity),
+        fields=', '.join(fields)
+    ).rstrip(': ')
+
+
+def _format_value(value):
+    if value is None or value == '':
+        return AppConfig.LABELS['audit_empty_value']
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+class AuditHistoryPanel:
+    """
+    Lista paginada con el historial de cambios de una reserva.
+
+    Responsable de:
+    - Cargar la primera página de cambios sólo al mostrarse
+    - Pedir más cambios a medida que se desplaza la lista
+    - Mostrar fecha, usuario y columnas cambiadas de cada cambio
+    """
+
+    def __init__(self, parent, calendar_logic, resource_id, day):
+        """
+        Inicializar panel de historial.
+
+        Args:
+            parent: Widget padre (ventana del diálogo de detalles)
+            calendar_logic: Instancia de CalendarLogic para datos
+            resource_id (int): Recurso de la reserva
+            day (str): Fecha de la reserva (AAAA-MM-DD)
+        """
+        self.calendar_logic = calendar_logic
+        self.resource_id = resource_id
+        self.day = day
+        self.frame = ttk.Frame(parent)
+        self.history = None
+
+    @property
+    def visible(self):
+        return self.frame.winfo_manager() != ''
+
+    def show(self, row):
+        """
+        Mostrar el panel en la fila `row` del padre y cargar los cambios más recientes.
+
+        Args:
+            row (int): Fila de la grilla del padre
+        """
+        if self.history is None:
+            self._create_widgets()
+        self.frame.grid(row=row, column=0, sticky='nsew', padx=AppConfig.PADDING['main_frame'][0])
+        self.history.reload()
+
+    def hide(self):
+        """Ocultar el panel (los cambios se vuelven a leer al mostrarlo)."""
+        self.frame.grid_remove()
+
+    def _create_widgets(self):
+        """Crear la lista paginada de cambios."""
+        config = AppConfig.AUDIT
+        columns = AppConfig.LABELS['audit_columns']
+        ttk.Label(self.frame, text=AppConfig.LABELS['audit']).pack(anchor='w')
+        self.history = PagedTreeview(
+            self.frame, columns,
+            fetch_page=self._fetch_page,
+            row_key=self.calendar_logic.audit_manager.history_key,
+            row_values=lambda entry: (entry.changed_on.strftime('%Y-%m-%d %H:%M'), entry.user or '',
+                                      describe_change(entry)),
+            page_size=config['page_size'],
+            max_pages=config['max_pages'],
+            height=config['visible_rows']
+        )
+        for index, column in enumerate(columns):
+            self.history.tree.heading(column, text=column)
+            self.history.tree.column(column, width=(110, 70, 260)[index], stretch=index == 2)
+        self.history.frame.pack(fill='both', expand=True)
+
+    def _fetch_page(self, key, forward, limit):
+        return self.calendar_logic.get_history(self.day, self.resource_id, key, forward, limit)
@@ -4,8 +4,12 @@ Manejo de eventos de calendario para Kumbayah Calendar App.
 Extraído de main.py líneas 185-206 para centralizar la lógica de interacción del usuario.
 Maneja eventos de clic, alternancia de disponibilidad e interacciones de día.
 """
+import calendar
+from datetime import date, timedelta
 from tkinter import messagebox
 from config.app_config import AppConfig
+from modules.undo import UndoConflictError
+from utils.telemetry import telemetry, MONTH_NAVIGATION, DAY_CLICK, AVAILABILITY_TOGGLE, UNDO
 
 
 class CalendarEventHandler:
@@ -18,20 +22,28 @@ class CalendarEventHandler:
     Extraído de main.py líneas 185-206.
     """
     
-    def __init__(self, calendar_logic, update_cell_callback, show_details_callback, open_form_callback):
+    def __init__(self, calendar_logic, show_details_callback, open_form_callback, preview_selection_callback=None):
         """
         Inicializar manejador de eventos de calendario.
         
+        Las celdas cambiadas no se actualizan aquí: CalendarLogic publica los
+        días cambiados en el EventBus y el renderizador está suscrito.
+        
         Args:
             calendar_logic: Instancia de CalendarLogic para lógica de negocio
-            update_cell_callback: Función para actualizar celda de día específica
             show_details_callback: Función para mostrar diálogo de detalles de reserva
             open_form_callback: Función para abrir formulario de reserva
+            preview_selection_callback: Función para resaltar los días seleccionados (opcional)
         """
         self.calendar_logic = calendar_logic
-        self.update_cell_callback = update_cell_callback
         self.show_details_callback = show_details_callback
         self.open_form_callback = open_form_callback
+        self.preview_selection_callback = preview_selection_callback
+        
+        # Estado de la selección de rango con el botón derecho
+        self._selection_anchor = None
+        self._selection_end = None
+        self._last_anchor = None
     
     def toggle_availability(self, day):
         """
@@ -47,12 +59,12 @@ class CalendarEventHandler:
         # Solo permitir alternar disponibilidad para días del mes actual
         if day.month != current_month:
             return
+        started = telemetry.start()
             
-        # Alternar disponibilidad usando lógica de calendario
+        # Alternar disponibilidad usando lógica de calendario (la celda se
+        # actualiza al publicarse el cambio)
         self.calendar_logic.toggle_day_availability(day)
-        
-        # Actualizar la celda para reflejar el cambio
-        self.update_cell_callback(day)
+        telemetry.finish_when_idle(AVAILABILITY_TOGGLE, started)
     
     def on_day_click(self, day):
         """
@@ -71,46 +83,172 @@ class CalendarEventHandler:
         # Solo manejar clics para días del mes actual
         if day.month != current_month:
             return
+        started = telemetry.start()
         
         # Obtener información de estado del día
         day_info = self.calendar_logic.get_day_status(day)
-        reservation = day_info['reservation']
-        is_available = day_info['is_available']
+        reservation = day_info.reservation
+        is_available = day_info.is_available
         
         # Determinar acción apropiada basada en el estado del día
         if reservation:
             # Mostrar detalles de reserva si existe
             self.show_details_callback(reservation)
+            telemetry.finish_when_idle(DAY_CLICK, started)
         elif not is_available:
             # Mostrar mensaje de no disponible
             messagebox.showinfo(
-                AppConfig.LABELS['unavailable'], 
+                AppConfig.LABELS['unavailable_msg'], 
                 AppConfig.LABELS['unavailable_detail']
             )
         else:
             # Abrir formulario de reserva para días disponibles
-            self.open_form_callback(day_info['date_str'])
+            self.open_form_callback(day_info.date_str)
+            telemetry.finish_when_idle(DAY_CLICK, started)
+    
+    def begin_selection(self, day):
+        """
+        Iniciar una selección de rango con el botón derecho.
+        
+        Args:
+            day (datetime.date): Día donde empieza la selección (o None)
+        """
+        current_month, _ = self.calendar_logic.get_current_month_year()
+        if day is None or day.month != current_month:
+            self._selection_anchor = None
+            return
+        self._selection_anchor = day
+        self._selection_end = day
+    
+    def extend_selection(self, day):
+        """
+        Extender la selección en curso hasta un día y actualizar la vista previa.
+        
+        Args:
+            day (datetime.date): Día bajo el puntero (o None)
+        """
+        if self._selection_anchor is None or day is None:
+            return
+        day = self._clamp_to_current_month(day)
+        if day == self._selection_end:
+            return
+        self._selection_end = day
+        self._preview_selection(self._selection_anchor, day)
+    
+    def finish_selection(self):
+        """
+        Terminar la selección en curso.
+        
+        Un clic sin arrastrar alterna sólo ese día; un arrastre aplica el
+        cambio a todo el rango de una vez.
+        """
+        anchor, end = self._selection_anchor, self._selection_end
+        self._selection_anchor = None
+        self._selection_end = None
+        if anchor is None:
+            return
+        self._preview_selection(None, None)
+        
+        if anchor == end:
+            self._last_anchor = anchor
+            self.toggle_availability(anchor)
+        else:
+            self.apply_availability_range(anchor, end)
     
-    def create_day_cell_bindings(self, canvas, day):
+    def extend_from_last_anchor(self, day):
         """
-        Crear enlaces de eventos de clic para celda de día del canvas.
+        Manejar Shift + clic derecho: aplicar el rango desde el último día marcado.
+        
+        Args:
+            day (datetime.date): Día clickeado (o None)
+        """
+        current_month, _ = self.calendar_logic.get_current_month_year()
+        if day is None or day.month != current_month:
+            return
+        anchor = self._last_anchor
+        if anchor is None or anchor.month != current_month or anchor == day:
+            self._last_anchor = day
+            self.toggle_availability(day)
+            return
+        self.apply_availability_range(anchor, day)
+    
+    def apply_availability_range(self, anchor, end):
+        """
+        Bloquear o liberar un rango de días en una sola transacción.
+        
+        El estado del día donde empezó la selección decide la acción: si estaba
+        disponible se bloquea todo el rango, si no, se libera.
+        
+        Args:
+            anchor (datetime.date): Día donde empezó la selección
+            end (datetime.date): Día donde terminó la selección
+        """
+        started = telemetry.start()
+        block = self.calendar_logic.get_day_status(anchor).is_available
+        self.calendar_logic.set_availability_range(anchor, end, not block)
+        telemetry.finish_when_idle(AVAILABILITY_TOGGLE, started)
+    
+    def _preview_selection(self, anchor, end):
+        """Resaltar los días entre anchor y end (ambos None para limpiar)."""
+        if not self.preview_selection_callback:
+            return
+        if anchor is None:
+            self.preview_selection_callback([])
+            return
+        first, last = sorted((anchor, end))
+        self.preview_selection_callback(
+            [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        )
+    
+    def _clamp_to_current_month(self, day):
+        """Limitar un día a los límites del mes mostrado."""
+        current_month, current_year = self.calendar_logic.get_current_month_year()
+        first = date(current_year, current_month, 1)
+        last = date(current_year, current_month, calendar.monthrange(current_year, current_month)[1])
+        return min(max(day, first), last)
+    
+    def create_day_cell_bindings(self, canvas, day_from_event):
+        """
+        Crear enlaces de eventos de clic para un canvas de días.
+        
+        Sirve tanto para un canvas por día como para un canvas con el mes
+        completo: el día se obtiene en cada evento a partir del puntero.
+        
+        - Click izquierdo: detalles o formulario de reserva
+        - Click derecho: alternar disponibilidad del día
+        - Arrastrar con botón derecho: seleccionar un rango y aplicarlo al soltar
+        - Shift + click derecho: rango desde el último día marcado
         
         Args:
             canvas: Widget canvas al que enlazar eventos
-            day (datetime.date): Día asociado con el canvas
+            day_from_event: Función (event) -> datetime.date o None
             
         Returns:
             tuple: (enlace_clic_izquierdo, enlace_clic_derecho)
         """
         def _on_left_click(event):
-            self.on_day_click(day)
+            day = day_from_event(event)
+            if day is not None:
+                self.on_day_click(day)
             
         def _on_right_click(event):
-            self.toggle_availability(day)
+            self.begin_selection(day_from_event(event))
+        
+        def _on_right_drag(event):
+            self.extend_selection(day_from_event(event))
+        
+        def _on_right_release(event):
+            self.finish_selection()
+        
+        def _on_shift_right_click(event):
+            self.extend_from_last_anchor(day_from_event(event))
         
         # Enlazar los eventos
         canvas.bind('<Button-1>', _on_left_click)
         canvas.bind('<Button-3>', _on_right_click)
+        canvas.bind('<B3-Motion>', _on_right_drag)
+        canvas.bind('<ButtonRelease-3>', _on_right_release)
+        canvas.bind('<Shift-Button-3>', _on_shift_right_click)
         
         return _on_left_click, _on_right_click
 
@@ -139,9 +277,9 @@ class EventCoordinator:
         # Crear manejador de eventos con callbacks apropiados
         self.event_handler = CalendarEventHandler(
             calendar_logic=calendar_logic,
-            update_cell_callback=calendar_renderer.update_cell,
             show_details_callback=form_manager.show_reservation_details,
-            open_form_callback=form_manager.open_reservation_form
+            open_form_callback=form_manager.open_reservation_form,
+            preview_selection_callback=calendar_renderer.set_selection
         )
     
     def get_event_handler(self):
@@ -160,6 +298,7 @@ class EventCoordinator:
         Args:
             direction (str): 'prev' o 'next'
         """
+        started = telemetry.start()
         if direction == 'prev':
             self.calendar_logic.prev_month()
         elif direction == 'next':
@@ -167,6 +306,40 @@ class EventCoordinator:
         
         # Redibujar calendario con nuevo mes
         self.calendar_renderer.draw_calendar()
+        telemetry.finish_when_idle(MONTH_NAVIGATION, started)
+    
+    def handle_resource_change(self, resource_id, day=None):
+        """
+        Mostrar el calendario de otro recurso.
+        
+        Args:
+            resource_id (int): Recurso elegido
+            day (datetime.date): Día cuyo mes se mostrará (opcional)
+        """
+        self.calendar_logic.set_resource(resource_id)
+        if day is not None:
+            self.calendar_logic.set_month_year(day.month, day.year)
+        self.calendar_renderer.draw_calendar()
+    
+    def handle_undo(self, redo=False):
+        """
+        Deshacer (o rehacer) el último cambio del calendario.
+        
+        Como cualquier otro cambio, publica sus días en el EventBus: sólo se
+        actualizan las celdas de esos días que estén a la vista, con una
+        consulta; el calendario no se redibuja.
+        
+        Args:
+            redo (bool): Rehacer el último cambio deshecho
+        """
+        started = telemetry.start()
+        try:
+            command = self.calendar_logic.redo() if redo else self.calendar_logic.undo()
+        except UndoConflictError as exc:
+            messagebox.showerror('Error', str(exc))
+            return
+        if command is not None:
+            telemetry.finish_when_idle(UNDO, started)
     
     def handle_day_selection(self, day):
         """
@@ -23,6 +23,8 @@ class CalendarRenderer:
     Extraído de main.py líneas 78-183.
     """
     
+    MAX_WEEKS = 6
+    
     def __init__(self, calendar_frame, title_label, style_manager, calendar_logic, event_handler=None):
         """
         Inicializar renderizador de calendario.
@@ -42,6 +44,17 @@ class CalendarRenderer:
         
         self.day_buttons = []  # Store references to all day cells
         
+        # Celdas reutilizables por posición (fila, columna) y filas visibles
+        self._cells = {}
+        self._canvas_index = {}  # canvas -> índice de la celda en day_buttons
+        self._weekday_header = None
+        self.rows = 0
+        
+        # Última apariencia aplicada a cada celda: (canvas, id_rect) -> estilo
+        self._cell_states = {}
+        self._selected = set()  # Celdas resaltadas como (canvas, id_rect)
+        self._title = None
+        
         # Get fonts from style manager
         self.font_day = style_manager.get_font('day')
         self.font_client = style_manager.get_font('client')
@@ -50,28 +63,30 @@ class CalendarRenderer:
         """
         Dibujar el calendario completo para el mes actual.
         
-        Limpia widgets existentes y crea nueva cuadrícula de calendario.
+        Reutiliza las celdas existentes entre meses: sólo crea las que faltan,
+        oculta las filas sobrantes y actualiza los elementos cuyo estado cambió.
         
         Extraído de main.py líneas 78-136.
         """
-        # Limpiar widgets existentes del calendario
-        for widget in self.calendar_frame.winfo_children():
-            widget.destroy()
+        self._update_title()
         
-        # Actualizar título
-        current_month, current_year = self.calendar_logic.get_current_month_year()
-        self.title_label.config(text=f'{calendar.month_name[current_month]} {current_year}')
+        # Crear encabezado de días de la semana una sola vez
+        if self._weekday_header is None:
+            self._weekday_header = WeekdayHeader(self.calendar_frame)
         
-        # Crear encabezado de días de la semana
-        weekday_header = WeekdayHeader(self.calendar_frame)
-        
-        # Obtener datos del calendario y crear celdas de día
+        # Obtener datos del calendario y actualizar celdas de día
         month_calendar_data = self.calendar_logic.get_month_calendar_data()
+        self._show_rows(len(month_calendar_data))
         self.day_buttons = []
         
         for row_idx, week_data in enumerate(month_calendar_data, start=1):  # Comenzar en fila 1 (después del encabezado)
             for col_idx, day_info in enumerate(week_data):
-                self._create_day_cell(day_info, row_idx, col_idx)
+                cell = self._cells.get((row_idx, col_idx))
+                if cell is None:
+                    cell = self._create_day_cell(row_idx, col_idx)
+                canvas, canvas_ids = cell
+                self._update_canvas_content(canvas, canvas_ids, day_info)
+                self.day_buttons.append((day_info.date, canvas, canvas_ids))
     
     def update_cell(self, day):
         """
@@ -94,17 +109,145 @@ class CalendarRenderer:
                 self._update_canvas_content(canvas, canvas_ids, day_info)
                 return
     
-    def _create_day_cell(self, day_info, row_idx, col_idx):
+    def update_cells(self, days):
+        """
+        Actualizar varias celdas con una sola consulta a la base de datos.
+        
+        Args:
+            days (iterable): Días (datetime.date) a actualizar
+        """
+        days = [day for day in days if self._find_cell(day) is not None]
+        if not days:
+            return
+        for day_info in self.calendar_logic.get_range_status(min(days), max(days)):
+            cell = self._find_cell(day_info.date)
+            if cell is not None:
+                self._update_canvas_content(cell[0], cell[1], day_info)
+    
+    def on_dates_changed(self, event):
+        """
+        Actualizar las celdas visibles de los días cambiados (EventBus).
+        
+        Las celdas muestran también la ocupación de todos los recursos, así
+        que se actualizan aunque el cambio sea de otro recurso.
+        
+        Args:
+            event (DatesChanged): Días cambiados desde el último ciclo de inactividad
+        """
+        self.update_cells(event.days)
+    
+    def on_client_changed(self, event):
+        """Actualizar las celdas visibles: muestran el nombre de los clientes (EventBus)."""
+        self.update_cells(cell_day for cell_day, _, _ in self.day_buttons)
+    
+    def day_from_event(self, event):
+        """
+        Obtener el día bajo el puntero de un evento de ratón.
+        
+        Durante un arrastre los eventos llegan al canvas donde empezó el clic,
+        así que se busca el widget que realmente está bajo el puntero.
+        
+        Args:
+            event: Evento de Tkinter
+            
+        Returns:
+            datetime.date: Día bajo el puntero, o None si no hay celda
+        """
+        try:
+            widget = event.widget.winfo_containing(event.x_root, event.y_root)
+        except (KeyError, tk.TclError):
+            return None
+        index = self._canvas_index.get(widget)
+        if index is None or index >= len(self.day_buttons):
+            return None
+        return self.day_buttons[index][0]
+    
+    def set_selection(self, days):
+        """
+        Resaltar un conjunto de días como vista previa de una selección.
+        
+        Sólo modifica las celdas que entran o salen de la selección.
+        
+        Args:
+            days (iterable): Días (datetime.date) a resaltar; vacío para limpiar
+        """
+        selected = set()
+        for day in days:
+            cell = self._find_cell(day)
+            if cell is not None:
+                selected.add((cell[0], cell[1]['rect']))
+        
+        try:
+            for canvas, rect in selected - self._selected:
+                canvas.itemconfig(rect, outline=AppConfig.COLORS['selection'], width=3)
+            for canvas, rect in self._selected - selected:
+                canvas.itemconfig(rect, width=0)
+        except Exception:
+            # Manejar casos donde los widgets podrían haber sido destruidos
+            pass
+        self._selected = selected
+    
+    def _find_cell(self, day):
         """
-        Crear un canvas de celda de día único y su contenido.
+        Buscar la celda que muestra un día en el mes actual.
+        
+        Args:
+            day (datetime.date): Día a buscar
+            
+        Returns:
+            tuple: (canvas, canvas_ids) o None si el día no está visible
+        """
+        for cell_day, canvas, canvas_ids in self.day_buttons:
+            if cell_day == day:
+                return canvas, canvas_ids
+        return None
+    
+    def _update_title(self):
+        """Actualizar el título de mes/año sólo si cambió."""
+        current_month, current_year = self.calendar_logic.get_current_month_year()
+        title = f'{calendar.month_name[current_month]} {current_year}'
+        if title != self._title:
+            self.title_label.config(text=title)
+            self._title = title
+    
+    def _show_rows(self, rows):
+        """
+        Mostrar sólo las filas de semanas que necesita el mes actual.
+        
+        Args:
+            rows (int): Número de semanas del mes
+        """
+        if rows == self.rows:
+            return
+        self.rows = rows
+        
+        for (row_idx, col_idx), (canvas, canvas_ids) in self._cells.items():
+            if row_idx <= rows:
+                canvas.grid()
+            else:
+                canvas.grid_remove()
+        
+        # Las filas ocultas no deben reservar espacio
+        for row_idx in range(1, self.MAX_WEEKS + 1):
+            if row_idx > rows:
+                self.calendar_frame.grid_rowconfigure(row_idx, weight=0, minsize=0)
+            else:
+                self.calendar_frame.grid_rowconfigure(row_idx, weight=1, minsize=AppConfig.CELL_SIZE['height'])
+    
+    def _create_day_cell(self, row_idx, col_idx):
+        """
+        Crear un canvas de celda de día reutilizable.
+        
+        La celda no queda ligada a un día concreto: los clics consultan el día
+        que ocupa su posición en el mes mostrado.
         
         Args:
-            day_info (dict): Información del día desde la lógica del calendario
             row_idx (int): Posición de fila en la cuadrícula
             col_idx (int): Posición de columna en la cuadrícula
+            
+        Returns:
+            tuple: (canvas, canvas_ids)
         """
-        day = day_info['date']
-        
         # Crear canvas para la celda del día
         canvas = tk.Canvas(
             self.calendar_frame,
@@ -126,22 +269,22 @@ class CalendarRenderer:
         # Crear elementos del canvas
         canvas_ids = self._create_canvas_items(canvas)
         
-        # Establecer contenido inicial
-        self._update_canvas_content(canvas, canvas_ids, day_info)
-        
         # Enlazar eventos de clic
         if self.event_handler:
-            self.event_handler.create_day_cell_bindings(canvas, day)
+            self.event_handler.create_day_cell_bindings(canvas, self.day_from_event)
         
         # Almacenar referencia de celda
-        self.day_buttons.append((day, canvas, canvas_ids))
+        self._cells[(row_idx, col_idx)] = (canvas, canvas_ids)
+        self._canvas_index[canvas] = (row_idx - 1) * 7 + col_idx
+        return canvas, canvas_ids
     
-    def _create_canvas_items(self, canvas):
+    def _create_canvas_items(self, canvas, tags=()):
         """
         Crear elementos visuales para una celda de día.
         
         Args:
             canvas: Widget canvas en el que dibujar
+            tags (tuple): Etiquetas adicionales para los elementos (opcional)
             
         Returns:
             dict: Diccionario con IDs de elementos del canvas
@@ -152,7 +295,8 @@ class CalendarRenderer:
             AppConfig.CELL_SIZE['width'], 
             AppConfig.CELL_SIZE['height'],
             fill=AppConfig.COLORS['current_month'], 
-            width=0
+            width=0,
+            tags=tags + ('rect',)
         )
         
         # Texto del número del día
@@ -161,7 +305,8 @@ class CalendarRenderer:
             anchor='nw',
             text='',
             font=self.font_day,
-            fill=AppConfig.COLORS['text_current']
+            fill=AppConfig.COLORS['text_current'],
+            tags=tags + ('day_txt',)
         )
         
         # Texto del nombre del cliente
@@ -170,13 +315,29 @@ class CalendarRenderer:
             anchor='nw',
             text='',
             font=self.font_client,
-            width=AppConfig.CELL_SIZE['width'] - 16  # Considerar relleno
+            width=AppConfig.CELL_SIZE['width'] - 16,  # Considerar relleno
+            tags=tags + ('name_txt',)
+        )
+        
+        # Barra de ocupación del día (huéspedes / capacidad), vacía al crearse
+        fill_bar = canvas.create_rectangle(
+            0, 0, 0, 0,
+            fill=AppConfig.COLORS['capacity_fill'],
+            width=0,
+            tags=tags + ('fill_bar',)
+        )
+        
+        # Registrar la apariencia inicial para que el primer estilo sólo
+        # modifique lo que realmente difiere
+        self._cell_states[(canvas, rect)] = (
+            AppConfig.COLORS['current_month'], '', AppConfig.COLORS['text_current'], '', None
         )
         
         return {
             'rect': rect,
             'day_txt': day_txt,
-            'name_txt': name_txt
+            'name_txt': name_txt,
+            'fill_bar': fill_bar
         }
     
     def _update_canvas_content(self, canvas, canvas_ids, day_info):
@@ -186,84 +347,126 @@ class CalendarRenderer:
         Args:
             canvas: Widget canvas
             canvas_ids (dict): Diccionario con IDs de elementos del canvas
-            day_info (dict): Información del día a mostrar
+            day_info (DayInfo): Información del día a mostrar
         """
-        is_current_month = day_info['is_current_month']
-        reservation = day_info['reservation']
-        is_available = day_info['is_available']
+        self._apply_cell_style(canvas, canvas_ids, self._cell_style(day_info))
+    
+    def _cell_style(self, day_info):
+        """
+        Calcular la apariencia de una celda a partir de la información del día.
         
-        # Obtener IDs de elementos del canvas
-        rect = canvas_ids.get('rect')
-        name_txt = canvas_ids.get('name_txt')
-        day_txt = canvas_ids.get('day_txt')
+        Compartido por todos los modos de renderizado para que las celdas
+        se vean igual sin importar cómo se dibujen.
         
-        # Actualizar basado en si es del mes actual
-        if not is_current_month:
-            self._update_other_month_day(canvas, rect, day_txt, name_txt)
-            return
+        Args:
+            day_info (DayInfo): Información del día
+            
+        Returns:
+            tuple: (color_fondo, texto_dia, color_texto_dia, texto_nombre, barra),
+            donde barra es (fracción ocupada, color) o None
+        """
+        if not day_info.is_current_month:
+            # Días fuera del mes actual: sin número ni nombre, en gris
+            return (AppConfig.COLORS['other_month'], '', AppConfig.COLORS['text_other'], '', None)
+        
+        day_text = str(day_info.date.day)
+        text_color = AppConfig.COLORS['text_current']
+        reservation = day_info.reservation
+        bar = self._fill_level(day_info)
+        
+        if reservation:
+            # El día tiene una reserva
+            status = reservation.payment_status or ''
+            color = self.style_manager.get_color_for_status(reservation_status=status)
+            display_name = reservation.client_name
+            return (color, day_text, text_color, display_name, bar)
+        
+        if not day_info.is_available:
+            # El día está marcado como no disponible
+            return (AppConfig.COLORS['unavailable'], day_text, text_color, AppConfig.LABELS['unavailable_msg'], bar)
         
-        # Actualizar día del mes actual
-        self._update_current_month_day(canvas, rect, day_txt, name_txt, day_info)
+        # El día está disponible
+        return (AppConfig.COLORS['available'], day_text, text_color, '', bar)
     
-    def _update_other_month_day(self, canvas, rect, day_txt, name_txt):
+    def _fill_level(self, day_info):
         """
-        Actualizar visualización para días no en el mes actual.
+        Calcular la barra de ocupación del día en todos los recursos.
+        
+        Args:
+            day_info (DayInfo): Información del día
+            
+        Returns:
+            tuple: (fracción ocupada entre 0 y 1, color), o None sin capacidad o sin huéspedes
+        """
+        if not day_info.capacity or not day_info.guests:
+            return None
+        fraction = min(1.0, day_info.guests / day_info.capacity)
+        color = AppConfig.COLORS['capacity_full' if fraction >= 1 else 'capacity_fill']
+        # Redondear evita redibujar la barra por diferencias invisibles
+        return (round(fraction, 2), color)
+    
+    def _place_fill_bar(self, canvas, canvas_ids, bar):
+        """
+        Colocar la barra de ocupación en el borde inferior de la celda.
         
         Args:
             canvas: Widget canvas
-            rect: ID del rectángulo de fondo
-            day_txt: ID del texto del día
-            name_txt: ID del texto del nombre
+            canvas_ids (dict): Diccionario con IDs de elementos del canvas
+            bar (tuple): (fracción, color) devuelto por _fill_level, o None
         """
-        try:
-            canvas.itemconfig(day_txt, fill=AppConfig.COLORS['text_other'])
-            canvas.itemconfig(rect, fill=AppConfig.COLORS['other_month'])
-            canvas.itemconfig(name_txt, text='')
-        except Exception:
-            # Manejar casos donde los widgets podrían haber sido destruidos
-            pass
+        item = canvas_ids['fill_bar']
+        if bar is None:
+            canvas.coords(item, 0, 0, 0, 0)
+            return
+        fraction, color = bar
+        x0, y0, x1, y1 = canvas.coords(canvas_ids['rect'])
+        canvas.coords(item, x0, y1 - AppConfig.CAPACITY['bar_height'], x0 + (x1 - x0) * fraction, y1)
+        canvas.itemconfig(item, fill=color)
     
-    def _update_current_month_day(self, canvas, rect, day_txt, name_txt, day_info):
+    def _apply_cell_style(self, canvas, canvas_ids, style):
         """
-        Actualizar visualización para días del mes actual.
+        Aplicar una apariencia calculada a los elementos de una celda.
+        
+        Compara con la última apariencia aplicada y sólo emite `itemconfig`
+        para los elementos y atributos que cambiaron: cada llamada es un viaje
+        al intérprete Tcl y la mayoría de refrescos cambian una o dos celdas.
         
         Args:
             canvas: Widget canvas
-            rect: ID del rectángulo de fondo
-            day_txt: ID del texto del día
-            name_txt: ID del texto del nombre
-            day_info (dict): Información del día
+            canvas_ids (dict): Diccionario con IDs de elementos del canvas
+            style (tuple): Apariencia devuelta por _cell_style
         """
-        day = day_info['date']
-        reservation = day_info['reservation']
-        is_available = day_info['is_available']
+        key = (canvas, canvas_ids['rect'])
+        previous = self._cell_states.get(key)
+        if previous == style:
+            return
+        if previous is None:
+            previous = (None, None, None, None, None)
         
+        fill, day_text, text_color, name_text, bar = style
+        old_fill, old_day_text, old_text_color, old_name_text, old_bar = previous
         try:
-            # Siempre establecer el número del día
-            canvas.itemconfig(day_txt, text=str(day.day))
+            if fill != old_fill:
+                canvas.itemconfig(canvas_ids['rect'], fill=fill)
             
-            if reservation:
-                # El día tiene una reserva
-                status = reservation.get('payment_status', '')
-                color = self.style_manager.get_color_for_status(reservation_status=status)
-                canvas.itemconfig(rect, fill=color)
-                
-                display_name = f"{reservation.get('first_name','')} {reservation.get('last_name','')}".strip()
-                canvas.itemconfig(name_txt, text=display_name)
-                
-            elif not is_available:
-                # El día está marcado como no disponible
-                canvas.itemconfig(rect, fill=AppConfig.COLORS['unavailable'])
-                canvas.itemconfig(name_txt, text=AppConfig.LABELS['unavailable_msg'])
-                
-            else:
-                # El día está disponible
-                canvas.itemconfig(rect, fill=AppConfig.COLORS['available'])
-                canvas.itemconfig(name_txt, text='')
-                
+            day_options = {}
+            if day_text != old_day_text:
+                day_options['text'] = day_text
+            if text_color != old_text_color:
+                day_options['fill'] = text_color
+            if day_options:
+                canvas.itemconfig(canvas_ids['day_txt'], **day_options)
+            
+            if name_text != old_name_text:
+                canvas.itemconfig(canvas_ids['name_txt'], text=name_text)
+            
+            if bar != old_bar:
+                self._place_fill_bar(canvas, canvas_ids, bar)
         except Exception:
             # Manejar casos donde los widgets podrían haber sido destruidos
-            pass
+            self._cell_states.pop(key, None)
+            return
+        self._cell_states[key] = style
     
     def get_day_buttons(self):
         """
@@ -0,0 +1,202 @@
+"""
+Renderizado del calendario en un único Canvas para Kumbayah Calendar App.
+
+Alternativa a CalendarRenderer que dibuja el mes completo sobre un solo
+widget Canvas con elementos etiquetados, en lugar de un Canvas por día.
+Los clics se traducen a fechas por coordenadas, lo que evita crear 42
+ventanas nativas por mes y hace el redimensionado mucho más fluido.
+"""
+import tkinter as tk
+from config.app_config import AppConfig
+from ui.calendar_renderer import CalendarRenderer
+
+
+class CanvasCalendarRenderer(CalendarRenderer):
+    """
+    Renderiza la cuadrícula del mes en un único Canvas.
+
+    Responsable de:
+    - Crear una sola vez los elementos de las 42 celdas posibles
+    - Reutilizar esos elementos al cambiar de mes
+    - Reposicionar la cuadrícula cuando cambia el tamaño del Canvas
+    - Traducir coordenadas de clic a fechas
+
+    La apariencia de cada celda se calcula con la misma lógica que
+    CalendarRenderer, por lo que ambos modos se ven igual.
+    """
+
+    def __init__(self, calendar_frame, title_label, style_manager, calendar_logic, event_handler=None):
+        """
+        Inicializar renderizador de Canvas único.
+
+        Args:
+            calendar_frame: Widget frame donde se colocará el Canvas
+            title_label: Widget label para título de mes/año
+            style_manager: Instancia de StyleManager para fuentes y colores
+            calendar_logic: Instancia de CalendarLogic para datos
+            event_handler: Instancia de EventHandler para interacciones del usuario (opcional)
+        """
+        super().__init__(calendar_frame, title_label, style_manager, calendar_logic, event_handler)
+
+        self.canvas = None
+        self.slots = []  # IDs de elementos por celda, en orden de fila y columna
+        self.weekday_ids = []
+        self._geometry = None  # Última geometría aplicada (ancho_celda, alto_celda, filas)
+
+    def draw_calendar(self):
+        """
+        Dibujar el calendario completo para el mes actual.
+
+        Reutiliza los elementos existentes del Canvas: sólo actualiza los
+        elementos cuyo estado cambió y oculta las filas que el mes no necesita.
+        """
+        if self.canvas is None:
+            self._create_canvas()
+
+        self._update_title()
+
+        month_calendar_data = self.calendar_logic.get_month_calendar_data()
+        rows = len(month_calendar_data)
+        if rows != self.rows:
+            self.rows = rows
+            self._show_rows(rows)
+
+        self.day_buttons = []
+        for row_idx, week_data in enumerate(month_calendar_data):
+            for col_idx, day_info in enumerate(week_data):
+                canvas_ids = self.slots[row_idx * 7 + col_idx]
+                self._update_canvas_content(self.canvas, canvas_ids, day_info)
+                self.day_buttons.append((day_info.date, self.canvas, canvas_ids))
+
+        self._layout()
+
+    def day_at(self, x, y):
+        """
+        Obtener el día que se encuentra en unas coordenadas del Canvas.
+
+        Args:
+            x (int): Coordenada horizontal dentro del Canvas
+            y (int): Coordenada vertical dentro del Canvas
+
+        Returns:
+            datetime.date: Día bajo el punto, o None si cae fuera de una celda
+        """
+        if not self._geometry:
+            return None
+        cell_width, cell_height, rows = self._geometry
+        pad_x, pad_y = AppConfig.PADDING['cell']
+        pitch_x = cell_width + 2 * pad_x
+        pitch_y = cell_height + 2 * pad_y
+
+        y -= AppConfig.WEEKDAY_HEADER_HEIGHT
+        if x < 0 or y < 0:
+            return None
+        col, offset_x = divmod(int(x), pitch_x)
+        row, offset_y = divmod(int(y), pitch_y)
+        if col >= 7 or row >= rows:
+            return None
+        # Los márgenes entre celdas no pertenecen a ningún día
+        if not (pad_x <= offset_x < pad_x + cell_width and pad_y <= offset_y < pad_y + cell_height):
+            return None
+
+        index = row * 7 + col
+        if index >= len(self.day_buttons):
+            return None
+        return self.day_buttons[index][0]
+
+    def day_from_event(self, event):
+        """
+        Obtener el día bajo el puntero de un evento de ratón.
+
+        Args:
+            event: Evento de Tkinter sobre el Canvas
+
+        Returns:
+            datetime.date: Día bajo el puntero, o None si no hay celda
+        """
+        return self.day_at(event.x, event.y)
+
+    def _create_canvas(self):
+        """Crear el Canvas y todos los elementos de las celdas."""
+        pad_x, pad_y = AppConfig.PADDING['cell']
+        self.canvas = tk.Canvas(
+            self.calendar_frame,
+            width=7 * (AppConfig.CELL_SIZE['width'] + 2 * pad_x),
+            height=AppConfig.WEEKDAY_HEADER_HEIGHT + self.MAX_WEEKS * (AppConfig.CELL_SIZE['height'] + 2 * pad_y),
+            background=self.style_manager.style.lookup('TFrame', 'background') or None,
+            highlightthickness=0
+        )
+        self.canvas.pack(fill='both', expand=True)
+
+        # Encabezado de días de la semana dibujado sobre el mismo Canvas
+        self.weekday_ids = [
+            self.canvas.create_text(0, 0, text=day_name, tags=('weekday',))
+            for day_name in AppConfig.WEEKDAYS
+        ]
+
+        self.slots = []
+        for index in range(self.MAX_WEEKS * 7):
+            self.slots.append(self._create_canvas_items(self.canvas, tags=('cell', f'cell{index}')))
+
+        self.canvas.bind('<Configure>', lambda event: self._layout())
+        if self.event_handler:
+            self.event_handler.create_day_cell_bindings(self.canvas, self.day_from_event)
+
+    def _show_rows(self, rows):
+        """
+        Mostrar sólo las filas de semanas que necesita el mes actual.
+
+        Args:
+            rows (int): Número de semanas del mes
+        """
+        for index in range(len(self.slots)):
+            state = 'normal' if index < rows * 7 else 'hidden'
+            self.canvas.itemconfig(f'cell{index}', state=state)
+
+        # Pedir la altura natural del mes, igual que la cuadrícula de widgets
+        pad_y = AppConfig.PADDING['cell'][1]
+        self.canvas.config(
+            height=AppConfig.WEEKDAY_HEADER_HEIGHT + rows * (AppConfig.CELL_SIZE['height'] + 2 * pad_y)
+        )
+
+    def _layout(self):
+        """
+        Posicionar las celdas según el tamaño actual del Canvas.
+
+        Sólo emite comandos de coordenadas cuando la geometría cambió.
+        """
+        if self.canvas is None or not self.rows:
+            return
+        pad_x, pad_y = AppConfig.PADDING['cell']
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            # Aún no está mapeado: usar el tamaño solicitado
+            width = int(self.canvas.cget('width'))
+            height = int(self.canvas.cget('height'))
+
+        cell_width = max(1, width // 7 - 2 * pad_x)
+        cell_height = max(1, (height - AppConfig.WEEKDAY_HEADER_HEIGHT) // self.rows - 2 * pad_y)
+        geometry = (cell_width, cell_height, self.rows)
+        if geometry == self._geometry:
+            return
+        self._geometry = geometry
+
+        pitch_x = cell_width + 2 * pad_x
+        pitch_y = cell_height + 2 * pad_y
+        header_y = AppConfig.WEEKDAY_HEADER_HEIGHT / 2
+        for col, item in enumerate(self.weekday_ids):
+            self.canvas.coords(item, col * pitch_x + pitch_x / 2, header_y)
+
+        for index, canvas_ids in enumerate(self.slots[:self.rows * 7]):
+            row, col = divmod(index, 7)
+            x0 = col * pitch_x + pad_x
+            y0 = AppConfig.WEEKDAY_HEADER_HEIGHT + row * pitch_y + pad_y
+            self.canvas.coords(canvas_ids['rect'], x0, y0, x0 + cell_width, y0 + cell_height)
+            self.canvas.coords(canvas_ids['day_txt'], x0 + 8, y0 + 8)
+            self.canvas.coords(canvas_ids['name_txt'], x0 + 8, y0 + 36)
+            self.canvas.itemconfig(canvas_ids['name_txt'], width=max(1, cell_width - 16))
+            # La barra de ocupación depende del ancho de la celda
+            state = self._cell_states.get((self.canvas, canvas_ids['rect']))
+            if state is not None and state[4] is not None:
+                self._place_fill_bar(self.canvas, canvas_ids, state[4])
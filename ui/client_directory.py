@@ -0,0 +1,168 @@
+"""
+Directorio de clientes para Kumbayah Calendar App.
+
+Lista todos los clientes con desplazamiento virtual (PagedTreeview) y, para el
+cliente seleccionado, su historial de reservas en todos los recursos. La
+lista se pagina por clave sobre índices de la tabla clients y el historial
+sólo se consulta cuando la selección se detiene en un cliente.
+"""
+import tkinter as tk
+from tkinter import ttk
+from datetime import date
+from config.app_config import AppConfig
+from ui.paged_list import PagedTreeview
+
+# Orden de la lista según la columna pulsada (ver CLIENT_SORTS en modules/repository.py)
+COLUMN_SORTS = ('id', 'name', 'name', 'phone')
+
+
+class ClientDirectory:
+    """
+    Ventana con el directorio de clientes y el historial del seleccionado.
+
+    Responsable de:
+    - Listar clientes por páginas a medida que se desplaza la lista
+    - Ordenar por número de cliente, apellido y nombre o teléfono
+    - Cargar el historial de reservas sólo del cliente seleccionado
+    - Abrir en el calendario principal el día de una reserva del historial
+    - Releer la lista y el historial cuando cambian clientes o reservas (EventBus)
+    """
+
+    def __init__(self, parent, calendar_logic, on_open_day=None):
+        """
+        Inicializar directorio de clientes.
+
+        Args:
+            parent: Ventana principal de la aplicación
+            calendar_logic: Instancia de CalendarLogic para datos
+            on_open_day: Callback (resource_id, date) al hacer doble click en una reserva
+        """
+        self.parent = parent
+        self.calendar_logic = calendar_logic
+        self.on_open_day = on_open_day
+        self.window = None
+        self.client_list = None
+        self.client_label = None
+        self.history = None
+        self.sort = 'name'
+        self._history_rows = {}
+        self._pending_detail = None
+        self._client = None  # Cliente cuyo historial se muestra
+
+    def show(self):
+        """Abrir el directorio, o traerlo al frente y recargarlo si ya está abierto."""
+        if self.window is not None and self.window.winfo_exists():
+            self.window.lift()
+        else:
+            self.window = tk.Toplevel(self.parent)
+            self.window.title(AppConfig.LABELS['clients_title'])
+            self._create_widgets()
+            self._client = None
+        self.client_list.reload()
+
+    def _create_widgets(self):
+        """Crear la lista de clientes y el panel de historial."""
+        config = AppConfig.CLIENT_DIRECTORY
+        pad_x, pad_y = AppConfig.PADDING['main_frame']
+        columns = AppConfig.LABELS['client_columns']
+
+        self.client_list = PagedTreeview(
+            self.window, columns,
+            fetch_page=self._fetch_page,
+            row_key=lambda client: self.calendar_logic.clients_manager.page_key(self.sort, client),
+            row_values=lambda client: (client.id, client.last_name or '', client.first_name or '',
+                                       client.phone or ''),
+            page_size=config['page_size'],
+            max_pages=config['max_pages'],
+            on_select=self._on_client_selected,
+            height=config['visible_rows']
+        )
+        for index, column in enumerate(columns):
+            self.client_list.tree.heading(column, command=lambda sort=COLUMN_SORTS[index]: self._set_sort(sort))
+            self.client_list.tree.column(column, width=60 if index == 0 else 130, anchor='e' if index == 0 else 'w')
+        self._update_headings()
+        self.client_list.frame.pack(side='left', fill='both', expand=True, padx=pad_x, pady=pad_y)
+
+        detail = ttk.Frame(self.window)
+        detail.pack(side='left', fill='both', expand=True, padx=pad_x, pady=pad_y)
+        self.client_label = ttk.Label(detail, text='')
+        self.client_label.pack(anchor='w')
+        ttk.Label(detail, text=AppConfig.LABELS['client_history']).pack(anchor='w')
+        history_columns = AppConfig.LABELS['history_columns']
+        self.history = ttk.Treeview(detail, columns=history_columns, show='headings',
+                                    height=config['visible_rows'] - 2, selectmode='browse')
+        for index, column in enumerate(history_columns):
+            self.history.heading(column, text=column)
+            self.history.column(column, width=90, anchor='e' if index in (2, 3) else 'w')
+        self.history.pack(fill='both', expand=True)
+        self.history.bind('<Double-1>', self._on_history_open)
+
+    def _fetch_page(self, key, forward, limit):
+        return self.calendar_logic.clients_manager.get_page(self.sort, key, forward, limit)
+
+    def _set_sort(self, sort):
+        """Ordenar por otra columna y volver al principio de la lista."""
+        if sort == self.sort:
+            return
+        self.sort = sort
+        self._update_headings()
+        self.client_list.reload()
+
+    def _update_headings(self):
+        """Marcar las columnas del orden actual."""
+        for index, column in enumerate(AppConfig.LABELS['client_columns']):
+            marker = AppConfig.LABELS['sort_marker'] if COLUMN_SORTS[index] == self.sort else ''
+            self.client_list.tree.heading(column, text=column + marker)
+
+    def _on_client_selected(self, client):
+        """
+        Programar la carga del historial del cliente seleccionado.
+
+        Al recorrer la lista con el teclado la selección cambia en cada fila;
+        la consulta sólo se hace cuando se detiene un momento en un cliente.
+        """
+        if self._pending_detail is not None:
+            self.window.after_cancel(self._pending_detail)
+        self.client_label.config(text=f"{client.first_name or ''} {client.last_name or ''} · {client.phone or ''}")
+        self._pending_detail = self.window.after(AppConfig.CLIENT_DIRECTORY['detail_delay_ms'],
+                                                 self._load_history, client)
+
+    def _load_history(self, client):
+        """Mostrar las reservas del cliente en todos los recursos."""
+        self._pending_detail = None
+        self._client = client
+        names = {resource.id: resource.name
+                 for resource in self.calendar_logic.resources_manager.get_resources(include_inactive=True)}
+        reservations = self.calendar_logic.reservations_manager.get_client_history(
+            client.id, AppConfig.CLIENT_DIRECTORY['history_limit'])
+        self.history.delete(*self.history.get_children())
+        self._history_rows = {}
+        for reservation in reservations:
+            iid = self.history.insert('', 'end', values=(
+                reservation.date,
+                names.get(reservation.resource_id, reservation.resource_id),
+                reservation.guests,
+                f'{reservation.amount or 0.0:.2f}',
+                reservation.payment_status or ''
+            ))
+            self._history_rows[iid] = reservation
+
+    def on_client_changed(self, event):
+        """Releer la lista desde la primera fila visible si el directorio está abierto."""
+        if self._is_open():
+            self.client_list.refresh()
+
+    def on_dates_changed(self, event):
+        """Releer el historial del cliente mostrado (sus reservas pueden haber cambiado)."""
+        if self._is_open() and self._client is not None and self._pending_detail is None:
+            self._load_history(self._client)
+
+    def _is_open(self):
+        return self.window is not None and self.window.winfo_exists()
+
+    def _on_history_open(self, event=None):
+        """Abrir en el calendario principal el recurso y el día de la reserva."""
+        selection = self.history.selection()
+        reservation = self._history_rows.get(selection[0]) if selection else None
+        if reservation is not None and self.on_open_day:
+            self.on_open_day(reservation.resource_id, date.fromisoformat(reservation.date))
@@ -2,7 +2,7 @@
 Componentes de UI reutilizables para Kumbayah Calendar App.
 
 Extraído de main.py líneas 36-57 para crear componentes modulares y reutilizables.
-Incluye componentes CalendarHeader y CalendarLegend.
+Incluye componentes CalendarHeader, CalendarLegend y CalendarControls.
 """
 import tkinter as tk
 from tkinter import ttk
@@ -133,36 +133,97 @@ class CalendarLegend:
 
 class CalendarControls:
     """
-    Frame de controles que contiene leyenda y sugerencia de disponibilidad.
+    Frame de controles que contiene leyenda, sugerencia de disponibilidad y
+    selector de recurso.
     
     Extraído y mejorado de main.py líneas 46-48 y 51-57.
-    Combina el botón de sugerencia y leyenda en un solo frame.
+    Combina el botón de sugerencia, la leyenda y el recurso mostrado en un solo frame.
     """
     
-    def __init__(self, parent):
+    def __init__(self, parent, resources=(), on_resource_change=None, on_show_occupancy=None,
+                 on_show_clients=None, on_show_agenda=None, selected_id=None):
         """
         Inicializar controles del calendario.
         
         Args:
             parent: Widget padre (tk.Frame)
+            resources (list): Registros Resource para el selector
+            on_resource_change: Callback con el id del recurso elegido
+            on_show_occupancy: Callback para abrir la vista de ocupación
+            on_show_clients: Callback para abrir el directorio de clientes
+            on_show_agenda: Callback para abrir la agenda de reservas
+            selected_id (int): Recurso mostrado al iniciar (por defecto el primero)
         """
         self.parent = parent
+        self.on_resource_change = on_resource_change
+        self.on_show_occupancy = on_show_occupancy
+        self.on_show_clients = on_show_clients
+        self.on_show_agenda = on_show_agenda
+        self.resources = []
+        self.resource_selector = None
         self.frame = ttk.Frame(parent)
         self._create_widgets()
+        self.set_resources(resources, selected_id)
     
     def _create_widgets(self):
-        """Crear controles con botón de sugerencia y leyenda."""
+        """Crear controles con selector de recurso, botón de sugerencia y leyenda."""
+        # Selector de recurso (cabaña, parcela, salón), vista de todos, directorio de clientes y agenda
+        resource_frame = ttk.Frame(self.frame)
+        resource_frame.grid(row=0, column=0, padx=AppConfig.PADDING['legend_item'] * 2)
+        ttk.Label(resource_frame, text=AppConfig.LABELS['resource']).grid(row=0, column=0)
+        self.resource_selector = ttk.Combobox(resource_frame, state='readonly', width=16)
+        self.resource_selector.grid(row=0, column=1, padx=AppConfig.PADDING['legend_item'])
+        self.resource_selector.bind('<<ComboboxSelected>>', self._on_resource_selected)
+        ttk.Button(
+            resource_frame,
+            text=AppConfig.LABELS['occupancy'],
+            command=lambda: self.on_show_occupancy and self.on_show_occupancy()
+        ).grid(row=0, column=2)
+        ttk.Button(
+            resource_frame,
+            text=AppConfig.LABELS['clients'],
+            command=lambda: self.on_show_clients and self.on_show_clients()
+        ).grid(row=0, column=3, padx=AppConfig.PADDING['legend_item'])
+        ttk.Button(
+            resource_frame,
+            text=AppConfig.LABELS['agenda'],
+            command=lambda: self.on_show_agenda and self.on_show_agenda()
+        ).grid(row=0, column=4)
+        
         # Botón de sugerencia de disponibilidad (deshabilitado, solo visual)
         hint_btn = ttk.Button(
             self.frame, 
             text=AppConfig.LABELS['availability_hint'],
             command=lambda: None
         )
-        hint_btn.grid(row=0, column=0)
+        hint_btn.grid(row=0, column=1)
         
         # Leyenda
         legend = CalendarLegend(self.frame)
-        legend.grid(row=0, column=1, padx=AppConfig.PADDING['legend_item'] * 2)
+        legend.grid(row=0, column=2, padx=AppConfig.PADDING['legend_item'] * 2)
+    
+    def set_resources(self, resources, selected_id=None):
+        """
+        Actualizar la lista de recursos del selector.
+        
+        Args:
+            resources (list): Registros Resource
+            selected_id (int): Recurso a mostrar seleccionado (por defecto el primero)
+        """
+        self.resources = list(resources)
+        self.resource_selector.config(values=[resource.name for resource in self.resources])
+        ids = [resource.id for resource in self.resources]
+        if ids:
+            self.resource_selector.current(ids.index(selected_id) if selected_id in ids else 0)
+    
+    def select_resource(self, resource_id):
+        """Mostrar un recurso como seleccionado sin notificar el cambio."""
+        self.set_resources(self.resources, resource_id)
+    
+    def _on_resource_selected(self, event=None):
+        index = self.resource_selector.current()
+        if self.on_resource_change and 0 <= index < len(self.resources):
+            self.on_resource_change(self.resources[index].id)
     
     def pack(self, **kwargs):
         """Empaquetar el frame de controles."""
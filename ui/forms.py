@@ -8,7 +8,12 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 from config.app_config import AppConfig
-from utils.validators import validate_client_data, validate_reservation_data, is_reference_required
+from modules.capacity import OverbookingError
+from modules.payments import OverpaymentError
+from modules.events import DatesChanged
+from ui.audit_panel import AuditHistoryPanel
+from utils.validators import validate_client_data, validate_reservation_data, validate_guests, is_reference_required
+from utils.telemetry import telemetry, FORM_SAVE
 
 
 class ReservationForm:
@@ -19,18 +24,16 @@ class ReservationForm:
     Maneja entrada del usuario para crear nuevas reservas con validación.
     """
     
-    def __init__(self, parent, calendar_logic, update_cell_callback):
+    def __init__(self, parent, calendar_logic):
         """
         Inicializar formulario de reserva.
         
         Args:
             parent: Widget padre (ventana principal)
             calendar_logic: Instancia de CalendarLogic para lógica de negocio
-            update_cell_callback: Función para actualizar celda del calendario después del envío del formulario
         """
         self.parent = parent
         self.calendar_logic = calendar_logic
-        self.update_cell_callback = update_cell_callback
     
     def open(self, day_str):
         """
@@ -54,7 +57,7 @@ class ReservationForm:
             day_str (str): Cadena de fecha para la reserva
         """
         labels = [AppConfig.LABELS['name'], AppConfig.LABELS['last_name'], 
-                  AppConfig.LABELS['phone'], AppConfig.LABELS['amount']]
+                  AppConfig.LABELS['phone'], AppConfig.LABELS['guests'], AppConfig.LABELS['amount']]
         entries = {}
         
         # Crear campos de entrada
@@ -72,6 +75,11 @@ class ReservationForm:
                 pady=AppConfig.PADDING['form_field'][1]
             )
             entries[label] = entry
+        entries[AppConfig.LABELS['guests']].insert(0, str(AppConfig.CAPACITY['default_guests']))
+        # Monto según las tarifas del recurso para ese día (editable)
+        price = self.calendar_logic.get_price(day_str)
+        if price is not None:
+            entries[AppConfig.LABELS['amount']].insert(0, f'{price:.2f}')
         
         # Crear dropdown de estado de pago
         self._create_payment_status_dropdown(form, entries)
@@ -84,12 +92,12 @@ class ReservationForm:
             form, 
             text=AppConfig.LABELS['save'], 
             command=lambda: self._submit_form(entries, day_str, form)
-        ).grid(row=7, column=0, columnspan=2, pady=8)
+        ).grid(row=8, column=0, columnspan=2, pady=8)
     
     def _create_payment_status_dropdown(self, form, entries):
         """Crear dropdown de estado de pago."""
         ttk.Label(form, text=AppConfig.LABELS['payment_status']).grid(
-            row=4, column=0, 
+            row=5, column=0, 
             padx=AppConfig.PADDING['form_field'][0], 
             pady=AppConfig.PADDING['form_field'][1],
             sticky='e'
@@ -98,7 +106,7 @@ class ReservationForm:
         pay_status = ttk.Combobox(form, values=AppConfig.PAYMENT_STATUSES, state='readonly')
         pay_status.current(0)
         pay_status.grid(
-            row=4, column=1, 
+            row=5, column=1, 
             padx=AppConfig.PADDING['form_field'][0], 
             pady=AppConfig.PADDING['form_field'][1]
         )
@@ -107,7 +115,7 @@ class ReservationForm:
     def _create_payment_method_dropdown(self, form, entries):
         """Crear dropdown de método de pago con campo de referencia condicional."""
         ttk.Label(form, text=AppConfig.LABELS['payment_method']).grid(
-            row=5, column=0, 
+            row=6, column=0, 
             padx=AppConfig.PADDING['form_field'][0], 
             pady=AppConfig.PADDING['form_field'][1],
             sticky='e'
@@ -116,7 +124,7 @@ class ReservationForm:
         pay_method = ttk.Combobox(form, values=AppConfig.PAYMENT_METHODS, state='readonly')
         pay_method.current(0)
         pay_method.grid(
-            row=5, column=1, 
+            row=6, column=1, 
             padx=AppConfig.PADDING['form_field'][0], 
             pady=AppConfig.PADDING['form_field'][1]
         )
@@ -128,13 +136,13 @@ class ReservationForm:
         def on_method_change(event=None):
             if is_reference_required(pay_method.get()):
                 ref_label.grid(
-                    row=6, column=0, 
+                    row=7, column=0, 
                     padx=AppConfig.PADDING['form_field'][0], 
                     pady=AppConfig.PADDING['form_field'][1],
                     sticky='e'
                 )
                 ref_entry.grid(
-                    row=6, column=1, 
+                    row=7, column=1, 
                     padx=AppConfig.PADDING['form_field'][0], 
                     pady=AppConfig.PADDING['form_field'][1]
                 )
@@ -161,6 +169,7 @@ class ReservationForm:
         fn = entries[AppConfig.LABELS['name']].get().strip()
         ln = entries[AppConfig.LABELS['last_name']].get().strip()
         phone = entries[AppConfig.LABELS['phone']].get().strip()
+        guests = entries[AppConfig.LABELS['guests']].get().strip()
         amount = entries[AppConfig.LABELS['amount']].get().strip()
         ps = entries['payment_status'].get()
         pm = entries['payment_method'].get()
@@ -174,25 +183,28 @@ class ReservationForm:
         
         # Validar datos de reserva
         reservation_valid, reservation_error = validate_reservation_data(amount, pm, ref)
+        if reservation_valid:
+            reservation_valid, reservation_error = validate_guests(guests)
         if not reservation_valid:
             messagebox.showerror('Error', reservation_error)
             return
         
-        # Guardar reserva
-        self.calendar_logic.add_or_update_reservation(
-            day_str,
-            {'first_name': fn, 'last_name': ln, 'phone': phone},
-            {'amount': float(amount), 'payment_status': ps, 'payment_method': pm, 'reference': ref}
-        )
+        # Guardar reserva; la capacidad se comprueba en la misma transacción
+        started = telemetry.start()
+        try:
+            self.calendar_logic.add_or_update_reservation(
+                day_str,
+                {'first_name': fn, 'last_name': ln, 'phone': phone},
+                {'amount': float(amount), 'guests': int(guests), 'payment_status': ps, 'payment_method': pm,
+                 'reference': ref}
+            )
+        except OverbookingError as exc:
+            messagebox.showerror('Error', str(exc))
+            return
         
-        # Cerrar formulario y actualizar calendario
+        # Cerrar formulario; la celda se actualiza al publicarse el cambio
         form.destroy()
-        try:
-            d = datetime.fromisoformat(day_str).date()
-            self.update_cell_callback(d)
-        except Exception:
-            # Si la actualización de celda individual falla, el calendario se redibujará externamente
-            pass
+        telemetry.finish_when_idle(FORM_SAVE, started)
 
 
 class ReservationDetailsDialog:
@@ -203,7 +215,7 @@ class ReservationDetailsDialog:
     Soporta modos de solo lectura y edición con funcionalidad CRUD completa.
     """
     
-    def __init__(self, parent, font_day, font_client, calendar_logic, update_cell_callback, redraw_calendar_callback):
+    def __init__(self, parent, font_day, font_client, calendar_logic, events):
         """
         Inicializar diálogo de detalles de reserva.
         
@@ -212,25 +224,25 @@ class ReservationDetailsDialog:
             font_day: Fuente para etiquetas
             font_client: Fuente para visualización de datos
             calendar_logic: Instancia de CalendarLogic para lógica de negocio
-            update_cell_callback: Función para actualizar celda individual
-            redraw_calendar_callback: Función para redibujar calendario completo
+            events: EventBus donde se publican los días cambiados
         """
         self.parent = parent
         self.font_day = font_day
         self.font_client = font_client
         self.calendar_logic = calendar_logic
-        self.update_cell_callback = update_cell_callback
-        self.redraw_calendar_callback = redraw_calendar_callback
+        self.events = events
+        self._history_panels = {}  # Ventana del diálogo -> AuditHistoryPanel
+        self._editing = set()      # Ventanas en modo edición (no se releen hasta guardar o cancelar)
     
     def show(self, reservation):
         """
         Mostrar diálogo de detalles de reserva.
         
         Args:
-            reservation (dict): Diccionario de datos de reserva
+            reservation (Reservation): Registro de la reserva
         """
         form = tk.Toplevel(self.parent)
-        form.title(f"{AppConfig.LABELS['details_title_prefix']}{reservation['date']}")
+        form.title(f"{AppConfig.LABELS['details_title_prefix']}{reservation.date}")
         form.geometry(AppConfig.FORM_DIMENSIONS['details'])
         
         # Crear componentes del diálogo
@@ -243,9 +255,30 @@ class ReservationDetailsDialog:
         btn_frame = ttk.Frame(form)
         btn_frame.grid(row=1, column=0, pady=8)
         
+        # Historial de cambios (fila 2): se crea y consulta al pulsar "Historial"
+        self._history_panels[form] = AuditHistoryPanel(form, self.calendar_logic, reservation.resource_id,
+                                                       reservation.date)
+        
+        # Releer la reserva cada vez que cambie su día, desde este diálogo o
+        # desde otra ventana (p. ej. al deshacer); al cerrar se deja de escuchar
+        day = datetime.fromisoformat(reservation.date).date()
+        
+        def on_dates_changed(event):
+            if day in event.days and reservation.resource_id in event.resource_ids and form not in self._editing:
+                self._refresh_details(info_frame, btn_frame, reservation, form)
+        
+        self.events.subscribe(DatesChanged, on_dates_changed)
+        form.bind('<Destroy>', lambda event: event.widget is form and self._forget(form, on_dates_changed))
+        
         # Estado inicial: solo lectura
         self._show_readonly_view(info_frame, btn_frame, reservation, form)
     
+    def _forget(self, form, on_dates_changed):
+        """Dejar de escuchar cambios y olvidar el estado de un diálogo cerrado."""
+        self.events.unsubscribe(DatesChanged, on_dates_changed)
+        self._history_panels.pop(form, None)
+        self._editing.discard(form)
+    
     def _show_readonly_view(self, info_frame, btn_frame, reservation, form):
         """Mostrar detalles de reserva en modo de solo lectura."""
         # Limpiar frame de información
@@ -254,31 +287,120 @@ class ReservationDetailsDialog:
         
         # Mostrar información de solo lectura
         readonly_data = [
-            (AppConfig.LABELS['name'] + ':', f"{reservation.get('first_name','')} {reservation.get('last_name','')}"),
-            (AppConfig.LABELS['phone'] + ':', reservation.get('phone','')),
-            (AppConfig.LABELS['amount'] + ':', reservation.get('amount','')),
-            (AppConfig.LABELS['payment_status'] + ':', reservation.get('payment_status','')),
-            (AppConfig.LABELS['payment_method'] + ':', reservation.get('payment_method',''))
+            (AppConfig.LABELS['name'] + ':', reservation.client_name),
+            (AppConfig.LABELS['phone'] + ':', reservation.phone or ''),
+            (AppConfig.LABELS['guests'] + ':', str(reservation.guests)),
+            (AppConfig.LABELS['amount'] + ':', _format_amount(reservation.amount)),
+            (AppConfig.LABELS['paid_total'] + ':', _format_amount(reservation.paid_total)),
+            (AppConfig.LABELS['balance'] + ':', _format_amount(reservation.balance)),
+            (AppConfig.LABELS['payment_status'] + ':', reservation.payment_status or ''),
+            (AppConfig.LABELS['payment_method'] + ':', reservation.payment_method or '')
         ]
+        # Agregar referencia si existe
+        if reservation.reference:
+            readonly_data.append((AppConfig.LABELS['reference'] + ':', reservation.reference))
         
         for i, (label, value) in enumerate(readonly_data):
             ttk.Label(info_frame, text=label, font=self.font_day).grid(row=i, column=0, sticky='w')
             ttk.Label(info_frame, text=value, font=self.font_client).grid(row=i, column=1, sticky='w')
         
-        # Agregar referencia si existe
-        if reservation.get('reference'):
-            ttk.Label(info_frame, text=AppConfig.LABELS['reference'] + ':', font=self.font_day).grid(
-                row=5, column=0, sticky='w'
-            )
-            ttk.Label(info_frame, text=reservation.get('reference'), font=self.font_client).grid(
-                row=5, column=1, sticky='w'
-            )
+        # Historial de pagos y registro de un pago nuevo
+        self._create_payment_history(info_frame, btn_frame, reservation, form, len(readonly_data))
         
         # Crear botones de acción
         self._create_readonly_buttons(btn_frame, info_frame, reservation, form)
     
+    def _create_payment_history(self, info_frame, btn_frame, reservation, form, row):
+        """
+        Mostrar los pagos de la reserva y los campos para registrar otro.
+        
+        Args:
+            info_frame: Frame de información del diálogo
+            btn_frame: Frame de botones del diálogo
+            reservation (Reservation): Registro de la reserva
+            form: Ventana Toplevel del diálogo
+            row (int): Primera fila libre de info_frame
+        """
+        ttk.Label(info_frame, text=AppConfig.LABELS['payments_title'], font=self.font_day).grid(
+            row=row, column=0, columnspan=2, sticky='w', pady=(AppConfig.PADDING['form_field'][1] * 2, 0)
+        )
+        
+        columns = AppConfig.LABELS['payment_columns']
+        history = ttk.Treeview(info_frame, columns=columns, show='headings', height=4)
+        for i, column in enumerate(columns):
+            history.heading(column, text=column)
+            history.column(column, width=80, anchor='e' if i == 1 else 'w')
+        for payment in self.calendar_logic.get_payments(reservation.date, reservation.resource_id):
+            history.insert('', 'end', iid=str(payment.id), values=(
+                payment.paid_on, _format_amount(payment.amount), payment.method or '', payment.reference or '',
+                (payment.reconciled_at or '')[:10]
+            ))
+        history.grid(row=row + 1, column=0, columnspan=2, sticky='nsew')
+        
+        # Nuevo pago: monto (por defecto el saldo), método y referencia
+        new_frame = ttk.Frame(info_frame)
+        new_frame.grid(row=row + 2, column=0, columnspan=2, sticky='w', pady=AppConfig.PADDING['form_field'][1])
+        amount_entry = ttk.Entry(new_frame, width=10)
+        if reservation.balance > 0:
+            amount_entry.insert(0, _format_amount(reservation.balance))
+        amount_entry.grid(row=0, column=0)
+        method = ttk.Combobox(new_frame, values=AppConfig.PAYMENT_METHODS, state='readonly', width=13)
+        try:
+            method.current(AppConfig.PAYMENT_METHODS.index(reservation.payment_method))
+        except ValueError:
+            method.current(0)
+        method.grid(row=0, column=1, padx=AppConfig.PADDING['form_field'][0])
+        ref_entry = ttk.Entry(new_frame, width=12)
+        ref_entry.grid(row=0, column=2)
+        
+        ttk.Button(
+            new_frame,
+            text=AppConfig.LABELS['add_payment'],
+            command=lambda: self._add_payment(reservation, amount_entry.get().strip(), method.get(),
+                                              ref_entry.get().strip())
+        ).grid(row=1, column=0, columnspan=2, sticky='w', pady=AppConfig.PADDING['form_field'][1])
+        ttk.Button(
+            new_frame,
+            text=AppConfig.LABELS['delete_payment'],
+            command=lambda: self._delete_payment(history.selection())
+        ).grid(row=1, column=2, sticky='w', pady=AppConfig.PADDING['form_field'][1])
+    
+    def _add_payment(self, reservation, amount, method, reference):
+        """Validar y registrar un pago de la reserva (el diálogo se relee al publicarse el cambio)."""
+        valid, error = validate_reservation_data(amount, method, reference)
+        if valid and float(amount) <= 0:
+            valid, error = False, AppConfig.LABELS['amount_invalid']
+        if not valid:
+            messagebox.showerror('Error', error)
+            return
+        try:
+            self.calendar_logic.add_payment(reservation.date, float(amount), method, reference,
+                                            resource_id=reservation.resource_id)
+        except OverpaymentError as exc:
+            messagebox.showerror('Error', str(exc))
+    
+    def _delete_payment(self, selection):
+        """Eliminar el pago seleccionado en el historial tras confirmación."""
+        if not selection:
+            return
+        if messagebox.askyesno('Confirmar', AppConfig.LABELS['confirm_delete_payment']):
+            self.calendar_logic.delete_payment(int(selection[0]))
+    
+    def _refresh_details(self, info_frame, btn_frame, reservation, form):
+        """Releer la reserva (saldo y estado cambian con cada pago); cerrar si se eliminó."""
+        d = datetime.fromisoformat(reservation.date).date()
+        current = self.calendar_logic.get_day_status(d, reservation.resource_id).reservation
+        if current is None:
+            form.destroy()
+        else:
+            self._show_readonly_view(info_frame, btn_frame, current, form)
+            panel = self._history_panels.get(form)
+            if panel is not None and panel.visible:
+                panel.show(2)
+    
     def _create_readonly_buttons(self, btn_frame, info_frame, reservation, form):
         """Create buttons for read-only view."""
+        self._clear_buttons(btn_frame)
         ttk.Button(
             btn_frame, 
             text=AppConfig.LABELS['edit'], 
@@ -291,14 +413,36 @@ class ReservationDetailsDialog:
             command=lambda: self._delete_reservation(reservation, form)
         ).grid(row=0, column=1, padx=AppConfig.PADDING['button'])
         
+        ttk.Button(
+            btn_frame, 
+            text=AppConfig.LABELS['audit'], 
+            command=lambda: self._toggle_history(form)
+        ).grid(row=0, column=2, padx=AppConfig.PADDING['button'])
+        
         ttk.Button(
             btn_frame, 
             text=AppConfig.LABELS['close'], 
             command=form.destroy
-        ).grid(row=0, column=2, padx=AppConfig.PADDING['button'])
+        ).grid(row=0, column=3, padx=AppConfig.PADDING['button'])
+    
+    def _toggle_history(self, form):
+        """Mostrar u ocultar el historial de cambios bajo los botones."""
+        panel = self._history_panels[form]
+        if panel.visible:
+            panel.hide()
+        else:
+            panel.show(2)
+        # Ajustar el tamaño de la ventana a su contenido
+        form.geometry('')
+    
+    def _clear_buttons(self, btn_frame):
+        """Destruir los botones del modo anterior (si no, se acumulan ocultos)."""
+        for widget in btn_frame.winfo_children():
+            widget.destroy()
     
     def _enter_edit_mode(self, info_frame, btn_frame, reservation, form):
         """Switch to edit mode with input fields."""
+        self._editing.add(form)
         # Clear info frame
         for widget in info_frame.winfo_children():
             widget.destroy()
@@ -307,12 +451,13 @@ class ReservationDetailsDialog:
         edit_widgets = {}
         
         labels = [AppConfig.LABELS['name'], AppConfig.LABELS['last_name'], 
-                  AppConfig.LABELS['phone'], AppConfig.LABELS['amount']]
+                  AppConfig.LABELS['phone'], AppConfig.LABELS['guests'], AppConfig.LABELS['amount']]
         values = {
-            AppConfig.LABELS['name']: reservation['first_name'],
-            AppConfig.LABELS['last_name']: reservation['last_name'],
-            AppConfig.LABELS['phone']: reservation['phone'],
-            AppConfig.LABELS['amount']: str(reservation['amount']),
+            AppConfig.LABELS['name']: reservation.first_name,
+            AppConfig.LABELS['last_name']: reservation.last_name,
+            AppConfig.LABELS['phone']: reservation.phone or '',
+            AppConfig.LABELS['guests']: str(reservation.guests),
+            AppConfig.LABELS['amount']: str(reservation.amount),
         }
         
         # Create input fields
@@ -332,36 +477,13 @@ class ReservationDetailsDialog:
             entry.insert(0, values[label])
             edit_widgets[label] = entry
         
-        # Create payment status dropdown
-        self._create_edit_payment_status(info_frame, edit_widgets, reservation)
-        
+        # El estado de pago no se edita: se deriva de los pagos registrados
         # Create payment method dropdown
         self._create_edit_payment_method(info_frame, edit_widgets, reservation)
         
         # Create edit mode buttons
         self._create_edit_buttons(btn_frame, edit_widgets, reservation, form)
     
-    def _create_edit_payment_status(self, info_frame, edit_widgets, reservation):
-        """Create payment status dropdown for edit mode."""
-        ttk.Label(info_frame, text=AppConfig.LABELS['payment_status']).grid(
-            row=4, column=0, 
-            padx=AppConfig.PADDING['form_field'][0], 
-            pady=AppConfig.PADDING['form_field'][1],
-            sticky='e'
-        )
-        
-        pay_status = ttk.Combobox(info_frame, values=AppConfig.PAYMENT_STATUSES, state='readonly')
-        try:
-            pay_status.current(AppConfig.PAYMENT_STATUSES.index(reservation['payment_status']))
-        except Exception:
-            pay_status.current(0)
-        pay_status.grid(
-            row=4, column=1, 
-            padx=AppConfig.PADDING['form_field'][0], 
-            pady=AppConfig.PADDING['form_field'][1]
-        )
-        edit_widgets['pay_status'] = pay_status
-    
     def _create_edit_payment_method(self, info_frame, edit_widgets, reservation):
         """Create payment method dropdown for edit mode."""
         ttk.Label(info_frame, text=AppConfig.LABELS['payment_method']).grid(
@@ -373,7 +495,7 @@ class ReservationDetailsDialog:
         
         pay_method = ttk.Combobox(info_frame, values=AppConfig.PAYMENT_METHODS, state='readonly')
         try:
-            pay_method.current(AppConfig.PAYMENT_METHODS.index(reservation['payment_method']))
+            pay_method.current(AppConfig.PAYMENT_METHODS.index(reservation.payment_method))
         except Exception:
             pay_method.current(0)
         pay_method.grid(
@@ -386,7 +508,7 @@ class ReservationDetailsDialog:
         # Reference field
         ref_label = ttk.Label(info_frame, text=AppConfig.LABELS['reference'])
         ref_entry = ttk.Entry(info_frame)
-        ref_entry.insert(0, reservation.get('reference', ''))
+        ref_entry.insert(0, reservation.reference or '')
         
         def on_method_change(event=None):
             if is_reference_required(pay_method.get()):
@@ -411,6 +533,7 @@ class ReservationDetailsDialog:
     
     def _create_edit_buttons(self, btn_frame, edit_widgets, reservation, form):
         """Create buttons for edit mode."""
+        self._clear_buttons(btn_frame)
         ttk.Button(
             btn_frame, 
             text=AppConfig.LABELS['save'], 
@@ -429,8 +552,8 @@ class ReservationDetailsDialog:
         fn = edit_widgets[AppConfig.LABELS['name']].get().strip()
         ln = edit_widgets[AppConfig.LABELS['last_name']].get().strip()
         phone = edit_widgets[AppConfig.LABELS['phone']].get().strip()
+        guests = edit_widgets[AppConfig.LABELS['guests']].get().strip()
         amount = edit_widgets[AppConfig.LABELS['amount']].get().strip()
-        ps = edit_widgets['pay_status'].get()
         pm = edit_widgets['pay_method'].get()
         ref = edit_widgets['ref_entry'].get().strip()
         
@@ -441,47 +564,41 @@ class ReservationDetailsDialog:
             return
         
         reservation_valid, reservation_error = validate_reservation_data(amount, pm, ref)
+        if reservation_valid:
+            reservation_valid, reservation_error = validate_guests(guests)
         if not reservation_valid:
             messagebox.showerror('Error', reservation_error)
             return
         
         # Update reservation
-        self.calendar_logic.add_or_update_reservation(
-            reservation['date'],
-            {'first_name': fn, 'last_name': ln, 'phone': phone},
-            {'amount': float(amount), 'payment_status': ps, 'payment_method': pm, 'reference': ref}
-        )
+        started = telemetry.start()
+        try:
+            self.calendar_logic.add_or_update_reservation(
+                reservation.date,
+                {'first_name': fn, 'last_name': ln, 'phone': phone},
+                {'amount': float(amount), 'guests': int(guests), 'payment_method': pm, 'reference': ref},
+                resource_id=reservation.resource_id
+            )
+        except OverbookingError as exc:
+            messagebox.showerror('Error', str(exc))
+            return
         
-        # Update local reservation object
-        reservation['first_name'] = fn
-        reservation['last_name'] = ln
-        reservation['phone'] = phone
-        reservation['amount'] = float(amount)
-        reservation['payment_status'] = ps
-        reservation['payment_method'] = pm
-        reservation['reference'] = ref
-        
-        # Return to readonly view
-        self._show_readonly_view(btn_frame.master.winfo_children()[0], btn_frame, reservation, form)
-        self.redraw_calendar_callback()
+        # El diálogo vuelve a la vista de solo lectura con la reserva releída
+        # (el estado de pago depende del monto) al publicarse el cambio
+        self._editing.discard(form)
+        telemetry.finish_when_idle(FORM_SAVE, started)
     
     def _cancel_edit(self, btn_frame, reservation, form):
         """Cancel edit mode and return to readonly view."""
         info_frame = btn_frame.master.winfo_children()[0]
+        self._editing.discard(form)
         self._show_readonly_view(info_frame, btn_frame, reservation, form)
     
     def _delete_reservation(self, reservation, form):
         """Delete the reservation after confirmation."""
         if messagebox.askyesno('Confirmar', AppConfig.LABELS['confirm_delete']):
-            self.calendar_logic.delete_reservation(reservation['date'])
+            self.calendar_logic.delete_reservation(reservation.date, reservation.resource_id)
             form.destroy()
-            
-            # Update calendar
-            try:
-                d = datetime.fromisoformat(reservation['date']).date()
-                self.update_cell_callback(d)
-            except Exception:
-                self.redraw_calendar_callback()
 
 
 class FormManager:
@@ -492,33 +609,32 @@ class FormManager:
     para que la aplicación principal interactúe con los formularios.
     """
     
-    def __init__(self, parent, style_manager, calendar_logic, calendar_renderer):
+    def __init__(self, parent, style_manager, calendar_logic, events):
         """
         Inicializar gestor de formularios.
         
+        Los formularios no actualizan el calendario: CalendarLogic publica
+        los días cambiados en el EventBus.
+        
         Args:
             parent: Ventana principal de la aplicación
             style_manager: Instancia de StyleManager
             calendar_logic: Instancia de CalendarLogic
-            calendar_renderer: Instancia de CalendarRenderer
+            events: EventBus de la aplicación
         """
         self.parent = parent
         self.style_manager = style_manager
         self.calendar_logic = calendar_logic
-        self.calendar_renderer = calendar_renderer
         
         # Inicializar componentes de formulario
-        self.reservation_form = ReservationForm(
-            parent, calendar_logic, calendar_renderer.update_cell
-        )
+        self.reservation_form = ReservationForm(parent, calendar_logic)
         
         self.details_dialog = ReservationDetailsDialog(
             parent, 
             style_manager.get_font('day'),
             style_manager.get_font('client'),
             calendar_logic,
-            calendar_renderer.update_cell,
-            calendar_renderer.draw_calendar
+            events
         )
     
     def open_reservation_form(self, day_str):
@@ -535,6 +651,10 @@ class FormManager:
         Mostrar diálogo de detalles de reserva.
         
         Args:
-            reservation (dict): Datos de reserva
+            reservation (Reservation): Datos de reserva
         """
-        self.details_dialog.show(reservation)
\ No newline at end of file
+        self.details_dialog.show(reservation)
+
+
+def _format_amount(value):
+    return f'{value or 0.0:.2f}'
@@ -0,0 +1,56 @@
+"""
+Programador de tareas en inactividad para Kumbayah Calendar App.
+
+Ejecuta el mantenimiento de la base de datos sólo cuando el usuario lleva un
+rato sin interactuar con la aplicación, un paso corto en cada comprobación.
+"""
+import time
+from config.app_config import AppConfig
+
+
+class IdleMaintenanceScheduler:
+    """
+    Lanza pasos de DatabaseMaintenance cuando la aplicación está inactiva.
+
+    Responsable de:
+    - Registrar la última interacción (teclado, ratón)
+    - Comprobar periódicamente si la aplicación está inactiva
+    - Ejecutar como mucho un paso de mantenimiento por comprobación
+    """
+
+    def __init__(self, root, maintenance):
+        """
+        Inicializar programador.
+
+        Args:
+            root: Ventana raíz de Tk
+            maintenance: Instancia de DatabaseMaintenance
+        """
+        self.root = root
+        self.maintenance = maintenance
+        self.config = AppConfig.MAINTENANCE
+        self._last_activity = time.monotonic()
+        self._after_id = None
+
+        for sequence in ('<Any-KeyPress>', '<Any-ButtonPress>', '<Motion>', '<MouseWheel>'):
+            root.bind_all(sequence, self._on_activity, add='+')
+
+    def start(self):
+        """Empezar las comprobaciones periódicas."""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.config['tick_ms'], self._tick)
+
+    def stop(self):
+        """Cancelar la siguiente comprobación (al cerrar la aplicación)."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _on_activity(self, event=None):
+        self._last_activity = time.monotonic()
+
+    def _tick(self):
+        self._after_id = None
+        if time.monotonic() - self._last_activity >= self.config['idle_after_s']:
+            self.maintenance.run_pending()
+        self.start()
@@ -0,0 +1,143 @@
+"""
+Vista de ocupación de todos los recursos para Kumbayah Calendar App.
+
+Muestra un mes completo con una fila por recurso (cabaña, parcela, salón) y
+una columna por día. Los datos salen de una sola consulta para todos los
+recursos y se dibujan en un único Canvas, así que añadir recursos no
+multiplica ni las consultas ni los widgets.
+"""
+import calendar
+import tkinter as tk
+from tkinter import ttk
+from config.app_config import AppConfig
+
+
+class OccupancyView:
+    """
+    Ventana con la ocupación del mes de todos los recursos.
+
+    Responsable de:
+    - Navegar entre meses sin cambiar el mes del calendario principal
+    - Dibujar la cuadrícula recursos × días en un solo Canvas
+    - Abrir en el calendario principal el recurso y mes de la celda pulsada
+    - Redibujarse cuando cambian días del mes mostrado o los clientes (EventBus)
+    """
+
+    def __init__(self, parent, style_manager, calendar_logic, on_select=None):
+        """
+        Inicializar vista de ocupación.
+
+        Args:
+            parent: Ventana principal de la aplicación
+            style_manager: Instancia de StyleManager para fuentes y colores
+            calendar_logic: Instancia de CalendarLogic para datos
+            on_select: Callback (resource_id, date) al hacer click en una celda
+        """
+        self.parent = parent
+        self.style_manager = style_manager
+        self.calendar_logic = calendar_logic
+        self.on_select = on_select
+        self.window = None
+        self.canvas = None
+        self.title_label = None
+        self.month = None
+        self.year = None
+        self._rows = []  # Ids de recurso en el orden de las filas dibujadas
+        self._days = []
+
+    def show(self):
+        """Abrir la vista en el mes del calendario principal, o traerla al frente."""
+        self.month, self.year = self.calendar_logic.get_current_month_year()
+        if self.window is not None and self.window.winfo_exists():
+            self.window.lift()
+        else:
+            self.window = tk.Toplevel(self.parent)
+            self.window.title(AppConfig.LABELS['occupancy_title'])
+            self._create_widgets()
+        self.refresh()
+
+    def _create_widgets(self):
+        """Crear la navegación de meses y el Canvas."""
+        nav = ttk.Frame(self.window)
+        nav.pack(fill='x', padx=AppConfig.PADDING['main_frame'][0], pady=AppConfig.PADDING['main_frame'][1])
+        ttk.Button(nav, text=AppConfig.NAV_BUTTONS['text_prev'], width=AppConfig.NAV_BUTTONS['width'],
+                   command=lambda: self._navigate(-1)).pack(side='left')
+        self.title_label = ttk.Label(nav, text='', font=self.style_manager.get_font('day'))
+        self.title_label.pack(side='left', padx=AppConfig.PADDING['legend_item'] * 3)
+        ttk.Button(nav, text=AppConfig.NAV_BUTTONS['text_next'], width=AppConfig.NAV_BUTTONS['width'],
+                   command=lambda: self._navigate(1)).pack(side='left')
+
+        self.canvas = tk.Canvas(
+            self.window,
+            background=self.style_manager.style.lookup('TFrame', 'background') or None,
+            highlightthickness=0
+        )
+        self.canvas.pack(fill='both', expand=True, padx=AppConfig.PADDING['main_frame'][0],
+                         pady=AppConfig.PADDING['main_frame'][1])
+        self.canvas.bind('<Button-1>', self._on_click)
+
+    def _navigate(self, step):
+        """Cambiar de mes dentro de la vista."""
+        index = self.year * 12 + self.month - 1 + step
+        self.year, self.month = divmod(index, 12)
+        self.month += 1
+        self.refresh()
+
+    def refresh(self):
+        """Volver a leer y dibujar la ocupación del mes mostrado."""
+        resources, days, cells = self.calendar_logic.get_month_occupancy(self.year, self.month)
+        self.title_label.config(text=f'{calendar.month_name[self.month]} {self.year}')
+        self._rows = [resource.id for resource in resources]
+        self._days = days
+
+        config = AppConfig.OCCUPANCY_VIEW
+        name_width, cell_width = config['name_width'], config['cell_width']
+        row_height, header_height = config['row_height'], config['header_height']
+        font = self.style_manager.get_font('client')
+
+        self.canvas.delete('all')
+        self.canvas.config(width=name_width + cell_width * len(days),
+                           height=header_height + row_height * len(resources))
+        for column, day in enumerate(days):
+            x = name_width + column * cell_width
+            self.canvas.create_text(x + cell_width / 2, header_height / 2, text=str(day.day), font=font)
+
+        for row, resource in enumerate(resources):
+            y = header_height + row * row_height
+            self.canvas.create_text(4, y + row_height / 2, text=resource.name, anchor='w', font=font)
+            resource_cells = cells[resource.id]
+            for column, day in enumerate(days):
+                day_info = resource_cells[day.toordinal()]
+                reservation = day_info.reservation
+                x = name_width + column * cell_width
+                self.canvas.create_rectangle(
+                    x + 1, y + 1, x + cell_width - 1, y + row_height - 1,
+                    fill=self.style_manager.get_color_for_status(
+                        reservation.payment_status if reservation else None, day_info.is_available, True),
+                    outline=''
+                )
+                if reservation:
+                    # Inicial del cliente; el detalle se ve en el calendario del recurso
+                    self.canvas.create_text(x + cell_width / 2, y + row_height / 2,
+                                            text=(reservation.first_name or '?')[:1], font=font)
+
+    def on_dates_changed(self, event):
+        """Redibujar si la vista está abierta y cambió algún día de su mes."""
+        if self._is_open() and any((day.year, day.month) == (self.year, self.month) for day in event.days):
+            self.refresh()
+
+    def on_client_changed(self, event):
+        """Redibujar si la vista está abierta (las celdas muestran la inicial del cliente)."""
+        if self._is_open():
+            self.refresh()
+
+    def _is_open(self):
+        return self.window is not None and self.window.winfo_exists()
+
+    def _on_click(self, event):
+        """Abrir en el calendario principal el recurso y el mes de la celda."""
+        config = AppConfig.OCCUPANCY_VIEW
+        column = (event.x - config['name_width']) // config['cell_width']
+        row = (event.y - config['header_height']) // config['row_height']
+        if self.on_select and 0 <= row < len(self._rows) and 0 <= column < len(self._days):
+            self.on_select(self._rows[row], self._days[column])
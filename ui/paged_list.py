@@ -0,0 +1,201 @@
+"""
+Lista paginada para Kumbayah Calendar App.
+
+Treeview con desplazamiento virtual sobre una consulta paginada por clave:
+el widget sólo contiene unas pocas páginas y pide la siguiente (o la
+anterior) cuando la vista se acerca a un extremo, descartando las del
+extremo opuesto. Abrir la lista o desplazarse cuesta lo mismo con cien filas
+que con cientos de miles.
+"""
+from collections import deque
+from tkinter import ttk
+
+
+class PagedTreeview:
+    """
+    Treeview que carga sus filas por páginas a medida que se desplaza.
+
+    Responsable de:
+    - Pedir la página siguiente o anterior a partir de la clave de la fila del extremo
+    - Mantener como máximo `max_pages` páginas en el widget
+    - Conservar la posición visible al añadir o descartar páginas
+    - Notificar la fila seleccionada
+    - Releer las filas desde la primera visible cuando cambian los datos
+    """
+
+    def __init__(self, parent, columns, fetch_page, row_key, row_values, page_size, max_pages,
+                 on_select=None, height=20):
+        """
+        Inicializar lista paginada.
+
+        Args:
+            parent: Widget padre
+            columns (tuple): Identificadores y encabezados de las columnas
+            fetch_page: Callback (clave, hacia_adelante, límite) -> filas en orden
+                ascendente; con clave None devuelve la primera página
+            row_key: Callback fila -> clave de paginación de la fila
+            row_values: Callback fila -> valores de las columnas
+            page_size (int): Filas por página
+            max_pages (int): Páginas que se mantienen a la vez en el widget
+            on_select: Callback con la fila seleccionada (opcional)
+            height (int): Filas visibles
+        """
+        self.fetch_page = fetch_page
+        self.row_key = row_key
+        self.row_values = row_values
+        self.page_size = page_size
+        self.max_pages = max(2, max_pages)
+        self.on_select = on_select
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=columns, show='headings', height=height, selectmode='browse')
+        self.scrollbar = ttk.Scrollbar(self.frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_yscroll)
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+
+        self._pages = deque()  # iids de cada página cargada, en orden
+        self._rows = {}        # iid -> fila
+        self._count = 0
+        self._at_start = True
+        self._at_end = True
+        self._next_iid = 0
+        self._check_pending = None
+        self._key = None  # Clave con la que se cargó la lista
+
+    def reload(self, key=None):
+        """
+        Vaciar la lista y cargar la primera página (p. ej. al cambiar el orden).
+
+        Args:
+            key: Clave de paginación desde la que empezar (p. ej. al saltar a
+                una fecha); las filas anteriores se cargan al subir
+        """
+        if self._rows:
+            self.tree.delete(*self._rows)
+        self._key = key
+        self._pages.clear()
+        self._rows.clear()
+        self._count = 0
+        rows = self.fetch_page(key, True, self.page_size)
+        self._at_start = key is None
+        self._at_end = len(rows) < self.page_size
+        if not rows and key is not None:
+            # Nada a partir de la clave: mostrar las últimas filas
+            rows = self.fetch_page(key, False, self.page_size)
+            self._at_start = len(rows) < self.page_size
+        if rows:
+            self._pages.append(self._insert(rows, at_start=False))
+        self.tree.yview_moveto(0)
+
+    def refresh(self):
+        """
+        Volver a leer la lista a partir de la primera fila visible.
+
+        Tras un cambio de datos, las filas cargadas pueden haber cambiado,
+        desaparecido o tener otras nuevas entre ellas; la lista se recarga
+        desde la clave de la fila anterior a la primera visible, así que la
+        vista queda aproximadamente en el mismo lugar.
+        """
+        if not self._count:
+            self.reload(self._key)
+            return
+        first, _ = self.tree.yview()
+        iids = [iid for page in self._pages for iid in page]
+        top = min(round(first * self._count), self._count - 1)
+        if top > 0:
+            key = self.row_key(self._rows[iids[top - 1]])
+        elif self._at_start:
+            key = self._key
+        else:
+            # La fila anterior a la primera cargada (las páginas de arriba se descartaron)
+            previous = self.fetch_page(self.row_key(self._rows[iids[0]]), False, 1)
+            key = self.row_key(previous[0]) if previous else None
+        self.reload(key)
+
+    def selected_row(self):
+        """
+        Obtener la fila seleccionada.
+
+        Returns:
+            Fila seleccionada, o None
+        """
+        selection = self.tree.selection()
+        return self._rows.get(selection[0]) if selection else None
+
+    def _insert(self, rows, at_start):
+        """Insertar filas al principio o al final; devuelve sus iids."""
+        iids = []
+        for index, row in enumerate(rows):
+            iid = str(self._next_iid)
+            self._next_iid += 1
+            self.tree.insert('', index if at_start else 'end', iid=iid, values=self.row_values(row))
+            self._rows[iid] = row
+            iids.append(iid)
+        self._count += len(iids)
+        return iids
+
+    def _drop(self, iids):
+        """Quitar una página del widget; devuelve cuántas filas quitó."""
+        self.tree.delete(*iids)
+        for iid in iids:
+            del self._rows[iid]
+        self._count -= len(iids)
+        return len(iids)
+
+    def _on_yscroll(self, first, last):
+        """Actualizar la barra y comprobar los extremos cuando Tk esté libre."""
+        self.scrollbar.set(first, last)
+        if self._check_pending is None:
+            self._check_pending = self.tree.after_idle(self._check_edges)
+
+    def _check_edges(self):
+        """Cargar una página si la vista está a menos de media página de un extremo."""
+        self._check_pending = None
+        if not self._count:
+            return
+        first, last = self.tree.yview()
+        top = round(first * self._count)
+        bottom = round(last * self._count)
+        margin = self.page_size // 2
+        if not self._at_end and self._count - bottom < margin:
+            self._load_next(top)
+        elif not self._at_start and top < margin:
+            self._load_prev(top)
+
+    def _load_next(self, top):
+        """Añadir la página siguiente y descartar la primera si sobran páginas."""
+        rows = self.fetch_page(self.row_key(self._rows[self._pages[-1][-1]]), True, self.page_size)
+        self._at_end = len(rows) < self.page_size
+        if not rows:
+            return
+        self._pages.append(self._insert(rows, at_start=False))
+        if len(self._pages) > self.max_pages:
+            top -= self._drop(self._pages.popleft())
+            self._at_start = False
+            self._scroll_to(top)
+
+    def _load_prev(self, top):
+        """Añadir la página anterior y descartar la última si sobran páginas."""
+        rows = self.fetch_page(self.row_key(self._rows[self._pages[0][0]]), False, self.page_size)
+        self._at_start = len(rows) < self.page_size
+        if not rows:
+            return
+        self._pages.appendleft(self._insert(rows, at_start=True))
+        if len(self._pages) > self.max_pages:
+            self._drop(self._pages.pop())
+            self._at_end = False
+        # Las filas añadidas arriba desplazarían la vista: mantener la misma fila arriba
+        self._scroll_to(top + len(rows))
+
+    def _scroll_to(self, index):
+        """Dejar la fila `index` (posición en el widget) en la parte superior."""
+        self.tree.yview_moveto(max(0, index) / self._count if self._count else 0)
+
+    def _on_tree_select(self, event=None):
+        row = self.selected_row()
+        if row is not None and self.on_select:
+            self.on_select(row)
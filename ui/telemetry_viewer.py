@@ -0,0 +1,89 @@
+"""
+Visor de telemetría para Kumbayah Calendar App.
+
+Muestra los percentiles de latencia de cada interacción por versión de la
+aplicación, a partir del archivo de métricas y de la sesión actual.
+"""
+import tkinter as tk
+from tkinter import ttk
+from config.app_config import AppConfig
+
+
+class TelemetryViewer:
+    """
+    Ventana con una tabla de percentiles (p50/p95/p99) por versión e interacción.
+
+    Responsable de:
+    - Elegir el periodo a resumir (últimos días o todo)
+    - Mostrar una fila por versión de la aplicación e interacción
+    """
+
+    def __init__(self, parent, telemetry):
+        """
+        Inicializar visor.
+
+        Args:
+            parent: Ventana principal de la aplicación
+            telemetry: Instancia de Telemetry con las mediciones
+        """
+        self.parent = parent
+        self.telemetry = telemetry
+        self.window = None
+        self.tree = None
+        self.period = None
+
+    def show(self):
+        """Abrir el visor, o traerlo al frente si ya está abierto."""
+        if self.window is not None and self.window.winfo_exists():
+            self.window.lift()
+            self.refresh()
+            return
+        self.window = tk.Toplevel(self.parent)
+        self.window.title(AppConfig.LABELS['telemetry_title'])
+        self._create_widgets()
+        self.refresh()
+
+    def _create_widgets(self):
+        """Crear selector de periodo y tabla de resultados."""
+        top = ttk.Frame(self.window)
+        top.pack(fill='x', padx=AppConfig.PADDING['main_frame'][0], pady=AppConfig.PADDING['main_frame'][1])
+        ttk.Label(top, text=AppConfig.LABELS['telemetry_period']).pack(side='left')
+
+        periods = list(AppConfig.LABELS['telemetry_periods'])
+        self.period = ttk.Combobox(top, values=periods, state='readonly')
+        self.period.current(0)
+        self.period.pack(side='left', padx=AppConfig.PADDING['legend_item'])
+        self.period.bind('<<ComboboxSelected>>', lambda event: self.refresh())
+
+        columns = AppConfig.LABELS['telemetry_columns']
+        self.tree = ttk.Treeview(self.window, columns=columns, show='headings', height=10)
+        for i, column in enumerate(columns):
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=170 if i == 1 else 80, anchor='w' if i < 2 else 'e')
+        self.tree.pack(fill='both', expand=True, padx=AppConfig.PADDING['main_frame'][0],
+                       pady=AppConfig.PADDING['main_frame'][1])
+
+    def refresh(self):
+        """Volver a calcular los percentiles del periodo seleccionado."""
+        days = AppConfig.LABELS['telemetry_periods'][self.period.get()]
+        self.tree.delete(*self.tree.get_children())
+
+        interactions = AppConfig.LABELS['telemetry_interactions']
+        summary = self.telemetry.summary(days)
+        if not summary:
+            self.tree.insert('', 'end', values=('', AppConfig.LABELS['telemetry_empty']))
+            return
+        for (version, name), histogram in sorted(summary.items(), key=lambda item: (str(item[0][0]), item[0][1])):
+            self.tree.insert('', 'end', values=(
+                version,
+                interactions.get(name, name),
+                histogram.count,
+                _format_ms(histogram.percentile(50)),
+                _format_ms(histogram.percentile(95)),
+                _format_ms(histogram.percentile(99)),
+                _format_ms(histogram.max_ms),
+            ))
+
+
+def _format_ms(value):
+    return '' if value is None else f'{value:.1f}'
@@ -0,0 +1,46 @@
+"""
+Utilidades de fechas para Kumbayah Calendar App.
+
+La base de datos guarda los días como números enteros (`date.toordinal()`).
+Estas funciones convierten entre ese número y `datetime.date` en el límite
+de la capa de datos, para que el resto de la aplicación no tenga que
+formatear ni parsear cadenas ISO en cada operación.
+"""
+from datetime import date, datetime
+
+
+# Desplazamiento entre el ordinal de Python (0001-01-01 == 1) y el día juliano
+# de SQLite: date(day + JULIAN_OFFSET) produce la fecha ISO del ordinal.
+JULIAN_OFFSET = 1721424.5
+
+
+def to_day_number(value):
+    """
+    Convertir una fecha a número de día.
+
+    Args:
+        value (date | datetime | str | int): Fecha, cadena AAAA-MM-DD o número de día
+
+    Returns:
+        int: Número de día (ordinal proléptico gregoriano)
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(value).toordinal()
+
+
+def from_day_number(day_number):
+    """
+    Convertir un número de día a fecha.
+
+    Args:
+        day_number (int): Número de día
+
+    Returns:
+        datetime.date: Fecha correspondiente
+    """
+    return date.fromordinal(day_number)
@@ -0,0 +1,241 @@
+"""
+Telemetría de latencia de interacciones para Kumbayah Calendar App.
+
+Mide el tiempo real de las interacciones del usuario (navegar de mes, abrir
+un día, guardar un formulario, cambiar disponibilidad, deshacer) y lo
+acumula en histogramas de cubos fijos, uno por interacción y por día. Al
+cerrar la aplicación se suman al archivo JSON local de métricas, agrupados
+por versión de la aplicación, para poder comparar percentiles entre días y
+versiones.
+
+Registrar una medición sólo cuesta una búsqueda binaria y un incremento.
+"""
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import date, timedelta
+from config.app_config import AppConfig
+
+# Límites superiores (ms) de los cubos; el último cubo recoge todo lo mayor
+BUCKET_BOUNDS_MS = (1, 2, 3, 5, 8, 12, 16, 25, 33, 50, 75, 100, 150, 200,
+                    300, 500, 750, 1000, 2000, 5000)
+
+# Interacciones medidas
+MONTH_NAVIGATION = 'month_navigation'
+DAY_CLICK = 'day_click'
+FORM_SAVE = 'form_save'
+AVAILABILITY_TOGGLE = 'availability_toggle'
+UNDO = 'undo'
+
+
+class LatencyHistogram:
+    """Histograma de latencias con cubos fijos (BUCKET_BOUNDS_MS)."""
+
+    __slots__ = ('counts', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self, counts=None, count=0, total_ms=0.0, max_ms=0.0):
+        self.counts = list(counts) if counts else [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = count
+        self.total_ms = total_ms
+        self.max_ms = max_ms
+
+    def record(self, ms):
+        """Añadir una medición en milisegundos."""
+        self.counts[bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def merge(self, other):
+        """Sumar otro histograma a este."""
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, p):
+        """
+        Estimar un percentil interpolando dentro de su cubo.
+
+        Args:
+            p (float): Percentil entre 0 y 100
+
+        Returns:
+            float: Latencia estimada en ms (None si no hay mediciones)
+        """
+        if not self.count:
+            return None
+        target = self.count * p / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= target:
+                if i == len(BUCKET_BOUNDS_MS):
+                    return self.max_ms
+                lower = BUCKET_BOUNDS_MS[i - 1] if i else 0
+                upper = min(BUCKET_BOUNDS_MS[i], self.max_ms)
+                return lower + (upper - lower) * (target - seen) / n
+            seen += n
+        return self.max_ms
+
+    def to_dict(self):
+        return {'counts': self.counts, 'count': self.count,
+                'total_ms': round(self.total_ms, 3), 'max_ms': round(self.max_ms, 3)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['counts'], data['count'], data['total_ms'], data['max_ms'])
+
+
+class Telemetry:
+    """
+    Registro de latencias en memoria con volcado a un archivo JSON.
+
+    Responsable de:
+    - Medir interacciones (hasta que la interfaz queda libre si hay widget)
+    - Acumular histogramas por día e interacción
+    - Sumar lo acumulado al archivo de métricas al cerrar
+    - Resumir los percentiles por versión e interacción para el visor
+    """
+
+    def __init__(self, path=None, version=None, enabled=True):
+        self.path = path
+        self.version = version
+        self.enabled = enabled
+        self._widget = None
+        self._histograms = {}  # (día ISO, interacción) -> LatencyHistogram
+
+    def configure(self, path, version, enabled=True):
+        """Indicar el archivo de métricas y la versión de la aplicación."""
+        self.path = path
+        self.version = version
+        self.enabled = enabled
+
+    def attach(self, widget):
+        """Usar el bucle de eventos de `widget` para finish_when_idle()."""
+        self._widget = widget
+
+    def start(self):
+        """Marca de tiempo de inicio de una interacción (None si está desactivada)."""
+        return time.perf_counter() if self.enabled else None
+
+    def finish(self, name, started):
+        """Registrar la interacción iniciada en `started`."""
+        if started is None:
+            return
+        self.record(name, (time.perf_counter() - started) * 1000)
+
+    def finish_when_idle(self, name, started):
+        """
+        Registrar la interacción cuando Tk termine el trabajo pendiente.
+
+        Los redibujados y cambios de geometría se procesan como tareas
+        inactivas encoladas antes que esta, así que la medición incluye el
+        tiempo hasta que el resultado es visible.
+        """
+        if started is None:
+            return
+        if self._widget is None:
+            self.finish(name, started)
+        else:
+            self._widget.after_idle(self.finish, name, started)
+
+    @contextmanager
+    def measure(self, name):
+        """Medir un bloque síncrono: `with telemetry.measure(FORM_SAVE): ...`."""
+        started = self.start()
+        try:
+            yield
+        finally:
+            self.finish(name, started)
+
+    def record(self, name, ms):
+        """Añadir una medición en ms a la interacción `name` del día de hoy."""
+        key = (date.today().isoformat(), name)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = LatencyHistogram()
+        histogram.record(ms)
+
+    def flush(self):
+        """
+        Sumar las mediciones en memoria al archivo de métricas.
+
+        Los días más antiguos que AppConfig.TELEMETRY['retention_days'] se
+        descartan. Un error de escritura nunca interrumpe el cierre.
+        """
+        if not self.enabled or not self.path or not self._histograms:
+            return
+        data = self._load()
+        days = data['versions'].setdefault(self.version, {})
+        for (day, name), histogram in self._histograms.items():
+            day_entry = days.setdefault(day, {})
+            total = LatencyHistogram.from_dict(day_entry[name]) if name in day_entry else LatencyHistogram()
+            total.merge(histogram)
+            day_entry[name] = total.to_dict()
+
+        oldest = (date.today() - timedelta(days=AppConfig.TELEMETRY['retention_days'])).isoformat()
+        for version_days in data['versions'].values():
+            for day in [d for d in version_days if d < oldest]:
+                del version_days[day]
+
+        tmp_path = f'{self.path}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as out:
+                json.dump(data, out)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            return
+        self._histograms.clear()
+
+    def summary(self, days=None):
+        """
+        Histogramas agregados por versión e interacción.
+
+        Args:
+            days (int): Considerar sólo los últimos `days` días (None = todos)
+
+        Returns:
+            dict: {(versión, interacción): LatencyHistogram}, incluyendo las
+            mediciones de esta sesión aún no volcadas
+        """
+        oldest = (date.today() - timedelta(days=days - 1)).isoformat() if days else ''
+        entries = [
+            (version, day, name, LatencyHistogram.from_dict(stored))
+            for version, version_days in self._load()['versions'].items()
+            for day, names in version_days.items()
+            for name, stored in names.items()
+        ]
+        entries.extend((self.version, day, name, histogram)
+                       for (day, name), histogram in self._histograms.items())
+
+        result = {}
+        for version, day, name, histogram in entries:
+            if day < oldest:
+                continue
+            total = result.get((version, name))
+            if total is None:
+                total = result[(version, name)] = LatencyHistogram()
+            total.merge(histogram)
+        return result
+
+    def _load(self):
+        # Un archivo ausente, dañado o con otros cubos se empieza de nuevo
+        empty = {'bounds_ms': list(BUCKET_BOUNDS_MS), 'versions': {}}
+        if not self.path or not os.path.exists(self.path):
+            return empty
+        try:
+            with open(self.path, encoding='utf-8') as src:
+                data = json.load(src)
+        except (OSError, ValueError):
+            return empty
+        if data.get('bounds_ms') != list(BUCKET_BOUNDS_MS):
+            return empty
+        return data
+
+
+# Instancia compartida por toda la aplicación; main.py la configura
+telemetry = Telemetry(enabled=False)
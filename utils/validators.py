@@ -58,6 +58,23 @@ def validate_reservation_data(amount, payment_method, reference):
     return True, None
 
 
+def validate_guests(guests):
+    """
+    Validar el número de huéspedes de una reserva.
+    
+    Args:
+        guests (str | int): Número de huéspedes
+        
+    Returns:
+        tuple: (es_valido, mensaje_error)
+    """
+    try:
+        valid = int(guests) >= 1
+    except (ValueError, TypeError):
+        valid = False
+    return (True, None) if valid else (False, AppConfig.LABELS['guests_invalid'])
+
+
 def validate_phone(phone):
     """
     Validar formato de número de teléfono.